@@ -1,8 +1,17 @@
 from sqlalchemy import URL
 
 from ash_dal.dao import AsyncBaseDAO, BaseDAO
-from ash_dal.database import AsyncDatabase, Database
-from ash_dal.utils import AsyncDeferredJoinPaginator, AsyncPaginator, DeferredJoinPaginator, Paginator, PaginatorPage
+from ash_dal.database import AsyncDatabase, Database, PoolConfig
+from ash_dal.utils import (
+    AsyncDeferredJoinPaginator,
+    AsyncKeysetPaginator,
+    AsyncPaginator,
+    CursorPage,
+    DeferredJoinPaginator,
+    KeysetPaginator,
+    Paginator,
+    PaginatorPage,
+)
 
 __VERSION__ = "0.3.0"
 
@@ -12,10 +21,14 @@ __all__ = [
     "BaseDAO",
     "Paginator",
     "DeferredJoinPaginator",
+    "KeysetPaginator",
     "AsyncDatabase",
     "AsyncBaseDAO",
     "AsyncPaginator",
     "AsyncDeferredJoinPaginator",
+    "AsyncKeysetPaginator",
     "PaginatorPage",
+    "CursorPage",
     "URL",
+    "PoolConfig",
 ]
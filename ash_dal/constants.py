@@ -1,2 +1 @@
-
 PAGINATOR_FIRST_PAGE_INDEX = 1
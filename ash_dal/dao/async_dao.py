@@ -1,18 +1,53 @@
+import asyncio
+import time
 import typing as t
+from contextlib import aclosing, asynccontextmanager
+from functools import partial
 
-from sqlalchemy import delete, insert, select, update
+from sqlalchemy import Result, ScalarResult, Select, delete, insert, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 from ash_dal.constants import PAGINATOR_FIRST_PAGE_INDEX
 from ash_dal.dao.mixin import BaseDAOMixin
 from ash_dal.database import AsyncDatabase
+from ash_dal.exceptions.paginator import PaginationError
 from ash_dal.typing import Entity
 from ash_dal.utils import AsyncPaginator
-from ash_dal.utils.paginator import PaginatorPage
-from ash_dal.utils.paginator.interface import AsyncPaginatorFactoryProtocol
+from ash_dal.utils.bulk_insert import BulkInsertMode, auto_increment_pks
+from ash_dal.utils.bulk_update import bulk_update_row_size
+from ash_dal.utils.chunking import chunked
+from ash_dal.utils.coalescer import LookupCoalescer
+from ash_dal.utils.instrumentation import instrument
+from ash_dal.utils.metrics import record_rows
+from ash_dal.utils.paginator import CursorPage, PaginatorPage
+from ash_dal.utils.paginator.interface import AsyncPaginatorFactoryProtocol, IAsyncKeysetPaginator
+from ash_dal.utils.partitioning import (
+    PKRange,
+    ScanBoundaries,
+    ScanQueries,
+    build_scan_bounds_query,
+    check_scan_arguments,
+    scan_batch_query,
+    scan_ranges,
+)
+from ash_dal.utils.progress import BulkProgress, ProgressCallback
+from ash_dal.utils.tracing import SPAN_FETCH, child_span
+from ash_dal.utils.upsert import (
+    UpsertResult,
+    build_existing_rows_count_query,
+    dedupe_upsert_rows,
+    upsert_result,
+)
+
+# Batches of a partition reader buffered for the consumer of a parallel scan
+_SCAN_BUFFERED_BATCHES = 2
 
 
 class AsyncBaseDAO(BaseDAOMixin[Entity]):
     __paginator_factory__: AsyncPaginatorFactoryProtocol = AsyncPaginator
+    # Merge `get_by_pk` and `get_by_unique_key` calls made in the same event loop tick into one `IN (...)` query
+    __coalesce_lookups__: bool = False
 
     def __init__(self, database: AsyncDatabase):
         self._db = database
@@ -26,30 +61,112 @@ class AsyncBaseDAO(BaseDAOMixin[Entity]):
         assert hasattr(self, "_db")
         return self._db
 
+    @property
+    def _transaction_session(self) -> Session | None:
+        session = self.db.current_session
+        return session.sync_session if session is not None else None
+
+    @asynccontextmanager
+    async def _session(self) -> t.AsyncIterator[AsyncSession]:
+        """
+        Reuse the session of the current `AsyncDatabase.transaction` scope or open a new one
+        """
+        session = self.db.current_session
+        if session is not None:
+            yield session
+            return
+        async with self.db.session as session:
+            yield session
+
+    async def _commit(self, session: AsyncSession) -> None:
+        # Changes made inside an `AsyncDatabase.transaction` scope are committed at its exit
+        if session is not self.db.current_session:
+            await session.commit()
+        await self.db.record_write()
+
+    @instrument()
     async def get_by_pk(self, pk: t.Any) -> Entity | None:
         """
-        Using this method you can fetch an entity by its primary key
+        Using this method you can fetch an entity by its primary key. If `__entity_cache__` is set,
+        the entity is looked up in the cache first.
         :param pk: the record's primary key value
         :return: Entity instance or None if the record is not found
         """
-        async with self.db.session as session:
-            db_item = await session.get(self.__model__, pk, options=self.__default_load_options__)
+        cache = self._active_entity_cache
+        if cache is None:
+            return await self._fetch_by_pk(pk)
+        key = self._entity_cache_key(pk)
+        is_cached, entity = cache.get(key)
+        if is_cached:
+            return entity
+        generation = cache.generation
+        entity = await self._fetch_by_pk(pk)
+        cache.set(key, entity, generation=generation)
+        return entity
+
+    async def _fetch_by_pk(self, pk: t.Any) -> Entity | None:
+        if self._coalesce_lookups:
+            entity = await self._get_coalescer(keys=self._entity_converter.primary_key_keys).load(pk)
+            record_rows(0 if entity is None else 1)
+            return entity
+        async with self._session() as session:
+            if self.__use_core_rows__:
+                query, params = self._prepare_pk_query(pk)
+                result = await session.execute(query, params)
+                db_item = result.first()
+            else:
+                db_item = await session.get(self.__model__, pk, options=self.__default_load_options__)
             if not db_item:
                 return None
-            item_dict = {k: getattr(db_item, k) for k in self._model_columns}
-            return self.__entity__(**item_dict)
+            return self._convert_db_item_in_entity(db_item=db_item)
 
+    @instrument()
+    async def get_many_by_pk(self, pks: t.Iterable[t.Any]) -> dict[t.Any, Entity]:
+        """
+        Fetch entities by primary keys with `IN (...)` queries of at most `__default_in_chunk_size__` keys
+        instead of a query per key. Cached entities are taken from `__entity_cache__` if it is set.
+        :param pks: primary key values. Values of composite primary keys are passed as tuples
+        :return: a dict that maps primary keys to entities. Keys that have no record are missing in it
+        """
+        unique_pks = tuple(dict.fromkeys(pks))
+        pk_keys = self._entity_converter.primary_key_keys
+        cache = self._active_entity_cache
+        if cache is None:
+            return await self._fetch_many_by_keys(keys=pk_keys, values=unique_pks)
+        entities, missing_pks = self._get_cached_entities(unique_pks)
+        generation = cache.generation
+        fetched = await self._fetch_many_by_keys(keys=pk_keys, values=missing_pks)
+        self._cache_entities(missing_pks, entities=fetched, generation=generation)
+        return {**entities, **fetched}
+
+    @instrument()
+    async def get_by_unique_key(self, field: str, value: t.Any) -> Entity | None:
+        """
+        Fetch an entity by a value of a unique field. Lookups are coalesced if `__coalesce_lookups__` is set.
+        :param field: name of a model attribute with unique values
+        :param value: the value to look up
+        :return: Entity instance or None if the record is not found
+        """
+        if self._coalesce_lookups:
+            entity = await self._get_coalescer(keys=(field,)).load(value)
+            record_rows(0 if entity is None else 1)
+            return entity
+        value = self._coerce_key(keys=(field,), value=value)
+        entities = await self._fetch_many_by_keys(keys=(field,), values=(value,))
+        return entities.get(value)
+
+    @instrument()
     async def all(self) -> tuple[Entity, ...]:
         """
         Using this method you can fetch all entities from the database
         :return: a tuple with entities
         """
-        async with self.db.session as session:
-            db_items = await session.scalars(select(self.__model__).options(*self.__default_load_options__))
-            if self.__default_load_options__:
-                db_items = db_items.unique().all()
+        async with self._session() as session:
+            query, params = self._prepare_query()
+            db_items = await self._fetch_db_items(session=session, query=query, params=params)
             return self._get_entities_from_db_items(db_items=db_items)
 
+    @instrument()
     async def get_page(
         self,
         page_index: int = PAGINATOR_FIRST_PAGE_INDEX,
@@ -63,80 +180,433 @@ class AsyncBaseDAO(BaseDAOMixin[Entity]):
         :param page_size: Numeric value. Defines size of the page that will be returned
         :return: An instance of :class:`PaginatorPage` that includes entities.
         """
-        query = select(self.__model__).options(*self.__default_load_options__)
-        if specification:
-            query = query.filter_by(**specification)
-
-        async with self.db.session as session:
+        query = self._build_query(specification=specification)
+        async with self._session() as session:
             paginator = self.__paginator_factory__(
                 session=session,
                 query=query,
                 page_size=page_size or self.__default_page_size__,
             )
             page = await paginator.get_page(page_index=page_index)
-            entities = self._get_entities_from_db_items(db_items=page)
-            return PaginatorPage(index=page_index, items=entities, pages_count=await paginator.size)
+            return self._convert_db_page_in_entity_page(db_page=page)
+
+    @instrument()
+    async def get_page_after(
+        self,
+        cursor: str,
+        page_size: int | None = None,
+        specification: dict[str, t.Any] | None = None,
+        with_count: bool = False,
+    ) -> CursorPage[Entity]:
+        """
+        Fetch the page a cursor points to. Works only with cursor based paginators
+        (e.g. :class:`AsyncKeysetPaginator`), otherwise :class:`PaginationError` is raised.
+        :param cursor: an opaque token taken from `next_cursor` or `previous_cursor` of a previously fetched page
+        :param page_size: Numeric value. Defines size of the page that will be returned
+        :param specification: Can be used to filter the entities you want to receive. Must be the same
+        specification that was used to fetch the page the cursor was taken from.
+        :param with_count: run the count query to fill `pages_count` of the page. Pages reached by cursors
+        aren't counted by default, so they cost the same at any depth.
+        :return: An instance of :class:`CursorPage` that includes entities.
+        """
+        query = self._build_query(specification=specification)
+        async with self._session() as session:
+            paginator = self.__paginator_factory__(
+                session=session,
+                query=query,
+                page_size=page_size or self.__default_page_size__,
+            )
+            if not isinstance(paginator, IAsyncKeysetPaginator):
+                raise PaginationError(f"{type(paginator).__name__} does not support cursor pagination")
+            page = await paginator.get_page_after(cursor=cursor, with_count=with_count)
+            return self._convert_db_cursor_page_in_entity_page(db_page=page)
 
+    @instrument()
     async def paginate(
         self,
         specification: dict[str, t.Any] | None = None,
         page_size: int | None = None,
+        prefetch: int = 0,
     ) -> t.AsyncIterator[PaginatorPage[Entity]]:
         """
         An iterator that returns pages with entities.
         :param specification: Can be used to filter the entities you want to receive.
         :param page_size: Numeric value. Defines size of pages that will be returned
+        :param prefetch: Numeric value. Defines how many pages are fetched ahead on separate connections
+        while the current page is being processed. Pages are fetched one by one if it equals 0.
         :return: :class:`t.Iterator` that returns :class:`PaginatorPage` with entities
         """
-        async with self.db.session as session:
-            query = select(self.__model__).options(*self.__default_load_options__)
-            if specification:
-                query = query.filter_by(**specification)
+        async with self._session() as session:
+            query = self._build_query(specification=specification)
             paginator = self.__paginator_factory__(
                 session=session,
                 query=query,
                 page_size=page_size or self.__default_page_size__,
             )
-            async for page in paginator.paginate():
-                entities = self._get_entities_from_db_items(db_items=page)
-                yield PaginatorPage(index=page.index, items=entities, pages_count=await paginator.size)
+            # Prefetched pages are read on other connections, that don't see changes of a transaction scope
+            prefetch = prefetch if self.db.current_session is None else 0
+            pages = paginator.paginate(prefetch=prefetch) if prefetch else paginator.paginate()
+            # Close the pages generator right away on early exit, so its prefetching tasks are cancelled
+            async with aclosing(t.cast(t.AsyncGenerator[PaginatorPage[t.Any], None], pages)):
+                async for page in pages:
+                    yield self._convert_db_page_in_entity_page(db_page=page)
 
+    @instrument()
+    async def stream(
+        self,
+        specification: dict[str, t.Any] | None = None,
+        batch_size: int | None = None,
+    ) -> t.AsyncIterator[Entity]:
+        """
+        Iterate over entities with a single query read through a server-side cursor, so memory usage stays constant
+        regardless of the number of records. Collections can't be loaded with `joinedload` in this mode,
+        so `__stream_load_options__` are applied instead of `__default_load_options__` if they are defined.
+        :param specification: Can be used to filter the entities you want to receive.
+        :param batch_size: Numeric value. Defines how many rows are fetched from the cursor at once
+        :return: :class:`t.AsyncIterator` that returns entities
+        """
+        async with aclosing(self.stream_batches(specification=specification, batch_size=batch_size)) as batches:
+            async for batch in batches:
+                for entity in batch:
+                    yield entity
+
+    @instrument()
+    async def stream_batches(
+        self,
+        specification: dict[str, t.Any] | None = None,
+        batch_size: int | None = None,
+    ) -> t.AsyncGenerator[tuple[Entity, ...], None]:
+        """
+        The same as `stream`, but yields entities in batches of `batch_size`
+        :param specification: Can be used to filter the entities you want to receive.
+        :param batch_size: Numeric value. Defines size of batches that will be returned
+        :return: :class:`t.AsyncIterator` that returns tuples with entities
+        """
+        async with self._session() as session:
+            query, params = self._prepare_stream_query(specification=specification, batch_size=batch_size)
+            result = await (
+                session.stream(query, params) if self.__use_core_rows__ else session.stream_scalars(query, params)
+            )
+            async for db_items in result.partitions():
+                yield self._get_entities_from_db_items(db_items=db_items)
+
+    @instrument()
+    async def parallel_scan(
+        self,
+        specification: dict[str, t.Any] | None = None,
+        partitions: int = 4,
+        concurrency: int | None = None,
+        batch_size: int | None = None,
+        ordered: bool = False,
+        boundaries: ScanBoundaries = ScanBoundaries.MIN_MAX,
+    ) -> t.AsyncIterator[Entity]:
+        """
+        Iterate over entities, reading ranges of primary keys concurrently on separate pooled connections,
+        so full-table jobs scale with the pool size. Every partition is read in batches ordered by the primary key.
+        Rows inserted after the scan has started and beyond the max primary key at that moment aren't read.
+        Inside an `AsyncDatabase.transaction` scope partitions are read one by one in the session of the scope.
+        :param specification: Can be used to filter the entities you want to receive.
+        :param partitions: Numeric value. Defines how many ranges the primary key space is split into
+        :param concurrency: Numeric value. Defines how many partitions are read at once, all of them if not set
+        :param batch_size: Numeric value. Defines how many rows are fetched by one query
+        :param ordered: Entities are returned in the primary key order if True, or as soon as they are read otherwise
+        :param boundaries: Defines how the primary key space is split, see :class:`ScanBoundaries`
+        :return: :class:`t.AsyncIterator` that returns entities
+        """
+        batches = self.parallel_scan_batches(
+            specification=specification,
+            partitions=partitions,
+            concurrency=concurrency,
+            batch_size=batch_size,
+            ordered=ordered,
+            boundaries=boundaries,
+        )
+        async with aclosing(batches):
+            async for batch in batches:
+                for entity in batch:
+                    yield entity
+
+    @instrument()
+    async def parallel_scan_batches(
+        self,
+        specification: dict[str, t.Any] | None = None,
+        partitions: int = 4,
+        concurrency: int | None = None,
+        batch_size: int | None = None,
+        ordered: bool = False,
+        boundaries: ScanBoundaries = ScanBoundaries.MIN_MAX,
+    ) -> t.AsyncGenerator[tuple[Entity, ...], None]:
+        """
+        The same as `parallel_scan`, but yields entities in batches of at most `batch_size`.
+        Close the generator (e.g. with `contextlib.aclosing`) if the iteration is stopped early,
+        so the partition readers are cancelled.
+        :return: :class:`t.AsyncIterator` that returns tuples with entities
+        """
+        check_scan_arguments(partitions=partitions, concurrency=concurrency)
+        async with self._session() as session:
+            bounds_query = build_scan_bounds_query(
+                self.__model__, self._scan_pk_field(), specification, partitions=partitions, boundaries=boundaries
+            )
+            bounds = (await session.execute(bounds_query)).all()
+        ranges = scan_ranges(bounds, partitions=partitions, boundaries=boundaries)
+        if not ranges:
+            return
+        queries = self._prepare_scan_queries(specification=specification, batch_size=batch_size)
+        # Partitions are read on other connections, that don't see changes of a transaction scope
+        concurrency = 1 if self.db.current_session is not None else min(concurrency or len(ranges), len(ranges))
+        # An item of a queue is a batch, None once a partition is read, or an error of a partition reader
+        queues = [
+            asyncio.Queue[t.Any](maxsize=_SCAN_BUFFERED_BATCHES if ordered else _SCAN_BUFFERED_BATCHES * concurrency)
+            for _ in range(len(ranges) if ordered else 1)
+        ]
+        pending = iter(enumerate(ranges))
+        # Readers stop between batches instead of being cancelled, so queries aren't interrupted
+        # and connections are returned to the pool in a clean state
+        stopped = asyncio.Event()
+
+        async def read_partitions() -> None:
+            # Partitions are taken in order, so the partition awaited by an ordered consumer is always being read
+            for index, pk_range in pending:
+                if stopped.is_set():
+                    return
+                queue = queues[index if ordered else 0]
+                try:
+                    async with aclosing(self._scan_partition(queries=queries, pk_range=pk_range)) as batches:
+                        async for db_items in batches:
+                            await queue.put(self._get_entities_from_db_items(db_items=db_items))
+                            if stopped.is_set():
+                                return
+                except Exception as error:
+                    await queue.put(error)
+                    return
+                await queue.put(None)
+
+        readers = [asyncio.create_task(read_partitions()) for _ in range(concurrency)]
+        try:
+            for queue in queues:
+                partitions_left = 1 if ordered else len(ranges)
+                while partitions_left:
+                    item = await queue.get()
+                    if item is None:
+                        partitions_left -= 1
+                    elif isinstance(item, Exception):
+                        raise item
+                    else:
+                        yield item
+        finally:
+            stopped.set()
+            # After the stop a reader puts at most one more item, a drained queue has room for items of all its readers
+            for queue in queues:
+                while not queue.empty():
+                    queue.get_nowait()
+            await asyncio.gather(*readers, return_exceptions=True)
+
+    async def _scan_partition(
+        self, queries: ScanQueries, pk_range: PKRange
+    ) -> t.AsyncGenerator[t.Sequence[t.Any], None]:
+        async with self._session() as session:
+            after = None
+            while True:
+                query, params = scan_batch_query(queries, pk_range=pk_range, after=after)
+                db_items = await self._fetch_db_items(session=session, query=query, params=params)
+                if db_items:
+                    yield db_items
+                if len(db_items) < queries.batch_size:
+                    return
+                after = self._db_item_key(db_items[-1], (queries.pk_key,))
+
+    @instrument()
     async def filter(self, specification: dict[str, t.Any]) -> tuple[Entity, ...]:
         """
         Fetches entities from database by specification.
         :param specification: a dict that will be used for filtering
         :return: a tuple with entities
         """
-        async with self.db.session as session:
-            db_items = await session.scalars(
-                select(self.__model__).filter_by(**specification).options(*self.__default_load_options__),
-            )
-            if self.__default_load_options__:
-                db_items = db_items.unique().all()
+        async with self._session() as session:
+            query, params = self._prepare_query(specification=specification)
+            db_items = await self._fetch_db_items(session=session, query=query, params=params)
             return self._get_entities_from_db_items(db_items=db_items)
 
+    @instrument()
     async def create(self, data: dict[str, t.Any]) -> Entity:
         """
         Creates an entity in database
         :param data: a dict that represents entity to be created.
         :return: a created entity instance
         """
-        async with self.db.session as session:
+        async with self._session() as session:
             result = await session.execute(insert(self.__model__).values(**data))
-            await session.commit()
+            record_rows(1)
+            await self._commit(session)
+            self._invalidate_entity_cache(
+                specification=dict(zip(self._entity_converter.primary_key_keys, result.inserted_primary_key))
+            )
             pk_dict: dict[str, t.Any] = result.inserted_primary_key._asdict()  # pyright: ignore
             response_data = {**data, **pk_dict}
             return self._dict_to_entity(dict_=response_data)
 
-    async def bulk_create(self, data: t.Sequence[dict[str, t.Any]]):
+    @t.overload
+    async def bulk_create(
+        self,
+        data: t.Iterable[dict[str, t.Any]] | t.AsyncIterable[dict[str, t.Any]],
+        chunk_size: int | None = None,
+        chunk_bytes: int | None = None,
+        commit_per_chunk: bool = False,
+        progress_callback: ProgressCallback | None = None,
+        return_entities: t.Literal[False] = False,
+    ) -> None:
+        ...
+
+    @t.overload
+    async def bulk_create(
+        self,
+        data: t.Iterable[dict[str, t.Any]] | t.AsyncIterable[dict[str, t.Any]],
+        chunk_size: int | None = None,
+        chunk_bytes: int | None = None,
+        commit_per_chunk: bool = False,
+        progress_callback: ProgressCallback | None = None,
+        *,
+        return_entities: t.Literal[True],
+    ) -> list[Entity]:
+        ...
+
+    @instrument()
+    async def bulk_create(
+        self,
+        data: t.Iterable[dict[str, t.Any]] | t.AsyncIterable[dict[str, t.Any]],
+        chunk_size: int | None = None,
+        chunk_bytes: int | None = None,
+        commit_per_chunk: bool = False,
+        progress_callback: ProgressCallback | None = None,
+        return_entities: bool = False,
+    ) -> list[Entity] | None:
         """
-        Create multiple records by one request
-        :param data: a sequence with dicts that represent entities to be created
+        Create multiple entities with multi-row statements. The data is consumed lazily chunk by chunk, so
+        the memory usage doesn't depend on the count of rows.
+        :param data: an iterable or an async iterable with dicts that represent entities to be created
+        :param chunk_size: max count of rows in one statement, `__default_bulk_chunk_size__` by default
+        :param chunk_bytes: max estimated size of row values in one statement. Defaults to a part of
+        `max_allowed_packet` on MySQL and isn't limited on other DBs.
+        :param commit_per_chunk: commit every chunk in its own transaction instead of committing all of them at once.
+        Chunks committed before an error are kept.
+        :param progress_callback: function called with a :class:`BulkProgress` after every written chunk
+        :param return_entities: return created entities with generated primary keys. Keys are read with
+        `INSERT ... RETURNING` where the DB supports it and derived from `LAST_INSERT_ID()` on MySQL, so each chunk
+        still takes one statement. Other DBs fall back to a statement per row. All entities are kept in memory.
+        :return: a list of created entities if `return_entities` is True
         """
-        async with self.db.session as session:
-            await session.execute(insert(self.__model__), data)
-            await session.commit()
+        max_allowed_packet = await self.db.get_max_allowed_packet()
+        chunks = self._asplit_bulk_data(data, max_allowed_packet, chunk_size=chunk_size, chunk_bytes=chunk_bytes)
+        started_at = time.perf_counter()
+        rows_count = chunks_count = 0
+        entities: list[Entity] = []
+        async with self._session() as session:
+            id_increment = await self._get_auto_increment_increment(session) if return_entities else 1
+            async for rows in chunks:
+                if return_entities:
+                    entities.extend(await self._insert_returning_entities(session, rows, id_increment=id_increment))
+                else:
+                    await session.execute(insert(self.__model__), rows)
+                if commit_per_chunk:
+                    await self._commit(session)
+                    self._invalidate_entity_cache()
+                rows_count += len(rows)
+                record_rows(len(rows))
+                chunks_count += 1
+                if progress_callback:
+                    elapsed = time.perf_counter() - started_at
+                    progress_callback(BulkProgress(rows=rows_count, chunks=chunks_count, elapsed=elapsed))
+            await self._commit(session)
+        self._invalidate_entity_cache()
+        return entities if return_entities else None
+
+    @instrument()
+    async def bulk_upsert(
+        self,
+        data: t.Sequence[dict[str, t.Any]],
+        update_fields: t.Sequence[str] | None = None,
+        conflict_fields: t.Sequence[str] | None = None,
+    ) -> UpsertResult:
+        """
+        Insert records or update the existing ones with multi-row statements: `INSERT ... ON DUPLICATE KEY UPDATE`
+        on MySQL and `INSERT ... ON CONFLICT DO UPDATE` on SQLite and PostgreSQL. Rows are split into statements
+        of at most `__default_bulk_chunk_size__` rows that fit into `max_allowed_packet`, and committed at once.
+        :param data: a sequence with dicts that represent entities, all of them must have the same keys.
+        Of rows with the same conflict fields only the last one is written
+        :param update_fields: fields overwritten in existing records. All passed fields except `conflict_fields`
+        by default. If no fields are left, a :class:`ValueError` exception will be raised.
+        :param conflict_fields: fields of a unique index that identifies existing records, the primary key by default.
+        MySQL checks all unique indexes of the table instead.
+        :return: an instance of :class:`UpsertResult` with counts of inserted and updated records
+        """
+        if not data:
+            return UpsertResult()
+        update_fields, conflict_fields = self._resolve_upsert_fields(data, update_fields, conflict_fields)
+        data = dedupe_upsert_rows(data, conflict_fields=conflict_fields)
+        dialect_name = self.db.engine.dialect.name
+        max_allowed_packet = await self.db.get_max_allowed_packet()
+        result = UpsertResult()
+        async with self._session() as session:
+            for rows in self._split_bulk_data(data, max_allowed_packet=max_allowed_packet):
+                existing_rows_count = 0
+                count_query = build_existing_rows_count_query(self.__model__, rows, conflict_fields=conflict_fields)
+                if dialect_name != "mysql" and count_query is not None:
+                    # Existing rows are counted on the primary within the upsert transaction
+                    count_result = await session.execute(
+                        count_query, bind_arguments={"bind": self.db.engine.sync_engine}
+                    )
+                    existing_rows_count = count_result.scalar_one()
+                stmt = self._build_upsert_statement(dialect_name, rows, update_fields, conflict_fields)
+                stmt_result = await session.execute(stmt)
+                record_rows(len(rows))
+                result += upsert_result(
+                    dialect_name,
+                    rows_count=len(rows),
+                    affected_rows=stmt_result.rowcount,  # pyright: ignore
+                    existing_rows_count=existing_rows_count,
+                )
+            await self._commit(session)
+        self._invalidate_entity_cache()
+        return result
+
+    @instrument()
+    async def bulk_update(
+        self,
+        rows: t.Iterable[dict[str, t.Any]],
+        key_fields: t.Sequence[str] | None = None,
+        chunk_size: int | None = None,
+    ) -> list[int]:
+        """
+        Write own values into every record with `UPDATE ... SET field = CASE key WHEN ... END WHERE key IN (...)`
+        statements. Rows are split into chunks of at most `chunk_size` rows (`__default_bulk_chunk_size__`
+        by default) that fit into `max_allowed_packet`, every chunk is committed in its own transaction.
+        :param rows: an iterable with dicts that contain `key_fields` and the fields to be updated.
+        A row without some of the fields keeps their current values. If a row misses key fields or no fields
+        to update are passed, a :class:`ValueError` exception will be raised.
+        :param key_fields: fields that identify records, the primary key by default
+        :param chunk_size: max count of rows in one statement
+        :return: counts of matched records per chunk
+        """
+        key_fields = tuple(key_fields or self._entity_converter.primary_key_keys)
+        max_allowed_packet = await self.db.get_max_allowed_packet()
+        chunks = self._split_bulk_data(
+            rows,
+            max_allowed_packet,
+            chunk_size=chunk_size,
+            size_of=partial(bulk_update_row_size, key_fields=key_fields),
+        )
+        rowcounts: list[int] = []
+        for chunk in chunks:
+            statement = self._build_bulk_update_statement(chunk, key_fields=key_fields)
+            async with self._session() as session:
+                result = await session.execute(statement)
+                await self._commit(session)
+            self._invalidate_updated_entities(chunk, key_fields=key_fields)
+            rowcounts.append(result.rowcount)  # pyright: ignore
+            record_rows(result.rowcount)  # pyright: ignore
+        return rowcounts
 
+    @instrument()
     async def update(self, specification: dict[str, t.Any], update_data: dict[str, t.Any]) -> bool:
         """
         Patches record(s)
@@ -147,11 +617,14 @@ class AsyncBaseDAO(BaseDAOMixin[Entity]):
         """
         if not specification:
             raise ValueError("Specification should be passed")
-        async with self.db.session as session:
+        async with self._session() as session:
             result = await session.execute(update(self.__model__).filter_by(**specification).values(update_data))
-            await session.commit()
+            await self._commit(session)
+            self._invalidate_entity_cache(specification=specification, update_data=update_data)
+            record_rows(result.rowcount)  # pyright: ignore
             return bool(result.rowcount)  # pyright: ignore
 
+    @instrument()
     async def delete(self, specification: dict[str, t.Any]) -> bool:
         """
         Removes record(s).
@@ -161,7 +634,83 @@ class AsyncBaseDAO(BaseDAOMixin[Entity]):
         """
         if not specification:
             raise ValueError("Specification should be passed")
-        async with self.db.session as session:
+        async with self._session() as session:
             result = await session.execute(delete(self.__model__).filter_by(**specification))
-            await session.commit()
+            await self._commit(session)
+            self._invalidate_entity_cache(specification=specification)
+            record_rows(result.rowcount)  # pyright: ignore
             return bool(result.rowcount)  # pyright: ignore
+
+    async def _fetch_db_items(
+        self, session: AsyncSession, query: Select[t.Any], params: dict[str, t.Any] | None = None
+    ) -> t.Sequence[t.Any]:
+        result: Result[t.Any] | ScalarResult[t.Any]
+        if self.__use_core_rows__:
+            result = await session.execute(query, params)
+        else:
+            result = await session.scalars(query, params)
+            if self.__default_load_options__:
+                result = result.unique()
+        with child_span(SPAN_FETCH):
+            return result.all()
+
+    async def _fetch_many_by_keys(self, keys: tuple[str, ...], values: t.Sequence[t.Any]) -> dict[t.Any, Entity]:
+        entities: dict[t.Any, Entity] = {}
+        if not values:
+            return entities
+        async with self._session() as session:
+            for chunk in chunked(values, self.__default_in_chunk_size__):
+                query, params = self._prepare_in_query(keys=keys, values=chunk)
+                db_items = await self._fetch_db_items(session=session, query=query, params=params)
+                for db_item, entity in zip(db_items, self._get_entities_from_db_items(db_items=db_items)):
+                    entities[self._db_item_key(db_item, keys=keys)] = entity
+        return entities
+
+    @property
+    def _coalesce_lookups(self) -> bool:
+        # Batches are shared between callers and loaded outside of their contexts, so lookups that must see
+        # changes of a transaction scope or go to the primary server after a write are not coalesced
+        return self.__coalesce_lookups__ and self.db.current_session is None and not self.db.has_recent_write
+
+    def _get_coalescer(self, keys: tuple[str, ...]) -> LookupCoalescer[t.Any, Entity]:
+        # Coalescers are shared by DAO instances of the same class and database, so lookups are merged even if
+        # every caller creates its own DAO. Batches are loaded by the DAO that created the coalescer
+        coalescer = self.db.lookup_coalescers.get((type(self), keys))
+        if coalescer is None:
+            coalescer = self.db.lookup_coalescers[(type(self), keys)] = LookupCoalescer[t.Any, Entity](
+                batch_load=partial(self._load_coalesced, keys)
+            )
+        return coalescer
+
+    async def _load_coalesced(self, keys: tuple[str, ...], values: tuple[t.Any, ...]) -> dict[t.Any, Entity]:
+        coerced = {value: self._coerce_key(keys=keys, value=value) for value in values}
+        entities = await self._fetch_many_by_keys(keys=keys, values=tuple(dict.fromkeys(coerced.values())))
+        return {value: entities[key] for value, key in coerced.items() if key in entities}
+
+    async def _get_auto_increment_increment(self, session: AsyncSession) -> int:
+        if self.db.engine.dialect.name != "mysql":
+            return 1
+        return await session.scalar(text("SELECT @@auto_increment_increment")) or 1
+
+    async def _insert_returning_entities(
+        self,
+        session: AsyncSession,
+        rows: t.Sequence[dict[str, t.Any]],
+        id_increment: int,
+    ) -> list[Entity]:
+        mode = self._bulk_insert_mode(self.db.engine.dialect, rows)
+        if mode is BulkInsertMode.PASSED_KEYS:
+            await session.execute(insert(self.__model__), rows)
+            return self._created_entities(rows, self._passed_pks(rows))
+        if mode is BulkInsertMode.RETURNING:
+            result = await session.execute(self._build_returning_insert(), rows)
+            return self._created_entities(rows, result.all())
+        if mode is BulkInsertMode.LAST_INSERT_ID:
+            result = await session.execute(insert(self.__model__).values(list(rows)))
+            first_id: int = result.lastrowid  # pyright: ignore [reportGeneralTypeIssues]
+            return self._created_entities(rows, auto_increment_pks(first_id, len(rows), id_increment))
+        pks: list[t.Sequence[t.Any]] = []
+        for row in rows:
+            result = await session.execute(insert(self.__model__).values(**row))
+            pks.append(result.inserted_primary_key)  # pyright: ignore [reportGeneralTypeIssues]
+        return self._created_entities(rows, pks)
@@ -0,0 +1,104 @@
+import dataclasses
+import keyword
+import typing as t
+from functools import cache
+
+from sqlalchemy import inspect
+
+from ash_dal.typing import Entity
+
+
+@dataclasses.dataclass(frozen=True)
+class EntityConverter(t.Generic[Entity]):
+    """
+    Functions converting ORM instances and result rows of a model into entities. They are generated once
+    per `(model, entity)` pair, so no intermediate dict is built for every converted item.
+    Rows are expected to contain the `column_keys` columns in the same order.
+    """
+
+    attribute_keys: tuple[str, ...]
+    column_keys: tuple[str, ...]
+    primary_key_keys: tuple[str, ...]
+    instance_to_entity: t.Callable[[t.Any], Entity]
+    row_to_entity: t.Callable[[t.Any], Entity]
+    instance_to_dict: t.Callable[[t.Any], dict[str, t.Any]]
+    row_to_dict: t.Callable[[t.Any], dict[str, t.Any]]
+
+
+@cache
+def get_entity_converter(model: type[t.Any], entity: type[Entity]) -> EntityConverter[Entity]:
+    """
+    Build the converter for a model and entity pair or return the one built before
+    :param model: ORM model class
+    :param entity: entity class, that accepts all model attributes as keyword arguments
+    :return: an instance of :class:`EntityConverter`
+    """
+    mapper = inspect(model)
+    attribute_keys = tuple(attr.key for attr in mapper.attrs)
+    column_keys = tuple(attr.key for attr in mapper.column_attrs)
+    primary_key_keys = tuple(mapper.get_property_by_column(column).key for column in mapper.primary_key)
+    instance_values = {key: _instance_value(key, is_column=key in column_keys) for key in attribute_keys}
+    row_values = {key: f"item[{index}]" for index, key in enumerate(column_keys)}
+    return EntityConverter(
+        attribute_keys=attribute_keys,
+        column_keys=column_keys,
+        primary_key_keys=primary_key_keys,
+        instance_to_entity=_compile(_entity_call(entity, instance_values), _INSTANCE_DICT, entity=entity),
+        row_to_entity=_compile(_entity_call(entity, row_values), entity=entity),
+        instance_to_dict=_compile(_dict_display(instance_values), _INSTANCE_DICT),
+        row_to_dict=_compile(_dict_display(row_values)),
+    )
+
+
+def _is_identifier(key: str) -> bool:
+    return key.isidentifier() and not keyword.iskeyword(key)
+
+
+def _instance_value(key: str, is_column: bool) -> str:
+    attribute = f"item.{key}" if _is_identifier(key) else f"getattr(item, {key!r})"
+    if not is_column:
+        return attribute
+    # Loaded column values are kept in the instance `__dict__`, reading them from there skips the attribute
+    # descriptor. Expired and deferred columns are missing in it and are loaded through the attribute as usual.
+    return f"(state[{key!r}] if {key!r} in state else {attribute})"
+
+
+def _positional_keys(entity: type[t.Any], keys: t.Collection[str]) -> tuple[str, ...] | None:
+    """
+    Return keys that are passed positionally, in the order of the dataclass `__init__` arguments,
+    if all keys but keyword-only ones can be passed so. Keyword-only fields are passed as keyword arguments.
+    """
+    if not dataclasses.is_dataclass(entity):
+        return None
+    init_fields = tuple(field for field in dataclasses.fields(entity) if field.init)
+    positional_fields = tuple(field.name for field in init_fields if not field.kw_only)
+    positional_keys = set(keys) - {field.name for field in init_fields if field.kw_only}
+    if set(positional_fields[: len(positional_keys)]) != positional_keys:
+        return None
+    return positional_fields[: len(positional_keys)]
+
+
+def _entity_call(entity: type[t.Any], values: dict[str, str]) -> str:
+    positional_keys = _positional_keys(entity, values)
+    if positional_keys is not None:
+        arguments = [values[key] for key in positional_keys]
+        arguments.extend(f"{key}={value}" for key, value in values.items() if key not in positional_keys)
+    else:
+        arguments = [f"{key}={value}" for key, value in values.items() if _is_identifier(key)]
+        extra = {key: value for key, value in values.items() if not _is_identifier(key)}
+        if extra:
+            arguments.append(f"**{_dict_display(extra)}")
+    return f"entity({', '.join(arguments)})"
+
+
+def _dict_display(values: dict[str, str]) -> str:
+    return "{" + ", ".join(f"{key!r}: {value}" for key, value in values.items()) + "}"
+
+
+_INSTANCE_DICT = "state = item.__dict__"
+
+
+def _compile(expression: str, preamble: str = "", **namespace: t.Any) -> t.Callable[[t.Any], t.Any]:
+    source = f"def convert(item):\n    {preamble}\n    return {expression}\n"
+    exec(source, namespace)  # noqa: S102
+    return namespace["convert"]
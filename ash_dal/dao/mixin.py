@@ -1,40 +1,444 @@
+import time
 import typing as t
 from abc import ABC
-from functools import cached_property
+from dataclasses import replace
 
-from sqlalchemy import ScalarResult, inspect
+from sqlalchemy import (
+    Dialect,
+    Insert,
+    Row,
+    ScalarResult,
+    Select,
+    Update,
+    bindparam,
+    event,
+    insert,
+    inspect,
+    select,
+    tuple_,
+)
+from sqlalchemy.orm import InstrumentedAttribute, Session
 from sqlalchemy.orm.interfaces import ORMOption
+from sqlalchemy.sql.dml import ReturningInsert
 
+from ash_dal.dao.converter import EntityConverter, get_entity_converter
 from ash_dal.typing import Entity, ORMModel
-from ash_dal.utils.paginator import PaginatorPage
+from ash_dal.utils.bulk_insert import BulkInsertMode
+from ash_dal.utils.bulk_update import build_bulk_update_statement
+from ash_dal.utils.chunking import achunked_by_size, chunked_by_size, estimate_row_size
+from ash_dal.utils.entity_cache import EntityCache
+from ash_dal.utils.metrics import MetricsCollector, is_measured, record_conversion
+from ash_dal.utils.paginator import CursorPage, PaginatorPage
+from ash_dal.utils.partitioning import ScanQueries
+from ash_dal.utils.statement_cache import (
+    StatementCache,
+    default_statement_cache,
+    specification_params,
+    specification_shape,
+    specification_template,
+)
+from ash_dal.utils.tracing import SPAN_CONVERT, ITracer, child_span, is_traced
+from ash_dal.utils.upsert import build_upsert_statement
+
+S = t.TypeVar("S")
 
 DEFAULT_PAGE_SIZE = 20
+DEFAULT_STREAM_BATCH_SIZE = 1000
+DEFAULT_IN_CHUNK_SIZE = 1000
+DEFAULT_BULK_CHUNK_SIZE = 1000
+# Part of `max_allowed_packet` that row values of a bulk statement may take, the rest is left for the statement text
+MAX_ALLOWED_PACKET_USAGE = 0.8
 
 
 class BaseDAOMixin(ABC, t.Generic[Entity]):
     __entity__: type[Entity]
     __model__: type[ORMModel]  # pyright: ignore [reportGeneralTypeIssues]
     __default_page_size__: int = DEFAULT_PAGE_SIZE
+    __default_stream_batch_size__: int = DEFAULT_STREAM_BATCH_SIZE
+    # Max count of values in one `IN (...)` list of batched lookups
+    __default_in_chunk_size__: int = DEFAULT_IN_CHUNK_SIZE
+    # Max count of rows written by one bulk statement
+    __default_bulk_chunk_size__: int = DEFAULT_BULK_CHUNK_SIZE
 
     __default_load_options__: t.Sequence[ORMOption] = ()
+    # Load options for streaming methods. `joinedload` of collections can't be combined with a server-side cursor,
+    # so such DAOs should define e.g. `selectinload` options here. Default load options are used if not set.
+    __stream_load_options__: t.Sequence[ORMOption] | None = None
+    # Read methods select mapped columns and build entities straight from rows, skipping ORM instances,
+    # the identity map and load options. Relationships are not loaded in this mode.
+    __use_core_rows__: bool = False
+    # Read-through cache for `get_by_pk`, invalidated by DAO write methods
+    __entity_cache__: EntityCache | None = None
+    # Collects latency, rows and conversion time of DAO methods. Methods aren't measured if it's not set
+    __metrics__: MetricsCollector | None = None
+    # Receives spans of DAO methods with child spans of checkouts, statements, fetches and conversions
+    __tracer__: ITracer | None = None
+    # Statements of read methods are built once per specification shape and reused with new values.
+    # Statements aren't cached if it's set to None
+    __statement_cache__: StatementCache | None = default_statement_cache
+
+    @property
+    def _entity_converter(self) -> EntityConverter[Entity]:
+        return get_entity_converter(self.__model__, self.__entity__)
 
-    @cached_property
+    @property
     def _model_columns(self) -> tuple[str, ...]:
+        return self._entity_converter.attribute_keys
+
+    def _cached_statement(self, key: t.Hashable, build: t.Callable[[], S]) -> S:
+        cache = self.__statement_cache__
+        if cache is None:
+            return build()
+        # Subclasses may override how statements are built, so they don't share statements with their parents
+        return cache.get_or_build((type(self), self.__model__, self.__entity__, self.__use_core_rows__, key), build)
+
+    def _resolve_load_options(self, load_options: t.Sequence[ORMOption] | None) -> tuple[ORMOption, ...]:
+        if self.__use_core_rows__:
+            return ()
+        return tuple(self.__default_load_options__ if load_options is None else load_options)
+
+    def _build_query(
+        self,
+        specification: dict[str, t.Any] | None = None,
+        load_options: t.Sequence[ORMOption] | None = None,
+    ) -> Select[t.Any]:
+        options = self._resolve_load_options(load_options)
+        query = self._cached_statement(("select", options), lambda: self._build_select(options))
+        if specification:
+            query = query.filter_by(**specification)
+        return query
+
+    def _build_select(self, load_options: tuple[ORMOption, ...]) -> Select[t.Any]:
+        if self.__use_core_rows__:
+            return select(*(getattr(self.__model__, key) for key in self._entity_converter.column_keys))
+        return select(self.__model__).options(*load_options)
+
+    def _prepare_query(
+        self,
+        specification: dict[str, t.Any] | None = None,
+        load_options: t.Sequence[ORMOption] | None = None,
+        yield_per: int | None = None,
+    ) -> tuple[Select[t.Any], dict[str, t.Any]]:
+        """
+        Build a query for a specification or take the one cached for specifications of the same shape
+        :return: the query and values of its bound parameters
+        """
+        specification = specification or {}
+        shape = specification_shape(specification, column_keys=self._entity_converter.column_keys)
+        if shape is None or self.__statement_cache__ is None:
+            query = self._build_query(specification=specification, load_options=load_options)
+            return (query.execution_options(yield_per=yield_per) if yield_per else query), {}
+        options = self._resolve_load_options(load_options)
+
+        def build() -> Select[t.Any]:
+            query = self._build_query(specification=specification_template(shape), load_options=options)
+            return query.execution_options(yield_per=yield_per) if yield_per else query
+
+        query = self._cached_statement(("filter", options, shape, yield_per), build)
+        return query, specification_params(specification)
+
+    def _prepare_stream_query(
+        self, specification: dict[str, t.Any] | None, batch_size: int | None
+    ) -> tuple[Select[t.Any], dict[str, t.Any]]:
+        # `yield_per` turns on `stream_results`, so MySQL drivers read rows through an unbuffered cursor
+        return self._prepare_query(
+            specification=specification,
+            load_options=self.__stream_load_options__,
+            yield_per=batch_size or self.__default_stream_batch_size__,
+        )
+
+    def _prepare_pk_query(self, pk: t.Any) -> tuple[Select[t.Any], dict[str, t.Any]]:
+        pk_values = pk if isinstance(pk, tuple) else (pk,)
+
+        def build() -> Select[t.Any]:
+            pk_columns = inspect(self.__model__).primary_key
+            return self._build_query().where(
+                *(column == bindparam(f"ash_dal_pk_{index}") for index, column in enumerate(pk_columns))
+            )
+
+        query = self._cached_statement(("pk", self._resolve_load_options(None)), build)
+        return query, {f"ash_dal_pk_{index}": value for index, value in enumerate(pk_values)}
+
+    def _prepare_in_query(
+        self, keys: tuple[str, ...], values: t.Sequence[t.Any]
+    ) -> tuple[Select[t.Any], dict[str, t.Any]]:
+        def build() -> Select[t.Any]:
+            columns = [getattr(self.__model__, key) for key in keys]
+            param = bindparam("ash_dal_in_values", expanding=True)
+            clause = columns[0].in_(param) if len(columns) == 1 else tuple_(*columns).in_(param)
+            return self._build_query().where(clause)
+
+        query = self._cached_statement(("in", self._resolve_load_options(None), keys), build)
+        return query, {"ash_dal_in_values": list(values)}
+
+    def _scan_pk_field(self) -> InstrumentedAttribute[t.Any]:
+        mapper = inspect(self.__model__)
+        if len(mapper.primary_key) != 1:
+            raise ValueError("Parallel scans need a model with a single-column primary key")
+        return getattr(self.__model__, mapper.get_property_by_column(mapper.primary_key[0]).key)
+
+    def _prepare_scan_queries(self, specification: dict[str, t.Any] | None, batch_size: int | None) -> ScanQueries:
+        pk_field = self._scan_pk_field()
+        batch_size = batch_size or self.__default_stream_batch_size__
+        query, params = self._prepare_query(specification=specification)
+        query = query.order_by(pk_field).limit(batch_size)
+        upper_bound = pk_field <= bindparam("ash_dal_scan_upper")
+        return ScanQueries(
+            first=query.where(upper_bound),
+            next=query.where(pk_field > bindparam("ash_dal_scan_after"), upper_bound),
+            params=params,
+            pk_key=pk_field.key,
+            batch_size=batch_size,
+        )
+
+    def _coerce_key(self, keys: tuple[str, ...], value: t.Any) -> t.Any:
+        """
+        Convert a looked up value to the Python types of its columns, so it matches values read from the database
+        """
+        attributes = inspect(self.__model__).attrs
+        if len(keys) == 1:
+            return _coerce_column_value(attributes[keys[0]], value)
+        return tuple(_coerce_column_value(attributes[key], item) for key, item in zip(keys, value))
+
+    @staticmethod
+    def _db_item_key(db_item: t.Any, keys: tuple[str, ...]) -> t.Any:
+        if len(keys) == 1:
+            return getattr(db_item, keys[0])
+        return tuple(getattr(db_item, key) for key in keys)
+
+    def _bulk_chunk_limits(
+        self,
+        max_allowed_packet: int | None,
+        chunk_size: int | None = None,
+        chunk_bytes: int | None = None,
+    ) -> tuple[int, int | None]:
+        if chunk_bytes is None and max_allowed_packet:
+            chunk_bytes = int(max_allowed_packet * MAX_ALLOWED_PACKET_USAGE)
+        return chunk_size or self.__default_bulk_chunk_size__, chunk_bytes
+
+    def _split_bulk_data(
+        self,
+        data: t.Iterable[dict[str, t.Any]],
+        max_allowed_packet: int | None,
+        chunk_size: int | None = None,
+        chunk_bytes: int | None = None,
+        size_of: t.Callable[[dict[str, t.Any]], int] = estimate_row_size,
+    ) -> t.Iterator[tuple[dict[str, t.Any], ...]]:
+        max_count, max_bytes = self._bulk_chunk_limits(max_allowed_packet, chunk_size, chunk_bytes)
+        return chunked_by_size(data, max_count=max_count, max_bytes=max_bytes, size_of=size_of)
+
+    def _asplit_bulk_data(
+        self,
+        data: t.Iterable[dict[str, t.Any]] | t.AsyncIterable[dict[str, t.Any]],
+        max_allowed_packet: int | None,
+        chunk_size: int | None = None,
+        chunk_bytes: int | None = None,
+    ) -> t.AsyncIterator[tuple[dict[str, t.Any], ...]]:
+        max_count, max_bytes = self._bulk_chunk_limits(max_allowed_packet, chunk_size, chunk_bytes)
+        return achunked_by_size(data, max_count=max_count, max_bytes=max_bytes, size_of=estimate_row_size)
+
+    @property
+    def _auto_increment_key(self) -> str | None:
+        """Attribute key of the primary key, if it's a single auto-increment column"""
         mapper = inspect(self.__model__)
-        columns = tuple(c.key for c in mapper.attrs)
-        return columns
+        if len(mapper.primary_key) != 1 or mapper.local_table.autoincrement_column is not mapper.primary_key[0]:
+            return None
+        return self._entity_converter.primary_key_keys[0]
+
+    def _bulk_insert_mode(self, dialect: Dialect, rows: t.Sequence[dict[str, t.Any]]) -> BulkInsertMode:
+        primary_key_keys = self._entity_converter.primary_key_keys
+        if all(key in row for row in rows for key in primary_key_keys):
+            return BulkInsertMode.PASSED_KEYS
+        if dialect.insert_executemany_returning_sort_by_parameter_order:
+            return BulkInsertMode.RETURNING
+        auto_increment_key = self._auto_increment_key
+        # A multi-row `VALUES` takes its columns from the first row, so rows have to share their keys
+        if (
+            dialect.name == "mysql"
+            and auto_increment_key
+            and not any(auto_increment_key in row for row in rows)
+            and all(row.keys() == rows[0].keys() for row in rows)
+        ):
+            return BulkInsertMode.LAST_INSERT_ID
+        return BulkInsertMode.PER_ROW
+
+    def _build_returning_insert(self) -> ReturningInsert[t.Any]:
+        pk_columns = [getattr(self.__model__, key) for key in self._entity_converter.primary_key_keys]
+        return insert(self.__model__).returning(*pk_columns, sort_by_parameter_order=True)
+
+    def _passed_pks(self, rows: t.Sequence[dict[str, t.Any]]) -> list[tuple[t.Any, ...]]:
+        return [tuple(row[key] for key in self._entity_converter.primary_key_keys) for row in rows]
+
+    def _created_entities(
+        self,
+        rows: t.Sequence[dict[str, t.Any]],
+        pks: t.Iterable[t.Sequence[t.Any]],
+    ) -> list[Entity]:
+        primary_key_keys = self._entity_converter.primary_key_keys
+        return [self._dict_to_entity(dict_={**row, **dict(zip(primary_key_keys, pk))}) for row, pk in zip(rows, pks)]
+
+    def _resolve_upsert_fields(
+        self,
+        data: t.Sequence[dict[str, t.Any]],
+        update_fields: t.Sequence[str] | None,
+        conflict_fields: t.Sequence[str] | None,
+    ) -> tuple[tuple[str, ...], tuple[str, ...]]:
+        conflict_fields = tuple(conflict_fields or self._entity_converter.primary_key_keys)
+        if update_fields is None:
+            update_fields = tuple(key for key in data[0] if key not in conflict_fields)
+        if not update_fields:
+            raise ValueError("Update fields should be passed")
+        return tuple(update_fields), conflict_fields
+
+    def _build_upsert_statement(
+        self,
+        dialect_name: str,
+        rows: t.Sequence[dict[str, t.Any]],
+        update_fields: tuple[str, ...],
+        conflict_fields: tuple[str, ...],
+    ) -> Insert:
+        # Rows and fields use attribute keys, while the statement is built of table columns
+        columns = inspect(self.__model__).columns
+        return build_upsert_statement(
+            self.__model__.__table__,  # pyright: ignore [reportGeneralTypeIssues]
+            dialect_name=dialect_name,
+            rows=[{columns[key].key: value for key, value in row.items()} for row in rows],
+            update_columns=[columns[field] for field in update_fields],
+            conflict_columns=[columns[field] for field in conflict_fields],
+        )
+
+    def _build_bulk_update_statement(self, rows: t.Sequence[dict[str, t.Any]], key_fields: tuple[str, ...]) -> Update:
+        if not all(key in row for row in rows for key in key_fields):
+            raise ValueError("Key fields should be passed in every row")
+        update_fields = tuple(dict.fromkeys(key for row in rows for key in row if key not in key_fields))
+        if not update_fields:
+            raise ValueError("Update fields should be passed")
+        columns = inspect(self.__model__).columns
+        return build_bulk_update_statement(
+            self.__model__.__table__,  # pyright: ignore [reportGeneralTypeIssues]
+            rows=[{columns[key].key: value for key, value in row.items()} for row in rows],
+            key_columns=[columns[field] for field in key_fields],
+            update_columns=[columns[field] for field in update_fields],
+        )
+
+    def _invalidate_updated_entities(self, rows: t.Sequence[dict[str, t.Any]], key_fields: tuple[str, ...]) -> None:
+        if self.__entity_cache__ is None:
+            return
+        if set(key_fields) != set(self._entity_converter.primary_key_keys):
+            self._invalidate_entity_cache()
+            return
+        for row in rows:
+            self._invalidate_entity_cache(specification={key: row[key] for key in key_fields})
+
+    @property
+    def _entity_cache_namespace(self) -> str:
+        # Plain strings keep keys picklable for backends shared between processes
+        model, entity = self.__model__, self.__entity__
+        return f"{model.__module__}.{model.__qualname__}:{entity.__module__}.{entity.__qualname__}"
+
+    def _entity_cache_key(self, pk: t.Any) -> tuple[t.Any, ...]:
+        return self._entity_cache_namespace, *(pk if isinstance(pk, tuple) else (pk,))
+
+    def _get_cached_entities(self, pks: t.Sequence[t.Any]) -> tuple[dict[t.Any, Entity], list[t.Any]]:
+        """
+        Split primary keys into cached entities and keys that have to be fetched from DB
+        """
+        assert self.__entity_cache__ is not None
+        entities: dict[t.Any, Entity] = {}
+        missing: list[t.Any] = []
+        for pk in pks:
+            is_cached, entity = self.__entity_cache__.get(self._entity_cache_key(pk))
+            if not is_cached:
+                missing.append(pk)
+            elif entity is not None:
+                entities[pk] = entity
+        return entities, missing
+
+    def _cache_entities(self, pks: t.Sequence[t.Any], entities: t.Mapping[t.Any, Entity], generation: int) -> None:
+        assert self.__entity_cache__ is not None
+        for pk in pks:
+            self.__entity_cache__.set(self._entity_cache_key(pk), entities.get(pk), generation=generation)
+
+    def _invalidate_entity_cache(
+        self,
+        specification: dict[str, t.Any] | None = None,
+        update_data: dict[str, t.Any] | None = None,
+    ) -> None:
+        """
+        Drop the cached entity if the specification selects a single record by primary key
+        and its primary key is not changed, otherwise drop all cached entities of the DAO
+        """
+        if self.__entity_cache__ is None:
+            return
+        pk_keys = self._entity_converter.primary_key_keys
+        key = None
+        if (
+            specification is not None
+            and set(specification) == set(pk_keys)
+            and not set(update_data or ()) & set(pk_keys)
+        ):
+            key = self._entity_cache_key(tuple(specification[k] for k in pk_keys))
+        cache, namespace = self.__entity_cache__, self._entity_cache_namespace
+        cache.invalidate(key, namespace=namespace)
+        session = self._transaction_session
+        if session is not None:
+            # Until the transaction is committed, other readers still get and cache the old values
+            event.listen(session, "after_commit", lambda _: cache.invalidate(key, namespace=namespace), once=True)
+
+    @property
+    def _transaction_session(self) -> Session | None:
+        """Sync session of the transaction scope entered in the current context"""
+        return None
+
+    @property
+    def _active_entity_cache(self) -> EntityCache | None:
+        # A transaction scope may read its own uncommitted changes, so they are neither cached nor read from cache
+        return self.__entity_cache__ if self._transaction_session is None else None
 
     def _convert_db_item_in_entity(self, db_item: t.Any) -> Entity:
-        item_dict = {k: getattr(db_item, k) for k in self._model_columns}
-        return self._dict_to_entity(dict_=item_dict)
+        if not is_measured() and not is_traced():
+            return self._db_item_converter()(db_item)
+        started_at = time.perf_counter()
+        with child_span(SPAN_CONVERT, {"ash_dal.rows": 1}):
+            entity = self._db_item_converter()(db_item)
+        record_conversion(rows=1, duration=time.perf_counter() - started_at)
+        return entity
 
     def _get_entities_from_db_items(
         self,
-        db_items: t.Sequence[ORMModel] | ScalarResult[ORMModel] | PaginatorPage[ORMModel],
+        db_items: t.Sequence[ORMModel]
+        | t.Sequence[Row[t.Any]]
+        | ScalarResult[ORMModel]
+        | PaginatorPage[ORMModel]
+        | CursorPage[ORMModel],
     ) -> tuple[Entity, ...]:
-        entities = tuple(self._convert_db_item_in_entity(db_item=db_item) for db_item in db_items)
+        convert = self._db_item_converter()
+        if not is_measured() and not is_traced():
+            return tuple(convert(db_item) for db_item in db_items)
+        started_at = time.perf_counter()
+        with child_span(SPAN_CONVERT) as span:
+            entities = tuple(convert(db_item) for db_item in db_items)
+            if span is not None:
+                span.set_attribute("ash_dal.rows", len(entities))
+        record_conversion(rows=len(entities), duration=time.perf_counter() - started_at)
         return entities
 
+    def _db_item_converter(self) -> t.Callable[[t.Any], Entity]:
+        converter = self._entity_converter
+        if type(self)._dict_to_entity is BaseDAOMixin._dict_to_entity:
+            return converter.row_to_entity if self.__use_core_rows__ else converter.instance_to_entity
+        # `_dict_to_entity` is overridden, so items are passed to it as dicts
+        to_dict = converter.row_to_dict if self.__use_core_rows__ else converter.instance_to_dict
+        return lambda db_item: self._dict_to_entity(dict_=to_dict(db_item))
+
+    def _convert_db_page_in_entity_page(self, db_page: PaginatorPage[t.Any], **changes: t.Any) -> PaginatorPage[Entity]:
+        entities = self._get_entities_from_db_items(db_items=db_page)
+        return replace(db_page, items=entities, **changes)
+
+    def _convert_db_cursor_page_in_entity_page(self, db_page: CursorPage[t.Any]) -> CursorPage[Entity]:
+        entities = self._get_entities_from_db_items(db_items=db_page)
+        return replace(db_page, items=entities)
+
     def _dict_to_entity(
         self,
         dict_: dict[str, t.Any],
@@ -46,3 +450,16 @@ class BaseDAOMixin(ABC, t.Generic[Entity]):
         """
         entity = self.__entity__(**dict_)
         return entity
+
+
+def _coerce_column_value(attribute: t.Any, value: t.Any) -> t.Any:
+    try:
+        python_type = attribute.columns[0].type.python_type
+    except NotImplementedError:
+        return value
+    if value is None or isinstance(value, python_type):
+        return value
+    try:
+        return python_type(value)
+    except (TypeError, ValueError):
+        return value
@@ -1,7 +1,31 @@
 from ash_dal.database.async_database import AsyncDatabase
+from ash_dal.database.compiled_cache import CompiledCacheStats
+from ash_dal.database.consistency import ReadYourWritesConfig
+from ash_dal.database.health import HealthCheckConfig
+from ash_dal.database.pool import PoolConfig, PoolStats
+from ash_dal.database.replicas import (
+    IReplicaBalancer,
+    LatencyBalancer,
+    LeastConnectionsBalancer,
+    ReplicaStats,
+    RoundRobinBalancer,
+)
+from ash_dal.database.slow_query import SlowQuery, SlowQueryConfig
 from ash_dal.database.sync_database import Database
 
 __all__ = [
     "Database",
     "AsyncDatabase",
+    "PoolConfig",
+    "PoolStats",
+    "IReplicaBalancer",
+    "RoundRobinBalancer",
+    "LeastConnectionsBalancer",
+    "LatencyBalancer",
+    "ReplicaStats",
+    "HealthCheckConfig",
+    "ReadYourWritesConfig",
+    "SlowQueryConfig",
+    "SlowQuery",
+    "CompiledCacheStats",
 ]
@@ -1,16 +1,36 @@
 import ssl
+import typing as t
+from contextlib import asynccontextmanager, contextmanager
 
-from sqlalchemy import URL
+from sqlalchemy import URL, text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
+from ash_dal.database.compiled_cache import (
+    DEFAULT_COMPILED_CACHE_SIZE,
+    CompiledCacheStats,
+    get_compiled_cache_stats,
+    install_compiled_cache_stats,
+)
+from ash_dal.database.consistency import ReadYourWritesConfig, WriteTracker, read_gtid_executed
+from ash_dal.database.health import AsyncReplicaHealthMonitor, CircuitBreaker, HealthCheckConfig
+from ash_dal.database.pool import PoolConfig, PoolStats, engine_options, get_pool_stats, install_idle_ping
+from ash_dal.database.replicas import IReplicaBalancer, Replica, ReplicaSet, ReplicaStats
+from ash_dal.database.slow_query import AsyncSlowQueryLog, SlowQueryConfig
 from ash_dal.database.sync_session import Session
 from ash_dal.exceptions.database import DBConnectionError
+from ash_dal.utils.coalescer import LookupCoalescer
+from ash_dal.utils.context import ContextSlot
+
+_HAS_WRITES_KEY = "ash_dal_has_writes"
 
 
 class AsyncDatabase:
     _engine: AsyncEngine
-    _ro_engine: AsyncEngine | None
+    _ro_engines: tuple[AsyncEngine, ...]
+    _replica_set: ReplicaSet | None
+    _health_monitor: AsyncReplicaHealthMonitor | None
     _session_maker: async_sessionmaker[AsyncSession]
+    _max_allowed_packet: int | None
 
     def __init__(
         self,
@@ -18,11 +38,32 @@ class AsyncDatabase:
         ssl_context: ssl.SSLContext | None = None,
         read_replica_url: URL | None = None,
         read_replica_ssl_context: ssl.SSLContext | None = None,
+        pool_config: PoolConfig | None = None,
+        read_replica_pool_config: PoolConfig | None = None,
+        read_replica_urls: t.Sequence[URL] = (),
+        replica_balancer: IReplicaBalancer | None = None,
+        health_check: HealthCheckConfig | None = None,
+        read_your_writes: ReadYourWritesConfig | None = None,
+        slow_query_log: SlowQueryConfig | None = None,
+        compiled_cache_size: int = DEFAULT_COMPILED_CACHE_SIZE,
+        count_compiled_cache_lookups: bool = False,
     ):
         self.db_url = db_url
         self.read_replica_url = read_replica_url
+        self.read_replica_urls = (*((read_replica_url,) if read_replica_url else ()), *read_replica_urls)
+        self._replica_balancer = replica_balancer
+        self._health_check = health_check
+        self._write_tracker = WriteTracker(read_your_writes) if read_your_writes else None
+        self._slow_query_log = AsyncSlowQueryLog(slow_query_log) if slow_query_log else None
         self._ssl_context = ssl_context
         self._read_replica_ssl_context = read_replica_ssl_context
+        self._pool_config = pool_config or PoolConfig()
+        self._compiled_cache_size = compiled_cache_size
+        self._count_compiled_cache_lookups = count_compiled_cache_lookups
+        self._read_replica_pool_config = read_replica_pool_config or self._pool_config
+        self._transaction_session = ContextSlot[AsyncSession]()
+        # Lookup coalescers of DAOs with `__coalesce_lookups__`, kept per DAO class and lookup keys
+        self.lookup_coalescers: dict[t.Hashable, LookupCoalescer[t.Any, t.Any]] = {}
 
     @property
     def engine(self) -> AsyncEngine:
@@ -31,8 +72,16 @@ class AsyncDatabase:
 
     @property
     def read_only_engine(self) -> AsyncEngine:
-        assert hasattr(self, "_ro_engine")
-        return self._engine
+        """
+        The engine of the first read replica or the primary engine if no replicas are configured
+        """
+        assert hasattr(self, "_ro_engines")
+        return self._ro_engines[0] if self._ro_engines else self._engine
+
+    @property
+    def read_only_engines(self) -> tuple[AsyncEngine, ...]:
+        assert hasattr(self, "_ro_engines")
+        return self._ro_engines
 
     @property
     def session_maker(self) -> async_sessionmaker[AsyncSession]:
@@ -42,27 +91,76 @@ class AsyncDatabase:
     async def connect(self):
         """
         Create SQLAlchemy engine and session maker. If read replica information was provided during initialization
-        an engine for read replica will be created as well and all fetching queries will be routed to the read replica.
+        engines for read replicas will be created as well and all fetching queries will be routed to the read replicas.
+        Every session picks a replica with the replica balancer on its first read and sticks to it.
+        If health checks are configured, replicas are probed in the background and reads of ejected replicas
+        fall back to other replicas or to the primary server.
+        If the slow query log is configured, statements slower than its threshold are logged with their plans.
         A typical use case is to run this method once your application is starting.
         """
-        self._engine = self._create_engine(url=self.db_url, ssl_context=self._ssl_context)
-        slave_sync_engine = None
-        if self.read_replica_url:
-            self._ro_engine = self._create_engine(url=self.read_replica_url, ssl_context=self._read_replica_ssl_context)
-            slave_sync_engine = self._ro_engine.sync_engine  # pyright: ignore [reportMissingParameterType]
+        self._engine = self._create_engine(
+            url=self.db_url, ssl_context=self._ssl_context, pool_config=self._pool_config
+        )
+        self._ro_engines = tuple(
+            self._create_engine(
+                url=url,
+                ssl_context=self._read_replica_ssl_context,
+                pool_config=self._read_replica_pool_config,
+            )
+            for url in self.read_replica_urls
+        )
+        if self._slow_query_log:
+            self._slow_query_log.install(self._engine, name="primary")
+            for index, engine in enumerate(self._ro_engines):
+                self._slow_query_log.install(engine, name=f"replica_{index}")
+        self._replica_set = None
+        self._health_monitor = None
+        if self._ro_engines:
+            replicas = [
+                Replica(name=f"replica_{index}", engine=engine.sync_engine, breaker=self._create_breaker())
+                for index, engine in enumerate(self._ro_engines)
+            ]
+            self._replica_set = ReplicaSet(replicas, balancer=self._replica_balancer)
+            if self._health_check:
+                self._health_monitor = AsyncReplicaHealthMonitor(
+                    list(zip(replicas, self._ro_engines)), config=self._health_check
+                )
+                self._health_monitor.start()
         self._session_maker = async_sessionmaker(
             expire_on_commit=False,
             sync_session_class=Session,
-            info={"master": self._engine.sync_engine, "slave": slave_sync_engine},
+            info={
+                "master": self._engine.sync_engine,
+                "slave": self._replica_set,
+                "write_tracker": self._write_tracker,
+            },
         )
 
     async def disconnect(self):
         """
         Close connections to DB. A typical use case is to run this method before shutting down your application
         """
+        if getattr(self, "_health_monitor", None):
+            await self._health_monitor.stop()
+            self._health_monitor = None
+        if self._slow_query_log:
+            await self._slow_query_log.close()
         await self._engine.dispose() if hasattr(self, "_engine") else ...
-        if hasattr(self, "_ro_engine") and isinstance(self._ro_engine, AsyncEngine):
-            await self._ro_engine.dispose()
+        for ro_engine in getattr(self, "_ro_engines", ()):
+            await ro_engine.dispose()
+
+    async def get_max_allowed_packet(self) -> int | None:
+        """
+        Read `max_allowed_packet` of the primary server. The value is read once and cached.
+        :return: max size of a statement in bytes or None if the database is not MySQL
+        """
+        if not hasattr(self, "_max_allowed_packet"):
+            max_allowed_packet = None
+            if self.engine.dialect.name == "mysql":
+                async with self.engine.connect() as connection:
+                    max_allowed_packet = await connection.scalar(text("SELECT @@max_allowed_packet"))
+            self._max_allowed_packet = max_allowed_packet
+        return self._max_allowed_packet
 
     @property
     def session(self) -> AsyncSession:
@@ -72,15 +170,140 @@ class AsyncDatabase:
         """
         return self.session_maker()  # pyright: ignore [ reportOptionalCall ]
 
-    @staticmethod
-    def _create_engine(url: URL, ssl_context: ssl.SSLContext | None) -> AsyncEngine:
+    def pool_stats(self) -> dict[str, PoolStats]:
+        """
+        Collect stats of connection pools: checked out, idle and overflow connections and checkout wait times
+        :return: a dict with stats of the "primary" pool and pools of read replicas ("replica_0", "replica_1", ...)
+        """
+        stats = {"primary": get_pool_stats(self.engine.sync_engine.pool)}
+        for replica in self._replica_set.replicas if self._replica_set else ():
+            stats[replica.name] = get_pool_stats(replica.engine.pool)
+        return stats
+
+    def compiled_cache_stats(self) -> dict[str, CompiledCacheStats]:
+        """
+        Collect stats of SQLAlchemy compiled statement caches of the engines: cached statements, the cache size
+        (`compiled_cache_size`) and lookup hits and misses. Lookups are counted only if the database is created with
+        `count_compiled_cache_lookups=True`, they are 0 otherwise
+        :return: a dict with stats of the "primary" engine and engines of read replicas ("replica_0", "replica_1", ...)
+        """
+        stats = {"primary": get_compiled_cache_stats(self.engine.sync_engine)}
+        for index, engine in enumerate(self.read_only_engines):
+            stats[f"replica_{index}"] = get_compiled_cache_stats(engine.sync_engine)
+        return stats
+
+    def replica_stats(self) -> dict[str, ReplicaStats]:
+        """
+        Collect counters of read replicas: routed sessions, executed statements, checked out connections,
+        the moving average of statement latency, availability and replication lag
+        :return: a dict with stats of read replicas ("replica_0", "replica_1", ...)
+        """
+        assert hasattr(self, "_replica_set")
+        return self._replica_set.stats() if self._replica_set else {}
+
+    async def check_replicas(self) -> None:
+        """
+        Probe read replicas once: eject replicas that don't respond or lag behind too much and return
+        recovered ones to routing. Replicas are probed in the background every `HealthCheckConfig.interval` seconds,
+        the method runs a check right away.
+        """
+        assert hasattr(self, "_health_monitor")
+        assert self._health_monitor, "Health checks are not enabled"
+        await self._health_monitor.check()
+
+    @property
+    def current_session(self) -> AsyncSession | None:
+        """
+        Session of the `transaction` scope entered in the current context
+        :return: a session instance or None outside of `transaction` scopes
+        """
+        return self._transaction_session.get()
+
+    @contextmanager
+    def request_scope(self) -> t.Iterator[None]:
+        """
+        Scope read-your-writes routing to a request: reads in the scope aren't pinned by writes made before it,
+        and writes made in it are forgotten at exit. Every asyncio task has its own context, wrap requests in it
+        (e.g. in a middleware) if one task handles several requests, otherwise a write pins reads of the next one.
+        Does nothing if read-your-writes routing is not configured.
+        """
+        if self._write_tracker is None:
+            yield
+            return
+        with self._write_tracker.scope():
+            yield
+
+    @asynccontextmanager
+    async def transaction(self) -> t.AsyncIterator[AsyncSession]:
+        """
+        Open a unit of work: DAO methods called inside the scope detect it and share its session, so they use one
+        connection to the primary server, and their changes are committed once at exit or rolled back on error.
+        Reads are routed to the primary server as well, so they see the changes made in the scope.
+        Nested scopes are run in SAVEPOINTs, an error rolls back only the changes of the nested scope.
+        Tasks created inside the scope inherit it, but the session must not be used by several tasks at once.
+        :return: the session of the unit of work
+        """
+        session = self._transaction_session.get()
+        if session is not None:
+            async with session.begin_nested():
+                yield session
+            return
+        async with self.session_maker(info={"slave": None}) as session:
+            token = self._transaction_session.set(session)
+            try:
+                async with session.begin():
+                    yield session
+            finally:
+                self._transaction_session.reset(token)
+            if session.info.pop(_HAS_WRITES_KEY, False):
+                await self.record_write()
+
+    @property
+    def has_recent_write(self) -> bool:
+        """
+        Whether reads of the current request are routed to the primary server by read-your-writes routing
+        """
+        return self._write_tracker is not None and self._write_tracker.recent_write is not None
+
+    async def record_write(self) -> None:
+        """
+        Route reads of the current request (thread or asyncio task) to the primary server for the
+        read-your-writes window. DAO write methods call it, call it after writes made with sessions directly.
+        Inside a `transaction` scope the write is recorded when the scope is committed.
+        Does nothing if read-your-writes routing is not configured.
+        """
+        if self._write_tracker is None:
+            return
+        session = self.current_session
+        if session is not None:
+            session.info[_HAS_WRITES_KEY] = True
+            return
+        gtid = None
+        if self._write_tracker.config.track_gtid:
+            async with self.engine.connect() as connection:
+                gtid = await connection.run_sync(read_gtid_executed)
+        self._write_tracker.mark_write(gtid)
+
+    def _create_breaker(self) -> CircuitBreaker | None:
+        if not self._health_check:
+            return None
+        return CircuitBreaker(
+            failure_threshold=self._health_check.failure_threshold, recovery_time=self._health_check.recovery_time
+        )
+
+    def _create_engine(self, url: URL, ssl_context: ssl.SSLContext | None, pool_config: PoolConfig) -> AsyncEngine:
         connect_args = {"ssl": ssl_context} if ssl_context else {}
         try:
             engine = create_async_engine(
                 url,
                 connect_args=connect_args,
-                pool_pre_ping=True,
+                query_cache_size=self._compiled_cache_size,
+                **engine_options(url, pool_config),
             )
-            return engine
         except Exception as ex:
             raise DBConnectionError("Can not connect to DB") from ex
+        if pool_config.ping_after_idle is not None:
+            install_idle_ping(engine.sync_engine, ping_after_idle=pool_config.ping_after_idle)
+        if self._count_compiled_cache_lookups:
+            install_compiled_cache_stats(engine.sync_engine)
+        return engine
@@ -0,0 +1,69 @@
+import threading
+import typing as t
+from dataclasses import dataclass
+
+from sqlalchemy import Engine, event
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+
+DEFAULT_COMPILED_CACHE_SIZE = 500
+
+_COUNTER_KEY = "ash_dal_compiled_cache_counter"
+
+
+@dataclass(frozen=True)
+class CompiledCacheStats:
+    """
+    Snapshot of the SQLAlchemy compiled statement cache of an engine. Lookups are counted since the engine was created,
+    statements that can't be cached (e.g. plain text SQL) aren't counted.
+    """
+
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _CacheCounter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def record(self, cache_hit: t.Any) -> None:
+        if cache_hit is CACHE_HIT:
+            with self._lock:
+                self.hits += 1
+        elif cache_hit is CACHE_MISS:
+            with self._lock:
+                self.misses += 1
+
+
+def install_compiled_cache_stats(engine: Engine) -> None:
+    """Count hits and misses of the compiled statement cache of an engine"""
+    counter = _CacheCounter()
+    setattr(engine, _COUNTER_KEY, counter)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(  # pyright: ignore [reportUnusedFunction]
+        conn: t.Any, cursor: t.Any, statement: str, parameters: t.Any, context: t.Any, executemany: bool
+    ) -> None:
+        counter.record(getattr(context, "cache_hit", None))
+
+
+def get_compiled_cache_stats(engine: Engine) -> CompiledCacheStats:
+    """
+    Collect stats of the compiled statement cache of an engine. Lookups are 0 unless the engine was set up with
+    :func:`install_compiled_cache_stats`.
+    """
+    counter: _CacheCounter = getattr(engine, _COUNTER_KEY, None) or _CacheCounter()
+    cache = engine._compiled_cache  # pyright: ignore [reportPrivateUsage]
+    return CompiledCacheStats(
+        size=len(cache) if cache is not None else 0,
+        max_size=cache.capacity if cache is not None else 0,  # pyright: ignore [reportGeneralTypeIssues]
+        hits=counter.hits,
+        misses=counter.misses,
+    )
@@ -0,0 +1,111 @@
+import logging
+import time
+import typing as t
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from sqlalchemy import Connection, Engine, text
+
+from ash_dal.utils.context import ContextSlot
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ReadYourWritesConfig:
+    """
+    Settings of read-your-writes routing. After a DAO write the reads of the same request (thread or asyncio task)
+    go to the primary server for `window` seconds. If `track_gtid` is set, the GTID set executed by the primary
+    is read after the write and a replica gets the reads back earlier if it has applied that set by the first read
+    routed to it. GTIDs are only tracked on MySQL with `gtid_mode=ON`.
+    """
+
+    window: float = 2.0
+    track_gtid: bool = False
+
+
+@dataclass
+class RecentWrite:
+    written_at: float
+    gtid: str | None = None
+    # Whether replica engines had applied the GTID set when they were checked. Every replica is checked once
+    # per write, a lagging one serves reads again after the window
+    applied_by: dict[Engine, bool] = field(default_factory=dict)
+
+
+def read_gtid_executed(connection: Connection) -> str | None:
+    """
+    Read the GTID set executed by a MySQL server
+    :return: the GTID set or None if the server is not MySQL or GTIDs are disabled
+    """
+    if connection.dialect.name != "mysql":
+        return None
+    return connection.scalar(text("SELECT @@global.gtid_executed")) or None
+
+
+def has_applied_gtid(connection: Connection, gtid: str) -> bool:
+    """
+    Check whether a MySQL replica has applied a GTID set
+    """
+    return bool(connection.scalar(text("SELECT GTID_SUBSET(:gtid, @@global.gtid_executed)"), {"gtid": gtid}))
+
+
+class WriteTracker:
+    """
+    Keeps the last write of the current context. Every thread and asyncio task has its own context,
+    tasks inherit the context of the code that created them.
+    """
+
+    def __init__(self, config: ReadYourWritesConfig, clock: t.Callable[[], float] = time.monotonic):
+        self.config = config
+        self._clock = clock
+        self._recent_write = ContextSlot[RecentWrite]()
+
+    @property
+    def recent_write(self) -> RecentWrite | None:
+        """The last write of the current context if it was made within the window"""
+        write = self._recent_write.get()
+        if write is None or self._clock() - write.written_at >= self.config.window:
+            return None
+        return write
+
+    def mark_write(self, gtid: str | None = None) -> None:
+        self._recent_write.set(RecentWrite(written_at=self._clock(), gtid=gtid))
+
+    def reset(self) -> None:
+        self._recent_write.set(None)
+
+    @contextmanager
+    def scope(self) -> t.Iterator[None]:
+        """
+        Start a block without a recent write and restore the marker of the outer context at exit,
+        so writes of a request don't pin reads of the next request handled by the same thread
+        """
+        token = self._recent_write.set(None)
+        try:
+            yield
+        finally:
+            self._recent_write.reset(token)
+
+    def pins_primary(self, replica_engine: Engine) -> bool:
+        """
+        Check whether a read of the current context must go to the primary server instead of the replica
+        """
+        write = self.recent_write
+        if write is None:
+            return False
+        if write.gtid is None:
+            return True
+        applied = write.applied_by.get(replica_engine)
+        if applied is None:
+            applied = write.applied_by[replica_engine] = self._has_applied_gtid(replica_engine, write.gtid)
+        return not applied
+
+    @staticmethod
+    def _has_applied_gtid(replica_engine: Engine, gtid: str) -> bool:
+        try:
+            with replica_engine.connect() as connection:
+                return has_applied_gtid(connection, gtid)
+        except Exception as ex:
+            logger.warning("Can not check GTID of a replica: %r", ex)
+            return False
@@ -0,0 +1,253 @@
+import asyncio
+import enum
+import logging
+import threading
+import time
+import typing as t
+from dataclasses import dataclass
+
+from sqlalchemy import Connection, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ash_dal.exceptions.database import ReplicaLagError
+
+if t.TYPE_CHECKING:
+    from ash_dal.database.replicas import Replica
+
+logger = logging.getLogger(__name__)
+
+LagReader = t.Callable[[Connection], float | None]
+
+
+@dataclass(frozen=True)
+class HealthCheckConfig:
+    """
+    Settings of read replica health checks. Replicas are probed in the background every `interval` seconds.
+    A replica is ejected from routing after `failure_threshold` failures in a row, either of probes or of
+    connections made by queries, and reads fall back to other replicas or to the primary server.
+    After `recovery_time` seconds a single session reads from an ejected replica on trial, a successful probe returns
+    it to routing and a failure ejects it for another `recovery_time`.
+    """
+
+    interval: float = 5.0
+    failure_threshold: int = 3
+    recovery_time: float = 30.0
+    # Max replication lag in seconds. Reading the lag needs the `REPLICATION CLIENT` privilege on MySQL.
+    # None disables lag checks.
+    max_lag: float | None = 30.0
+
+
+class CircuitState(enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Tracks failures of a replica. Opens after `failure_threshold` failures in a row and lets a single trial session
+    through after `recovery_time` seconds: a success closes it, a failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        recovery_time: float = 30.0,
+        clock: t.Callable[[], float] = time.monotonic,
+    ):
+        assert failure_threshold > 0, "Failure threshold must be greater than 0"
+        self._failure_threshold = failure_threshold
+        self._recovery_time = recovery_time
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_taken = False
+
+    @property
+    def state(self) -> CircuitState:
+        opened_at = self._opened_at
+        if opened_at is None:
+            return CircuitState.CLOSED
+        if self._clock() - opened_at >= self._recovery_time:
+            return CircuitState.HALF_OPEN
+        return CircuitState.OPEN
+
+    @property
+    def is_available(self) -> bool:
+        return self.state is not CircuitState.OPEN
+
+    def take_trial(self) -> bool:
+        """
+        Let a session through a half-open circuit. Only the first caller gets the trial,
+        the next trial is given once a success or a failure is recorded
+        :return: whether the caller got the trial
+        """
+        with self._lock:
+            if self._trial_taken or self.state is not CircuitState.HALF_OPEN:
+                return False
+            self._trial_taken = True
+            return True
+
+    def record_success(self) -> None:
+        if self._opened_at is None and not self._failures:
+            return
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_taken = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._opened_at is not None or self._failures >= self._failure_threshold:
+                # A failed trial of a half-open circuit restarts the recovery time
+                self._opened_at = self._clock()
+                self._trial_taken = False
+
+
+def read_replication_lag(connection: Connection) -> float | None:
+    """
+    Read `Seconds_Behind_Source` of a MySQL replica
+    :param connection: connection to the replica
+    :return: lag in seconds or None if the server is not a MySQL replica
+    """
+    if connection.dialect.name != "mysql":
+        return None
+    try:
+        status = connection.execute(text("SHOW REPLICA STATUS")).mappings().first()
+        lag_key = "Seconds_Behind_Source"
+    except Exception:
+        # MySQL before 8.0.22 and MariaDB
+        connection.rollback()
+        status = connection.execute(text("SHOW SLAVE STATUS")).mappings().first()
+        lag_key = "Seconds_Behind_Master"
+    if status is None:
+        return None
+    lag = status[lag_key]
+    if lag is None:
+        raise ReplicaLagError("Replication is not running")
+    return float(lag)
+
+
+def probe_replica(connection: Connection, lag_reader: LagReader, config: HealthCheckConfig) -> float | None:
+    """
+    Check that the replica responds and read its replication lag if lag checks are enabled
+    :return: lag in seconds or None if it's unknown
+    """
+    connection.execute(text("SELECT 1"))
+    return lag_reader(connection) if config.max_lag is not None else None
+
+
+def record_probe(replica: "Replica", lag: float | None, config: HealthCheckConfig) -> None:
+    """
+    Update the replica's state with a successful probe
+    """
+    assert replica.breaker is not None
+    replica.lag = lag
+    if config.max_lag is not None and lag is not None and lag > config.max_lag:
+        logger.warning("Replica %s lags behind by %s seconds", replica.name, lag)
+        replica.breaker.record_failure()
+    else:
+        replica.breaker.record_success()
+
+
+def record_probe_failure(replica: "Replica", error: Exception) -> None:
+    assert replica.breaker is not None
+    logger.warning("Health check of replica %s failed: %r", replica.name, error)
+    replica.breaker.record_failure()
+
+
+class ReplicaHealthMonitor:
+    """
+    Probes replicas from a daemon thread
+    """
+
+    def __init__(
+        self,
+        replicas: t.Sequence["Replica"],
+        config: HealthCheckConfig,
+        lag_reader: LagReader = read_replication_lag,
+    ):
+        self._replicas = replicas
+        self._config = config
+        self._lag_reader = lag_reader
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def check(self) -> None:
+        """Probe every replica once"""
+        for replica in self._replicas:
+            try:
+                with replica.engine.connect() as connection:
+                    lag = probe_replica(connection, lag_reader=self._lag_reader, config=self._config)
+            except Exception as ex:
+                record_probe_failure(replica, ex)
+            else:
+                record_probe(replica, lag, self._config)
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="ash-dal-replica-health", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._config.interval):
+            self.check()
+
+
+class AsyncReplicaHealthMonitor:
+    """
+    Probes replicas from an asyncio task
+    """
+
+    def __init__(
+        self,
+        replicas: t.Sequence[tuple["Replica", AsyncEngine]],
+        config: HealthCheckConfig,
+        lag_reader: LagReader = read_replication_lag,
+    ):
+        """
+        :param replicas: pairs of replicas and their async engines
+        :param config: health check settings
+        :param lag_reader: function reading replication lag through a sync connection
+        """
+        self._replicas = replicas
+        self._config = config
+        self._lag_reader = lag_reader
+        self._task: asyncio.Task[None] | None = None
+
+    async def check(self) -> None:
+        """Probe every replica once"""
+        for replica, engine in self._replicas:
+            try:
+                async with engine.connect() as connection:
+                    lag = await connection.run_sync(probe_replica, lag_reader=self._lag_reader, config=self._config)
+            except Exception as ex:
+                record_probe_failure(replica, ex)
+            else:
+                record_probe(replica, lag, self._config)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._config.interval)
+            await self.check()
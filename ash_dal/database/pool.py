@@ -0,0 +1,158 @@
+import threading
+import time
+import typing as t
+from dataclasses import dataclass
+
+from sqlalchemy import URL, Engine, event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine.interfaces import DBAPIConnection
+from sqlalchemy.pool import ConnectionPoolEntry, Pool, PoolProxiedConnection, QueuePool
+
+from ash_dal.utils.tracing import SPAN_CHECKOUT, child_span
+
+_LAST_USED_KEY = "ash_dal_last_used"
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """
+    Settings of the connection pool of an engine. Size settings only apply to queue pools,
+    the pool class of the dialect is used if `poolclass` is not set.
+    """
+
+    pool_size: int = 5
+    max_overflow: int = 10
+    # Seconds to wait for a connection when all of them are checked out
+    pool_timeout: float = 30.0
+    # Seconds after which connections are replaced, -1 disables recycling
+    pool_recycle: int = -1
+    poolclass: type[Pool] | None = None
+    # Ping connections idle for longer than this many seconds on checkout and replace them if they are dead.
+    # None disables pings.
+    ping_after_idle: float | None = 30.0
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """
+    Snapshot of the state of a connection pool. Checkout counters are kept since the engine was created.
+    """
+
+    size: int
+    checked_out: int
+    idle: int
+    overflow: int
+    checkouts: int
+    checkout_timeouts: int
+    checkout_wait_total: float
+    checkout_wait_max: float
+
+    @property
+    def checkout_wait_avg(self) -> float:
+        return self.checkout_wait_total / self.checkouts if self.checkouts else 0.0
+
+
+class _CheckoutTimer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = self.timeouts = 0
+        self.wait_total = self.wait_max = 0.0
+
+    def record(self, wait: float, timed_out: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+
+class _TimedPool(Pool):
+    """Measures how long checkouts wait for a connection"""
+
+    _checkout_timer: _CheckoutTimer
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started_at = time.perf_counter()
+        timed_out = False
+        try:
+            with child_span(SPAN_CHECKOUT):
+                return super()._do_get()
+        except sa_exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self._checkout_timer.record(time.perf_counter() - started_at, timed_out=timed_out)
+
+
+def engine_options(url: URL, pool_config: PoolConfig) -> dict[str, t.Any]:
+    """
+    Build `create_engine` keyword arguments for a pool config
+    :param url: DB URL, its dialect defines the default pool class
+    :param pool_config: pool settings
+    :return: a dict with pool arguments
+    """
+    poolclass = pool_config.poolclass or url.get_dialect().get_pool_class(url)
+    # A class per engine keeps its checkout counters, pools recreated by `dispose` continue them
+    timed_poolclass = type(f"Timed{poolclass.__name__}", (_TimedPool, poolclass), {"_checkout_timer": _CheckoutTimer()})
+    options: dict[str, t.Any] = {"poolclass": timed_poolclass, "pool_recycle": pool_config.pool_recycle}
+    if issubclass(poolclass, QueuePool):
+        options.update(
+            pool_size=pool_config.pool_size,
+            max_overflow=pool_config.max_overflow,
+            pool_timeout=pool_config.pool_timeout,
+        )
+    return options
+
+
+def install_idle_ping(engine: Engine, ping_after_idle: float) -> None:
+    """
+    Ping connections that were idle in the pool for longer than `ping_after_idle` seconds on checkout. Unlike
+    `pool_pre_ping` it doesn't add a round trip to checkouts of connections that were used recently.
+    A dead connection is replaced with a new one.
+    """
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(  # pyright: ignore [reportUnusedFunction]
+        dbapi_connection: DBAPIConnection | None,
+        connection_record: ConnectionPoolEntry,
+    ) -> None:
+        connection_record.info[_LAST_USED_KEY] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(  # pyright: ignore [reportUnusedFunction]
+        dbapi_connection: DBAPIConnection,
+        connection_record: ConnectionPoolEntry,
+        connection_proxy: PoolProxiedConnection,
+    ) -> None:
+        last_used = connection_record.info.get(_LAST_USED_KEY)
+        if last_used is None or time.monotonic() - last_used < ping_after_idle:
+            return
+        try:
+            is_alive = engine.dialect.do_ping(dbapi_connection)
+        except Exception as ex:
+            # The pool invalidates the connection and checks out another one
+            raise sa_exc.DisconnectionError() from ex
+        if not is_alive:
+            raise sa_exc.DisconnectionError()
+
+
+def get_pool_stats(pool: Pool) -> PoolStats:
+    """
+    Collect stats of a pool created with :func:`engine_options`. Counts that the pool class doesn't track are 0.
+    """
+    timer: _CheckoutTimer = getattr(pool, "_checkout_timer", None) or _CheckoutTimer()
+    size = checked_out = idle = overflow = 0
+    if isinstance(pool, QueuePool):
+        size, checked_out, idle = pool.size(), pool.checkedout(), pool.checkedin()
+        # The counter is negative until the pool is filled up to its size
+        overflow = max(pool.overflow(), 0)
+    return PoolStats(
+        size=size,
+        checked_out=checked_out,
+        idle=idle,
+        overflow=overflow,
+        checkouts=timer.checkouts,
+        checkout_timeouts=timer.timeouts,
+        checkout_wait_total=timer.wait_total,
+        checkout_wait_max=timer.wait_max,
+    )
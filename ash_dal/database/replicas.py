@@ -0,0 +1,198 @@
+import itertools
+import threading
+import time
+import typing as t
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from sqlalchemy import Engine, event
+from sqlalchemy.engine import ExceptionContext
+
+from ash_dal.database.health import CircuitBreaker, CircuitState
+
+DEFAULT_LATENCY_EWMA_ALPHA = 0.2
+_STARTED_AT_KEY = "ash_dal_query_started_at"
+
+
+@dataclass(frozen=True)
+class ReplicaStats:
+    """
+    Counters of a read replica. `latency_ewma` is the exponentially weighted moving average of statement
+    execution time in seconds, None until the first statement is executed.
+    """
+
+    sessions: int
+    queries: int
+    checked_out: int
+    latency_ewma: float | None
+    # Whether reads are routed to the replica, replicas ejected by health checks are not
+    available: bool = True
+    # Replication lag in seconds read by the last health check
+    lag: float | None = None
+
+
+class Replica:
+    """
+    Engine of a read replica with counters of routed sessions, executed statements and their latency
+    """
+
+    def __init__(
+        self,
+        name: str,
+        engine: Engine,
+        ewma_alpha: float = DEFAULT_LATENCY_EWMA_ALPHA,
+        breaker: CircuitBreaker | None = None,
+    ):
+        """
+        :param name: name of the replica in stats
+        :param engine: sync engine of the replica, for async engines pass `AsyncEngine.sync_engine`
+        :param ewma_alpha: weight of the latest statement latency in the moving average
+        :param breaker: circuit breaker that ejects the replica from routing, the replica is always available without it
+        """
+        self.name = name
+        self.engine = engine
+        self.breaker = breaker
+        self.lag: float | None = None
+        self._ewma_alpha = ewma_alpha
+        self._lock = threading.Lock()
+        self._sessions = self._queries = self._checked_out = 0
+        self._latency_ewma: float | None = None
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        # Pool events are counted instead of reading pool stats, because not every pool class tracks checkouts
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "handle_error", self._on_error)
+
+    @property
+    def is_available(self) -> bool:
+        return self.breaker is None or self.breaker.is_available
+
+    @property
+    def is_healthy(self) -> bool:
+        """Whether the circuit is closed, a half-open replica only gets a trial session"""
+        return self.breaker is None or self.breaker.state is CircuitState.CLOSED
+
+    def take_trial(self) -> bool:
+        return self.breaker is not None and self.breaker.take_trial()
+
+    @property
+    def checked_out(self) -> int:
+        return self._checked_out
+
+    @property
+    def latency_ewma(self) -> float | None:
+        return self._latency_ewma
+
+    def record_session(self) -> None:
+        with self._lock:
+            self._sessions += 1
+
+    def record_query(self, latency: float) -> None:
+        with self._lock:
+            self._queries += 1
+            if self._latency_ewma is None:
+                self._latency_ewma = latency
+            else:
+                self._latency_ewma += self._ewma_alpha * (latency - self._latency_ewma)
+
+    @property
+    def stats(self) -> ReplicaStats:
+        with self._lock:
+            return ReplicaStats(
+                sessions=self._sessions,
+                queries=self._queries,
+                checked_out=self._checked_out,
+                latency_ewma=self._latency_ewma,
+                available=self.is_available,
+                lag=self.lag,
+            )
+
+    def _on_checkout(self, *_: t.Any) -> None:
+        with self._lock:
+            self._checked_out += 1
+
+    def _on_checkin(self, *_: t.Any) -> None:
+        with self._lock:
+            self._checked_out = max(self._checked_out - 1, 0)
+
+    def _before_cursor_execute(self, conn: t.Any, *_: t.Any) -> None:
+        conn.info[_STARTED_AT_KEY] = time.perf_counter()
+
+    def _after_cursor_execute(self, conn: t.Any, *_: t.Any) -> None:
+        started_at = conn.info.pop(_STARTED_AT_KEY, None)
+        if started_at is not None:
+            self.record_query(time.perf_counter() - started_at)
+
+    def _on_error(self, context: ExceptionContext) -> None:
+        # Only health checks close the circuit, successful queries don't reset failures of lag checks
+        if self.breaker is not None and context.is_disconnect:
+            self.breaker.record_failure()
+
+
+class IReplicaBalancer(ABC):
+    @abstractmethod
+    def choose(self, replicas: t.Sequence[Replica]) -> Replica:
+        """Pick a replica for a new session out of a non-empty sequence"""
+
+
+class RoundRobinBalancer(IReplicaBalancer):
+    """
+    Picks replicas in turn
+    """
+
+    def __init__(self):
+        self._counter = itertools.count()
+
+    def choose(self, replicas: t.Sequence[Replica]) -> Replica:
+        # `next` of `itertools.count` is atomic in CPython, so the balancer is thread safe without a lock
+        return replicas[next(self._counter) % len(replicas)]
+
+
+class LeastConnectionsBalancer(IReplicaBalancer):
+    """
+    Picks the replica with the least connections checked out of its pool
+    """
+
+    def choose(self, replicas: t.Sequence[Replica]) -> Replica:
+        return min(replicas, key=lambda replica: replica.checked_out)
+
+
+class LatencyBalancer(IReplicaBalancer):
+    """
+    Picks the replica with the lowest moving average of statement latency. Replicas that have not executed
+    any statement yet are picked first, so every replica gets measured.
+    """
+
+    def choose(self, replicas: t.Sequence[Replica]) -> Replica:
+        return min(replicas, key=lambda replica: -1.0 if replica.latency_ewma is None else replica.latency_ewma)
+
+
+class ReplicaSet:
+    """
+    Read replicas of a database. Sessions pick one of them with the balancer on the first read and stick to it.
+    """
+
+    def __init__(self, replicas: t.Sequence[Replica], balancer: IReplicaBalancer | None = None):
+        assert replicas, "At least one replica is required"
+        self.replicas = tuple(replicas)
+        self.balancer = balancer or RoundRobinBalancer()
+
+    def choose(self) -> Replica | None:
+        """
+        Pick a healthy replica. A replica whose circuit is half-open is picked once, for a trial session
+        :return: a replica or None if all of them are ejected by health checks
+        """
+        for replica in self.replicas:
+            if replica.take_trial():
+                replica.record_session()
+                return replica
+        replicas = [replica for replica in self.replicas if replica.is_healthy]
+        if not replicas:
+            return None
+        replica = self.balancer.choose(replicas) if len(replicas) > 1 else replicas[0]
+        replica.record_session()
+        return replica
+
+    def stats(self) -> dict[str, ReplicaStats]:
+        return {replica.name: replica.stats for replica in self.replicas}
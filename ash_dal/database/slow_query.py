@@ -0,0 +1,280 @@
+import asyncio
+import contextvars
+import json
+import logging
+import threading
+import time
+import typing as t
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+
+from sqlalchemy import Engine, Row, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ash_dal.utils.explain import explain_prefix
+from ash_dal.utils.instrumentation import current_call_site, enable_call_sites
+
+logger = logging.getLogger(__name__)
+
+_STARTED_AT_KEY = "ash_dal_slow_query_started_at"
+# Execution option of connections that capture plans, their statements aren't logged
+_EXPLAIN_OPTION = "ash_dal_explain"
+# Statements that can be explained without side effects
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+@dataclass(frozen=True)
+class SlowQuery:
+    statement: str
+    # Types of bound parameters, values are never kept
+    parameters: t.Any
+    # Number of parameter sets of an executemany statement, the shape of the first one is kept
+    batch_size: int
+    duration: float
+    # "primary" or the name of a read replica ("replica_0", "replica_1", ...)
+    engine: str
+    # Instrumented DAO and paginator methods that issued the statement as `<class>.<method>`, the outermost first
+    call_site: tuple[str, ...]
+    # The plan of the statement if it was captured
+    plan: t.Any = None
+
+
+@dataclass(frozen=True)
+class SlowQueryConfig:
+    """
+    Settings of the slow query log. Statements that run for `threshold` seconds or longer are logged
+    with the `ash_dal.database.slow_query` logger and passed to `callback`. Plans of slow statements are captured
+    with `EXPLAIN FORMAT=JSON` (`EXPLAIN (FORMAT JSON)` on PostgreSQL, `EXPLAIN QUERY PLAN` on SQLite)
+    on a separate connection: a statement is explained at most once per `explain_cooldown` seconds
+    and no more than `max_explains_per_minute` statements are explained in a minute.
+    """
+
+    threshold: float = 1.0
+    explain: bool = True
+    explain_cooldown: float = 300.0
+    max_explains_per_minute: int = 6
+    callback: t.Callable[[SlowQuery], None] | None = None
+
+
+def redact_parameters(parameters: t.Any) -> t.Any:
+    """
+    Replace values of bound parameters with their type names
+    """
+    if isinstance(parameters, t.Mapping):
+        return {key: type(value).__name__ for key, value in t.cast(t.Mapping[str, t.Any], parameters).items()}
+    if isinstance(parameters, list | tuple):
+        return tuple(type(value).__name__ for value in t.cast(t.Sequence[t.Any], parameters))
+    return None if parameters is None else type(parameters).__name__
+
+
+def explain_statement(dialect_name: str, statement: str) -> str | None:
+    """
+    :return: the statement that captures the plan of a statement or None if it can't be explained
+    """
+    if not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    if dialect_name == "mysql":
+        return explain_prefix("JSON") + statement
+    if dialect_name == "postgresql":
+        return "EXPLAIN (FORMAT JSON) " + statement
+    if dialect_name == "sqlite":
+        return "EXPLAIN QUERY PLAN " + statement
+    return None
+
+
+def parse_plan(rows: t.Sequence[Row[t.Any]]) -> t.Any:
+    if len(rows) == 1 and len(rows[0]) == 1:
+        # A JSON document
+        plan = rows[0][0]
+        return json.loads(plan) if isinstance(plan, str | bytes) else plan
+    return [dict(row._mapping) for row in rows]
+
+
+class ExplainRateLimiter:
+    """
+    Limits how often plans are captured: a statement is explained once per cooldown and the total number
+    of explained statements per minute is capped
+    """
+
+    def __init__(self, cooldown: float, max_per_minute: int, clock: t.Callable[[], float] = time.monotonic):
+        self.cooldown = cooldown
+        self.max_per_minute = max_per_minute
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._explained_at: dict[str, float] = {}
+        self._recent: deque[float] = deque()
+
+    def acquire(self, statement: str) -> bool:
+        """
+        :return: whether the statement may be explained now
+        """
+        now = self._clock()
+        with self._lock:
+            while self._recent and now - self._recent[0] >= 60.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.max_per_minute:
+                return False
+            explained_at = self._explained_at.get(statement)
+            if explained_at is not None and now - explained_at < self.cooldown:
+                return False
+            self._explained_at = {
+                key: value for key, value in self._explained_at.items() if now - value < self.cooldown
+            }
+            self._explained_at[statement] = now
+            self._recent.append(now)
+            return True
+
+
+class BaseSlowQueryLog(ABC):
+    def __init__(self, config: SlowQueryConfig, clock: t.Callable[[], float] = time.monotonic):
+        self.config = config
+        self._limiter = ExplainRateLimiter(
+            cooldown=config.explain_cooldown, max_per_minute=config.max_explains_per_minute, clock=clock
+        )
+        enable_call_sites()
+
+    def _listen(self, engine: Engine, name: str) -> None:
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn: t.Any, *_: t.Any) -> None:  # pyright: ignore [reportUnusedFunction]
+            conn.info[_STARTED_AT_KEY] = time.perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(  # pyright: ignore [reportUnusedFunction]
+            conn: t.Any, cursor: t.Any, statement: str, parameters: t.Any, context: t.Any, executemany: bool
+        ) -> None:
+            started_at: float | None = conn.info.pop(_STARTED_AT_KEY, None)
+            if started_at is None or context.execution_options.get(_EXPLAIN_OPTION):
+                return
+            duration = time.perf_counter() - started_at
+            if duration >= self.config.threshold:
+                self._on_slow_query(engine, name, statement, parameters, executemany, duration)
+
+    def _on_slow_query(
+        self, engine: Engine, name: str, statement: str, parameters: t.Any, executemany: bool, duration: float
+    ) -> None:
+        if executemany:
+            batch_size = len(parameters)
+            parameters = parameters[0] if parameters else None
+        else:
+            batch_size = 1
+        query = SlowQuery(
+            statement=statement,
+            parameters=redact_parameters(parameters),
+            batch_size=batch_size,
+            duration=duration,
+            engine=name,
+            call_site=current_call_site(),
+        )
+        explain = explain_statement(engine.dialect.name, statement) if self.config.explain else None
+        if explain is None or not self._limiter.acquire(statement):
+            self._report(query)
+            return
+        self._schedule_explain(engine, query, explain, parameters)
+
+    @abstractmethod
+    def _schedule_explain(self, engine: Engine, query: SlowQuery, explain: str, parameters: t.Any) -> None:
+        ...
+
+    def _report(self, query: SlowQuery) -> None:
+        logger.warning(
+            "Slow query (%.3fs) on %s by %s: %s; parameters: %s%s%s",
+            query.duration,
+            query.engine,
+            " > ".join(query.call_site) or "-",
+            query.statement,
+            query.parameters,
+            f" x {query.batch_size}" if query.batch_size > 1 else "",
+            f"; plan: {json.dumps(query.plan, default=str)}" if query.plan is not None else "",
+        )
+        if self.config.callback is not None:
+            try:
+                self.config.callback(query)
+            except Exception:
+                logger.exception("Slow query callback failed")
+
+
+class SlowQueryLog(BaseSlowQueryLog):
+    """
+    Slow query log of sync engines. Plans are captured on a background thread, so the statements are reported
+    once their plans are ready.
+    """
+
+    def __init__(self, config: SlowQueryConfig, clock: t.Callable[[], float] = time.monotonic):
+        super().__init__(config, clock=clock)
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    def install(self, engine: Engine, name: str) -> None:
+        """
+        Start logging slow statements of an engine
+        :param name: name of the engine in records, "primary" or the name of a read replica
+        """
+        self._listen(engine, name)
+
+    def close(self) -> None:
+        """Wait for plans that are being captured"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _schedule_explain(self, engine: Engine, query: SlowQuery, explain: str, parameters: t.Any) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ash_dal_explain")
+            self._executor.submit(self._explain, engine, query, explain, parameters)
+
+    def _explain(self, engine: Engine, query: SlowQuery, explain: str, parameters: t.Any) -> None:
+        plan = None
+        try:
+            with engine.connect().execution_options(**{_EXPLAIN_OPTION: True}) as connection:
+                plan = parse_plan(connection.exec_driver_sql(explain, parameters).all())
+        except Exception as ex:
+            logger.warning("Can not capture the plan of a slow query: %r", ex)
+        self._report(replace(query, plan=plan))
+
+
+class AsyncSlowQueryLog(BaseSlowQueryLog):
+    """
+    Slow query log of async engines. Plans are captured in tasks of the running event loop, so the statements
+    are reported once their plans are ready.
+    """
+
+    def __init__(self, config: SlowQueryConfig, clock: t.Callable[[], float] = time.monotonic):
+        super().__init__(config, clock=clock)
+        self._engines: dict[Engine, AsyncEngine] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def install(self, engine: AsyncEngine, name: str) -> None:
+        """
+        Start logging slow statements of an engine
+        :param name: name of the engine in records, "primary" or the name of a read replica
+        """
+        self._engines[engine.sync_engine] = engine
+        self._listen(engine.sync_engine, name)
+
+    async def close(self) -> None:
+        """Wait for plans that are being captured"""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _schedule_explain(self, engine: Engine, query: SlowQuery, explain: str, parameters: t.Any) -> None:
+        # The task runs in an empty context, so it isn't a part of the operation that issued the statement
+        task = asyncio.get_running_loop().create_task(
+            self._explain(self._engines[engine], query, explain, parameters), context=contextvars.Context()
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, engine: AsyncEngine, query: SlowQuery, explain: str, parameters: t.Any) -> None:
+        plan = None
+        try:
+            async with engine.connect() as connection:
+                await connection.execution_options(**{_EXPLAIN_OPTION: True})
+                result = await connection.exec_driver_sql(explain, parameters)
+                plan = parse_plan(result.all())
+        except Exception as ex:
+            logger.warning("Can not capture the plan of a slow query: %r", ex)
+        self._report(replace(query, plan=plan))
@@ -1,9 +1,37 @@
+import threading
 import typing as t
 
-from sqlalchemy import ClauseElement, Connection, Engine, Select
+from sqlalchemy import ClauseElement, Connection, Engine, Select, event
 from sqlalchemy import exc as sa_exc
 from sqlalchemy.orm import Session as SQLAlchemySession
 
+from ash_dal.database.consistency import WriteTracker
+from ash_dal.database.replicas import Replica, ReplicaSet
+from ash_dal.utils.metrics import ENGINE_PRIMARY, ENGINE_REPLICA, is_measured, record_engine
+from ash_dal.utils.tracing import install_tracing, is_traced, set_span_attribute
+
+_ENGINE_ROLE_KEY = "ash_dal_engine_role"
+_install_lock = threading.Lock()
+
+
+def install_engine_role(engine: Engine, role: str) -> None:
+    """
+    Record the role of an engine ("primary" or "replica") in the metrics and the span of the operation
+    that executes a statement on it. Listeners are added once per engine
+    """
+    if getattr(engine, _ENGINE_ROLE_KEY, None) is not None:
+        return
+    with _install_lock:
+        if getattr(engine, _ENGINE_ROLE_KEY, None) is not None:
+            return
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(*_: t.Any) -> None:  # pyright: ignore [reportUnusedFunction]
+            record_engine(role)
+            set_span_attribute("ash_dal.engine", role)
+
+        setattr(engine, _ENGINE_ROLE_KEY, role)
+
 
 class Session(SQLAlchemySession):
     def get_bind(
@@ -17,7 +45,7 @@ class Session(SQLAlchemySession):
         **kw: t.Any,
     ) -> Engine | Connection:
         try:
-            return super().get_bind(
+            bound = super().get_bind(
                 mapper=mapper,
                 clause=clause,
                 bind=bind,
@@ -25,12 +53,48 @@ class Session(SQLAlchemySession):
                 _sa_skip_for_implicit_returning=_sa_skip_for_implicit_returning,
                 **kw,
             )
+            self._record_engine(
+                bound.engine, ENGINE_PRIMARY if bound.engine is self.info.get("master") else ENGINE_REPLICA
+            )
+            return bound
         except sa_exc.UnboundExecutionError as e:
             # Make decision either suse master or slave instance based on clause
             master_engine = self.info.get("master")
             slave_engine = self.info.get("slave")
             if issubclass(clause.__class__, Select) and slave_engine:
-                return slave_engine
+                if isinstance(slave_engine, ReplicaSet):
+                    slave_engine = self._get_replica_engine(slave_engine)
+                # Reads fall back to the primary if all replicas are ejected or the context has written recently
+                if slave_engine and not self._pins_primary(slave_engine):
+                    self._record_engine(slave_engine, ENGINE_REPLICA)
+                    return slave_engine
             if master_engine:
+                self._record_engine(master_engine, ENGINE_PRIMARY)
                 return master_engine
             raise e
+
+    def _get_replica_engine(self, replica_set: ReplicaSet) -> Engine | None:
+        # The replica is chosen once per session, so all its reads see the same state of data,
+        # unless it's ejected by health checks. A session that got the trial of a half-open replica keeps it
+        replica: Replica | None = getattr(self, "_replica", None)
+        if replica is None or replica not in replica_set.replicas or not self._keeps_replica(replica):
+            replica = self._replica = replica_set.choose()
+            self._is_replica_trial = replica is not None and not replica.is_healthy
+        return replica.engine if replica else None
+
+    def _keeps_replica(self, replica: Replica) -> bool:
+        return replica.is_healthy or (getattr(self, "_is_replica_trial", False) and replica.is_available)
+
+    def _pins_primary(self, replica_engine: Engine) -> bool:
+        write_tracker: WriteTracker | None = self.info.get("write_tracker")
+        return write_tracker is not None and write_tracker.pins_primary(replica_engine)
+
+    @staticmethod
+    def _record_engine(engine: Engine, role: str) -> None:
+        # The engine is recorded by statements it executes, binding alone (e.g. to read the dialect) doesn't count.
+        # Listeners are added the first time an engine is bound inside a measured or traced operation
+        traced = is_traced()
+        if traced or is_measured():
+            install_engine_role(engine, role)
+        if traced:
+            install_tracing(engine)
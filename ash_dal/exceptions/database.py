@@ -3,3 +3,11 @@ from ash_dal.exceptions import DALError
 
 class DBConnectionError(DALError):
     pass
+
+
+class UnsupportedDialectError(DALError):
+    pass
+
+
+class ReplicaLagError(DALError):
+    pass
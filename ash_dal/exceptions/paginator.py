@@ -0,0 +1,9 @@
+from ash_dal.exceptions import DALError
+
+
+class PaginationError(DALError):
+    pass
+
+
+class InvalidCursorError(PaginationError):
+    pass
@@ -1,19 +1,52 @@
+from ash_dal.utils.entity_cache import EntityCache, InMemoryCacheBackend, SharedDictCacheBackend
+from ash_dal.utils.metrics import MetricsCollector, OperationMetrics
 from ash_dal.utils.paginator import (
     AsyncDeferredJoinPaginator,
+    AsyncKeysetPaginator,
     AsyncPaginator,
+    CountCache,
+    CountEstimation,
+    CursorPage,
     DeferredJoinPaginator,
     DeferredJoinPaginatorFactory,
+    KeysetPaginator,
+    KeysetPaginatorFactory,
     Paginator,
+    PaginatorFactory,
     PaginatorPage,
 )
+from ash_dal.utils.partitioning import ScanBoundaries
+from ash_dal.utils.progress import BulkProgress
 from ash_dal.utils.ssl import prepare_ssl_context
+from ash_dal.utils.statement_cache import StatementCache
+from ash_dal.utils.tracing import InMemoryTracer, ITracer, OpenTelemetryTracer
+from ash_dal.utils.upsert import UpsertResult
 
 __all__ = [
     "prepare_ssl_context",
     "Paginator",
     "DeferredJoinPaginator",
+    "KeysetPaginator",
     "AsyncPaginator",
     "AsyncDeferredJoinPaginator",
+    "AsyncKeysetPaginator",
     "PaginatorPage",
+    "CursorPage",
+    "PaginatorFactory",
     "DeferredJoinPaginatorFactory",
+    "KeysetPaginatorFactory",
+    "CountCache",
+    "CountEstimation",
+    "EntityCache",
+    "InMemoryCacheBackend",
+    "SharedDictCacheBackend",
+    "UpsertResult",
+    "BulkProgress",
+    "MetricsCollector",
+    "OperationMetrics",
+    "ITracer",
+    "InMemoryTracer",
+    "OpenTelemetryTracer",
+    "StatementCache",
+    "ScanBoundaries",
 ]
@@ -0,0 +1,23 @@
+from enum import Enum
+
+
+class BulkInsertMode(Enum):
+    """How primary keys of rows created by `bulk_create(return_entities=True)` are obtained"""
+
+    # All rows contain their primary keys
+    PASSED_KEYS = "passed_keys"
+    # One `INSERT ... RETURNING` statement, batched by insertmanyvalues
+    RETURNING = "returning"
+    # One multi-row `INSERT`, ids are derived from `LAST_INSERT_ID()` of the first row
+    LAST_INSERT_ID = "last_insert_id"
+    # A statement per row
+    PER_ROW = "per_row"
+
+
+def auto_increment_pks(first_id: int, rows_count: int, increment: int) -> list[tuple[int]]:
+    """
+    Primary keys of rows of a multi-row MySQL insert. They are consecutive (with the step of
+    `auto_increment_increment`) in every `innodb_autoinc_lock_mode`, because the count of rows is known in advance
+    :param first_id: `LAST_INSERT_ID()`, the id of the first inserted row
+    """
+    return [(first_id + index * increment,) for index in range(rows_count)]
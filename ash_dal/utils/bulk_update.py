@@ -0,0 +1,48 @@
+import typing as t
+
+from sqlalchemy import Column, ColumnElement, Table, Update, and_, case, literal, tuple_, update
+
+from ash_dal.utils.chunking import estimate_row_size
+
+
+def build_bulk_update_statement(
+    table: Table,
+    rows: t.Sequence[dict[str, t.Any]],
+    key_columns: t.Sequence[Column[t.Any]],
+    update_columns: t.Sequence[Column[t.Any]],
+) -> Update:
+    """
+    Build `UPDATE ... SET column = CASE ... END WHERE key IN (...)` that writes its own values into every row.
+    If a key is passed more than once, the last row wins.
+    :param table: the table to update rows of
+    :param rows: dicts of column keys to values, all of them must contain `key_columns`.
+    A row without some of `update_columns` keeps their current values.
+    :param key_columns: columns that identify rows
+    :param update_columns: columns that are overwritten
+    :return: an update statement
+    """
+    rows_by_key = {tuple(row[column.key] for column in key_columns): row for row in rows}
+    values: dict[Column[t.Any], ColumnElement[t.Any]] = {}
+    for column in update_columns:
+        new_values = {
+            key: literal(row[column.key], column.type) for key, row in rows_by_key.items() if column.key in row
+        }
+        if len(key_columns) == 1:
+            values[column] = case(
+                {key[0]: value for key, value in new_values.items()}, value=key_columns[0], else_=column
+            )
+        else:
+            whens = [(and_(*(c == v for c, v in zip(key_columns, key))), value) for key, value in new_values.items()]
+            values[column] = case(*whens, else_=column)
+    if len(key_columns) == 1:
+        where_clause = key_columns[0].in_([key[0] for key in rows_by_key])
+    else:
+        where_clause = tuple_(*key_columns).in_(list(rows_by_key))
+    return update(table).where(where_clause).values(values)
+
+
+def bulk_update_row_size(row: dict[str, t.Any], key_fields: tuple[str, ...]) -> int:
+    """Estimate bytes a row takes in a bulk update statement"""
+    # Keys are repeated in the `WHERE` clause and in the `CASE` of every updated column
+    key_size = estimate_row_size({key: row[key] for key in key_fields if key in row})
+    return estimate_row_size(row) + len(row) * key_size
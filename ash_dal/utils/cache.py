@@ -0,0 +1,100 @@
+import threading
+import time
+import typing as t
+from collections import OrderedDict
+from dataclasses import dataclass
+
+K = t.TypeVar("K", bound=t.Hashable)
+V = t.TypeVar("V")
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class TTLCache(t.Generic[K, V]):
+    """
+    Thread safe in-process cache with LRU eviction and an optional time to live for every entry
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float | None = 60.0,
+        clock: t.Callable[[], float] = time.monotonic,
+    ):
+        assert max_size > 0, "Cache size must be greater than 0"
+        self._max_size = max_size
+        self._ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[K, tuple[V, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = 0
+
+    def get(self, key: K) -> V | None:
+        """
+        Get a value by key
+        :param key: cache key
+        :return: the cached value or None if the key is missing or expired
+        """
+        entry = self.get_with_age(key)
+        return entry[0] if entry else None
+
+    def get_with_age(self, key: K) -> tuple[V, float] | None:
+        """
+        Get a value by key together with its age
+        :param key: cache key
+        :return: a tuple of the cached value and seconds passed since it was stored, or None if the key is missing
+        or expired
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and self._ttl is not None and now - entry[1] >= self._ttl:
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return entry[0], now - entry[1]
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            self._data[key] = (value, self._clock())
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_size:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, key: K) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_matching(self, predicate: t.Callable[[K], bool]) -> None:
+        """Remove entries whose keys match the predicate"""
+        with self._lock:
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(hits=self._hits, misses=self._misses, evictions=self._evictions, size=len(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
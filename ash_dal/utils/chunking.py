@@ -0,0 +1,90 @@
+import itertools
+import typing as t
+
+T = t.TypeVar("T")
+
+
+def chunked(iterable: t.Iterable[T], size: int) -> t.Iterator[tuple[T, ...]]:
+    """
+    Split an iterable into tuples of `size` items, the last one may be shorter
+    :param iterable: items to split
+    :param size: max count of items in a chunk
+    """
+    assert size > 0, "Chunk size must be greater than 0"
+    iterator = iter(iterable)
+    while chunk := tuple(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def chunked_by_size(
+    iterable: t.Iterable[T],
+    max_count: int,
+    max_bytes: int | None,
+    size_of: t.Callable[[T], int],
+) -> t.Iterator[tuple[T, ...]]:
+    """
+    Split an iterable into tuples of at most `max_count` items whose total size doesn't exceed `max_bytes`.
+    An item bigger than `max_bytes` is yielded in a chunk of its own.
+    :param iterable: items to split
+    :param max_count: max count of items in a chunk
+    :param max_bytes: max total size of items in a chunk, it's not limited if None
+    :param size_of: function that estimates the size of an item in bytes
+    """
+    if max_bytes is None:
+        yield from chunked(iterable, max_count)
+        return
+    assert max_count > 0, "Chunk size must be greater than 0"
+    chunk: list[T] = []
+    chunk_bytes = 0
+    for item in iterable:
+        item_bytes = size_of(item)
+        if chunk and (len(chunk) == max_count or chunk_bytes + item_bytes > max_bytes):
+            yield tuple(chunk)
+            chunk, chunk_bytes = [], 0
+        chunk.append(item)
+        chunk_bytes += item_bytes
+    if chunk:
+        yield tuple(chunk)
+
+
+async def achunked_by_size(
+    iterable: t.Iterable[T] | t.AsyncIterable[T],
+    max_count: int,
+    max_bytes: int | None,
+    size_of: t.Callable[[T], int],
+) -> t.AsyncIterator[tuple[T, ...]]:
+    """
+    Async version of :func:`chunked_by_size`, that accepts async iterables as well
+    """
+    if not isinstance(iterable, t.AsyncIterable):
+        for chunk in chunked_by_size(iterable, max_count=max_count, max_bytes=max_bytes, size_of=size_of):
+            yield chunk
+        return
+    assert max_count > 0, "Chunk size must be greater than 0"
+    chunk: list[T] = []
+    chunk_bytes = 0
+    async for item in iterable:
+        item_bytes = size_of(item) if max_bytes is not None else 0
+        if chunk and (len(chunk) == max_count or (max_bytes is not None and chunk_bytes + item_bytes > max_bytes)):
+            yield tuple(chunk)
+            chunk, chunk_bytes = [], 0
+        chunk.append(item)
+        chunk_bytes += item_bytes
+    if chunk:
+        yield tuple(chunk)
+
+
+def estimate_row_size(row: t.Mapping[str, t.Any]) -> int:
+    """
+    Roughly estimate how many bytes the values of a row take in the text of an `INSERT` statement
+    """
+    size = 2
+    for value in row.values():
+        if isinstance(value, bytes | bytearray):
+            size += 2 * len(value) + 4
+        elif isinstance(value, str):
+            # Multibyte characters and escaping can take up to 4 bytes per character
+            size += 4 * len(value) + 3
+        else:
+            size += len(str(value)) + 3
+    return size
@@ -0,0 +1,59 @@
+import asyncio
+import contextvars
+import typing as t
+from dataclasses import dataclass, field
+
+K = t.TypeVar("K", bound=t.Hashable)
+V = t.TypeVar("V")
+
+
+@dataclass
+class _Batch(t.Generic[K, V]):
+    futures: dict[K, list[asyncio.Future[V | None]]] = field(default_factory=dict)
+
+
+class LookupCoalescer(t.Generic[K, V]):
+    """
+    DataLoader-style batching of lookups by key. Keys requested in the same event loop tick are collected
+    and loaded with one `batch_load` call, then every caller gets the value of its own key.
+    A batch is loaded in an empty context, so it doesn't belong to the metrics or spans of any of its callers.
+    """
+
+    def __init__(self, batch_load: t.Callable[[tuple[K, ...]], t.Awaitable[t.Mapping[K, V]]]):
+        """
+        :param batch_load: coroutine function that loads values for a tuple of unique keys and returns a mapping
+        of found keys to values. Missing keys are resolved with None.
+        """
+        self._batch_load = batch_load
+        self._batches: dict[asyncio.AbstractEventLoop, _Batch[K, V]] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def load(self, key: K) -> V | None:
+        loop = asyncio.get_running_loop()
+        batch = self._batches.get(loop)
+        if batch is None:
+            batch = self._batches[loop] = _Batch()
+            loop.call_soon(self._dispatch, loop, context=contextvars.Context())
+        future: asyncio.Future[V | None] = loop.create_future()
+        batch.futures.setdefault(key, []).append(future)
+        return await future
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop) -> None:
+        batch = self._batches.pop(loop)
+        task = loop.create_task(self._load_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _load_batch(self, batch: _Batch[K, V]) -> None:
+        try:
+            values = await self._batch_load(tuple(batch.futures))
+        except Exception as ex:
+            for futures in batch.futures.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(ex)
+            return
+        for key, futures in batch.futures.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(values.get(key))
@@ -0,0 +1,47 @@
+import itertools
+import typing as t
+from contextvars import ContextVar
+
+T = t.TypeVar("T")
+
+_keys = itertools.count()
+# Values of all slots of the current context by slot keys. Mappings are never mutated, every change makes a copy
+_slot_values: ContextVar[dict[int, t.Any]] = ContextVar("ash_dal_context_slots", default={})
+
+_MISSING: t.Any = object()
+
+
+class ContextSlot(t.Generic[T]):
+    """
+    A value of the current context (thread or asyncio task) that belongs to an object, e.g. to a database.
+    Slots share one module-level context variable, since context variables are never garbage collected
+    and one per object would leak with every object created.
+    """
+
+    def __init__(self):
+        self._key = next(_keys)
+
+    def get(self) -> T | None:
+        return _slot_values.get().get(self._key)
+
+    def set(self, value: T | None) -> t.Any:
+        """
+        Set the value in the current context
+        :return: a token to pass to `reset`
+        """
+        values = _slot_values.get()
+        previous = values.get(self._key, _MISSING)
+        _slot_values.set({**values, self._key: value})
+        return previous
+
+    def reset(self, token: t.Any) -> None:
+        """
+        Restore the value the slot had before `set` returned the token. Values of other slots set in the meantime
+        are kept
+        """
+        values = dict(_slot_values.get())
+        if token is _MISSING:
+            values.pop(self._key, None)
+        else:
+            values[self._key] = token
+        _slot_values.set(values)
@@ -0,0 +1,227 @@
+import threading
+import time
+import typing as t
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import partial
+
+from ash_dal.utils.cache import CacheStats, TTLCache
+
+
+@dataclass(frozen=True)
+class _NotFound:
+    """Marker stored for primary keys that have no record, when negative caching is on"""
+
+
+_NOT_FOUND = _NotFound()
+
+
+def _in_namespace(namespace: str, key: t.Hashable) -> bool:
+    return isinstance(key, tuple) and bool(key) and key[0] == namespace
+
+
+class ICacheBackend(ABC):
+    @abstractmethod
+    def get(self, key: t.Hashable) -> t.Any | None:
+        """Return the stored value or None if the key is missing or expired"""
+
+    @abstractmethod
+    def set(self, key: t.Hashable, value: t.Any) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: t.Hashable) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    def delete_namespace(self, namespace: str) -> None:
+        """
+        Remove entries of a namespace, i.e. with tuple keys starting with it. Backends that can't select
+        entries by key clear everything
+        """
+        self.clear()
+
+    @property
+    @abstractmethod
+    def stats(self) -> CacheStats:
+        ...
+
+
+class InMemoryCacheBackend(ICacheBackend):
+    """
+    Backend that keeps entries in the current process with LRU and TTL eviction
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float | None = 60.0,
+        clock: t.Callable[[], float] = time.monotonic,
+    ):
+        self._cache = TTLCache[t.Hashable, t.Any](max_size=max_size, ttl=ttl, clock=clock)
+
+    def get(self, key: t.Hashable) -> t.Any | None:
+        return self._cache.get(key)
+
+    def set(self, key: t.Hashable, value: t.Any) -> None:
+        self._cache.set(key, value)
+
+    def delete(self, key: t.Hashable) -> None:
+        self._cache.delete(key)
+
+    def delete_namespace(self, namespace: str) -> None:
+        self._cache.delete_matching(partial(_in_namespace, namespace))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._cache.stats
+
+
+class SharedDictCacheBackend(ICacheBackend):
+    """
+    Backend on top of a mapping shared between processes, e.g. `multiprocessing.Manager().dict()`, which is served
+    by the manager process over a local socket. Keys and values must be picklable. Entries are evicted oldest first,
+    because updating access times on every hit could bring back entries invalidated by another process.
+    Hit and miss counters are kept per process.
+    """
+
+    def __init__(
+        self,
+        mapping: t.MutableMapping[t.Any, t.Any],
+        max_size: int = 1024,
+        ttl: float | None = 60.0,
+        clock: t.Callable[[], float] = time.time,
+    ):
+        assert max_size > 0, "Cache size must be greater than 0"
+        self._mapping = mapping
+        self._max_size = max_size
+        self._ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = 0
+
+    def get(self, key: t.Hashable) -> t.Any | None:
+        entry = self._mapping.get(key)
+        if entry is not None and self._ttl is not None and self._clock() - entry[1] >= self._ttl:
+            self._mapping.pop(key, None)
+            entry = None
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        return entry[0]
+
+    def set(self, key: t.Hashable, value: t.Any) -> None:
+        self._mapping[key] = (value, self._clock())
+        overflow = len(self._mapping) - self._max_size
+        if overflow <= 0:
+            return
+        oldest = sorted(self._mapping.items(), key=lambda item: item[1][1])[:overflow]
+        for oldest_key, _ in oldest:
+            self._mapping.pop(oldest_key, None)
+        with self._lock:
+            self._evictions += len(oldest)
+
+    def delete(self, key: t.Hashable) -> None:
+        self._mapping.pop(key, None)
+
+    def delete_namespace(self, namespace: str) -> None:
+        # Only keys of the namespace are removed, the mapping may be shared with other caches and applications
+        for key in [key for key in self._mapping.keys() if _in_namespace(namespace, key)]:
+            self._mapping.pop(key, None)
+
+    def clear(self) -> None:
+        self._mapping.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(hits=self._hits, misses=self._misses, evictions=self._evictions, size=len(self._mapping))
+
+
+class EntityCache:
+    """
+    Read-through cache of entities fetched by primary key. Assign an instance to `__entity_cache__` of a DAO class
+    to enable it. DAO write methods invalidate the cache, writes made bypassing the DAO are only picked up
+    once entries expire. Cached entities are shared between callers, so they must not be mutated.
+    """
+
+    def __init__(
+        self,
+        backend: ICacheBackend | None = None,
+        cache_misses: bool = False,
+        max_size: int = 1024,
+        ttl: float | None = 60.0,
+    ):
+        """
+        :param backend: storage for cached entities. An :class:`InMemoryCacheBackend` with `max_size` and `ttl`
+        is created if it's not passed.
+        :param cache_misses: remember primary keys that have no record, so repeated lookups don't hit the DB
+        :param max_size: max count of entries of the default backend
+        :param ttl: seconds entries of the default backend live
+        """
+        self._backend = backend or InMemoryCacheBackend(max_size=max_size, ttl=ttl)
+        self._cache_misses = cache_misses
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._backend.stats
+
+    @property
+    def generation(self) -> int:
+        """
+        Counter of invalidations. Take it before reading from DB and pass it to `set`, so a value read concurrently
+        with a write is not cached after the write invalidated the cache.
+        """
+        return self._generation
+
+    def get(self, key: t.Hashable) -> tuple[bool, t.Any | None]:
+        """
+        Look up an entity
+        :param key: cache key
+        :return: a tuple of a flag whether the key is cached and the entity, which is None for cached misses
+        """
+        value = self._backend.get(key)
+        if value is None:
+            return False, None
+        if isinstance(value, _NotFound):
+            return True, None
+        return True, value
+
+    def set(self, key: t.Hashable, entity: t.Any | None, generation: int | None = None) -> None:
+        """
+        Store an entity or a miss if `entity` is None
+        :param key: cache key
+        :param entity: the entity fetched from DB
+        :param generation: the value of `generation` taken before fetching the entity
+        """
+        if entity is None and not self._cache_misses:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._backend.set(key, _NOT_FOUND if entity is None else entity)
+
+    def invalidate(self, key: t.Hashable | None = None, namespace: str | None = None) -> None:
+        """
+        Remove an entry by key, all entries of a namespace, or all entries if neither is passed
+        :param key: cache key
+        :param namespace: the first item of tuple keys, DAOs use one per `(__model__, __entity__)` pair
+        """
+        with self._lock:
+            self._generation += 1
+            if key is not None:
+                self._backend.delete(key)
+            elif namespace is not None:
+                self._backend.delete_namespace(namespace)
+            else:
+                self._backend.clear()
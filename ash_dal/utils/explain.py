@@ -0,0 +1,29 @@
+import typing as t
+
+from sqlalchemy import Executable
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import ClauseElement
+from sqlalchemy.sql.compiler import SQLCompiler
+
+
+class Explain(Executable, ClauseElement):
+    """
+    `EXPLAIN` statement for any SQLAlchemy statement. Bound parameters of the explained statement are preserved.
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement: Executable, format_: str | None = None):
+        self.statement = statement
+        self.format = format_
+
+
+def explain_prefix(format_: str | None = None) -> str:
+    return f"EXPLAIN FORMAT={format_} " if format_ else "EXPLAIN "
+
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler: SQLCompiler, **kw: t.Any) -> str:
+    return explain_prefix(element.format) + compiler.process(  # pyright: ignore [reportUnknownMemberType]
+        element.statement, **kw
+    )
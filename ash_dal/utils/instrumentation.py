@@ -0,0 +1,209 @@
+import functools
+import inspect
+import typing as t
+from contextlib import aclosing, contextmanager
+from contextvars import ContextVar
+
+from ash_dal.utils.metrics import operation_scope, start_operation
+from ash_dal.utils.tracing import span_scope, start_owner_span
+
+F = t.TypeVar("F", bound=t.Callable[..., t.Any])
+
+
+class _CallSite:
+    __slots__ = ("owner", "name", "parent")
+
+    def __init__(self, owner: t.Any, name: str, parent: "_CallSite | None"):
+        self.owner = owner
+        self.name = name
+        self.parent = parent
+
+
+_current_call_site: ContextVar[_CallSite | None] = ContextVar("ash_dal_current_call_site", default=None)
+_track_call_sites = False
+
+
+def enable_call_sites() -> None:
+    """
+    Keep track of instrumented methods that are being called, e.g. to tell which DAO method issued a statement.
+    Calls made before the tracking is enabled aren't tracked.
+    """
+    global _track_call_sites
+    _track_call_sites = True
+
+
+def current_call_site() -> tuple[str, ...]:
+    """
+    :return: instrumented methods of the current call stack as `<class>.<method>`, the outermost first
+    """
+    names: list[str] = []
+    site = _current_call_site.get()
+    while site is not None:
+        names.append(site.name)
+        site = site.parent
+    return tuple(reversed(names))
+
+
+def _start_call_site(owner: t.Any, method: str) -> _CallSite | None:
+    if not _track_call_sites:
+        return None
+    parent = _current_call_site.get()
+    if parent is not None and parent.owner is owner:
+        return None
+    return _CallSite(owner, f"{type(owner).__name__}.{method}", parent)
+
+
+@contextmanager
+def _call_site_scope(site: _CallSite | None) -> t.Iterator[None]:
+    if site is None:
+        yield
+        return
+    token = _current_call_site.set(site)
+    try:
+        yield
+    finally:
+        _current_call_site.reset(token)
+
+
+class _Call:
+    """Metrics operation, span and call site of a call of an instrumented method, at least one of them is set"""
+
+    __slots__ = ("method", "operation", "span", "site")
+
+    def __init__(self, method: str, operation: t.Any, span: t.Any, site: _CallSite | None):
+        self.method = method
+        self.operation = operation
+        self.span = span
+        self.site = site
+
+    @contextmanager
+    def step(self) -> t.Iterator[None]:
+        with operation_scope(self.operation), span_scope(self.span), _call_site_scope(self.site):
+            yield
+
+    def finish(self, error: BaseException | None) -> None:
+        if self.operation is not None:
+            self.operation.finish(self.method, error=error is not None)
+        if self.span is not None:
+            self.span.end(error)
+
+
+def _start_call(owner: t.Any, method: str, inherit: bool) -> _Call | None:
+    operation = start_operation(owner, inherit=inherit)
+    span = start_owner_span(owner, method, inherit=inherit)
+    site = _start_call_site(owner, method)
+    if operation is None and span is None and site is None:
+        return None
+    return _Call(method, operation, span, site)
+
+
+def instrument(inherit: bool = False) -> t.Callable[[F], F]:
+    """
+    Measure calls of a method of an object with a `__metrics__` collector and trace them if the object has
+    a `__tracer__`. Coroutines, generators and async generators are supported. Without both the method
+    is called as is, unless call sites are tracked.
+    :param inherit: instrument calls made inside an operation of another object with its collector and tracer,
+    if the object has none of its own
+    """
+
+    def decorator(func: F) -> F:
+        method = func.__name__
+
+        if inspect.isasyncgenfunction(func):
+
+            @functools.wraps(func)
+            async def async_gen_wrapper(self: t.Any, *args: t.Any, **kwargs: t.Any) -> t.Any:
+                call = _start_call(self, method, inherit=inherit)
+                iterator = func(self, *args, **kwargs)
+                if call is None:
+                    async with aclosing(iterator):
+                        async for item in iterator:
+                            yield item
+                    return
+                error: BaseException | None = None
+                try:
+                    while True:
+                        with call.step():
+                            try:
+                                item = await iterator.__anext__()
+                            except StopAsyncIteration:
+                                break
+                        yield item
+                except GeneratorExit:
+                    # The caller stopped iterating early
+                    raise
+                except BaseException as ex:
+                    error = ex
+                    raise
+                finally:
+                    await iterator.aclose()
+                    call.finish(error)
+
+            return t.cast(F, async_gen_wrapper)
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(self: t.Any, *args: t.Any, **kwargs: t.Any) -> t.Any:
+                call = _start_call(self, method, inherit=inherit)
+                if call is None:
+                    return await func(self, *args, **kwargs)
+                error: BaseException | None = None
+                try:
+                    with call.step():
+                        return await func(self, *args, **kwargs)
+                except BaseException as ex:
+                    error = ex
+                    raise
+                finally:
+                    call.finish(error)
+
+            return t.cast(F, async_wrapper)
+
+        if inspect.isgeneratorfunction(func):
+
+            @functools.wraps(func)
+            def gen_wrapper(self: t.Any, *args: t.Any, **kwargs: t.Any) -> t.Any:
+                call = _start_call(self, method, inherit=inherit)
+                iterator = func(self, *args, **kwargs)
+                if call is None:
+                    return (yield from iterator)
+                error: BaseException | None = None
+                try:
+                    while True:
+                        with call.step():
+                            try:
+                                item = next(iterator)
+                            except StopIteration:
+                                break
+                        yield item
+                except GeneratorExit:
+                    # The caller stopped iterating early
+                    raise
+                except BaseException as ex:
+                    error = ex
+                    raise
+                finally:
+                    iterator.close()
+                    call.finish(error)
+
+            return t.cast(F, gen_wrapper)
+
+        @functools.wraps(func)
+        def wrapper(self: t.Any, *args: t.Any, **kwargs: t.Any) -> t.Any:
+            call = _start_call(self, method, inherit=inherit)
+            if call is None:
+                return func(self, *args, **kwargs)
+            error: BaseException | None = None
+            try:
+                with call.step():
+                    return func(self, *args, **kwargs)
+            except BaseException as ex:
+                error = ex
+                raise
+            finally:
+                call.finish(error)
+
+        return t.cast(F, wrapper)
+
+    return decorator
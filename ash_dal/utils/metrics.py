@@ -0,0 +1,244 @@
+import threading
+import time
+import typing as t
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+ENGINE_PRIMARY = "primary"
+ENGINE_REPLICA = "replica"
+ENGINE_MIXED = "mixed"
+# The operation didn't execute statements, e.g. all entities were taken from the cache
+ENGINE_NONE = "none"
+
+_COUNTERS = (
+    ("operation_rows_total", "rows", "Rows read or written by DAO operations"),
+    ("operation_rows_converted_total", "rows_converted", "Entities built by DAO operations"),
+    ("operation_conversion_seconds_total", "conversion_time", "Time DAO operations spent building entities"),
+    ("operation_errors_total", "errors", "DAO operations that raised an exception"),
+)
+
+
+@dataclass(frozen=True)
+class OperationMetrics:
+    """
+    Measurements of one call of an instrumented DAO or paginator method. Time is measured in seconds,
+    for iterators it's the time spent producing items, without the time the caller spends between them.
+    """
+
+    dao: str
+    method: str
+    engine: str
+    duration: float
+    # Rows read by the operation or written by it
+    rows: int
+    # Entities built from rows
+    rows_converted: int
+    conversion_time: float
+    error: bool
+
+
+MetricsCallback = t.Callable[[OperationMetrics], None]
+
+
+@dataclass
+class _Histogram:
+    bucket_counts: list[int]
+    sum: float = 0.0
+    count: int = 0
+
+
+@dataclass
+class _Series:
+    duration: _Histogram
+    rows: int = 0
+    rows_converted: int = 0
+    conversion_time: float = 0.0
+    errors: int = 0
+
+
+class MetricsCollector:
+    """
+    Aggregates :class:`OperationMetrics` into latency histograms and counters labelled by DAO class, method
+    and engine, and passes every measurement to registered callbacks. Set it as `__metrics__` of DAO classes
+    to enable instrumentation, DAOs without a collector aren't measured.
+    """
+
+    def __init__(self, buckets: t.Sequence[float] = DEFAULT_LATENCY_BUCKETS, namespace: str = "ash_dal"):
+        """
+        :param buckets: upper bounds of latency histogram buckets in seconds
+        :param namespace: prefix of rendered Prometheus metric names
+        """
+        self._buckets = tuple(sorted(buckets))
+        self._namespace = namespace
+        self._lock = threading.Lock()
+        self._series: dict[tuple[str, str, str], _Series] = {}
+        self._callbacks: list[MetricsCallback] = []
+
+    def add_callback(self, callback: MetricsCallback) -> None:
+        """Register a function that is called with the measurements of every operation"""
+        self._callbacks.append(callback)
+
+    def remove_callback(self, callback: MetricsCallback) -> None:
+        self._callbacks.remove(callback)
+
+    def record(self, metrics: OperationMetrics) -> None:
+        key = (metrics.dao, metrics.method, metrics.engine)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(duration=_Histogram(bucket_counts=[0] * len(self._buckets)))
+            histogram = series.duration
+            for index, bound in enumerate(self._buckets):
+                if metrics.duration <= bound:
+                    histogram.bucket_counts[index] += 1
+                    break
+            histogram.sum += metrics.duration
+            histogram.count += 1
+            series.rows += metrics.rows
+            series.rows_converted += metrics.rows_converted
+            series.conversion_time += metrics.conversion_time
+            series.errors += metrics.error
+        for callback in self._callbacks:
+            callback(metrics)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render_prometheus(self) -> str:
+        """
+        Render collected metrics in the Prometheus text exposition format
+        :return: text to serve on a metrics endpoint
+        """
+        prefix = self._namespace
+        with self._lock:
+            series = sorted(self._series.items())
+            lines = [
+                f"# HELP {prefix}_operation_duration_seconds Latency of DAO operations",
+                f"# TYPE {prefix}_operation_duration_seconds histogram",
+            ]
+            for key, item in series:
+                labels = _labels(key)
+                cumulative = 0
+                for bound, bucket_count in zip(self._buckets, item.duration.bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f'{prefix}_operation_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_operation_duration_seconds_bucket{{{labels},le="+Inf"}} {item.duration.count}')
+                lines.append(f"{prefix}_operation_duration_seconds_sum{{{labels}}} {item.duration.sum}")
+                lines.append(f"{prefix}_operation_duration_seconds_count{{{labels}}} {item.duration.count}")
+            for name, attribute, help_ in _COUNTERS:
+                lines.append(f"# HELP {prefix}_{name} {help_}")
+                lines.append(f"# TYPE {prefix}_{name} counter")
+                lines.extend(f"{prefix}_{name}{{{_labels(key)}}} {getattr(item, attribute)}" for key, item in series)
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key: tuple[str, str, str]) -> str:
+    dao, method, engine = key
+    return f'dao="{_escape(dao)}",method="{_escape(method)}",engine="{_escape(engine)}"'
+
+
+class _Operation:
+    __slots__ = ("collector", "owner", "parent", "engine", "rows", "rows_converted", "conversion_time", "duration")
+
+    def __init__(self, collector: MetricsCollector, owner: t.Any, parent: "_Operation | None"):
+        self.collector = collector
+        self.owner = owner
+        self.parent = parent
+        self.engine = ENGINE_NONE
+        self.rows = self.rows_converted = 0
+        self.conversion_time = self.duration = 0.0
+
+    def record_engine(self, engine: str) -> None:
+        operation: _Operation | None = self
+        while operation is not None:
+            if operation.engine == ENGINE_NONE:
+                operation.engine = engine
+            elif operation.engine != engine:
+                operation.engine = ENGINE_MIXED
+            operation = operation.parent
+
+    def finish(self, method: str, error: bool) -> None:
+        self.collector.record(
+            OperationMetrics(
+                dao=type(self.owner).__name__,
+                method=method,
+                engine=self.engine,
+                duration=self.duration,
+                rows=self.rows,
+                rows_converted=self.rows_converted,
+                conversion_time=self.conversion_time,
+                error=error,
+            )
+        )
+
+
+_current_operation: ContextVar[_Operation | None] = ContextVar("ash_dal_current_operation", default=None)
+
+
+def record_engine(engine: str) -> None:
+    """Record the role of the engine a statement of the current operation is executed on"""
+    operation = _current_operation.get()
+    if operation is not None:
+        operation.record_engine(engine)
+
+
+def record_rows(rows: int) -> None:
+    """Record rows read or written by the current operation"""
+    operation = _current_operation.get()
+    if operation is not None:
+        operation.rows += rows
+
+
+def is_measured() -> bool:
+    return _current_operation.get() is not None
+
+
+def record_conversion(rows: int, duration: float) -> None:
+    """Record rows converted into entities by the current operation and the time it took"""
+    operation = _current_operation.get()
+    if operation is not None:
+        operation.rows += rows
+        operation.rows_converted += rows
+        operation.conversion_time += duration
+
+
+def start_operation(owner: t.Any, inherit: bool) -> _Operation | None:
+    """
+    Start measuring a method call of an object with a `__metrics__` collector
+    :param inherit: measure calls made inside an operation of another object with its collector,
+    if the object has no collector of its own
+    :return: the operation or None if the call isn't measured
+    """
+    parent = _current_operation.get()
+    if parent is not None and parent.owner is owner:
+        # Methods called by an instrumented method of the same object are measured as its part
+        return None
+    collector: MetricsCollector | None = getattr(owner, "__metrics__", None)
+    if collector is None and inherit and parent is not None:
+        collector = parent.collector
+    if collector is None:
+        return None
+    return _Operation(collector, owner=owner, parent=parent)
+
+
+@contextmanager
+def operation_scope(operation: _Operation | None) -> t.Iterator[None]:
+    """Make an operation current within a block and add the time spent in it to its duration"""
+    if operation is None:
+        yield
+        return
+    token = _current_operation.set(operation)
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        operation.duration += time.perf_counter() - started_at
+        _current_operation.reset(token)
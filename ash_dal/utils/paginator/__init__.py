@@ -1,13 +1,22 @@
-from ash_dal.utils.paginator.async_paginator import AsyncDeferredJoinPaginator, AsyncPaginator
-from ash_dal.utils.paginator.factory import DeferredJoinPaginatorFactory
-from ash_dal.utils.paginator.paginator_page import PaginatorPage
-from ash_dal.utils.paginator.sync_paginator import DeferredJoinPaginator, Paginator
+from ash_dal.utils.paginator.async_paginator import AsyncDeferredJoinPaginator, AsyncKeysetPaginator, AsyncPaginator
+from ash_dal.utils.paginator.count_cache import CountCache
+from ash_dal.utils.paginator.estimation import CountEstimation
+from ash_dal.utils.paginator.factory import DeferredJoinPaginatorFactory, KeysetPaginatorFactory, PaginatorFactory
+from ash_dal.utils.paginator.paginator_page import CursorPage, PaginatorPage
+from ash_dal.utils.paginator.sync_paginator import DeferredJoinPaginator, KeysetPaginator, Paginator
 
 __all__ = [
     "Paginator",
     "DeferredJoinPaginator",
+    "KeysetPaginator",
     "AsyncPaginator",
     "AsyncDeferredJoinPaginator",
+    "AsyncKeysetPaginator",
     "PaginatorPage",
+    "CursorPage",
+    "PaginatorFactory",
     "DeferredJoinPaginatorFactory",
+    "KeysetPaginatorFactory",
+    "CountCache",
+    "CountEstimation",
 ]
@@ -1,56 +1,192 @@
+import asyncio
 import math
 import typing as t
+from collections import deque
 
-from sqlalchemy import Select, func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Result, ScalarResult, Select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 from sqlalchemy.sql.roles import ColumnsClauseRole
 
 from ash_dal.typing import ORMModel
-from ash_dal.utils.paginator.base import BasePaginator
-from ash_dal.utils.paginator.interface import IAsyncPaginator
-from ash_dal.utils.paginator.paginator_page import PaginatorPage
+from ash_dal.utils.instrumentation import instrument
+from ash_dal.utils.paginator.base import BaseKeysetPaginator, BasePaginator, check_key_fields
+from ash_dal.utils.paginator.cursor import KeysetCursor
+from ash_dal.utils.paginator.estimation import CountEstimation, build_estimate_statement
+from ash_dal.utils.paginator.interface import IAsyncKeysetPaginator, IAsyncPaginator, ICountCache
+from ash_dal.utils.paginator.paginator_page import CursorPage, PaginatorPage
+from ash_dal.utils.tracing import SPAN_FETCH, child_span
 
 
 class AsyncPaginator(IAsyncPaginator[ORMModel], BasePaginator):
     _size: int | None = None
 
-    def __init__(self, session: AsyncSession, query: Select[t.Any], page_size: int):
+    def __init__(
+        self,
+        session: AsyncSession,
+        query: Select[t.Any],
+        page_size: int,
+        count_cache: ICountCache | None = None,
+        count_estimation: CountEstimation | None = None,
+    ):
         self._session = session
         self._page_size = page_size
         self._query = query
+        self._count_cache = count_cache
+        self._count_estimation = count_estimation
 
+    @instrument(inherit=True)
     async def get_page(self, page_index: int) -> PaginatorPage[ORMModel]:
-        offset = self._calculate_offset(page_index)
-        page_stmt = self._query.offset(offset).limit(self._page_size)
-        result = await self._session.scalars(page_stmt)
-        page: t.Sequence[ORMModel] = result.unique().all()
-        return PaginatorPage(index=page_index, items=tuple(page), pages_count=await self.size)
-
-    async def paginate(self) -> t.AsyncIterator[PaginatorPage[ORMModel]]:
-        current_page = self._first_page_index
-        while True:
-            page = await self.get_page(page_index=current_page)
-            if not page:
-                break
-            yield page
-            current_page += 1
+        return await self._get_page(session=self._session, page_index=page_index)
+
+    async def paginate(self, prefetch: int = 0) -> t.AsyncIterator[PaginatorPage[ORMModel]]:
+        """
+        Iterate over all pages
+        :param prefetch: how many pages to fetch ahead while the current page is being consumed. Every prefetched page
+        is loaded concurrently in its own session, so it takes its own connection from the pool. At most `prefetch`
+        pages are fetched at once, and pending fetches are cancelled once the iteration stops.
+        """
+        if prefetch < 0:
+            raise ValueError("Prefetch depth can not be negative")
+        if not prefetch:
+            current_page = self._first_page_index
+            while True:
+                page = await self.get_page(page_index=current_page)
+                if not page:
+                    break
+                yield page
+                current_page += 1
+            return
+        # The main session must not be shared with prefetching tasks, so the size is calculated upfront
+        last_page_index = self._first_page_index + await self.size - 1
+        next_page_index = self._first_page_index
+        bind = self._spawn_bind()
+        pending: deque[asyncio.Task[PaginatorPage[ORMModel]]] = deque()
+
+        def schedule() -> None:
+            nonlocal next_page_index
+            # An estimated size can be wrong, so pages are fetched until an empty one is met
+            while len(pending) < prefetch and (next_page_index <= last_page_index or self._is_size_estimated):
+                pending.append(asyncio.create_task(self._prefetch_page(page_index=next_page_index, bind=bind)))
+                next_page_index += 1
+
+        try:
+            schedule()
+            while pending:
+                page = await pending.popleft()
+                if not page:
+                    break
+                # The page is handed out, so its slot is taken by the next page
+                schedule()
+                yield page
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
 
     @property
+    @instrument(inherit=True)
     async def size(self) -> int:
         """Returns the count of pages the requested resource has"""
         if self._size is None:
-            stmt = select(func.count()).select_from(self._query.subquery())
-            items_count: int = await self._session.scalar(stmt) or 0
+            items_count = await self._count_items()
             self._size = math.ceil(items_count / self._page_size)
         return self._size
 
+    async def _estimate_items(self) -> int | None:
+        if self._count_estimation is None:
+            return None
+        dialect = self._session.get_bind(clause=self._query).dialect
+        estimate_statement = build_estimate_statement(self._query, dialect=dialect, estimation=self._count_estimation)
+        if estimate_statement is None:
+            return None
+        stmt, parse = estimate_statement
+        result = await self._session.execute(stmt)
+        return self._accept_estimate(parse(result))
+
+    async def _count_items(self) -> int:
+        estimate = await self._estimate_items()
+        if estimate is not None:
+            return estimate
+        stmt = self._count_query()
+        if self._count_cache is None:
+            return await self._session.scalar(stmt) or 0
+        engine = AsyncEngine(self._session.get_bind(clause=stmt).engine)
+
+        async def count() -> int:
+            return await self._session.scalar(stmt) or 0
+
+        async def refresh() -> int:
+            async with engine.connect() as connection:
+                return await connection.scalar(stmt) or 0
+
+        return await self._count_cache.get_or_count_async(
+            key=self._count_cache_key(dialect=engine.dialect), count=count, refresh=refresh
+        )
+
+    async def _get_page(self, session: AsyncSession, page_index: int) -> PaginatorPage[ORMModel]:
+        offset = self._calculate_offset(page_index)
+        page_stmt = self._query.offset(offset).limit(self._page_size)
+        page: t.Sequence[ORMModel] = await self._fetch_all(session=session, stmt=page_stmt)
+        pages_count = await self.size
+        return PaginatorPage(
+            index=page_index,
+            items=tuple(page),
+            pages_count=pages_count,
+            is_estimate=self._is_size_estimated,
+        )
+
+    async def _fetch_all(self, session: AsyncSession, stmt: Select[t.Any]) -> t.Sequence[t.Any]:
+        result: Result[t.Any] | ScalarResult[t.Any]
+        if self._selects_entities:
+            result = (await session.scalars(stmt)).unique()
+        else:
+            result = await session.execute(stmt)
+        with child_span(SPAN_FETCH):
+            return result.all()
+
+    async def _prefetch_page(self, page_index: int, bind: AsyncEngine | None) -> PaginatorPage[ORMModel]:
+        async with self._spawn_session(bind=bind) as session:
+            return await self._get_page(session=session, page_index=page_index)
+
+    def _spawn_bind(self) -> AsyncEngine | None:
+        """The engine of the paginator's session, built once and shared by the sessions of prefetched pages"""
+        sync_bind = self._session.sync_session.bind
+        return AsyncEngine(sync_bind.engine) if sync_bind is not None else None
+
+    def _spawn_session(self, bind: AsyncEngine | None) -> AsyncSession:
+        """
+        Create a session that shares binds and routing with the paginator's session,
+        so a page can be fetched concurrently on another pooled connection
+        """
+        return AsyncSession(
+            bind=bind,
+            sync_session_class=type(self._session.sync_session),
+            info=self._session.info,
+            expire_on_commit=False,
+        )
+
 
 class AsyncDeferredJoinPaginator(AsyncPaginator[ORMModel]):
-    def __init__(self, session: AsyncSession, query: Select[t.Any], page_size: int, pk_field: ColumnsClauseRole):
-        super().__init__(session=session, query=query, page_size=page_size)
+    def __init__(
+        self,
+        session: AsyncSession,
+        query: Select[t.Any],
+        page_size: int,
+        pk_field: ColumnsClauseRole,
+        count_cache: ICountCache | None = None,
+        count_estimation: CountEstimation | None = None,
+    ):
+        super().__init__(
+            session=session,
+            query=query,
+            page_size=page_size,
+            count_cache=count_cache,
+            count_estimation=count_estimation,
+        )
         self._pk_field = pk_field
 
-    async def get_page(self, page_index: int) -> PaginatorPage[ORMModel]:
+    async def _get_page(self, session: AsyncSession, page_index: int) -> PaginatorPage[ORMModel]:
         offset = self._calculate_offset(page_index)
         deferred_join_subquery = (
             self._query.with_only_columns(self._pk_field).offset(offset).limit(self._page_size).subquery()
@@ -59,6 +195,112 @@ class AsyncDeferredJoinPaginator(AsyncPaginator[ORMModel]):
             target=deferred_join_subquery,
             onclause=self._pk_field == deferred_join_subquery.c[0],  # pyright: ignore [reportArgumentType]
         )
-        result = await self._session.scalars(stmt)
-        page: t.Sequence[ORMModel] = result.unique().all()
-        return PaginatorPage(index=page_index, items=tuple(page), pages_count=await self.size)
+        page: t.Sequence[ORMModel] = await self._fetch_all(session=session, stmt=stmt)
+        pages_count = await self.size
+        return PaginatorPage(
+            index=page_index,
+            items=tuple(page),
+            pages_count=pages_count,
+            is_estimate=self._is_size_estimated,
+        )
+
+
+class AsyncKeysetPaginator(IAsyncKeysetPaginator[ORMModel], AsyncPaginator[ORMModel], BaseKeysetPaginator):
+    """
+    Paginator that seeks on an ordered unique key instead of skipping rows with OFFSET, so every page
+    reached by a cursor costs the same regardless of its depth.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        query: Select[t.Any],
+        page_size: int,
+        key_fields: t.Sequence[InstrumentedAttribute[t.Any]],
+        descending: bool = False,
+        count_cache: ICountCache | None = None,
+        count_estimation: CountEstimation | None = None,
+    ):
+        super().__init__(
+            session=session,
+            query=query,
+            page_size=page_size,
+            count_cache=count_cache,
+            count_estimation=count_estimation,
+        )
+        self._key_fields = check_key_fields(key_fields)
+        self._descending = descending
+
+    @instrument(inherit=True)
+    async def get_page(self, page_index: int) -> PaginatorPage[ORMModel]:
+        if page_index == self._first_page_index:
+            return await self._fetch_page(cursor=None)
+        # Jumping to an arbitrary page has no key to seek on, so it falls back to OFFSET
+        rows: t.Sequence[ORMModel] = await self._fetch_all(session=self._session, stmt=self._offset_query(page_index))
+        return self._build_page(rows=rows, page_index=page_index, is_backward=False, pages_count=await self.size)
+
+    @instrument(inherit=True)
+    async def get_page_after(self, cursor: str, with_count: bool = False) -> CursorPage[ORMModel]:
+        """
+        Fetch the page a cursor points to
+        :param cursor: an opaque token taken from `next_cursor` or `previous_cursor` of a page
+        :param with_count: run the count query to fill `pages_count` of the page, it's None otherwise
+        :return: an instance of :class:`CursorPage`
+        """
+        keyset_cursor = self._decode_cursor(cursor)
+        rows: t.Sequence[ORMModel] = await self._fetch_all(session=self._session, stmt=self._seek_query(keyset_cursor))
+        return self._build_cursor_page(
+            rows=rows,
+            page_index=keyset_cursor.page_index,
+            is_backward=keyset_cursor.is_backward,
+            pages_count=await self.size if with_count else None,
+        )
+
+    async def paginate(self, prefetch: int = 0) -> t.AsyncIterator[PaginatorPage[ORMModel]]:
+        """
+        Iterate over all pages following the cursors
+        :param prefetch: if positive, the next page is fetched in a separate session while the current one is being
+        consumed. Every page is seeked from the previous one, so only one page is fetched ahead whatever the depth is.
+        """
+        if prefetch < 0:
+            raise ValueError("Prefetch depth can not be negative")
+        page = await self._fetch_page(cursor=None)
+        bind = self._spawn_bind() if prefetch else None
+        next_page_task: asyncio.Task[PaginatorPage[ORMModel]] | None = None
+        try:
+            while page:
+                cursor = None
+                if page.next_cursor:
+                    cursor = KeysetCursor(
+                        values=self._key_values(page[-1]), is_backward=False, page_index=page.index + 1
+                    )
+                if cursor and prefetch:
+                    next_page_task = asyncio.create_task(self._prefetch_page_after(cursor=cursor, bind=bind))
+                yield page
+                if not cursor:
+                    break
+                if next_page_task:
+                    page, next_page_task = await next_page_task, None
+                else:
+                    page = await self._fetch_page(cursor=cursor)
+        finally:
+            if next_page_task:
+                next_page_task.cancel()
+                await asyncio.gather(next_page_task, return_exceptions=True)
+
+    async def _prefetch_page_after(self, cursor: KeysetCursor, bind: AsyncEngine | None) -> PaginatorPage[ORMModel]:
+        async with self._spawn_session(bind=bind) as session:
+            return await self._fetch_page(cursor=cursor, session=session)
+
+    async def _fetch_page(
+        self, cursor: KeysetCursor | None, session: AsyncSession | None = None
+    ) -> PaginatorPage[ORMModel]:
+        rows: t.Sequence[ORMModel] = await self._fetch_all(
+            session=session or self._session, stmt=self._seek_query(cursor)
+        )
+        return self._build_page(
+            rows=rows,
+            page_index=cursor.page_index if cursor else self._first_page_index,
+            is_backward=cursor.is_backward if cursor else False,
+            pages_count=await self.size,
+        )
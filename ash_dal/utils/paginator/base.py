@@ -1,10 +1,151 @@
+import typing as t
+from functools import cached_property
+
+from sqlalchemy import ColumnElement, Dialect, Select, and_, func, inspect, or_, select
+from sqlalchemy.orm import InstrumentedAttribute
+
 from ash_dal.constants import PAGINATOR_FIRST_PAGE_INDEX
+from ash_dal.exceptions.paginator import InvalidCursorError
+from ash_dal.utils.metrics import MetricsCollector
+from ash_dal.utils.paginator.cursor import KeysetCursor, decode_cursor, encode_cursor
+from ash_dal.utils.paginator.estimation import CountEstimation
+from ash_dal.utils.paginator.paginator_page import CursorPage, PaginatorPage
+from ash_dal.utils.tracing import ITracer
+
+
+def check_key_fields(key_fields: t.Sequence[InstrumentedAttribute[t.Any]]) -> tuple[InstrumentedAttribute[t.Any], ...]:
+    """
+    Key fields must be NOT NULL: pages are seeked with `key > value`, which is never true for NULL,
+    so rows with NULL keys would be silently skipped
+    """
+    for field in key_fields:
+        if getattr(field.expression, "nullable", False):
+            raise ValueError(f"Keyset pagination needs NOT NULL key fields, {field.key} is nullable")
+    return tuple(key_fields)
 
 
 class BasePaginator:
     _page_size: int
+    _query: Select[t.Any]
+    _count_estimation: CountEstimation | None = None
+    _is_size_estimated: bool = False
     _first_page_index: int = PAGINATOR_FIRST_PAGE_INDEX
+    # Measures `get_page` and `size`. Paginators created by DAO methods are measured with the collector of the DAO
+    __metrics__: MetricsCollector | None = None
+    # Traces `get_page` and `size`, paginators created by DAO methods are traced with the tracer of the DAO
+    __tracer__: ITracer | None = None
+
+    @property
+    def is_size_estimated(self) -> bool:
+        """Shows whether the pages count is calculated from an approximate items count"""
+        return self._is_size_estimated
+
+    @cached_property
+    def _selects_entities(self) -> bool:
+        """
+        Shows whether the query selects ORM instances. Queries of plain columns are fetched as rows,
+        so paginating them skips the ORM identity map
+        """
+        descriptions = self._query.column_descriptions
+        if len(descriptions) != 1:
+            return False
+        inspected = inspect(descriptions[0]["expr"], raiseerr=False)
+        return bool(getattr(inspected, "is_mapper", False) or getattr(inspected, "is_aliased_class", False))
 
     def _calculate_offset(self, page_index: int) -> int:
         assert page_index >= self._first_page_index, f"Page index must be greater or equal to {self._first_page_index}"
         return (page_index - 1) * self._page_size
+
+    def _count_query(self) -> Select[t.Any]:
+        return select(func.count()).select_from(self._query.subquery())
+
+    def _accept_estimate(self, estimate: int | None) -> int | None:
+        if estimate is None or self._count_estimation is None or estimate < self._count_estimation.threshold:
+            return None
+        self._is_size_estimated = True
+        return estimate
+
+    def _count_cache_key(self, dialect: Dialect) -> t.Hashable:
+        # Compiled with the dialect of the bind, the string dialect renders some constructs as placeholders
+        # (e.g. `<regexp>` for any regexp flags), so queries that differ only in them would share a count
+        compiled = self._query.compile(dialect=dialect)
+        return str(compiled), repr(sorted(compiled.params.items()))
+
+
+class BaseKeysetPaginator(BasePaginator):
+    _key_fields: tuple[InstrumentedAttribute[t.Any], ...]
+    _descending: bool
+
+    def _ordered_query(self, is_backward: bool) -> Select[t.Any]:
+        reverse = self._descending != is_backward
+        order_by = (field.desc() if reverse else field.asc() for field in self._key_fields)
+        return self._query.order_by(None).order_by(*order_by)
+
+    def _seek_clause(self, values: tuple[t.Any, ...], is_backward: bool) -> ColumnElement[bool]:
+        # (a, b) > (x, y) is expanded into "a > x OR (a = x AND b > y)" because MySQL
+        # does not always use an index for row constructor comparisons
+        greater = self._descending == is_backward
+        clauses: list[ColumnElement[bool]] = []
+        for position, (field, value) in enumerate(zip(self._key_fields, values)):
+            preceding = (f == v for f, v in zip(self._key_fields[:position], values[:position]))
+            comparison = field > value if greater else field < value
+            clauses.append(and_(*preceding, comparison))
+        return or_(*clauses)
+
+    def _seek_query(self, cursor: KeysetCursor | None) -> Select[t.Any]:
+        if cursor is None:
+            return self._ordered_query(is_backward=False).limit(self._page_size + 1)
+        query = self._ordered_query(is_backward=cursor.is_backward)
+        return query.where(self._seek_clause(cursor.values, cursor.is_backward)).limit(self._page_size + 1)
+
+    def _offset_query(self, page_index: int) -> Select[t.Any]:
+        offset = self._calculate_offset(page_index)
+        return self._ordered_query(is_backward=False).offset(offset).limit(self._page_size + 1)
+
+    def _decode_cursor(self, cursor: str) -> KeysetCursor:
+        keyset_cursor = decode_cursor(cursor)
+        if len(keyset_cursor.values) != len(self._key_fields):
+            raise InvalidCursorError("Cursor does not match the paginator key fields")
+        return keyset_cursor
+
+    def _key_values(self, item: t.Any) -> tuple[t.Any, ...]:
+        return tuple(getattr(item, field.key) for field in self._key_fields)
+
+    def _build_page(
+        self, rows: t.Sequence[t.Any], page_index: int, is_backward: bool, pages_count: int
+    ) -> PaginatorPage[t.Any]:
+        return PaginatorPage(pages_count=pages_count, **self._page_fields(rows, page_index, is_backward))
+
+    def _build_cursor_page(
+        self, rows: t.Sequence[t.Any], page_index: int, is_backward: bool, pages_count: int | None
+    ) -> CursorPage[t.Any]:
+        return CursorPage(pages_count=pages_count, **self._page_fields(rows, page_index, is_backward))
+
+    def _page_fields(self, rows: t.Sequence[t.Any], page_index: int, is_backward: bool) -> dict[str, t.Any]:
+        items = tuple(rows[: self._page_size])
+        has_more = len(rows) > self._page_size
+        if is_backward:
+            items = items[::-1]
+            has_previous, has_next = has_more, True
+        else:
+            has_previous, has_next = page_index > self._first_page_index, has_more
+        next_cursor = previous_cursor = None
+        if items and has_next:
+            next_cursor = encode_cursor(
+                KeysetCursor(values=self._key_values(items[-1]), is_backward=False, page_index=page_index + 1)
+            )
+        if items and has_previous:
+            previous_cursor = encode_cursor(
+                KeysetCursor(
+                    values=self._key_values(items[0]),
+                    is_backward=True,
+                    page_index=max(page_index - 1, self._first_page_index),
+                )
+            )
+        return {
+            "index": page_index,
+            "items": items,
+            "is_estimate": self._is_size_estimated,
+            "next_cursor": next_cursor,
+            "previous_cursor": previous_cursor,
+        }
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import threading
+import time
+import typing as t
+from dataclasses import dataclass, field
+
+from ash_dal.utils.cache import CacheStats, TTLCache
+from ash_dal.utils.paginator.interface import ICountCache
+
+logger = logging.getLogger(__name__)
+
+
+class _LeaderCancelledError(Exception):
+    """The task running a shared count was cancelled, a waiting task takes over"""
+
+
+@dataclass
+class _Flight:
+    event: threading.Event = field(default_factory=threading.Event)
+    result: int = 0
+    error: BaseException | None = None
+
+
+class CountCache(ICountCache):
+    """
+    Shared cache for paginator item counts. Entries are keyed by the compiled statement and its parameters,
+    evicted by TTL and LRU. Concurrent lookups of the same missing key run the count query only once
+    (single-flight). If `refresh_after` is set, entries older than that are still served, but recounted
+    in the background so that readers don't wait for the count query.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        max_size: int = 1024,
+        refresh_after: float | None = None,
+        clock: t.Callable[[], float] = time.monotonic,
+    ):
+        assert refresh_after is None or refresh_after < ttl, "refresh_after must be less than ttl"
+        self._cache = TTLCache[t.Hashable, int](max_size=max_size, ttl=ttl, clock=clock)
+        self._refresh_after = refresh_after
+        self._lock = threading.Lock()
+        self._in_flight: dict[t.Hashable, _Flight] = {}
+        self._async_in_flight: dict[tuple[int, t.Hashable], asyncio.Future[int]] = {}
+        self._refreshing: set[t.Hashable] = set()
+        self._refresh_tasks: set[asyncio.Task[None]] = set()
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._cache.stats
+
+    def invalidate(self, key: t.Hashable | None = None) -> None:
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.delete(key)
+
+    def get_or_count(
+        self,
+        key: t.Hashable,
+        count: t.Callable[[], int],
+        refresh: t.Callable[[], int] | None = None,
+    ) -> int:
+        cached = self._cache.get_with_age(key)
+        if cached is not None:
+            value, age = cached
+            if refresh is not None and self._is_stale(age) and self._start_refresh(key):
+                threading.Thread(target=self._refresh, args=(key, refresh), daemon=True).start()
+            return value
+
+        with self._lock:
+            flight = self._in_flight.get(key)
+            is_leader = flight is None
+            if flight is None:
+                flight = self._in_flight[key] = _Flight()
+        if not is_leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = count()
+            self._cache.set(key, flight.result)
+            return flight.result
+        except BaseException as ex:
+            flight.error = ex
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            flight.event.set()
+
+    async def get_or_count_async(
+        self,
+        key: t.Hashable,
+        count: t.Callable[[], t.Awaitable[int]],
+        refresh: t.Callable[[], t.Awaitable[int]] | None = None,
+    ) -> int:
+        cached = self._cache.get_with_age(key)
+        if cached is not None:
+            value, age = cached
+            if refresh is not None and self._is_stale(age) and self._start_refresh(key):
+                task = asyncio.create_task(self._refresh_async(key, refresh))
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_tasks.discard)
+            return value
+
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        while (future := self._async_in_flight.get(flight_key)) is not None:
+            try:
+                return await asyncio.shield(future)
+            except _LeaderCancelledError:
+                # Cancellation of the counting task is not passed to the tasks waiting for it,
+                # one of them runs the count instead
+                continue
+
+        future = self._async_in_flight[flight_key] = loop.create_future()
+        try:
+            value = await count()
+            self._cache.set(key, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelledError())
+            future.exception()
+            raise
+        except BaseException as ex:
+            future.set_exception(ex)
+            future.exception()  # Mark the exception as retrieved if nobody else was waiting for it
+            raise
+        finally:
+            del self._async_in_flight[flight_key]
+
+    def _is_stale(self, age: float) -> bool:
+        return self._refresh_after is not None and age >= self._refresh_after
+
+    def _start_refresh(self, key: t.Hashable) -> bool:
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _refresh(self, key: t.Hashable, refresh: t.Callable[[], int]) -> None:
+        try:
+            self._cache.set(key, refresh())
+        except Exception:
+            logger.exception("Failed to refresh cached count")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    async def _refresh_async(self, key: t.Hashable, refresh: t.Callable[[], t.Awaitable[int]]) -> None:
+        try:
+            self._cache.set(key, await refresh())
+        except Exception:
+            logger.exception("Failed to refresh cached count")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
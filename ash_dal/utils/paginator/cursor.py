@@ -0,0 +1,86 @@
+import base64
+import binascii
+import datetime
+import json
+import typing as t
+import uuid
+from dataclasses import dataclass
+from decimal import Decimal
+
+from ash_dal.exceptions.paginator import InvalidCursorError
+
+
+@dataclass(frozen=True)
+class KeysetCursor:
+    values: tuple[t.Any, ...]
+    is_backward: bool
+    page_index: int
+
+
+_ENCODERS: dict[type[t.Any], tuple[str, t.Callable[[t.Any], t.Any]]] = {
+    datetime.datetime: ("dt", lambda v: v.isoformat()),
+    datetime.date: ("d", lambda v: v.isoformat()),
+    datetime.time: ("t", lambda v: v.isoformat()),
+    Decimal: ("dec", str),
+    uuid.UUID: ("uuid", str),
+    bytes: ("b", lambda v: base64.b64encode(v).decode()),
+}
+
+_DECODERS: dict[str, t.Callable[[t.Any], t.Any]] = {
+    "dt": datetime.datetime.fromisoformat,
+    "d": datetime.date.fromisoformat,
+    "t": datetime.time.fromisoformat,
+    "dec": Decimal,
+    "uuid": uuid.UUID,
+    "b": base64.b64decode,
+}
+
+
+def _encode_value(value: t.Any) -> t.Any:
+    if value is None or isinstance(value, bool | int | float | str):
+        return value
+    encoder = _ENCODERS.get(type(value))
+    if encoder is None:
+        raise TypeError(f"Value of type {type(value).__name__} can not be used as a keyset pagination key")
+    tag, encode = encoder
+    return [tag, encode(value)]
+
+
+def _decode_value(value: t.Any) -> t.Any:
+    if isinstance(value, list):
+        tag, encoded = t.cast(list[t.Any], value)
+        return _DECODERS[tag](encoded)
+    return value
+
+
+def encode_cursor(cursor: KeysetCursor) -> str:
+    """
+    Serialize a cursor into an opaque URL-safe token
+    :param cursor: an instance of :class:`KeysetCursor`
+    :return: a token that can be handed out to API clients
+    """
+    payload = {
+        "v": [_encode_value(value) for value in cursor.values],
+        "b": cursor.is_backward,
+        "i": cursor.page_index,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str) -> KeysetCursor:
+    """
+    Restore a cursor from a token produced by :func:`encode_cursor`
+    :param token: an opaque cursor token
+    :return: an instance of :class:`KeysetCursor`
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        return KeysetCursor(
+            values=tuple(_decode_value(value) for value in payload["v"]),
+            is_backward=bool(payload["b"]),
+            page_index=int(payload["i"]),
+        )
+    except (binascii.Error, ValueError, TypeError, KeyError) as ex:
+        raise InvalidCursorError("Cursor is malformed") from ex
@@ -0,0 +1,80 @@
+import typing as t
+from dataclasses import dataclass
+
+from sqlalchemy import BigInteger, Dialect, Executable, Result, Select, String, Table, column, func, select, table
+
+from ash_dal.utils.explain import Explain
+
+_TABLES = table(
+    "TABLES",
+    column("TABLE_SCHEMA", String),
+    column("TABLE_NAME", String),
+    column("TABLE_ROWS", BigInteger),
+    schema="information_schema",
+)
+
+
+@dataclass(frozen=True)
+class CountEstimation:
+    """
+    Settings of the approximate items count used by paginators instead of `SELECT count(*)`.
+    :param threshold: if the estimated items count is below this value, the exact count is calculated anyway
+    :param use_table_statistics: use `information_schema.TABLES` for queries without filtering
+    :param use_explain: use `EXPLAIN` row estimates for filtered queries
+    """
+
+    threshold: int = 100_000
+    use_table_statistics: bool = True
+    use_explain: bool = True
+
+
+EstimateParser = t.Callable[[Result[t.Any]], int | None]
+
+
+def build_estimate_statement(
+    query: Select[t.Any],
+    dialect: Dialect,
+    estimation: CountEstimation,
+) -> tuple[Executable, EstimateParser] | None:
+    """
+    Build a statement that estimates the count of rows the query returns
+    :param query: a query to be estimated
+    :param dialect: dialect of the database the query will be run on
+    :param estimation: estimation settings
+    :return: a statement and a function that extracts the estimate from its result or None if the query can not be
+    estimated on the dialect
+    """
+    if dialect.name != "mysql":
+        return None
+    # Eager loading joins are not taken into account, they don't change the count of the selected entities
+    froms = query.columns_clause_froms
+    if (
+        estimation.use_table_statistics
+        and query.whereclause is None
+        and len(froms) == 1
+        and isinstance(froms[0], Table)
+    ):
+        target = froms[0]
+        schema = target.schema if target.schema else func.database()
+        stmt = select(_TABLES.c.TABLE_ROWS).where(
+            _TABLES.c.TABLE_SCHEMA == schema,
+            _TABLES.c.TABLE_NAME == target.name,
+        )
+        return stmt, _parse_table_statistics
+    if estimation.use_explain:
+        return Explain(query), _parse_explain
+    return None
+
+
+def _parse_table_statistics(result: Result[t.Any]) -> int | None:
+    rows = result.scalar()
+    return int(rows) if rows is not None else None
+
+
+def _parse_explain(result: Result[t.Any]) -> int | None:
+    # The first row describes the driving table of the query
+    row = result.mappings().first()
+    if row is None or row.get("rows") is None:
+        return None
+    filtered = float(row.get("filtered") or 100.0)
+    return int(int(row["rows"]) * filtered / 100)
@@ -1,20 +1,49 @@
 import typing as t
 
+from sqlalchemy.orm import InstrumentedAttribute
 from sqlalchemy.sql.roles import ColumnsClauseRole
 
+from ash_dal.utils.paginator.base import check_key_fields
+
 P = t.TypeVar("P")
 
 
-class DeferredJoinPaginatorFactory(t.Generic[P]):
+class PaginatorFactory(t.Generic[P]):
+    """
+    Binds extra keyword arguments (e.g. `count_cache`) to a paginator class, so that it can be used
+    as `__paginator_factory__` of a DAO class
+    """
+
     _paginator_class: type[P]
 
+    def __init__(self, paginator_class: type[P], **paginator_kwargs: t.Any):
+        self._paginator_class = paginator_class
+        self._paginator_kwargs = paginator_kwargs
+
+    def __call__(self, *args: t.Any, **kwargs: t.Any) -> P:
+        return self._paginator_class(*args, **kwargs, **self._paginator_kwargs)
+
+
+class DeferredJoinPaginatorFactory(PaginatorFactory[P]):
     def __init__(
         self,
         paginator_class: type[P],
         pk_field: ColumnsClauseRole,
+        **paginator_kwargs: t.Any,
     ):
+        super().__init__(paginator_class, pk_field=pk_field, **paginator_kwargs)
         self._pk_field = pk_field
-        self._paginator_class = paginator_class
 
-    def __call__(self, *args: t.Any, **kwargs: t.Any) -> P:
-        return self._paginator_class(*args, **kwargs, pk_field=self._pk_field)
+
+class KeysetPaginatorFactory(PaginatorFactory[P]):
+    def __init__(
+        self,
+        paginator_class: type[P],
+        key_fields: t.Sequence[InstrumentedAttribute[t.Any]],
+        descending: bool = False,
+        **paginator_kwargs: t.Any,
+    ):
+        key_fields = check_key_fields(key_fields)
+        super().__init__(paginator_class, key_fields=key_fields, descending=descending, **paginator_kwargs)
+        self._key_fields = key_fields
+        self._descending = descending
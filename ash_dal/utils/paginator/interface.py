@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ash_dal.typing import ORMModel
-from ash_dal.utils.paginator.paginator_page import PaginatorPage
+from ash_dal.utils.paginator.paginator_page import CursorPage, PaginatorPage
 
 
 class IPaginator(ABC, t.Generic[ORMModel]):
@@ -30,7 +30,9 @@ class IAsyncPaginator(t.Generic[ORMModel], ABC):
         ...
 
     @abstractmethod
-    def paginate(self) -> t.AsyncIterator[PaginatorPage[ORMModel]]:  # Make pyright happy by removing async keyword :)
+    def paginate(
+        self, prefetch: int = 0
+    ) -> t.AsyncIterator[PaginatorPage[ORMModel]]:  # Make pyright happy by removing async keyword :)
         ...
 
     @property
@@ -39,6 +41,45 @@ class IAsyncPaginator(t.Generic[ORMModel], ABC):
         ...
 
 
+class IKeysetPaginator(IPaginator[ORMModel], ABC):
+    @abstractmethod
+    def get_page_after(self, cursor: str, with_count: bool = False) -> CursorPage[ORMModel]:
+        ...
+
+
+class IAsyncKeysetPaginator(IAsyncPaginator[ORMModel], ABC):
+    @abstractmethod
+    async def get_page_after(self, cursor: str, with_count: bool = False) -> CursorPage[ORMModel]:
+        ...
+
+
+class ICountCache(ABC):
+    @abstractmethod
+    def get_or_count(
+        self,
+        key: t.Hashable,
+        count: t.Callable[[], int],
+        refresh: t.Callable[[], int] | None = None,
+    ) -> int:
+        """
+        Return the cached count for the key or calculate it with `count`.
+        `refresh` is a session independent version of `count` that can be run in the background.
+        """
+
+    @abstractmethod
+    async def get_or_count_async(
+        self,
+        key: t.Hashable,
+        count: t.Callable[[], t.Awaitable[int]],
+        refresh: t.Callable[[], t.Awaitable[int]] | None = None,
+    ) -> int:
+        ...
+
+    @abstractmethod
+    def invalidate(self, key: t.Hashable | None = None) -> None:
+        ...
+
+
 class PaginatorFactoryProtocol(t.Protocol):
     def __call__(self, session: Session, query: Select[t.Any], page_size: int) -> IPaginator[t.Any]:
         ...
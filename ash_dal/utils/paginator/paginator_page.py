@@ -4,10 +4,7 @@ from dataclasses import dataclass
 T = t.TypeVar("T")
 
 
-@dataclass
-class PaginatorPage(t.Generic[T]):
-    index: int
-    pages_count: int
+class _PageItems(t.Generic[T]):
     items: tuple[T, ...]
 
     def __len__(self) -> int:
@@ -18,3 +15,25 @@ class PaginatorPage(t.Generic[T]):
 
     def __bool__(self):
         return bool(self.items)
+
+
+@dataclass
+class PaginatorPage(_PageItems[T]):
+    index: int
+    pages_count: int
+    items: tuple[T, ...]
+    is_estimate: bool = False
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+
+
+@dataclass
+class CursorPage(_PageItems[T]):
+    """A page fetched by a keyset cursor. It's counted only on request, `pages_count` is None otherwise"""
+
+    index: int
+    pages_count: int | None
+    items: tuple[T, ...]
+    is_estimate: bool = False
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
@@ -1,29 +1,49 @@
 import math
 import typing as t
 
-from sqlalchemy import Select, func, select
-from sqlalchemy.orm import Session
+from sqlalchemy import Result, ScalarResult, Select
+from sqlalchemy.orm import InstrumentedAttribute, Session
 from sqlalchemy.sql.roles import ColumnsClauseRole
 
 from ash_dal.typing import ORMModel
-from ash_dal.utils.paginator.base import BasePaginator
-from ash_dal.utils.paginator.interface import IPaginator
-from ash_dal.utils.paginator.paginator_page import PaginatorPage
+from ash_dal.utils.instrumentation import instrument
+from ash_dal.utils.paginator.base import BaseKeysetPaginator, BasePaginator, check_key_fields
+from ash_dal.utils.paginator.cursor import KeysetCursor
+from ash_dal.utils.paginator.estimation import CountEstimation, build_estimate_statement
+from ash_dal.utils.paginator.interface import ICountCache, IKeysetPaginator, IPaginator
+from ash_dal.utils.paginator.paginator_page import CursorPage, PaginatorPage
+from ash_dal.utils.tracing import SPAN_FETCH, child_span
 
 
 class Paginator(IPaginator[ORMModel], BasePaginator):
     _size: int | None = None
 
-    def __init__(self, session: Session, query: Select[t.Any], page_size: int):
+    def __init__(
+        self,
+        session: Session,
+        query: Select[t.Any],
+        page_size: int,
+        count_cache: ICountCache | None = None,
+        count_estimation: CountEstimation | None = None,
+    ):
         self._session = session
         self._page_size = page_size
         self._query = query
+        self._count_cache = count_cache
+        self._count_estimation = count_estimation
 
+    @instrument(inherit=True)
     def get_page(self, page_index: int) -> PaginatorPage[ORMModel]:
         offset = self._calculate_offset(page_index)
         page_stmt = self._query.offset(offset).limit(self._page_size)
-        page: t.Sequence[ORMModel] = self._session.scalars(page_stmt).unique().all()
-        return PaginatorPage(index=page_index, items=tuple(page), pages_count=self.size)
+        page: t.Sequence[ORMModel] = self._fetch_all(page_stmt)
+        pages_count = self.size
+        return PaginatorPage(
+            index=page_index,
+            items=tuple(page),
+            pages_count=pages_count,
+            is_estimate=self._is_size_estimated,
+        )
 
     def paginate(self) -> t.Iterator[PaginatorPage[ORMModel]]:
         current_page = self._first_page_index
@@ -35,20 +55,74 @@ class Paginator(IPaginator[ORMModel], BasePaginator):
             current_page += 1
 
     @property
+    @instrument(inherit=True)
     def size(self) -> int:
         """Returns the count of pages the requested resource has"""
         if self._size is None:
-            stmt = select(func.count()).select_from(self._query.subquery())
-            items_count: int = self._session.scalar(stmt) or 0
+            items_count = self._count_items()
             self._size = math.ceil(items_count / self._page_size)
         return self._size
 
+    def _estimate_items(self) -> int | None:
+        if self._count_estimation is None:
+            return None
+        dialect = self._session.get_bind(clause=self._query).dialect
+        estimate_statement = build_estimate_statement(self._query, dialect=dialect, estimation=self._count_estimation)
+        if estimate_statement is None:
+            return None
+        stmt, parse = estimate_statement
+        result = self._session.execute(stmt)
+        return self._accept_estimate(parse(result))
+
+    def _count_items(self) -> int:
+        estimate = self._estimate_items()
+        if estimate is not None:
+            return estimate
+        stmt = self._count_query()
+        if self._count_cache is None:
+            return self._session.scalar(stmt) or 0
+        engine = self._session.get_bind(clause=stmt).engine
+
+        def refresh() -> int:
+            with engine.connect() as connection:
+                return connection.scalar(stmt) or 0
+
+        return self._count_cache.get_or_count(
+            key=self._count_cache_key(dialect=engine.dialect),
+            count=lambda: self._session.scalar(stmt) or 0,
+            refresh=refresh,
+        )
+
+    def _fetch_all(self, stmt: Select[t.Any]) -> t.Sequence[t.Any]:
+        result: Result[t.Any] | ScalarResult[t.Any]
+        if self._selects_entities:
+            result = self._session.scalars(stmt).unique()
+        else:
+            result = self._session.execute(stmt)
+        with child_span(SPAN_FETCH):
+            return result.all()
+
 
 class DeferredJoinPaginator(Paginator[ORMModel]):
-    def __init__(self, session: Session, query: Select[t.Any], page_size: int, pk_field: ColumnsClauseRole):
-        super().__init__(session=session, query=query, page_size=page_size)
+    def __init__(
+        self,
+        session: Session,
+        query: Select[t.Any],
+        page_size: int,
+        pk_field: ColumnsClauseRole,
+        count_cache: ICountCache | None = None,
+        count_estimation: CountEstimation | None = None,
+    ):
+        super().__init__(
+            session=session,
+            query=query,
+            page_size=page_size,
+            count_cache=count_cache,
+            count_estimation=count_estimation,
+        )
         self._pk_field = pk_field
 
+    @instrument(inherit=True)
     def get_page(self, page_index: int) -> PaginatorPage[ORMModel]:
         offset = self._calculate_offset(page_index)
         deferred_join_subquery = (
@@ -58,5 +132,83 @@ class DeferredJoinPaginator(Paginator[ORMModel]):
             target=deferred_join_subquery,
             onclause=self._pk_field == deferred_join_subquery.c[0],  # pyright: ignore [reportArgumentType]
         )
-        page: t.Sequence[ORMModel] = self._session.scalars(stmt).unique().all()
-        return PaginatorPage(index=page_index, items=tuple(page), pages_count=self.size)
+        page: t.Sequence[ORMModel] = self._fetch_all(stmt)
+        pages_count = self.size
+        return PaginatorPage(
+            index=page_index,
+            items=tuple(page),
+            pages_count=pages_count,
+            is_estimate=self._is_size_estimated,
+        )
+
+
+class KeysetPaginator(IKeysetPaginator[ORMModel], Paginator[ORMModel], BaseKeysetPaginator):
+    """
+    Paginator that seeks on an ordered unique key instead of skipping rows with OFFSET, so every page
+    reached by a cursor costs the same regardless of its depth.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        query: Select[t.Any],
+        page_size: int,
+        key_fields: t.Sequence[InstrumentedAttribute[t.Any]],
+        descending: bool = False,
+        count_cache: ICountCache | None = None,
+        count_estimation: CountEstimation | None = None,
+    ):
+        super().__init__(
+            session=session,
+            query=query,
+            page_size=page_size,
+            count_cache=count_cache,
+            count_estimation=count_estimation,
+        )
+        self._key_fields = check_key_fields(key_fields)
+        self._descending = descending
+
+    @instrument(inherit=True)
+    def get_page(self, page_index: int) -> PaginatorPage[ORMModel]:
+        if page_index == self._first_page_index:
+            return self._fetch_page(cursor=None)
+        # Jumping to an arbitrary page has no key to seek on, so it falls back to OFFSET
+        rows: t.Sequence[ORMModel] = self._fetch_all(self._offset_query(page_index))
+        return self._build_page(rows=rows, page_index=page_index, is_backward=False, pages_count=self.size)
+
+    @instrument(inherit=True)
+    def get_page_after(self, cursor: str, with_count: bool = False) -> CursorPage[ORMModel]:
+        """
+        Fetch the page a cursor points to
+        :param cursor: an opaque token taken from `next_cursor` or `previous_cursor` of a page
+        :param with_count: run the count query to fill `pages_count` of the page, it's None otherwise
+        :return: an instance of :class:`CursorPage`
+        """
+        keyset_cursor = self._decode_cursor(cursor)
+        rows: t.Sequence[ORMModel] = self._fetch_all(self._seek_query(keyset_cursor))
+        return self._build_cursor_page(
+            rows=rows,
+            page_index=keyset_cursor.page_index,
+            is_backward=keyset_cursor.is_backward,
+            pages_count=self.size if with_count else None,
+        )
+
+    def paginate(self) -> t.Iterator[PaginatorPage[ORMModel]]:
+        cursor = None
+        while True:
+            page = self._fetch_page(cursor=cursor)
+            if not page:
+                break
+            yield page
+            if not page.next_cursor:
+                break
+            cursor = KeysetCursor(values=self._key_values(page[-1]), is_backward=False, page_index=page.index + 1)
+
+    def _fetch_page(self, cursor: KeysetCursor | None) -> PaginatorPage[ORMModel]:
+        rows: t.Sequence[ORMModel] = self._fetch_all(self._seek_query(cursor))
+        return self._build_page(
+            rows=rows,
+            page_index=cursor.page_index if cursor else self._first_page_index,
+            is_backward=cursor.is_backward if cursor else False,
+            pages_count=self.size,
+        )
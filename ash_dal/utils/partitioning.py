@@ -0,0 +1,113 @@
+import math
+import typing as t
+from dataclasses import dataclass
+from enum import Enum
+
+from sqlalchemy import Row, Select, func, select
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+class ScanBoundaries(Enum):
+    """How parallel scans split the primary key space into partitions"""
+
+    # Equal ranges between the min and the max primary key, it needs an integer primary key.
+    # Partitions are uneven if keys have big gaps
+    MIN_MAX = "min_max"
+    # Ranges of equal row counts, boundaries are taken with `NTILE`, so the whole primary key index is read once
+    SAMPLED = "sampled"
+
+
+@dataclass(frozen=True)
+class PKRange:
+    """
+    Primary key values of a partition: `after < pk <= upper`, there is no lower bound if `after` is None
+    """
+
+    after: t.Any
+    upper: t.Any
+
+
+def ranges_from_upper_bounds(upper_bounds: t.Iterable[t.Any]) -> list[PKRange]:
+    """
+    :param upper_bounds: ascending upper bounds of partitions, the last one is the max primary key
+    :return: adjacent ranges, every range starts after the upper bound of the previous one
+    """
+    ranges: list[PKRange] = []
+    after = None
+    for upper in upper_bounds:
+        ranges.append(PKRange(after=after, upper=upper))
+        after = upper
+    return ranges
+
+
+def split_pk_range(min_pk: int, max_pk: int, partitions: int) -> list[PKRange]:
+    """
+    Split integer primary keys into equal ranges, there are fewer ranges than `partitions` if the keys are too few
+    :param min_pk: the min primary key
+    :param max_pk: the max primary key
+    :param partitions: max count of ranges
+    """
+    assert partitions > 0, "Count of partitions must be greater than 0"
+    step = max(math.ceil((max_pk - min_pk + 1) / partitions), 1)
+    return ranges_from_upper_bounds([*range(min_pk + step - 1, max_pk, step), max_pk])
+
+
+class ScanQueries(t.NamedTuple):
+    """Queries that read a partition of a parallel scan in batches ordered by the primary key"""
+
+    # Query of the first batch of a range without a lower bound
+    first: Select[t.Any]
+    # Query of batches after a primary key
+    next: Select[t.Any]
+    params: dict[str, t.Any]
+    pk_key: str
+    batch_size: int
+
+
+def check_scan_arguments(partitions: int, concurrency: int | None) -> None:
+    if partitions < 1:
+        raise ValueError("Count of partitions must be greater than 0")
+    if concurrency is not None and concurrency < 1:
+        raise ValueError("Concurrency must be greater than 0")
+
+
+def build_scan_bounds_query(
+    model: type[t.Any],
+    pk_field: InstrumentedAttribute[t.Any],
+    specification: dict[str, t.Any] | None,
+    partitions: int,
+    boundaries: ScanBoundaries,
+) -> Select[t.Any]:
+    """Query of the min and max primary keys, or of upper bounds of `partitions` buckets of equal row counts"""
+    if boundaries is ScanBoundaries.MIN_MAX:
+        query = select(func.min(pk_field), func.max(pk_field)).select_from(model)
+        return query.filter_by(**(specification or {}))
+    bucket = func.ntile(partitions).over(order_by=pk_field).label("ash_dal_bucket")
+    numbered = select(pk_field.label("ash_dal_pk"), bucket).select_from(model)
+    numbered = numbered.filter_by(**(specification or {})).subquery()
+    upper_bound = func.max(numbered.c.ash_dal_pk)
+    return select(upper_bound).group_by(numbered.c.ash_dal_bucket).order_by(upper_bound)
+
+
+def scan_ranges(bounds: t.Sequence[Row[t.Any]], partitions: int, boundaries: ScanBoundaries) -> list[PKRange]:
+    """
+    :param bounds: rows of the query built by :func:`build_scan_bounds_query`
+    """
+    if boundaries is ScanBoundaries.SAMPLED:
+        return ranges_from_upper_bounds(row[0] for row in bounds)
+    min_pk, max_pk = bounds[0]
+    if min_pk is None:
+        return []
+    if not isinstance(min_pk, int):
+        raise ValueError("Min/max boundaries need an integer primary key, use ScanBoundaries.SAMPLED")
+    return split_pk_range(min_pk=min_pk, max_pk=max_pk, partitions=partitions)
+
+
+def scan_batch_query(queries: ScanQueries, pk_range: PKRange, after: t.Any) -> tuple[Select[t.Any], dict[str, t.Any]]:
+    """
+    :param after: primary key of the last row read from the range, None if nothing was read yet
+    """
+    after = pk_range.after if after is None else after
+    if after is None:
+        return queries.first, {**queries.params, "ash_dal_scan_upper": pk_range.upper}
+    return queries.next, {**queries.params, "ash_dal_scan_after": after, "ash_dal_scan_upper": pk_range.upper}
@@ -0,0 +1,20 @@
+import typing as t
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class BulkProgress:
+    """
+    State of a bulk write reported after every written chunk
+    """
+
+    rows: int
+    chunks: int
+    elapsed: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+
+ProgressCallback = t.Callable[[BulkProgress], None]
@@ -0,0 +1,73 @@
+import typing as t
+
+from sqlalchemy import BindParameter, bindparam
+from sqlalchemy.sql import ClauseElement
+
+from ash_dal.utils.cache import CacheStats, TTLCache
+
+S = t.TypeVar("S")
+
+# Prefix of names of parameters that carry specification values
+SPECIFICATION_PARAM_PREFIX = "ash_dal_spec_"
+
+
+class StatementCache:
+    """
+    Statements built by DAO methods, kept per model, load options and specification shape (its keys and which
+    of them are None). A cached statement has bound parameters in place of specification values, so calls only
+    bind the values. Reusing a statement object also reuses its memoized SQLAlchemy cache key.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        """
+        :param max_size: max count of statements, the least recently used ones are evicted
+        """
+        self._cache = TTLCache[t.Hashable, t.Any](max_size=max_size, ttl=None)
+
+    def get_or_build(self, key: t.Hashable, build: t.Callable[[], S]) -> S:
+        statement = self._cache.get(key)
+        if statement is None:
+            statement = build()
+            self._cache.set(key, statement)
+        return statement
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._cache.stats
+
+
+# Shared by DAOs that don't define their own `__statement_cache__`
+default_statement_cache = StatementCache()
+
+
+def specification_shape(
+    specification: dict[str, t.Any], column_keys: t.Container[str]
+) -> tuple[tuple[str, bool], ...] | None:
+    """
+    :param column_keys: keys of column attributes of the model, other attributes (e.g. relationships)
+    can't be compared with bound parameters
+    :return: the specification keys with flags of None values, or None if the specification can't be templated
+    """
+    shape: list[tuple[str, bool]] = []
+    for key, value in specification.items():
+        if key not in column_keys or isinstance(value, ClauseElement):
+            return None
+        shape.append((key, value is None))
+    return tuple(sorted(shape))
+
+
+def specification_template(shape: tuple[tuple[str, bool], ...]) -> dict[str, BindParameter[t.Any] | None]:
+    """
+    :return: a specification with bound parameters in place of values, None values are kept as `IS NULL` checks
+    """
+    return {key: None if is_null else bindparam(SPECIFICATION_PARAM_PREFIX + key) for key, is_null in shape}
+
+
+def specification_params(specification: dict[str, t.Any]) -> dict[str, t.Any]:
+    """
+    :return: values of a specification for the bound parameters of its template
+    """
+    return {SPECIFICATION_PARAM_PREFIX + key: value for key, value in specification.items() if value is not None}
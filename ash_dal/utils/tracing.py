@@ -0,0 +1,260 @@
+import threading
+import time
+import typing as t
+from abc import ABC, abstractmethod
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import Engine, event
+from sqlalchemy.engine import ExceptionContext
+
+SPAN_CHECKOUT = "ash_dal.checkout"
+SPAN_EXECUTE = "ash_dal.execute"
+SPAN_FETCH = "ash_dal.fetch"
+SPAN_CONVERT = "ash_dal.convert"
+
+_EXECUTE_SPAN_KEY = "ash_dal_execute_span"
+_TRACING_INSTALLED_KEY = "ash_dal_tracing_installed"
+_install_lock = threading.Lock()
+
+
+class ITracer(ABC):
+    """
+    Receives spans of DAO and paginator methods and their child spans: pool checkouts, statement execution,
+    fetching of results and conversion of entities. Span handles are opaque to ash-dal.
+    """
+
+    @abstractmethod
+    def start_span(self, name: str, attributes: dict[str, t.Any], parent: t.Any | None) -> t.Any:
+        """
+        Start a span
+        :param name: span name, `<DAO class>.<method>` for DAO and paginator methods
+        :param attributes: initial span attributes
+        :param parent: handle of the parent span or None for a root span
+        :return: handle of the started span
+        """
+
+    @abstractmethod
+    def set_attribute(self, span: t.Any, key: str, value: t.Any) -> None:
+        ...
+
+    @abstractmethod
+    def end_span(self, span: t.Any, error: BaseException | None) -> None:
+        """
+        End a span
+        :param span: handle returned by `start_span`
+        :param error: the exception the operation raised, if any
+        """
+
+
+@dataclass
+class RecordedSpan:
+    name: str
+    attributes: dict[str, t.Any]
+    parent: "RecordedSpan | None"
+    start_time: float
+    end_time: float | None = None
+    error: BaseException | None = None
+    children: list["RecordedSpan"] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float | None:
+        return None if self.end_time is None else self.end_time - self.start_time
+
+
+class InMemoryTracer(ITracer):
+    """
+    Keeps spans in memory, e.g. for tests or for dumping slow operations
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans: list[RecordedSpan] = []
+
+    @property
+    def root_spans(self) -> list[RecordedSpan]:
+        return [span for span in self.spans if span.parent is None]
+
+    def start_span(self, name: str, attributes: dict[str, t.Any], parent: RecordedSpan | None) -> RecordedSpan:
+        span = RecordedSpan(name=name, attributes=dict(attributes), parent=parent, start_time=time.perf_counter())
+        with self._lock:
+            self.spans.append(span)
+            if parent is not None:
+                parent.children.append(span)
+        return span
+
+    def set_attribute(self, span: RecordedSpan, key: str, value: t.Any) -> None:
+        span.attributes[key] = value
+
+    def end_span(self, span: RecordedSpan, error: BaseException | None) -> None:
+        span.end_time = time.perf_counter()
+        span.error = error
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+
+class OpenTelemetryTracer(ITracer):
+    """
+    Adapter that reports spans to an OpenTelemetry tracer. Requires the `opentelemetry-api` package.
+    """
+
+    def __init__(self, tracer: t.Any):
+        """
+        :param tracer: an `opentelemetry.trace.Tracer`, e.g. `opentelemetry.trace.get_tracer("ash_dal")`
+        """
+        from opentelemetry import trace
+
+        self._tracer = tracer
+        self._trace = trace
+
+    def start_span(self, name: str, attributes: dict[str, t.Any], parent: t.Any | None) -> t.Any:
+        # Without an explicit parent the span is attached to the span that is current in OpenTelemetry
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        return self._tracer.start_span(name, context=context, attributes=attributes)
+
+    def set_attribute(self, span: t.Any, key: str, value: t.Any) -> None:
+        span.set_attribute(key, value)
+
+    def end_span(self, span: t.Any, error: BaseException | None) -> None:
+        if error is not None:
+            span.record_exception(error)
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, str(error)))
+        span.end()
+
+
+class ActiveSpan:
+    __slots__ = ("tracer", "handle", "owner")
+
+    def __init__(self, tracer: ITracer, handle: t.Any, owner: t.Any):
+        self.tracer = tracer
+        self.handle = handle
+        self.owner = owner
+
+    def set_attribute(self, key: str, value: t.Any) -> None:
+        self.tracer.set_attribute(self.handle, key, value)
+
+    def end(self, error: BaseException | None = None) -> None:
+        self.tracer.end_span(self.handle, error)
+
+
+_current_span: ContextVar[ActiveSpan | None] = ContextVar("ash_dal_current_span", default=None)
+
+
+def is_traced() -> bool:
+    return _current_span.get() is not None
+
+
+def start_owner_span(owner: t.Any, method: str, inherit: bool) -> ActiveSpan | None:
+    """
+    Start the span of a method call of an object with a `__tracer__`
+    :param inherit: trace calls made inside a span of another object with its tracer,
+    if the object has no tracer of its own
+    :return: the span or None if the call isn't traced
+    """
+    parent = _current_span.get()
+    if parent is not None and parent.owner is owner:
+        # Methods called by a traced method of the same object are a part of its span
+        return None
+    tracer: ITracer | None = getattr(owner, "__tracer__", None)
+    if tracer is None and inherit and parent is not None:
+        tracer = parent.tracer
+    if tracer is None:
+        return None
+    name = type(owner).__name__
+    handle = tracer.start_span(
+        f"{name}.{method}",
+        attributes={"ash_dal.dao": name, "ash_dal.method": method},
+        parent=parent.handle if parent is not None and parent.tracer is tracer else None,
+    )
+    return ActiveSpan(tracer, handle, owner=owner)
+
+
+def start_child_span(name: str, attributes: dict[str, t.Any] | None = None) -> ActiveSpan | None:
+    """Start a child span of the current span, if there is one. Child spans don't become current"""
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    handle = parent.tracer.start_span(name, attributes=attributes or {}, parent=parent.handle)
+    return ActiveSpan(parent.tracer, handle, owner=None)
+
+
+def set_span_attribute(key: str, value: t.Any) -> None:
+    """Set an attribute of the current span"""
+    span = _current_span.get()
+    if span is not None:
+        span.set_attribute(key, value)
+
+
+class _ChildSpan:
+    def __init__(self, span: ActiveSpan):
+        self._span = span
+
+    def __enter__(self) -> ActiveSpan:
+        return self._span
+
+    def __exit__(self, exc_type: t.Any, exc: BaseException | None, tb: t.Any) -> None:
+        self._span.end(exc)
+
+
+_NO_SPAN = nullcontext(None)
+
+
+def child_span(name: str, attributes: dict[str, t.Any] | None = None) -> t.ContextManager[ActiveSpan | None]:
+    """Wrap a block in a child span of the current span. Outside of spans it's a no-op"""
+    span = start_child_span(name, attributes)
+    return _NO_SPAN if span is None else _ChildSpan(span)
+
+
+@contextmanager
+def span_scope(span: ActiveSpan | None) -> t.Iterator[None]:
+    """Make a span current within a block"""
+    if span is None:
+        yield
+        return
+    token = _current_span.set(span)
+    try:
+        yield
+    finally:
+        _current_span.reset(token)
+
+
+def install_tracing(engine: Engine) -> None:
+    """
+    Emit `ash_dal.execute` spans for statements an engine executes inside traced operations.
+    Listeners are added once per engine, sessions call it when an engine is bound inside a traced operation,
+    so engines that are never traced don't get them.
+    """
+    if getattr(engine, _TRACING_INSTALLED_KEY, False):
+        return
+    with _install_lock:
+        if getattr(engine, _TRACING_INSTALLED_KEY, False):
+            return
+        _add_tracing_listeners(engine)
+        setattr(engine, _TRACING_INSTALLED_KEY, True)
+
+
+def _add_tracing_listeners(engine: Engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(  # pyright: ignore [reportUnusedFunction]
+        conn: t.Any, cursor: t.Any, statement: str, *_: t.Any
+    ) -> None:
+        span = start_child_span(SPAN_EXECUTE, {"db.system": engine.dialect.name, "db.statement": statement})
+        if span is not None:
+            conn.info[_EXECUTE_SPAN_KEY] = span
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn: t.Any, *_: t.Any) -> None:  # pyright: ignore [reportUnusedFunction]
+        span: ActiveSpan | None = conn.info.pop(_EXECUTE_SPAN_KEY, None)
+        if span is not None:
+            span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context: ExceptionContext) -> None:  # pyright: ignore [reportUnusedFunction]
+        if context.connection is None:
+            return
+        span: ActiveSpan | None = context.connection.info.pop(_EXECUTE_SPAN_KEY, None)
+        if span is not None:
+            span.end(context.original_exception)
@@ -0,0 +1,112 @@
+import typing as t
+from dataclasses import dataclass
+
+from sqlalchemy import Column, Insert, Select, Table, func, inspect, select, tuple_
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from ash_dal.exceptions.database import UnsupportedDialectError
+
+# `INSERT ... ON CONFLICT` is built by dialect specific `insert` functions with the same API
+_ON_CONFLICT_INSERTS: dict[str, t.Callable[[Table], t.Any]] = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+@dataclass(frozen=True)
+class UpsertResult:
+    """
+    Counts of rows inserted and updated by `bulk_upsert`
+    """
+
+    inserted: int = 0
+    updated: int = 0
+
+    def __add__(self, other: "UpsertResult") -> "UpsertResult":
+        return UpsertResult(inserted=self.inserted + other.inserted, updated=self.updated + other.updated)
+
+
+def build_upsert_statement(
+    table: Table,
+    dialect_name: str,
+    rows: t.Sequence[dict[str, t.Any]],
+    update_columns: t.Sequence[Column[t.Any]],
+    conflict_columns: t.Sequence[Column[t.Any]],
+) -> Insert:
+    """
+    Build a multi-row insert that updates `update_fields` of rows that already exist
+    :param table: the table to upsert rows into
+    :param dialect_name: name of the SQLAlchemy dialect
+    :param rows: dicts of column keys to values, all of them must have the same keys
+    :param update_columns: columns that are overwritten if a row exists
+    :param conflict_columns: columns of a unique index that identifies existing rows. Only used by `ON CONFLICT`,
+    MySQL checks all unique indexes of the table.
+    :return: an insert statement
+    """
+    if dialect_name == "mysql":
+        mysql_stmt = mysql.insert(table).values(rows)
+        return mysql_stmt.on_duplicate_key_update({c.key: mysql_stmt.inserted[c.key] for c in update_columns})
+    if dialect_name not in _ON_CONFLICT_INSERTS:
+        raise UnsupportedDialectError(f"Upsert is not supported by {dialect_name} dialect")
+    stmt = _ON_CONFLICT_INSERTS[dialect_name](table).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=conflict_columns,
+        set_={c.key: stmt.excluded[c.key] for c in update_columns},
+    )
+
+
+def mysql_upsert_result(rows_count: int, affected_rows: int) -> UpsertResult:
+    """
+    Calculate counts from affected rows reported by MySQL for `INSERT ... ON DUPLICATE KEY UPDATE`:
+    1 for an inserted row and 2 for an updated one. SQLAlchemy MySQL drivers connect with the `FOUND_ROWS` flag,
+    so existing rows that are left unchanged are reported as 1 too, and they are counted as inserted.
+    """
+    updated = max(affected_rows - rows_count, 0)
+    return UpsertResult(inserted=rows_count - updated, updated=updated)
+
+
+def dedupe_upsert_rows(rows: t.Sequence[dict[str, t.Any]], conflict_fields: tuple[str, ...]) -> list[dict[str, t.Any]]:
+    """
+    Keep the last of rows with the same conflict key. PostgreSQL rejects a statement that updates a row twice,
+    and other dialects would count such rows as inserted more than once
+    :param rows: dicts of attribute keys to values
+    :param conflict_fields: attribute keys of a unique index
+    """
+    unique_rows: dict[t.Any, dict[str, t.Any]] = {}
+    for index, row in enumerate(rows):
+        # Rows without all conflict fields never conflict with each other
+        key = tuple(row[field] for field in conflict_fields) if all(f in row for f in conflict_fields) else index
+        unique_rows[key] = row
+    return list(unique_rows.values())
+
+
+def upsert_result(dialect_name: str, rows_count: int, affected_rows: int, existing_rows_count: int) -> UpsertResult:
+    """
+    :param existing_rows_count: rows that conflicted with upserted ones, counted before the upsert. MySQL reports
+    updated rows in affected rows, so it's not used there
+    """
+    if dialect_name == "mysql":
+        return mysql_upsert_result(rows_count=rows_count, affected_rows=affected_rows)
+    return UpsertResult(inserted=rows_count - existing_rows_count, updated=existing_rows_count)
+
+
+def build_existing_rows_count_query(
+    model: type[t.Any], rows: t.Sequence[dict[str, t.Any]], conflict_fields: tuple[str, ...]
+) -> Select[t.Any] | None:
+    """
+    Count rows that conflict with the upserted ones, since `ON CONFLICT` doesn't report how many rows were updated
+    :param model: ORM model of the upserted table
+    :param rows: dicts of attribute keys to values
+    :param conflict_fields: attribute keys of a unique index
+    :return: a count query or None if no row has all conflict fields
+    """
+    keys = [tuple(row[field] for field in conflict_fields) for row in rows if all(f in row for f in conflict_fields)]
+    if not keys:
+        return None
+    model_columns = inspect(model).columns
+    columns = [model_columns[field] for field in conflict_fields]
+    if len(columns) == 1:
+        clause = columns[0].in_([key[0] for key in keys])
+    else:
+        clause = tuple_(*columns).in_(keys)
+    return select(func.count()).select_from(model.__table__).where(clause)
@@ -0,0 +1,72 @@
+"""
+Compare two result files of `benchmarks.suite` and flag regressions: cases whose metrics grew by more than
+the threshold. Exits with code 1 if there are regressions.
+
+    python -m benchmarks.compare before.json after.json --threshold 0.1 --metrics p50 p99 peak_memory
+"""
+import argparse
+import json
+import sys
+import typing as t
+from pathlib import Path
+
+# Metrics where lower is better
+METRICS = ("p50", "p99", "mean", "min", "peak_memory")
+META_KEYS = ("backend", "rows", "repeat", "page_size", "bulk_rows")
+
+
+def _load(path: Path) -> tuple[dict[str, t.Any], dict[str, dict[str, t.Any]]]:
+    report = json.loads(path.read_text())
+    return report["meta"], {result["name"]: result for result in report["results"]}
+
+
+def compare(
+    baseline: dict[str, dict[str, t.Any]],
+    current: dict[str, dict[str, t.Any]],
+    metrics: t.Sequence[str],
+    threshold: float,
+) -> list[tuple[str, str, float, float, float, bool]]:
+    """
+    :return: rows of (case, metric, baseline value, current value, relative change, is regression)
+    for cases present in both runs
+    """
+    rows: list[tuple[str, str, float, float, float, bool]] = []
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+        for metric in metrics:
+            before, after = baseline[name][metric], result[metric]
+            change = (after - before) / before if before else 0.0
+            rows.append((name, metric, before, after, change, change > threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative growth that is a regression")
+    parser.add_argument("--metrics", nargs="+", choices=METRICS, default=["p50", "p99", "peak_memory"])
+    args = parser.parse_args()
+
+    baseline_meta, baseline = _load(args.baseline)
+    current_meta, current = _load(args.current)
+    for key in META_KEYS:
+        if baseline_meta.get(key) != current_meta.get(key):
+            print(f"Warning: runs differ in {key}: {baseline_meta.get(key)} vs {current_meta.get(key)}")
+    for name in sorted(baseline.keys() ^ current.keys()):
+        print(f"Warning: {name} is missing in {'the current' if name in baseline else 'the baseline'} run")
+
+    rows = compare(baseline, current, metrics=args.metrics, threshold=args.threshold)
+    width = max((len(row[0]) for row in rows), default=4) + 2
+    print(f"{'case':<{width}}{'metric':<13}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name, metric, before, after, change, is_regression in rows:
+        flag = "  REGRESSION" if is_regression else ""
+        print(f"{name:<{width}}{metric:<13}{before:>12.6g}{after:>12.6g}{change:>+9.1%}{flag}")
+    regressions = sum(row[-1] for row in rows)
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Per-row cost of DAO read methods with ORM instances vs Core rows (`__use_core_rows__`).
+
+    python -m benchmarks.core_rows --rows 100000 --repeat 5
+"""
+import argparse
+
+from ash_dal import BaseDAO, Database
+
+from benchmarks.infrastructure import BenchmarkEntity, BenchmarkORMModel, measure, populate, sqlite_url
+
+
+class ORMBenchmarkDAO(BaseDAO[BenchmarkEntity]):
+    __entity__ = BenchmarkEntity
+    __model__ = BenchmarkORMModel
+
+
+class CoreRowsBenchmarkDAO(ORMBenchmarkDAO):
+    __use_core_rows__ = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    database = Database(db_url=sqlite_url())
+    database.connect()
+    populate(database, rows_count=args.rows)
+    pages_count = args.rows // args.page_size or 1
+
+    print(f"{'method':<12}{'mode':<12}{'best, s':>10}{'per row, us':>14}")
+    for method, rows_count in (("all", args.rows), ("get_page", args.page_size)):
+        results: dict[str, float] = {}
+        for mode, dao_class in (("orm", ORMBenchmarkDAO), ("core_rows", CoreRowsBenchmarkDAO)):
+            dao = dao_class(database=database)
+            if method == "all":
+                durations = measure(dao.all, repeat=args.repeat)
+            else:
+                durations = measure(
+                    lambda: dao.get_page(page_index=pages_count, page_size=args.page_size), repeat=args.repeat
+                )
+            results[mode] = min(durations)
+            print(f"{method:<12}{mode:<12}{results[mode]:>10.4f}{results[mode] / rows_count * 1e6:>14.2f}")
+        print(f"{method:<12}{'speedup':<12}{results['orm'] / results['core_rows']:>10.2f}x")
+    database.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Microbenchmark of converting ORM instances and rows into entities: the previous dict based conversion vs
+the generated per-class converters.
+
+    python -m benchmarks.entity_conversion --rows 100000 --repeat 5
+"""
+import argparse
+import typing as t
+
+from ash_dal import BaseDAO, Database
+from ash_dal.dao.converter import get_entity_converter
+from sqlalchemy import inspect, select
+
+from benchmarks.infrastructure import BenchmarkEntity, BenchmarkORMModel, measure, populate, sqlite_url
+
+
+class BenchmarkDAO(BaseDAO[BenchmarkEntity]):
+    __entity__ = BenchmarkEntity
+    __model__ = BenchmarkORMModel
+
+
+class CoreRowsBenchmarkDAO(BenchmarkDAO):
+    __use_core_rows__ = True
+
+
+class CustomMappingBenchmarkDAO(BenchmarkDAO):
+    def _dict_to_entity(self, dict_: dict[str, t.Any]) -> BenchmarkEntity:
+        return self.__entity__(**dict_)
+
+
+def dict_based_conversion(db_items: t.Sequence[t.Any]) -> tuple[BenchmarkEntity, ...]:
+    """The conversion DAOs used before converters were generated"""
+    keys = tuple(c.key for c in inspect(BenchmarkORMModel).attrs)
+    return tuple(BenchmarkEntity(**{k: getattr(db_item, k) for k in keys}) for db_item in db_items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    database = Database(db_url=sqlite_url())
+    database.connect()
+    populate(database, rows_count=args.rows)
+    column_keys = get_entity_converter(BenchmarkORMModel, BenchmarkEntity).column_keys
+    with database.session as session:
+        instances = session.scalars(select(BenchmarkORMModel)).all()
+        rows = session.execute(select(*(getattr(BenchmarkORMModel, key) for key in column_keys))).all()
+
+        cases: tuple[tuple[str, t.Callable[[], t.Any]], ...] = (
+            ("dict based, instances", lambda: dict_based_conversion(instances)),
+            ("dict based, rows", lambda: tuple(BenchmarkEntity(**row._asdict()) for row in rows)),
+            ("converter, instances", lambda: BenchmarkDAO(database)._get_entities_from_db_items(instances)),
+            ("converter, rows", lambda: CoreRowsBenchmarkDAO(database)._get_entities_from_db_items(rows)),
+            (
+                "converter, _dict_to_entity",
+                lambda: CustomMappingBenchmarkDAO(database)._get_entities_from_db_items(instances),
+            ),
+        )
+        print(f"{'case':<30}{'best, s':>10}{'per row, us':>14}")
+        for name, case in cases:
+            best = min(measure(case, repeat=args.repeat))
+            print(f"{name:<30}{best:>10.4f}{best / args.rows * 1e6:>14.3f}")
+    database.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import math
+import tempfile
+import time
+import tracemalloc
+import typing as t
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from ash_dal import Database
+from sqlalchemy import URL, String, delete, insert
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class BenchmarkORMModel(Base):
+    __tablename__ = "benchmark_table"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    first_name: Mapped[str] = mapped_column("firstName", String(64))
+    last_name: Mapped[str] = mapped_column("lastName", String(64))
+    email: Mapped[str] = mapped_column(String(128))
+    age: Mapped[int]
+    score: Mapped[float]
+
+
+@dataclass
+class BenchmarkEntity:
+    id: int
+    first_name: str
+    last_name: str
+    email: str
+    age: int
+    score: float
+
+
+# The primary server of docker-compose.yaml
+MYSQL_URL = URL.create(
+    drivername="mysql+pymysql",
+    username="my_db_user",
+    password="S3cret",
+    host="127.0.0.1",
+    port=3306,
+    database="my_db",
+)
+
+
+def sqlite_url(directory: str | None = None) -> URL:
+    directory = directory or tempfile.mkdtemp(prefix="ash_dal_benchmark_")
+    return URL.create(drivername="sqlite", database=str(Path(directory) / "benchmark.db"))
+
+
+def async_url(url: URL) -> URL:
+    """The URL of the same database for the async driver: aiosqlite or aiomysql"""
+    return url.set(drivername={"sqlite": "sqlite+aiosqlite", "mysql+pymysql": "mysql+aiomysql"}[url.drivername])
+
+
+def populate(database: Database, rows_count: int, chunk_size: int = 10_000):
+    """Recreate the benchmark table and fill it with `rows_count` generated rows"""
+    Base.metadata.drop_all(database.engine)
+    Base.metadata.create_all(database.engine)
+    with database.session as session:
+        for start in range(1, rows_count + 1, chunk_size):
+            rows = [
+                {
+                    "id": i,
+                    "first_name": f"first_{i}",
+                    "last_name": f"last_{i}",
+                    "email": f"user_{i}@example.com",
+                    "age": i % 90 + 10,
+                    "score": i / 7,
+                }
+                for i in range(start, min(start + chunk_size, rows_count + 1))
+            ]
+            session.execute(insert(BenchmarkORMModel), rows)
+        session.commit()
+
+
+def delete_rows_after(database: Database, last_id: int):
+    """Delete rows created by a benchmark after the generated ones"""
+    with database.session as session:
+        session.execute(delete(BenchmarkORMModel).where(BenchmarkORMModel.id > last_id))
+        session.commit()
+
+
+def measure(func: t.Callable[[], t.Any], repeat: int) -> list[float]:
+    """Run `func` `repeat` times and return durations in seconds"""
+    durations: list[float] = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started_at)
+    return durations
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    """Timings of one benchmark case. Durations are in seconds, memory in bytes"""
+
+    name: str
+    repeat: int
+    # Rows a call reads or writes, 0 if it's not meaningful for the case
+    rows: int
+    p50: float
+    p99: float
+    mean: float
+    min: float
+    # Calls per second
+    throughput: float
+    rows_per_second: float
+    # Peak memory allocated by one call, measured with tracemalloc in a separate run
+    peak_memory: int
+
+    def to_dict(self) -> dict[str, t.Any]:
+        return asdict(self)
+
+
+def percentile(values: t.Sequence[float], q: float) -> float:
+    """Percentile with linear interpolation between the closest ranks, `q` is between 0 and 100"""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower, upper = math.floor(position), math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(name: str, durations: list[float], rows: int, peak_memory: int) -> BenchmarkResult:
+    throughput = len(durations) / sum(durations) if sum(durations) else 0.0
+    return BenchmarkResult(
+        name=name,
+        repeat=len(durations),
+        rows=rows,
+        p50=percentile(durations, 50),
+        p99=percentile(durations, 99),
+        mean=sum(durations) / len(durations),
+        min=min(durations),
+        throughput=throughput,
+        rows_per_second=throughput * rows,
+        peak_memory=peak_memory,
+    )
+
+
+def run_case(
+    name: str,
+    func: t.Callable[[], t.Any],
+    repeat: int,
+    rows: int = 0,
+    warmup: int = 1,
+    setup: t.Callable[[], t.Any] | None = None,
+) -> BenchmarkResult:
+    """
+    Time `repeat` calls of `func` after `warmup` calls, then measure the peak memory of one more call
+    :param setup: called before every call, it isn't timed
+    """
+    durations: list[float] = []
+    for index in range(warmup + repeat):
+        if setup:
+            setup()
+        started_at = time.perf_counter()
+        func()
+        if index >= warmup:
+            durations.append(time.perf_counter() - started_at)
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return summarize(name, durations, rows=rows, peak_memory=peak_memory)
+
+
+async def run_async_case(
+    name: str,
+    func: t.Callable[[], t.Awaitable[t.Any]],
+    repeat: int,
+    rows: int = 0,
+    warmup: int = 1,
+    setup: t.Callable[[], t.Any] | None = None,
+) -> BenchmarkResult:
+    """The same as :func:`run_case` for coroutine functions"""
+    durations: list[float] = []
+    for index in range(warmup + repeat):
+        if setup:
+            setup()
+        started_at = time.perf_counter()
+        await func()
+        if index >= warmup:
+            durations.append(time.perf_counter() - started_at)
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        await func()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return summarize(name, durations, rows=rows, peak_memory=peak_memory)
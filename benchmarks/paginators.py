@@ -0,0 +1,253 @@
+"""
+Shoot-out of pagination strategies: `Paginator` (OFFSET), `DeferredJoinPaginator` and `KeysetPaginator` (seeking
+with cursors) over a generated table of configurable size and width, across page depths, page sizes and eager-load
+options. Every combination reports the latency of fetching a page (the count is served from a warm count cache),
+and rows read by the page statements: handler counters on MySQL, the query plan on SQLite.
+The cost of the count query is reported once per eager-load option, it is the same for all strategies.
+Results use the format of `benchmarks.suite`, so runs can be compared with `benchmarks.compare`.
+
+    python -m benchmarks.paginators --rows 100000 --width 20 --depths 1 100 1000 --page-sizes 20 100
+    python -m benchmarks.paginators --backend mysql --loads none joined selectin --output paginators.json
+"""
+import argparse
+import json
+import platform
+import time
+import typing as t
+from pathlib import Path
+
+import sqlalchemy
+from ash_dal import Database, DeferredJoinPaginator, KeysetPaginator, Paginator
+from ash_dal.database.slow_query import explain_statement, parse_plan
+from ash_dal.utils import CountCache
+from ash_dal.utils.paginator.cursor import KeysetCursor, encode_cursor
+from sqlalchemy import Connection, ForeignKey, Integer, Select, String, event, insert, select, text
+from sqlalchemy.orm import DeclarativeBase, Session, joinedload, mapped_column, relationship, selectinload
+
+from benchmarks.infrastructure import MYSQL_URL, run_case, sqlite_url
+
+STRATEGIES = ("offset", "deferred_join", "keyset")
+LOADS = ("none", "joined", "selectin")
+
+
+class Models(t.NamedTuple):
+    base: type[DeclarativeBase]
+    parent: type[t.Any]
+    child: type[t.Any]
+
+
+def build_models(width: int, column_length: int) -> Models:
+    """Models of a table with `width` text columns besides the primary key, and of a table of its children"""
+
+    class Base(DeclarativeBase):
+        pass
+
+    child = type(
+        "ShootoutChildORMModel",
+        (Base,),
+        {
+            "__tablename__": "shootout_child_table",
+            "id": mapped_column(Integer, primary_key=True),
+            "parent_id": mapped_column(ForeignKey("shootout_table.id"), index=True, nullable=False),
+            "name": mapped_column(String(64)),
+        },
+    )
+    columns = {f"column_{index}": mapped_column(String(column_length)) for index in range(width)}
+    parent = type(
+        "ShootoutORMModel",
+        (Base,),
+        {
+            "__tablename__": "shootout_table",
+            "id": mapped_column(Integer, primary_key=True),
+            **columns,
+            "children": relationship(child, lazy="noload"),
+        },
+    )
+    return Models(base=Base, parent=parent, child=child)
+
+
+def populate(database: Database, models: Models, args: argparse.Namespace, chunk_size: int = 5000) -> None:
+    models.base.metadata.drop_all(database.engine)
+    models.base.metadata.create_all(database.engine)
+    value = "x" * args.column_length
+    with database.session as session:
+        for start in range(1, args.rows + 1, chunk_size):
+            ids = range(start, min(start + chunk_size, args.rows + 1))
+            session.execute(
+                insert(models.parent), [{"id": i, **{f"column_{c}": value for c in range(args.width)}} for i in ids]
+            )
+            if args.children:
+                session.execute(
+                    insert(models.child),
+                    [
+                        {"id": (i - 1) * args.children + n + 1, "parent_id": i, "name": f"child_{n}"}
+                        for i in ids
+                        for n in range(args.children)
+                    ],
+                )
+        session.commit()
+
+
+def build_query(models: Models, load: str) -> Select[t.Any]:
+    query = select(models.parent).order_by(models.parent.id)
+    if load == "joined":
+        return query.options(joinedload(models.parent.children))
+    if load == "selectin":
+        return query.options(selectinload(models.parent.children))
+    return query
+
+
+def fetch_page(
+    strategy: str, session: Session, query: Select[t.Any], models: Models, page_size: int, depth: int, cache: CountCache
+) -> t.Any:
+    if strategy == "offset":
+        return Paginator(session, query, page_size=page_size, count_cache=cache).get_page(depth)
+    if strategy == "deferred_join":
+        return DeferredJoinPaginator(
+            session, query, page_size=page_size, pk_field=models.parent.id, count_cache=cache
+        ).get_page(depth)
+    paginator = KeysetPaginator(session, query, page_size=page_size, key_fields=[models.parent.id], count_cache=cache)
+    if depth == 1:
+        return paginator.get_page(depth)
+    # A client follows `next_cursor` to deep pages, the cursor holds the last key of the previous page
+    last_key = (depth - 1) * page_size
+    return paginator.get_page_after(
+        encode_cursor(KeysetCursor(values=(last_key,), is_backward=False, page_index=depth))
+    )
+
+
+def _handler_reads(connection: Connection) -> int:
+    rows = connection.execute(text("SHOW SESSION STATUS LIKE 'Handler_read%'")).all()
+    return sum(int(value) for _, value in rows)
+
+
+def rows_scanned(database: Database, fetch: t.Callable[[Session], t.Any]) -> tuple[int | None, list[t.Any] | None]:
+    """
+    Run a page fetch on one connection and find out how many rows it read
+    :return: a sum of MySQL `Handler_read_*` counters, or the plans of the page statements on other backends
+    """
+    statements: list[tuple[str, t.Any]] = []
+
+    def collect(conn: t.Any, cursor: t.Any, statement: str, parameters: t.Any, *_: t.Any) -> None:
+        statements.append((statement, parameters))
+
+    with database.engine.connect() as connection:
+        if connection.dialect.name == "mysql":
+            # Reading the counters may read rows as well, that's measured by two reads in a row and subtracted
+            overhead = _handler_reads(connection)
+            before = _handler_reads(connection)
+            overhead = before - overhead
+            fetch(Session(bind=connection))
+            return _handler_reads(connection) - before - overhead, None
+        event.listen(connection, "before_cursor_execute", collect)
+        try:
+            fetch(Session(bind=connection))
+        finally:
+            event.remove(connection, "before_cursor_execute", collect)
+        plans: list[t.Any] = []
+        for statement, parameters in statements:
+            explain = explain_statement(connection.dialect.name, statement)
+            if explain is not None:
+                plans.append(parse_plan(connection.exec_driver_sql(explain, parameters).all()))
+        return None, plans
+
+
+def _plan_summary(plans: list[t.Any] | None) -> list[str] | None:
+    if plans is None:
+        return None
+    return [" / ".join(str(step.get("detail", step)) for step in plan) for plan in plans]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--rows", type=int, default=100_000, help="rows in the generated table")
+    parser.add_argument("--width", type=int, default=10, help="text columns of the generated table")
+    parser.add_argument("--column-length", type=int, default=32, help="length of values of text columns")
+    parser.add_argument("--children", type=int, default=2, help="child rows per row, loaded by eager-load options")
+    parser.add_argument("--strategies", nargs="+", choices=STRATEGIES, default=list(STRATEGIES))
+    parser.add_argument("--loads", nargs="+", choices=LOADS, default=["none"], help="eager-load options")
+    parser.add_argument("--depths", nargs="+", type=int, default=[1, 10, 100, 1000], help="page indexes")
+    parser.add_argument("--page-sizes", nargs="+", type=int, default=[20, 100])
+    parser.add_argument("--repeat", type=int, default=20, help="timed fetches of every page")
+    parser.add_argument("--output", type=Path, help="write results to this JSON file")
+    args = parser.parse_args()
+
+    models = build_models(width=args.width, column_length=args.column_length)
+    database = Database(db_url=MYSQL_URL if args.backend == "mysql" else sqlite_url())
+    database.connect()
+    results: list[dict[str, t.Any]] = []
+    try:
+        populate(database, models, args)
+        print(f"{'case':<44}{'p50, ms':>10}{'p99, ms':>10}{'rows read':>11}")
+        for load in args.loads:
+            query = build_query(models, load)
+
+            def count(query: Select[t.Any] = query) -> int:
+                with database.session as session:
+                    return Paginator(session, query, page_size=args.page_sizes[0]).size
+
+            result = run_case(f"count.{load}", count, repeat=args.repeat)
+            results.append({**result.to_dict(), "load": load})
+            print(f"{result.name:<44}{result.p50 * 1e3:>10.3f}{result.p99 * 1e3:>10.3f}")
+            for page_size in args.page_sizes:
+                for depth in args.depths:
+                    if (depth - 1) * page_size >= args.rows:
+                        continue
+                    for strategy in args.strategies:
+                        cache = CountCache(ttl=3600)
+
+                        def fetch(session: Session, strategy: str = strategy, depth: int = depth) -> t.Any:
+                            return fetch_page(strategy, session, query, models, page_size, depth, cache=cache)
+
+                        def fetch_with_session(fetch: t.Callable[[Session], t.Any] = fetch) -> t.Any:
+                            with database.session as session:
+                                return fetch(session)
+
+                        result = run_case(
+                            f"{strategy}.{load}.size_{page_size}.page_{depth}",
+                            fetch_with_session,
+                            repeat=args.repeat,
+                            rows=page_size,
+                        )
+                        scanned, plans = rows_scanned(database, fetch)
+                        results.append(
+                            {
+                                **result.to_dict(),
+                                "strategy": strategy,
+                                "load": load,
+                                "page_size": page_size,
+                                "depth": depth,
+                                "rows_scanned": scanned,
+                                "plans": _plan_summary(plans),
+                            }
+                        )
+                        print(
+                            f"{result.name:<44}{result.p50 * 1e3:>10.3f}{result.p99 * 1e3:>10.3f}"
+                            f"{scanned if scanned is not None else '-':>11}"
+                        )
+    finally:
+        database.disconnect()
+
+    if args.output:
+        report = {
+            "meta": {
+                "backend": args.backend,
+                "rows": args.rows,
+                "repeat": args.repeat,
+                "width": args.width,
+                "column_length": args.column_length,
+                "children": args.children,
+                "python": platform.python_version(),
+                "sqlalchemy": sqlalchemy.__version__,
+                "platform": platform.platform(),
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            },
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2, default=str))
+        print(f"Results are written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Benchmarks of DAO and paginator hot paths with sync and async DAOs. Runs offline against SQLite (aiosqlite is needed
+for async cases) or against the MySQL server of docker-compose.yaml with `--backend mysql`.
+Results are printed and written as JSON with `--output`, results of two runs are compared by `benchmarks.compare`.
+
+    python -m benchmarks.suite --rows 10000 --repeat 30 --output before.json
+    python -m benchmarks.suite --backend mysql --cases get_page --output mysql.json
+"""
+import argparse
+import asyncio
+import importlib.util
+import itertools
+import json
+import platform
+import random
+import subprocess
+import time
+import typing as t
+from pathlib import Path
+
+import sqlalchemy
+from ash_dal import AsyncBaseDAO, AsyncDatabase, BaseDAO, Database
+from sqlalchemy import URL
+
+from benchmarks.infrastructure import (
+    MYSQL_URL,
+    BenchmarkEntity,
+    BenchmarkORMModel,
+    BenchmarkResult,
+    async_url,
+    delete_rows_after,
+    populate,
+    run_async_case,
+    run_case,
+    sqlite_url,
+)
+
+FILTER_SPECIFICATION = {"age": 42}
+
+
+class BenchmarkDAO(BaseDAO[BenchmarkEntity]):
+    __entity__ = BenchmarkEntity
+    __model__ = BenchmarkORMModel
+
+
+class AsyncBenchmarkDAO(AsyncBaseDAO[BenchmarkEntity]):
+    __entity__ = BenchmarkEntity
+    __model__ = BenchmarkORMModel
+
+
+class Case(t.NamedTuple):
+    name: str
+    func: t.Callable[[], t.Any]
+    rows: int
+    setup: t.Callable[[], t.Any] | None = None
+
+
+def _bulk_data(args: argparse.Namespace) -> list[dict[str, t.Any]]:
+    first_id = args.rows + 1
+    return [
+        {
+            "id": i,
+            "first_name": f"first_{i}",
+            "last_name": f"last_{i}",
+            "email": f"user_{i}@example.com",
+            "age": i % 90 + 10,
+            "score": i / 7,
+        }
+        for i in range(first_id, first_id + args.bulk_rows)
+    ]
+
+
+def _cases(dao: BaseDAO[BenchmarkEntity] | AsyncBaseDAO[BenchmarkEntity], database: Database, args: argparse.Namespace):
+    """Cases shared by sync and async DAOs, `func` returns a coroutine for async ones"""
+    pks = itertools.cycle(random.Random(args.seed).sample(range(1, args.rows + 1), k=min(args.rows, 1000)))
+    deep_page_index = max(args.rows // args.page_size, 1)
+    filtered_rows = sum(1 for i in range(1, args.rows + 1) if i % 90 + 10 == FILTER_SPECIFICATION["age"])
+    bulk_data = _bulk_data(args)
+    return [
+        Case("get_by_pk", lambda: dao.get_by_pk(next(pks)), rows=1),
+        Case("all", dao.all, rows=args.rows),
+        Case("filter", lambda: dao.filter(specification=FILTER_SPECIFICATION), rows=filtered_rows),
+        Case("get_page.shallow", lambda: dao.get_page(page_index=1, page_size=args.page_size), rows=args.page_size),
+        Case(
+            "get_page.deep",
+            lambda: dao.get_page(page_index=deep_page_index, page_size=args.page_size),
+            rows=args.page_size,
+        ),
+        Case("paginate", lambda: _consume(dao.paginate(page_size=args.page_size)), rows=args.rows),
+        Case(
+            "bulk_create",
+            lambda: dao.bulk_create(data=bulk_data),
+            rows=args.bulk_rows,
+            setup=lambda: delete_rows_after(database, last_id=args.rows),
+        ),
+    ]
+
+
+def _consume(iterator: t.Iterator[t.Any] | t.AsyncIterator[t.Any]) -> t.Any:
+    if isinstance(iterator, t.AsyncIterator):
+
+        async def consume() -> None:
+            async for _ in iterator:
+                pass
+
+        return consume()
+    for _ in iterator:
+        pass
+
+
+def _selected(cases: list[Case], args: argparse.Namespace) -> list[Case]:
+    return [case for case in cases if not args.cases or any(name in case.name for name in args.cases)]
+
+
+def run_sync(url: URL, database: Database, args: argparse.Namespace) -> list[BenchmarkResult]:
+    dao = BenchmarkDAO(database)
+    return [
+        run_case(f"sync.{case.name}", case.func, repeat=args.repeat, rows=case.rows, setup=case.setup)
+        for case in _selected(_cases(dao, database, args), args)
+    ]
+
+
+async def run_async(url: URL, database: Database, args: argparse.Namespace) -> list[BenchmarkResult]:
+    async_database = AsyncDatabase(db_url=async_url(url))
+    await async_database.connect()
+    try:
+        dao = AsyncBenchmarkDAO(async_database)
+        return [
+            await run_async_case(f"async.{case.name}", case.func, repeat=args.repeat, rows=case.rows, setup=case.setup)
+            for case in _selected(_cases(dao, database, args), args)
+        ]
+    finally:
+        await async_database.disconnect()
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_results(results: list[BenchmarkResult]) -> None:
+    print(f"{'case':<26}{'p50, ms':>10}{'p99, ms':>10}{'ops/s':>10}{'rows/s':>12}{'peak, KiB':>11}")
+    for result in results:
+        print(
+            f"{result.name:<26}{result.p50 * 1e3:>10.3f}{result.p99 * 1e3:>10.3f}{result.throughput:>10.1f}"
+            f"{result.rows_per_second:>12.0f}{result.peak_memory / 1024:>11.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--rows", type=int, default=10_000, help="rows in the benchmark table")
+    parser.add_argument("--repeat", type=int, default=30, help="timed calls of every case")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--bulk-rows", type=int, default=1000, help="rows created by one bulk_create call")
+    parser.add_argument("--seed", type=int, default=0, help="seed of primary keys looked up by get_by_pk")
+    parser.add_argument("--cases", nargs="*", default=(), help="run only cases whose names contain these strings")
+    parser.add_argument("--no-async", action="store_true", help="skip async cases")
+    parser.add_argument("--output", type=Path, help="write results to this JSON file")
+    args = parser.parse_args()
+
+    url = MYSQL_URL if args.backend == "mysql" else sqlite_url()
+    database = Database(db_url=url)
+    database.connect()
+    try:
+        populate(database, rows_count=args.rows)
+        results = run_sync(url, database, args)
+        if args.no_async:
+            pass
+        elif args.backend == "sqlite" and importlib.util.find_spec("aiosqlite") is None:
+            print("Async cases are skipped: install aiosqlite to run them against SQLite")
+        else:
+            results += asyncio.run(run_async(url, database, args))
+    finally:
+        database.disconnect()
+
+    _print_results(results)
+    if args.output:
+        report = {
+            "meta": {
+                "backend": args.backend,
+                "rows": args.rows,
+                "repeat": args.repeat,
+                "page_size": args.page_size,
+                "bulk_rows": args.bulk_rows,
+                "python": platform.python_version(),
+                "sqlalchemy": sqlalchemy.__version__,
+                "platform": platform.platform(),
+                "revision": (_git_revision() or "").strip() or None,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            },
+            "results": [result.to_dict() for result in results],
+        }
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Results are written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,42 @@
+import asyncio
+import gc
 import math
 import random
+import weakref
 from collections import Counter
 from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
 
 import pytest
-from ash_dal import AsyncBaseDAO, AsyncDatabase, AsyncDeferredJoinPaginator, PaginatorPage
-from ash_dal.utils import DeferredJoinPaginatorFactory
+from ash_dal import (
+    AsyncBaseDAO,
+    AsyncDatabase,
+    AsyncDeferredJoinPaginator,
+    AsyncKeysetPaginator,
+    CursorPage,
+    PaginatorPage,
+)
+from ash_dal.database import ReadYourWritesConfig
+from ash_dal.exceptions.paginator import PaginationError
+from ash_dal.utils import (
+    BulkProgress,
+    DeferredJoinPaginatorFactory,
+    EntityCache,
+    InMemoryTracer,
+    KeysetPaginatorFactory,
+    MetricsCollector,
+    OperationMetrics,
+    ScanBoundaries,
+    StatementCache,
+    UpsertResult,
+)
+from ash_dal.utils.bulk_insert import BulkInsertMode
 from faker import Faker
-from sqlalchemy import select
-from sqlalchemy.orm import joinedload
+from parameterized import parameterized
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import joinedload, selectinload
 
-from tests.constants import ASYNC_DB_URL
+from tests.constants import ASYNC_DB_URL, ASYNC_DB_URL__SLAVE
 from tests.dao.infrastructure import ExampleEntity, ExampleORMModel
 
 
@@ -18,6 +44,7 @@ class ExampleAsyncDAO(AsyncBaseDAO[ExampleEntity]):
     __entity__ = ExampleEntity
     __model__ = ExampleORMModel
     __default_load_options__ = (joinedload(ExampleORMModel.children),)
+    __stream_load_options__ = (selectinload(ExampleORMModel.children),)
 
 
 class ExampleDAOCustomPaginator(ExampleAsyncDAO):
@@ -27,6 +54,29 @@ class ExampleDAOCustomPaginator(ExampleAsyncDAO):
     )
 
 
+class ExampleDAOKeysetPaginator(ExampleAsyncDAO):
+    __paginator_factory__ = KeysetPaginatorFactory[AsyncKeysetPaginator](
+        paginator_class=AsyncKeysetPaginator,
+        key_fields=(ExampleORMModel.id,),
+    )
+
+
+class ExampleDAOCoreRows(ExampleAsyncDAO):
+    __use_core_rows__ = True
+
+
+class ExampleDAOCached(ExampleAsyncDAO):
+    __entity_cache__ = EntityCache(cache_misses=True)
+
+
+class ExampleDAOSmallChunks(ExampleAsyncDAO):
+    __default_in_chunk_size__ = 3
+
+
+class ExampleDAOCoalesced(ExampleDAOSmallChunks):
+    __coalesce_lookups__ = True
+
+
 class AsyncDAOTestCaseBase(IsolatedAsyncioTestCase):
     async def asyncSetUp(self) -> None:
         self.faker = Faker()
@@ -105,6 +155,49 @@ class AsyncDAOFetchAllTestCase(AsyncDAOFetchingTestCaseBase):
         assert len(results) == self.records_count
         assert isinstance(results[0], ExampleEntity)
 
+    async def test_stream(self):
+        results = [entity async for entity in self.dao.stream(batch_size=7)]
+        assert len(results) == self.records_count
+        assert isinstance(results[0], ExampleEntity)
+        assert sorted(entity.id for entity in results) == list(range(1, self.records_count + 1))
+
+    async def test_stream_batches(self):
+        batch_size = self.faker.pyint(min_value=2, max_value=20)
+        batches = [batch async for batch in self.dao.stream_batches(batch_size=batch_size)]
+        assert len(batches) == math.ceil(self.records_count / batch_size)
+        assert all(len(batch) == batch_size for batch in batches[:-1])
+        assert sum(len(batch) for batch in batches) == self.records_count
+        assert isinstance(batches[0], tuple)
+        assert isinstance(batches[0][0], ExampleEntity)
+
+    async def test_parallel_scan(self):
+        results = [entity async for entity in self.dao.parallel_scan(partitions=4, concurrency=2, batch_size=7)]
+        assert isinstance(results[0], ExampleEntity)
+        assert sorted(entity.id for entity in results) == list(range(1, self.records_count + 1))
+
+    @parameterized.expand([(ScanBoundaries.MIN_MAX,), (ScanBoundaries.SAMPLED,)])
+    async def test_parallel_scan__ordered(self, boundaries: ScanBoundaries):
+        results = self.dao.parallel_scan(partitions=3, batch_size=5, ordered=True, boundaries=boundaries)
+        assert [entity.id async for entity in results] == list(range(1, self.records_count + 1))
+
+    async def test_parallel_scan_batches(self):
+        batch_size = self.faker.pyint(min_value=2, max_value=20)
+        batches = [batch async for batch in self.dao.parallel_scan_batches(partitions=5, batch_size=batch_size)]
+        assert all(isinstance(batch, tuple) and 0 < len(batch) <= batch_size for batch in batches)
+        assert sum(len(batch) for batch in batches) == self.records_count
+
+    async def test_parallel_scan__early_exit(self):
+        batches = self.dao.parallel_scan_batches(partitions=4, batch_size=2)
+        assert len(await anext(batches)) == 2
+        await batches.aclose()
+        assert self.db.engine.sync_engine.pool.checkedout() == 0  # pyright: ignore [reportGeneralTypeIssues]
+
+    async def test_parallel_scan__invalid_arguments(self):
+        with pytest.raises(ValueError):
+            [entity async for entity in self.dao.parallel_scan(partitions=0)]
+        with pytest.raises(ValueError):
+            [entity async for entity in self.dao.parallel_scan(concurrency=0)]
+
     async def test_get_page__default_page_size(self):
         results = await self.dao.get_page()
         assert results
@@ -151,6 +244,13 @@ class AsyncDAOFetchAllTestCase(AsyncDAOFetchingTestCaseBase):
                 assert len(page) <= page_size
         assert pages_count == pages_counter
 
+    async def test_paginate__prefetch(self):
+        page_size = self.faker.pyint(min_value=2, max_value=20)
+        pages = [page async for page in self.dao.paginate(page_size=page_size, prefetch=2)]
+        assert [page.index for page in pages] == list(range(1, math.ceil(self.records_count / page_size) + 1))
+        assert sum(len(page) for page in pages) == self.records_count
+        assert isinstance(pages[0][0], ExampleEntity)
+
     async def test_paginate__custom_page_size(self):
         page_size = self.faker.pyint(min_value=2, max_value=20)
         pages_count = math.ceil(self.records_count / page_size)
@@ -201,6 +301,17 @@ class AsyncDAOFetchFilteredTestCase(AsyncDAOFetchingTestCaseBase):
         assert not results
         assert isinstance(results, tuple)
 
+    async def test_stream_filtered(self):
+        results = [entity async for entity in self.dao.stream(specification={"age": 30}, batch_size=5)]
+        assert len(results) == self.records_counter["30"]
+        assert all(entity.age == 30 for entity in results)
+
+    async def test_parallel_scan_filtered(self):
+        results = self.dao.parallel_scan(specification={"age": 30}, partitions=3, boundaries=ScanBoundaries.SAMPLED)
+        results = [entity async for entity in results]
+        assert len(results) == self.records_counter["30"]
+        assert all(entity.age == 30 for entity in results)
+
     async def test_paginate_filtered(self):
         page_size = 3
         pages_count = math.ceil(self.records_counter["30"] / page_size)
@@ -223,6 +334,47 @@ class AsyncDAOCustomPaginatorUseCase(AsyncDAOFetchAllTestCase):
         self.dao = ExampleDAOCustomPaginator(database=self.db)
 
 
+class AsyncDAOKeysetPaginatorUseCase(AsyncDAOFetchAllTestCase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.dao = ExampleDAOKeysetPaginator(database=self.db)
+
+    async def test_get_page_after(self):
+        page_size = 10
+        page = await self.dao.get_page(page_size=page_size)
+        ids = [entity.id for entity in page]
+        while page.next_cursor:
+            page = await self.dao.get_page_after(cursor=page.next_cursor, page_size=page_size)
+            assert isinstance(page, CursorPage)
+            assert page.pages_count is None
+            assert all(isinstance(entity, ExampleEntity) for entity in page)
+            ids.extend(entity.id for entity in page)
+        assert ids == list(range(1, self.records_count + 1))
+
+    async def test_get_page_after__not_supported_paginator(self):
+        page = await self.dao.get_page(page_size=10)
+        with pytest.raises(PaginationError):
+            await ExampleAsyncDAO(database=self.db).get_page_after(cursor=page.next_cursor)
+
+
+class AsyncDAOCoreRowsGetOneRecordUseCase(AsyncDAOTestCase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.dao = ExampleDAOCoreRows(database=self.db)
+
+
+class AsyncDAOCoreRowsFetchAllUseCase(AsyncDAOFetchAllTestCase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.dao = ExampleDAOCoreRows(database=self.db)
+
+
+class AsyncDAOCoreRowsFetchFilteredUseCase(AsyncDAOFetchFilteredTestCase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.dao = ExampleDAOCoreRows(database=self.db)
+
+
 class AsyncDAOCreateTestCase(AsyncDAOTestCaseBase):
     async def test_create(self):
         data = {
@@ -252,6 +404,143 @@ class AsyncDAOCreateTestCase(AsyncDAOTestCaseBase):
             items = results.all()
             assert len(items) == items_count
 
+    def _generate_data(self):
+        return {
+            "first_name": self.faker.first_name(),
+            "last_name": self.faker.last_name(),
+            "age": self.faker.pyint(min_value=10, max_value=100),
+        }
+
+    async def test_bulk_create__iterator(self):
+        progress: list[BulkProgress] = []
+        data = (self._generate_data() for _ in range(7))
+        await self.dao.bulk_create(data=data, chunk_size=3, progress_callback=progress.append)
+        assert [(item.rows, item.chunks) for item in progress] == [(3, 1), (6, 2), (7, 3)]
+        assert all(item.elapsed >= 0 and item.rows_per_second >= 0 for item in progress)
+        assert len(await self.dao.all()) == 7
+
+    async def test_bulk_create__chunk_bytes(self):
+        progress: list[BulkProgress] = []
+        await self.dao.bulk_create(
+            data=[self._generate_data() for _ in range(4)], chunk_bytes=1, progress_callback=progress.append
+        )
+        assert progress[-1].chunks == 4
+        assert len(await self.dao.all()) == 4
+
+    @parameterized.expand([(True, 3), (False, 1)])
+    async def test_bulk_create__commits(self, commit_per_chunk: bool, expected_commits: int):
+        commits: list[None] = []
+
+        def on_commit(*_):
+            commits.append(None)
+
+        event.listen(self.db.engine.sync_engine, "commit", on_commit)
+        try:
+            await self.dao.bulk_create(
+                data=(self._generate_data() for _ in range(7)), chunk_size=3, commit_per_chunk=commit_per_chunk
+            )
+        finally:
+            event.remove(self.db.engine.sync_engine, "commit", on_commit)
+        assert len(commits) == expected_commits
+        assert len(await self.dao.all()) == 7
+
+    @parameterized.expand([(True, 3), (False, 0)])
+    async def test_bulk_create__error(self, commit_per_chunk: bool, expected_count: int):
+        def generate_data():
+            for _ in range(4):
+                yield self._generate_data()
+            raise RuntimeError()
+
+        with pytest.raises(RuntimeError):
+            await self.dao.bulk_create(data=generate_data(), chunk_size=3, commit_per_chunk=commit_per_chunk)
+        assert len(await self.dao.all()) == expected_count
+
+    async def test_bulk_create__async_iterable(self):
+        async def generate_data():
+            for _ in range(7):
+                await asyncio.sleep(0)
+                yield self._generate_data()
+
+        progress: list[BulkProgress] = []
+        await self.dao.bulk_create(data=generate_data(), chunk_size=3, progress_callback=progress.append)
+        assert [item.rows for item in progress] == [3, 6, 7]
+        assert len(await self.dao.all()) == 7
+
+    async def test_bulk_create__return_entities(self):
+        data = [self._generate_data() for _ in range(5)]
+        entities = await self.dao.bulk_create(data=data, chunk_size=2, return_entities=True)
+        assert [{**entity.__dict__} for entity in entities] == [
+            {**row, "id": entity.id, "children": []} for row, entity in zip(data, entities)
+        ]
+        assert entities == list(await self.dao.all())
+
+    async def test_bulk_create__return_entities_with_passed_keys(self):
+        data = [{**self._generate_data(), "id": id_} for id_ in (10, 20)]
+        entities = await self.dao.bulk_create(data=data, return_entities=True)
+        assert [entity.id for entity in entities] == [10, 20]
+
+    async def test_bulk_create__return_entities_per_row(self):
+        data = [self._generate_data() for _ in range(3)]
+        with patch.object(self.dao, "_bulk_insert_mode", return_value=BulkInsertMode.PER_ROW):
+            entities = await self.dao.bulk_create(data=data, return_entities=True)
+        assert entities == list(await self.dao.all())
+
+    async def test_bulk_create__returns_none(self):
+        assert await self.dao.bulk_create(data=[self._generate_data()]) is None
+
+
+class AsyncDAOBulkUpsertTestCase(AsyncDAOTestCaseBase):
+    def _generate_data(self, id_: int, age: int = 20):
+        return {"id": id_, "first_name": f"name_{id_}", "last_name": self.faker.last_name(), "age": age}
+
+    async def test_bulk_upsert(self):
+        result = await self.dao.bulk_upsert(data=[self._generate_data(id_=i) for i in range(1, 6)])
+        assert result == UpsertResult(inserted=5, updated=0)
+        result = await self.dao.bulk_upsert(data=[self._generate_data(id_=i, age=30) for i in range(4, 11)])
+        assert result == UpsertResult(inserted=5, updated=2)
+        entities = await self.dao.all()
+        assert [entity.age for entity in entities] == [20] * 3 + [30] * 7
+
+    async def test_bulk_upsert__chunks(self):
+        dao = ExampleDAOSmallChunks(database=self.db)
+        await dao.bulk_upsert(data=[self._generate_data(id_=i) for i in range(1, 4)])
+        result = await dao.bulk_upsert(data=[self._generate_data(id_=i, age=30) for i in range(1, 9)])
+        assert result == UpsertResult(inserted=5, updated=3)
+        assert len(await dao.all()) == 8
+
+    async def test_bulk_upsert__update_fields(self):
+        await self.dao.bulk_upsert(data=[self._generate_data(id_=1)])
+        data = {**self._generate_data(id_=1, age=30), "first_name": "Changed"}
+        await self.dao.bulk_upsert(data=[data], update_fields=["age"])
+        entity = await self.dao.get_by_pk(1)
+        assert entity
+        assert entity.age == 30
+        assert entity.first_name == "name_1"
+
+    async def test_bulk_upsert__repeated_conflict_key(self):
+        data = [self._generate_data(id_=900), self._generate_data(id_=1), self._generate_data(id_=900, age=30)]
+        result = await self.dao.bulk_upsert(data=data)
+        assert result == UpsertResult(inserted=2, updated=0)
+        entity = await self.dao.get_by_pk(900)
+        assert entity
+        assert entity.age == 30
+        assert len(await self.dao.all()) == 2
+
+    async def test_bulk_upsert__empty(self):
+        assert await self.dao.bulk_upsert(data=[]) == UpsertResult()
+
+    async def test_bulk_upsert__no_update_fields(self):
+        with pytest.raises(ValueError):
+            await self.dao.bulk_upsert(data=[{"id": 1}])
+
+    async def test_bulk_upsert__invalidates_entity_cache(self):
+        ExampleDAOCached.__entity_cache__ = EntityCache()
+        dao = ExampleDAOCached(database=self.db)
+        await dao.bulk_upsert(data=[self._generate_data(id_=1)])
+        assert (await dao.get_by_pk(1)).age == 20
+        await dao.bulk_upsert(data=[self._generate_data(id_=1, age=30)])
+        assert (await dao.get_by_pk(1)).age == 30
+
 
 class AsyncDAOUpdateTestCase(AsyncDAOTestCaseBase):
     async def _create_record(self):
@@ -287,6 +576,121 @@ class AsyncDAOUpdateTestCase(AsyncDAOTestCaseBase):
         with pytest.raises(ValueError):
             await self.dao.update(specification={}, update_data={})
 
+    async def _create_records(self, count: int):
+        await self.dao.bulk_create(
+            data=[
+                {"id": id_, "first_name": f"name_{id_}", "last_name": "Doe", "age": 20} for id_ in range(1, count + 1)
+            ]
+        )
+
+    async def test_bulk_update(self):
+        await self._create_records(count=6)
+        rows = [{"id": id_, "age": 20 + id_, "last_name": f"last_{id_}"} for id_ in range(1, 6)]
+        rowcounts = await self.dao.bulk_update(rows=iter(rows), chunk_size=2)
+        assert rowcounts == [2, 2, 1]
+        entities = await self.dao.all()
+        assert [(entity.age, entity.last_name) for entity in entities] == [
+            *((20 + id_, f"last_{id_}") for id_ in range(1, 6)),
+            (20, "Doe"),
+        ]
+
+    async def test_bulk_update__rows_with_different_fields(self):
+        await self._create_records(count=2)
+        await self.dao.bulk_update(rows=[{"id": 1, "age": 30}, {"id": 2, "first_name": "Changed"}])
+        entities = await self.dao.all()
+        assert [(entity.first_name, entity.age) for entity in entities] == [("name_1", 30), ("Changed", 20)]
+
+    async def test_bulk_update__key_fields(self):
+        await self._create_records(count=3)
+        rowcounts = await self.dao.bulk_update(
+            rows=[{"first_name": "name_2", "age": 50}, {"first_name": "missing", "age": 60}], key_fields=["first_name"]
+        )
+        assert rowcounts == [1]
+        assert [entity.age for entity in await self.dao.all()] == [20, 50, 20]
+
+    @parameterized.expand([([{"age": 30}],), ([{"id": 1}],)])
+    async def test_bulk_update__invalid_rows(self, rows):
+        with pytest.raises(ValueError):
+            await self.dao.bulk_update(rows=rows)
+
+    async def test_bulk_update__invalidates_entity_cache(self):
+        ExampleDAOCached.__entity_cache__ = EntityCache()
+        dao = ExampleDAOCached(database=self.db)
+        await self._create_records(count=2)
+        assert (await dao.get_by_pk(1)).age == 20
+        await dao.bulk_update(rows=[{"id": 1, "age": 30}])
+        assert (await dao.get_by_pk(1)).age == 30
+
+
+class AsyncDAOTransactionTestCase(AsyncDAOTestCaseBase):
+    def _generate_data(self, id_: int):
+        return {"id": id_, "first_name": f"name_{id_}", "last_name": "Doe", "age": 20}
+
+    async def test_transaction__commits_once(self):
+        commits: list[None] = []
+
+        def on_commit(*_):
+            commits.append(None)
+
+        event.listen(self.db.engine.sync_engine, "commit", on_commit)
+        try:
+            async with self.db.transaction():
+                await self.dao.create(data=self._generate_data(id_=1))
+                await self.dao.bulk_create(data=[self._generate_data(id_=2), self._generate_data(id_=3)])
+                await self.dao.update(specification={"id": 1}, update_data={"age": 30})
+                await self.dao.delete(specification={"id": 3})
+                # Reads see changes of the transaction
+                entity = await self.dao.get_by_pk(1)
+                assert entity
+                assert entity.age == 30
+                assert commits == []
+        finally:
+            event.remove(self.db.engine.sync_engine, "commit", on_commit)
+        assert len(commits) == 1
+        assert [entity.id for entity in await self.dao.all()] == [1, 2]
+
+    async def test_transaction__rollback(self):
+        with pytest.raises(RuntimeError):
+            async with self.db.transaction():
+                await self.dao.create(data=self._generate_data(id_=1))
+                raise RuntimeError()
+        assert await self.dao.all() == ()
+
+    async def test_transaction__nested_scope_is_rolled_back_alone(self):
+        async with self.db.transaction():
+            await self.dao.create(data=self._generate_data(id_=1))
+            with pytest.raises(RuntimeError):
+                async with self.db.transaction():
+                    await self.dao.create(data=self._generate_data(id_=2))
+                    raise RuntimeError()
+        assert [entity.id for entity in await self.dao.all()] == [1]
+
+    async def test_transaction__parallel_scan_sees_changes(self):
+        async with self.db.transaction():
+            await self.dao.bulk_create(data=[self._generate_data(id_=i) for i in range(1, 11)])
+            results = self.dao.parallel_scan(partitions=3, concurrency=3, ordered=True)
+            assert [entity.id async for entity in results] == list(range(1, 11))
+
+    async def test_transaction__entity_cache_is_bypassed(self):
+        ExampleDAOCached.__entity_cache__ = EntityCache()
+        dao = ExampleDAOCached(database=self.db)
+        await dao.create(data=self._generate_data(id_=1))
+        assert (await dao.get_by_pk(1)).age == 20
+        with pytest.raises(RuntimeError):
+            async with self.db.transaction():
+                await dao.update(specification={"id": 1}, update_data={"age": 30})
+                assert (await dao.get_by_pk(1)).age == 30
+                raise RuntimeError()
+        assert (await dao.get_by_pk(1)).age == 20
+
+    async def test_transaction__lookups_are_not_coalesced(self):
+        dao = ExampleDAOCoalesced(database=self.db)
+        async with self.db.transaction():
+            await dao.create(data=self._generate_data(id_=1))
+            entity = await dao.get_by_pk(1)
+        assert entity
+        assert entity.id == 1
+
 
 class AsyncDAODeleteTestCase(AsyncDAOTestCaseBase):
     async def _create_record(self):
@@ -313,3 +717,312 @@ class AsyncDAODeleteTestCase(AsyncDAOTestCaseBase):
     async def test_delete__empty_specification(self):
         with pytest.raises(ValueError):
             await self.dao.delete(specification={})
+
+
+class AsyncDAOEntityCacheTestCase(AsyncDAOTestCaseBase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        ExampleDAOCached.__entity_cache__ = EntityCache(cache_misses=True)
+        self.dao = ExampleDAOCached(database=self.db)
+
+    def _generate_data(self, **data):
+        return {
+            "first_name": self.faker.first_name(),
+            "last_name": self.faker.last_name(),
+            "age": self.faker.pyint(min_value=10, max_value=100),
+            **data,
+        }
+
+    async def _rename_bypassing_dao(self, pk: int, first_name: str):
+        async with self.db.session as session:
+            await session.execute(update(ExampleORMModel).filter_by(id=pk).values(first_name=first_name))
+            await session.commit()
+
+    async def test_get_by_pk__is_cached(self):
+        entity = await self.dao.create(data=self._generate_data())
+        assert await self.dao.get_by_pk(entity.id) == entity
+        await self._rename_bypassing_dao(pk=entity.id, first_name="Changed")
+        assert await self.dao.get_by_pk(entity.id) == entity
+        stats = self.dao.__entity_cache__.stats
+        assert stats.hits == 1
+        assert stats.misses == 1
+
+    async def test_get_by_pk__miss_is_cached_until_create(self):
+        assert await self.dao.get_by_pk(100) is None
+        assert await self.dao.get_by_pk(100) is None
+        assert self.dao.__entity_cache__.stats.hits == 1
+        entity = await self.dao.create(data=self._generate_data(id=100))
+        assert await self.dao.get_by_pk(100) == entity
+
+    async def test_get_by_pk__miss_is_cached_until_bulk_create(self):
+        assert await self.dao.get_by_pk(100) is None
+        await self.dao.bulk_create(data=(self._generate_data(id=100),))
+        assert await self.dao.get_by_pk(100)
+
+    @parameterized.expand(((True,), (False,)))
+    async def test_get_by_pk__update_invalidates_cache(self, by_pk: bool):
+        entity = await self.dao.create(data=self._generate_data(age=50))
+        await self.dao.get_by_pk(entity.id)
+        specification = {"id": entity.id} if by_pk else {"age": 50}
+        await self.dao.update(specification=specification, update_data={"first_name": "Changed"})
+        result = await self.dao.get_by_pk(entity.id)
+        assert result
+        assert result.first_name == "Changed"
+
+    async def test_get_by_pk__delete_invalidates_cache(self):
+        entity = await self.dao.create(data=self._generate_data())
+        await self.dao.get_by_pk(entity.id)
+        await self.dao.delete(specification={"id": entity.id})
+        assert await self.dao.get_by_pk(entity.id) is None
+
+
+class AsyncDAOBatchedLookupTestCase(AsyncDAOFetchingTestCaseBase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.records_count = 10
+        self.dao = ExampleDAOSmallChunks(database=self.db)
+        records = tuple(self._generate_record(id_=i, first_name=f"name_{i}") for i in range(1, self.records_count + 1))
+        async with self.db.session as session:
+            session.add_all(records)
+            await session.commit()
+
+    async def test_get_many_by_pk(self):
+        pks = [1, 2, 3, 5, 8, 8, 100]
+        results = await self.dao.get_many_by_pk(pks)
+        assert set(results) == {1, 2, 3, 5, 8}
+        assert all(isinstance(entity, ExampleEntity) and entity.id == pk for pk, entity in results.items())
+
+    async def test_get_many_by_pk__empty(self):
+        assert await self.dao.get_many_by_pk([]) == {}
+
+    async def test_get_many_by_pk__entity_cache(self):
+        class ExampleDAOSmallChunksCached(ExampleDAOSmallChunks):
+            __entity_cache__ = EntityCache(cache_misses=True)
+
+        dao = ExampleDAOSmallChunksCached(database=self.db)
+        assert set(await dao.get_many_by_pk([1, 2, 100])) == {1, 2}
+        assert set(await dao.get_many_by_pk([1, 2, 3, 100])) == {1, 2, 3}
+        stats = dao.__entity_cache__.stats
+        assert stats.hits == 3
+        assert stats.misses == 4
+
+    async def test_get_by_unique_key(self):
+        entity = await self.dao.get_by_unique_key(field="first_name", value="name_4")
+        assert entity
+        assert entity.id == 4
+        assert await self.dao.get_by_unique_key(field="first_name", value="unknown") is None
+
+    async def test_get_by_unique_key__value_of_another_type(self):
+        entity = await self.dao.get_by_unique_key(field="id", value="2")
+        assert entity
+        assert entity.id == 2
+
+    def _count_queries(self) -> list[str]:
+        statements = []
+        event.listen(
+            self.db.engine.sync_engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+        return statements
+
+    async def test_get_by_pk__coalesced(self):
+        dao = ExampleDAOCoalesced(database=self.db)
+        statements = self._count_queries()
+        pks = (1, 2, 3, 100, 2)
+        results = await asyncio.gather(*(ExampleDAOCoalesced(database=self.db).get_by_pk(pk) for pk in pks))
+        assert [entity.id if entity else None for entity in results] == [1, 2, 3, None, 2]
+        assert len(statements) == math.ceil(len(set(pks)) / ExampleDAOCoalesced.__default_in_chunk_size__)
+        statements.clear()
+        assert await dao.get_by_pk(5)
+        assert len(statements) == 1
+
+    async def test_get_by_unique_key__coalesced(self):
+        dao = ExampleDAOCoalesced(database=self.db)
+        statements = self._count_queries()
+        names = [f"name_{i}" for i in range(1, 8)]
+        results = await asyncio.gather(*(dao.get_by_unique_key(field="first_name", value=name) for name in names))
+        assert [entity.first_name for entity in results] == names
+        assert len(statements) == math.ceil(len(names) / ExampleDAOCoalesced.__default_in_chunk_size__)
+
+    async def test_get_by_pk__coalesced_keys_are_coerced(self):
+        dao = ExampleDAOCoalesced(database=self.db)
+        results = await asyncio.gather(dao.get_by_pk("5"), dao.get_by_pk(6), dao.get_by_pk("100"))
+        assert [entity.id if entity else None for entity in results] == [5, 6, None]
+
+    async def test_get_by_unique_key__coalesced_in_callers_context(self):
+        dao = ExampleDAOCoalesced(database=self.db)
+        ExampleDAOCoalesced.__metrics__ = MetricsCollector()
+        measurements: list[OperationMetrics] = []
+        ExampleDAOCoalesced.__metrics__.add_callback(measurements.append)
+        try:
+            await asyncio.gather(*(dao.get_by_unique_key(field="first_name", value=f"name_{i}") for i in (1, 2, 99)))
+        finally:
+            ExampleDAOCoalesced.__metrics__ = None
+        assert sorted(measurement.rows for measurement in measurements) == [0, 1, 1]
+
+    async def test_get_by_pk__coalesced_by_dao_with_own_arguments(self):
+        class ExampleDAOWithSuffix(ExampleDAOCoalesced):
+            def __init__(self, database: AsyncDatabase, suffix: str):
+                super().__init__(database)
+                self.suffix = suffix
+
+            def _dict_to_entity(self, dict_):
+                return super()._dict_to_entity({**dict_, "last_name": dict_["last_name"] + self.suffix})
+
+        dao = ExampleDAOWithSuffix(self.db, suffix="_loaded")
+        results = await asyncio.gather(dao.get_by_pk(1), dao.get_by_pk(2))
+        assert all(entity.last_name.endswith("_loaded") for entity in results)
+
+    async def test_coalescers_do_not_keep_database(self):
+        db = AsyncDatabase(db_url=ASYNC_DB_URL)
+        await db.connect()
+        assert await ExampleDAOCoalesced(database=db).get_by_pk(1)
+        await db.disconnect()
+        db_ref = weakref.ref(db)
+        del db
+        gc.collect()
+        assert db_ref() is None
+
+
+class AsyncDAOReadYourWritesTestCase(AsyncDAOTestCaseBase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        await self.db.disconnect()
+        self.db = AsyncDatabase(
+            db_url=ASYNC_DB_URL,
+            read_replica_url=ASYNC_DB_URL__SLAVE,
+            read_your_writes=ReadYourWritesConfig(window=60.0),
+        )
+        await self.db.connect()
+        self.dao = ExampleAsyncDAO(database=self.db)
+
+    async def test_reads_after_write_go_to_primary(self):
+        assert await self.dao.get_by_pk(1) is None
+        assert self.db.replica_stats()["replica_0"].queries == 1
+        await self.dao.create(data={"id": 1, "first_name": "John", "last_name": "Doe", "age": 20})
+        assert await self.dao.get_by_pk(1)
+        assert self.db.replica_stats()["replica_0"].queries == 1
+
+
+class AsyncDAOMetricsTestCase(AsyncDAOTestCaseBase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.dao.__metrics__ = MetricsCollector()
+        self.measurements: list[OperationMetrics] = []
+        self.dao.__metrics__.add_callback(self.measurements.append)
+
+    async def test_methods_are_measured(self):
+        await self.dao.bulk_create(
+            data=[{"id": id_, "first_name": "John", "last_name": "Doe", "age": 20} for id_ in (1, 2)]
+        )
+        assert await self.dao.get_by_pk(1)
+        assert len(await self.dao.all()) == 2
+        assert await self.dao.delete(specification={"id": 2})
+        assert [(item.dao, item.method, item.engine, item.rows, item.rows_converted) for item in self.measurements] == [
+            ("ExampleAsyncDAO", "bulk_create", "primary", 2, 0),
+            ("ExampleAsyncDAO", "get_by_pk", "primary", 1, 1),
+            ("ExampleAsyncDAO", "all", "primary", 2, 2),
+            ("ExampleAsyncDAO", "delete", "primary", 1, 0),
+        ]
+
+    async def test_stream_is_measured_once(self):
+        await self.dao.create(data={"id": 1, "first_name": "John", "last_name": "Doe", "age": 20})
+        assert len([entity async for entity in self.dao.stream()]) == 1
+        assert [(item.method, item.rows_converted) for item in self.measurements[1:]] == [("stream", 1)]
+
+    async def test_parallel_scan_is_measured_once(self):
+        await self.dao.bulk_create(
+            data=[{"id": id_, "first_name": "John", "last_name": "Doe", "age": 20} for id_ in (1, 2, 3)]
+        )
+        assert len([entity async for entity in self.dao.parallel_scan(partitions=3)]) == 3
+        assert [(item.method, item.rows_converted) for item in self.measurements[1:]] == [("parallel_scan", 3)]
+
+
+class AsyncDAOTracingTestCase(AsyncDAOTestCaseBase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.dao.__tracer__ = InMemoryTracer()
+
+    async def test_method_span(self):
+        await self.dao.create(data={"id": 1, "first_name": "John", "last_name": "Doe", "age": 20})
+        self.dao.__tracer__.clear()
+        assert len(await self.dao.all()) == 1
+        [span] = self.dao.__tracer__.root_spans
+        assert span.name == "ExampleAsyncDAO.all"
+        assert span.attributes["ash_dal.engine"] == "primary"
+        assert [child.name for child in span.children] == [
+            "ash_dal.checkout",
+            "ash_dal.execute",
+            "ash_dal.fetch",
+            "ash_dal.convert",
+        ]
+        assert all(item.end_time is not None and item.error is None for item in self.dao.__tracer__.spans)
+
+    async def test_stream_span(self):
+        await self.dao.create(data={"id": 1, "first_name": "John", "last_name": "Doe", "age": 20})
+        self.dao.__tracer__.clear()
+        assert len([entity async for entity in self.dao.stream()]) == 1
+        assert [span.name for span in self.dao.__tracer__.root_spans] == ["ExampleAsyncDAO.stream"]
+
+    async def test_tracing_listeners_are_added_by_traced_calls(self):
+        tracer = self.dao.__tracer__
+        self.dao.__tracer__ = None
+        await self.dao.all()
+        listeners = len(self.db.engine.sync_engine.dispatch.before_cursor_execute)
+        self.dao.__tracer__ = tracer
+        await self.dao.all()
+        await self.dao.all()
+        # Listeners recording the engine role and emitting execute spans, added once
+        assert len(self.db.engine.sync_engine.dispatch.before_cursor_execute) == listeners + 2
+
+
+class AsyncDAOStatementCacheTestCase(AsyncDAOTestCaseBase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.dao.__statement_cache__ = StatementCache()
+        await self.dao.bulk_create(
+            data=[
+                {"id": 1, "first_name": "John", "last_name": "Doe", "age": 20},
+                {"id": 2, "first_name": "Jane", "last_name": "Doe", "age": 30},
+            ]
+        )
+
+    async def test_statement_is_reused_for_specification_shape(self):
+        assert [entity.id for entity in await self.dao.filter(specification={"age": 20})] == [1]
+        assert [entity.id for entity in await self.dao.filter(specification={"age": 30})] == [2]
+        assert self.dao.__statement_cache__.stats.hits == 1
+
+    async def test_lookups_by_keys(self):
+        assert set(await self.dao.get_many_by_pk([1, 2, 3])) == {1, 2}
+        self.dao.__use_core_rows__ = True
+        assert (await self.dao.get_by_pk(2)).first_name == "Jane"
+
+    async def test_stream(self):
+        assert [entity.id async for entity in self.dao.stream(specification={"age": 30})] == [2]
+        assert [entity.id async for entity in self.dao.stream(specification={"age": 20})] == [1]
+
+    async def test_subclass_statements_are_not_shared(self):
+        class AdultsDAO(ExampleAsyncDAO):
+            def _build_select(self, load_options):
+                return super()._build_select(load_options).where(ExampleORMModel.age >= 25)
+
+        adults_dao = AdultsDAO(database=self.db)
+        adults_dao.__statement_cache__ = self.dao.__statement_cache__
+        assert len(await self.dao.filter(specification={"last_name": "Doe"})) == 2
+        assert [entity.id for entity in await adults_dao.filter(specification={"last_name": "Doe"})] == [2]
+        assert [entity.id for entity in await adults_dao.all()] == [2]
+
+    async def test_compiled_cache_stats(self):
+        db = AsyncDatabase(db_url=ASYNC_DB_URL, count_compiled_cache_lookups=True)
+        await db.connect()
+        self.addAsyncCleanup(db.disconnect)
+        dao = ExampleAsyncDAO(database=db)
+        await dao.filter(specification={"age": 20})
+        await dao.filter(specification={"age": 30})
+        assert db.compiled_cache_stats()["primary"].hits > 0
+
+    async def test_compiled_cache_lookups_are_not_counted_by_default(self):
+        await self.dao.filter(specification={"age": 20})
+        await self.dao.filter(specification={"age": 30})
+        assert self.db.compiled_cache_stats()["primary"].hits == 0
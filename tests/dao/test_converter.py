@@ -0,0 +1,109 @@
+from dataclasses import KW_ONLY, dataclass, field
+
+from ash_dal import BaseDAO, Database
+from ash_dal.dao.converter import get_entity_converter
+from sqlalchemy import select
+
+from tests.constants import SYNC_DB_URL
+from tests.dao.infrastructure import ExampleChildEntity, ExampleEntity, ExampleORMModel
+
+
+@dataclass
+class ReorderedEntity:
+    age: int
+    last_name: str
+    first_name: str
+    id: int
+    children: list[ExampleChildEntity] = field(default_factory=list)
+
+
+@dataclass(kw_only=True)
+class KwOnlyDataclassEntity:
+    id: int
+    first_name: str
+    last_name: str
+    age: int
+    children: list[ExampleChildEntity] = field(default_factory=list)
+
+
+@dataclass
+class PartlyKwOnlyEntity:
+    id: int
+    first_name: str
+    _: KW_ONLY
+    age: int
+    last_name: str
+    children: list[ExampleChildEntity] = field(default_factory=list)
+
+
+class KeywordOnlyEntity:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+
+def _build_record() -> ExampleORMModel:
+    return ExampleORMModel(id=1, first_name="John", last_name="Doe", age=42, children=[])
+
+
+def test_converter__is_built_once_per_pair():
+    assert get_entity_converter(ExampleORMModel, ExampleEntity) is get_entity_converter(ExampleORMModel, ExampleEntity)
+    assert get_entity_converter(ExampleORMModel, ExampleEntity) is not get_entity_converter(
+        ExampleORMModel, ReorderedEntity
+    )
+
+
+def test_converter__keys():
+    converter = get_entity_converter(ExampleORMModel, ExampleEntity)
+    assert set(converter.attribute_keys) == {"id", "first_name", "last_name", "age", "children"}
+    assert converter.column_keys == ("id", "first_name", "last_name", "age")
+
+
+def test_converter__instance_to_entity():
+    for entity_class in (ExampleEntity, ReorderedEntity, KwOnlyDataclassEntity, PartlyKwOnlyEntity):
+        entity = get_entity_converter(ExampleORMModel, entity_class).instance_to_entity(_build_record())
+        assert entity == entity_class(id=1, first_name="John", last_name="Doe", age=42, children=[])
+
+
+def test_converter__kw_only_fields_are_passed_as_keywords():
+    for entity_class in (KwOnlyDataclassEntity, PartlyKwOnlyEntity):
+        converter = get_entity_converter(ExampleORMModel, entity_class)
+        row = tuple(
+            {"id": 1, "first_name": "John", "last_name": "Doe", "age": 42}[key] for key in converter.column_keys
+        )
+        assert converter.row_to_entity(row) == entity_class(id=1, first_name="John", last_name="Doe", age=42)
+
+
+def test_converter__keyword_arguments():
+    entity = get_entity_converter(ExampleORMModel, KeywordOnlyEntity).instance_to_entity(_build_record())
+    assert entity.kwargs == {"id": 1, "first_name": "John", "last_name": "Doe", "age": 42, "children": []}
+
+
+def test_converter__row_to_entity():
+    database = Database(db_url=SYNC_DB_URL)
+    database.connect()
+    ExampleORMModel.metadata.drop_all(database.engine)
+    ExampleORMModel.metadata.create_all(database.engine)
+    converter = get_entity_converter(ExampleORMModel, ReorderedEntity)
+    with database.session as session:
+        record = _build_record()
+        session.add(record)
+        session.commit()
+        session.expire(record)
+        assert converter.instance_to_entity(record) == ReorderedEntity(id=1, first_name="John", last_name="Doe", age=42)
+        row = session.execute(select(*(getattr(ExampleORMModel, key) for key in converter.column_keys))).one()
+    database.disconnect()
+    assert converter.row_to_entity(row) == ReorderedEntity(id=1, first_name="John", last_name="Doe", age=42)
+    assert converter.row_to_dict(row) == {"id": 1, "first_name": "John", "last_name": "Doe", "age": 42}
+
+
+def test_converter__overridden_dict_to_entity_is_used():
+    class ExampleDAO(BaseDAO[ExampleEntity]):
+        __entity__ = ExampleEntity
+        __model__ = ExampleORMModel
+
+        def _dict_to_entity(self, dict_):
+            return self.__entity__(**{**dict_, "first_name": dict_["first_name"].upper()})
+
+    dao = ExampleDAO(database=Database(db_url=SYNC_DB_URL))
+    assert dao._convert_db_item_in_entity(_build_record()).first_name == "JOHN"
+    assert dao._get_entities_from_db_items([_build_record()])[0].first_name == "JOHN"
@@ -0,0 +1,45 @@
+from ash_dal import BaseDAO
+from ash_dal.utils.bulk_insert import BulkInsertMode
+from parameterized import parameterized
+from sqlalchemy.dialects import mysql, sqlite
+
+from tests.dao.infrastructure import ExampleChildEntity, ExampleEntity, ExampleORMModel, ExampleORMModelChild
+
+
+class ExampleDAO(BaseDAO[ExampleEntity]):
+    __entity__ = ExampleEntity
+    __model__ = ExampleORMModel
+
+
+class ExampleChildDAO(BaseDAO[ExampleChildEntity]):
+    __entity__ = ExampleChildEntity
+    __model__ = ExampleORMModelChild
+
+
+ROW = {"first_name": "John", "last_name": "Doe", "age": 42}
+
+
+@parameterized.expand(
+    (
+        (sqlite.dialect(), [ROW, ROW], BulkInsertMode.RETURNING),
+        (mysql.dialect(), [ROW, ROW], BulkInsertMode.LAST_INSERT_ID),
+        (mysql.dialect(), [{**ROW, "id": 1}, {**ROW, "id": 2}], BulkInsertMode.PASSED_KEYS),
+        (mysql.dialect(), [{**ROW, "id": 1}, ROW], BulkInsertMode.PER_ROW),
+        (mysql.dialect(), [{"first_name": "John", "last_name": "Doe"}, ROW], BulkInsertMode.PER_ROW),
+        (mysql.dialect(), [ROW, {"first_name": "John", "last_name": "Doe"}], BulkInsertMode.PER_ROW),
+    )
+)
+def test_bulk_insert_mode(dialect, rows, expected):
+    dao = ExampleDAO.__new__(ExampleDAO)
+    assert dao._bulk_insert_mode(dialect, rows) is expected
+
+
+def test_auto_increment_key():
+    assert ExampleDAO.__new__(ExampleDAO)._auto_increment_key == "id"
+    assert ExampleChildDAO.__new__(ExampleChildDAO)._auto_increment_key == "id"
+
+
+def test_created_entities():
+    dao = ExampleDAO.__new__(ExampleDAO)
+    entities = dao._created_entities([ROW, ROW], [(1,), (2,)])
+    assert entities == [ExampleEntity(id=1, **ROW), ExampleEntity(id=2, **ROW)]
@@ -2,15 +2,33 @@ import math
 import random
 from collections import Counter
 from unittest import TestCase
+from unittest.mock import patch
 
 import pytest
-from ash_dal import BaseDAO, Database, DeferredJoinPaginator, PaginatorPage
-from ash_dal.utils import DeferredJoinPaginatorFactory
+from ash_dal import BaseDAO, CursorPage, Database, DeferredJoinPaginator, KeysetPaginator, PaginatorPage
+from ash_dal.database import ReadYourWritesConfig
+from ash_dal.exceptions.paginator import PaginationError
+from ash_dal.utils import (
+    BulkProgress,
+    DeferredJoinPaginatorFactory,
+    EntityCache,
+    InMemoryTracer,
+    KeysetPaginatorFactory,
+    MetricsCollector,
+    OperationMetrics,
+    ScanBoundaries,
+    StatementCache,
+    UpsertResult,
+)
+from ash_dal.utils.bulk_insert import BulkInsertMode
+from ash_dal.utils.instrumentation import instrument
+from ash_dal.utils.metrics import ENGINE_NONE, ENGINE_PRIMARY
 from faker import Faker
-from sqlalchemy import select
-from sqlalchemy.orm import joinedload
+from parameterized import parameterized
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import joinedload, selectinload
 
-from tests.constants import SYNC_DB_URL
+from tests.constants import SYNC_DB_URL, SYNC_DB_URL__SLAVE
 from tests.dao.infrastructure import ExampleEntity, ExampleORMModel
 
 
@@ -18,6 +36,7 @@ class ExampleDAO(BaseDAO[ExampleEntity]):
     __entity__ = ExampleEntity
     __model__ = ExampleORMModel
     __default_load_options__ = (joinedload(ExampleORMModel.children),)
+    __stream_load_options__ = (selectinload(ExampleORMModel.children),)
 
 
 class ExampleDAOCustomPaginator(ExampleDAO):
@@ -27,6 +46,25 @@ class ExampleDAOCustomPaginator(ExampleDAO):
     )
 
 
+class ExampleDAOKeysetPaginator(ExampleDAO):
+    __paginator_factory__ = KeysetPaginatorFactory[KeysetPaginator](
+        paginator_class=KeysetPaginator,
+        key_fields=(ExampleORMModel.id,),
+    )
+
+
+class ExampleDAOCoreRows(ExampleDAO):
+    __use_core_rows__ = True
+
+
+class ExampleDAOCached(ExampleDAO):
+    __entity_cache__ = EntityCache(cache_misses=True)
+
+
+class ExampleDAOSmallChunks(ExampleDAO):
+    __default_in_chunk_size__ = 3
+
+
 class SyncDAOTestCaseBase(TestCase):
     def setUp(self) -> None:
         self.faker = Faker()
@@ -102,6 +140,49 @@ class SyncDAOFetchAllTestCase(SyncDAOFetchingTestCaseBase):
         assert len(results) == self.records_count
         assert isinstance(results[0], ExampleEntity)
 
+    def test_stream(self):
+        results = [entity for entity in self.dao.stream(batch_size=7)]
+        assert len(results) == self.records_count
+        assert isinstance(results[0], ExampleEntity)
+        assert sorted(entity.id for entity in results) == list(range(1, self.records_count + 1))
+
+    def test_stream_batches(self):
+        batch_size = self.faker.pyint(min_value=2, max_value=20)
+        batches = [batch for batch in self.dao.stream_batches(batch_size=batch_size)]
+        assert len(batches) == math.ceil(self.records_count / batch_size)
+        assert all(len(batch) == batch_size for batch in batches[:-1])
+        assert sum(len(batch) for batch in batches) == self.records_count
+        assert isinstance(batches[0], tuple)
+        assert isinstance(batches[0][0], ExampleEntity)
+
+    def test_parallel_scan(self):
+        results = [entity for entity in self.dao.parallel_scan(partitions=4, concurrency=2, batch_size=7)]
+        assert isinstance(results[0], ExampleEntity)
+        assert sorted(entity.id for entity in results) == list(range(1, self.records_count + 1))
+
+    @parameterized.expand([(ScanBoundaries.MIN_MAX,), (ScanBoundaries.SAMPLED,)])
+    def test_parallel_scan__ordered(self, boundaries: ScanBoundaries):
+        results = self.dao.parallel_scan(partitions=3, batch_size=5, ordered=True, boundaries=boundaries)
+        assert [entity.id for entity in results] == list(range(1, self.records_count + 1))
+
+    def test_parallel_scan_batches(self):
+        batch_size = self.faker.pyint(min_value=2, max_value=20)
+        batches = list(self.dao.parallel_scan_batches(partitions=5, batch_size=batch_size))
+        assert all(isinstance(batch, tuple) and 0 < len(batch) <= batch_size for batch in batches)
+        assert sum(len(batch) for batch in batches) == self.records_count
+
+    def test_parallel_scan__early_exit(self):
+        batches = self.dao.parallel_scan_batches(partitions=4, batch_size=2)
+        assert len(next(batches)) == 2
+        batches.close()
+        assert self.db.engine.pool.checkedout() == 0  # pyright: ignore [reportGeneralTypeIssues]
+
+    def test_parallel_scan__invalid_arguments(self):
+        with pytest.raises(ValueError):
+            list(self.dao.parallel_scan(partitions=0))
+        with pytest.raises(ValueError):
+            list(self.dao.parallel_scan(concurrency=0))
+
     def test_get_page__default_page_size(self):
         results = self.dao.get_page()
         assert results
@@ -198,6 +279,18 @@ class SyncDAOFetchFilteredTestCase(SyncDAOFetchingTestCaseBase):
         assert not results
         assert isinstance(results, tuple)
 
+    def test_stream_filtered(self):
+        results = [entity for entity in self.dao.stream(specification={"age": 30}, batch_size=5)]
+        assert len(results) == self.records_counter["30"]
+        assert all(entity.age == 30 for entity in results)
+
+    def test_parallel_scan_filtered(self):
+        results = list(
+            self.dao.parallel_scan(specification={"age": 30}, partitions=3, boundaries=ScanBoundaries.SAMPLED)
+        )
+        assert len(results) == self.records_counter["30"]
+        assert all(entity.age == 30 for entity in results)
+
     def test_paginate_filtered(self):
         page_size = 3
         pages_count = math.ceil(self.records_counter["30"] / page_size)
@@ -221,6 +314,52 @@ class SyncDAOCustomPaginatorUseCase(SyncDAOFetchAllTestCase):
         self.dao = ExampleDAOCustomPaginator(database=self.db)
 
 
+class SyncDAOKeysetPaginatorUseCase(SyncDAOFetchAllTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.dao = ExampleDAOKeysetPaginator(database=self.db)
+
+    def test_get_page_after(self):
+        page_size = 10
+        page = self.dao.get_page(page_size=page_size)
+        ids = [entity.id for entity in page]
+        while page.next_cursor:
+            page = self.dao.get_page_after(cursor=page.next_cursor, page_size=page_size)
+            assert isinstance(page, CursorPage)
+            assert page.pages_count is None
+            assert all(isinstance(entity, ExampleEntity) for entity in page)
+            ids.extend(entity.id for entity in page)
+        assert ids == list(range(1, self.records_count + 1))
+
+    def test_get_page_after__specification_passed(self):
+        page = self.dao.get_page(page_size=1, specification={"id": 1})
+        assert len(page) == 1
+        assert page.next_cursor is None
+
+    def test_get_page_after__not_supported_paginator(self):
+        page = self.dao.get_page(page_size=10)
+        with pytest.raises(PaginationError):
+            ExampleDAO(database=self.db).get_page_after(cursor=page.next_cursor)
+
+
+class SyncDAOCoreRowsGetOneRecordUseCase(SyncDAOGetOneRecordTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.dao = ExampleDAOCoreRows(database=self.db)
+
+
+class SyncDAOCoreRowsFetchAllUseCase(SyncDAOFetchAllTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.dao = ExampleDAOCoreRows(database=self.db)
+
+
+class SyncDAOCoreRowsFetchFilteredUseCase(SyncDAOFetchFilteredTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.dao = ExampleDAOCoreRows(database=self.db)
+
+
 class SyncDAOCreateTestCase(SyncDAOTestCaseBase):
     def test_create(self):
         data = {
@@ -249,6 +388,132 @@ class SyncDAOCreateTestCase(SyncDAOTestCaseBase):
             results = session.execute(select(ExampleORMModel)).all()
             assert len(results) == items_count
 
+    def _generate_data(self):
+        return {
+            "first_name": self.faker.first_name(),
+            "last_name": self.faker.last_name(),
+            "age": self.faker.pyint(min_value=10, max_value=100),
+        }
+
+    def test_bulk_create__iterator(self):
+        progress: list[BulkProgress] = []
+        data = (self._generate_data() for _ in range(7))
+        self.dao.bulk_create(data=data, chunk_size=3, progress_callback=progress.append)
+        assert [(item.rows, item.chunks) for item in progress] == [(3, 1), (6, 2), (7, 3)]
+        assert all(item.elapsed >= 0 and item.rows_per_second >= 0 for item in progress)
+        assert len(self.dao.all()) == 7
+
+    def test_bulk_create__chunk_bytes(self):
+        progress: list[BulkProgress] = []
+        self.dao.bulk_create(
+            data=[self._generate_data() for _ in range(4)], chunk_bytes=1, progress_callback=progress.append
+        )
+        assert progress[-1].chunks == 4
+        assert len(self.dao.all()) == 4
+
+    @parameterized.expand([(True, 3), (False, 1)])
+    def test_bulk_create__commits(self, commit_per_chunk: bool, expected_commits: int):
+        commits: list[None] = []
+
+        def on_commit(*_):
+            commits.append(None)
+
+        event.listen(self.db.engine, "commit", on_commit)
+        try:
+            self.dao.bulk_create(
+                data=(self._generate_data() for _ in range(7)), chunk_size=3, commit_per_chunk=commit_per_chunk
+            )
+        finally:
+            event.remove(self.db.engine, "commit", on_commit)
+        assert len(commits) == expected_commits
+        assert len(self.dao.all()) == 7
+
+    @parameterized.expand([(True, 3), (False, 0)])
+    def test_bulk_create__error(self, commit_per_chunk: bool, expected_count: int):
+        def generate_data():
+            for _ in range(4):
+                yield self._generate_data()
+            raise RuntimeError()
+
+        with pytest.raises(RuntimeError):
+            self.dao.bulk_create(data=generate_data(), chunk_size=3, commit_per_chunk=commit_per_chunk)
+        assert len(self.dao.all()) == expected_count
+
+    def test_bulk_create__return_entities(self):
+        data = [self._generate_data() for _ in range(5)]
+        entities = self.dao.bulk_create(data=data, chunk_size=2, return_entities=True)
+        assert [{**entity.__dict__} for entity in entities] == [
+            {**row, "id": entity.id, "children": []} for row, entity in zip(data, entities)
+        ]
+        assert entities == list(self.dao.all())
+
+    def test_bulk_create__return_entities_with_passed_keys(self):
+        data = [{**self._generate_data(), "id": id_} for id_ in (10, 20)]
+        entities = self.dao.bulk_create(data=data, return_entities=True)
+        assert [entity.id for entity in entities] == [10, 20]
+
+    def test_bulk_create__return_entities_per_row(self):
+        data = [self._generate_data() for _ in range(3)]
+        with patch.object(self.dao, "_bulk_insert_mode", return_value=BulkInsertMode.PER_ROW):
+            entities = self.dao.bulk_create(data=data, return_entities=True)
+        assert entities == list(self.dao.all())
+
+    def test_bulk_create__returns_none(self):
+        assert self.dao.bulk_create(data=[self._generate_data()]) is None
+
+
+class SyncDAOBulkUpsertTestCase(SyncDAOTestCaseBase):
+    def _generate_data(self, id_: int, age: int = 20):
+        return {"id": id_, "first_name": f"name_{id_}", "last_name": self.faker.last_name(), "age": age}
+
+    def test_bulk_upsert(self):
+        result = self.dao.bulk_upsert(data=[self._generate_data(id_=i) for i in range(1, 6)])
+        assert result == UpsertResult(inserted=5, updated=0)
+        result = self.dao.bulk_upsert(data=[self._generate_data(id_=i, age=30) for i in range(4, 11)])
+        assert result == UpsertResult(inserted=5, updated=2)
+        entities = self.dao.all()
+        assert [entity.age for entity in entities] == [20] * 3 + [30] * 7
+
+    def test_bulk_upsert__chunks(self):
+        dao = ExampleDAOSmallChunks(database=self.db)
+        dao.bulk_upsert(data=[self._generate_data(id_=i) for i in range(1, 4)])
+        result = dao.bulk_upsert(data=[self._generate_data(id_=i, age=30) for i in range(1, 9)])
+        assert result == UpsertResult(inserted=5, updated=3)
+        assert len(dao.all()) == 8
+
+    def test_bulk_upsert__update_fields(self):
+        self.dao.bulk_upsert(data=[self._generate_data(id_=1)])
+        data = {**self._generate_data(id_=1, age=30), "first_name": "Changed"}
+        self.dao.bulk_upsert(data=[data], update_fields=["age"])
+        entity = self.dao.get_by_pk(1)
+        assert entity
+        assert entity.age == 30
+        assert entity.first_name == "name_1"
+
+    def test_bulk_upsert__repeated_conflict_key(self):
+        data = [self._generate_data(id_=900), self._generate_data(id_=1), self._generate_data(id_=900, age=30)]
+        result = self.dao.bulk_upsert(data=data)
+        assert result == UpsertResult(inserted=2, updated=0)
+        entity = self.dao.get_by_pk(900)
+        assert entity
+        assert entity.age == 30
+        assert len(self.dao.all()) == 2
+
+    def test_bulk_upsert__empty(self):
+        assert self.dao.bulk_upsert(data=[]) == UpsertResult()
+
+    def test_bulk_upsert__no_update_fields(self):
+        with pytest.raises(ValueError):
+            self.dao.bulk_upsert(data=[{"id": 1}])
+
+    def test_bulk_upsert__invalidates_entity_cache(self):
+        ExampleDAOCached.__entity_cache__ = EntityCache()
+        dao = ExampleDAOCached(database=self.db)
+        dao.bulk_upsert(data=[self._generate_data(id_=1)])
+        assert (dao.get_by_pk(1)).age == 20
+        dao.bulk_upsert(data=[self._generate_data(id_=1, age=30)])
+        assert (dao.get_by_pk(1)).age == 30
+
 
 class SyncDAOUpdateTestCase(SyncDAOTestCaseBase):
     def _create_record(self):
@@ -284,6 +549,113 @@ class SyncDAOUpdateTestCase(SyncDAOTestCaseBase):
         with pytest.raises(ValueError):
             self.dao.update(specification={}, update_data={})
 
+    def _create_records(self, count: int):
+        self.dao.bulk_create(
+            data=[
+                {"id": id_, "first_name": f"name_{id_}", "last_name": "Doe", "age": 20} for id_ in range(1, count + 1)
+            ]
+        )
+
+    def test_bulk_update(self):
+        self._create_records(count=6)
+        rows = [{"id": id_, "age": 20 + id_, "last_name": f"last_{id_}"} for id_ in range(1, 6)]
+        rowcounts = self.dao.bulk_update(rows=iter(rows), chunk_size=2)
+        assert rowcounts == [2, 2, 1]
+        entities = self.dao.all()
+        assert [(entity.age, entity.last_name) for entity in entities] == [
+            *((20 + id_, f"last_{id_}") for id_ in range(1, 6)),
+            (20, "Doe"),
+        ]
+
+    def test_bulk_update__rows_with_different_fields(self):
+        self._create_records(count=2)
+        self.dao.bulk_update(rows=[{"id": 1, "age": 30}, {"id": 2, "first_name": "Changed"}])
+        entities = self.dao.all()
+        assert [(entity.first_name, entity.age) for entity in entities] == [("name_1", 30), ("Changed", 20)]
+
+    def test_bulk_update__key_fields(self):
+        self._create_records(count=3)
+        rowcounts = self.dao.bulk_update(
+            rows=[{"first_name": "name_2", "age": 50}, {"first_name": "missing", "age": 60}], key_fields=["first_name"]
+        )
+        assert rowcounts == [1]
+        assert [entity.age for entity in self.dao.all()] == [20, 50, 20]
+
+    @parameterized.expand([([{"age": 30}],), ([{"id": 1}],)])
+    def test_bulk_update__invalid_rows(self, rows):
+        with pytest.raises(ValueError):
+            self.dao.bulk_update(rows=rows)
+
+    def test_bulk_update__invalidates_entity_cache(self):
+        ExampleDAOCached.__entity_cache__ = EntityCache()
+        dao = ExampleDAOCached(database=self.db)
+        self._create_records(count=2)
+        assert (dao.get_by_pk(1)).age == 20
+        dao.bulk_update(rows=[{"id": 1, "age": 30}])
+        assert (dao.get_by_pk(1)).age == 30
+
+
+class SyncDAOTransactionTestCase(SyncDAOTestCaseBase):
+    def _generate_data(self, id_: int):
+        return {"id": id_, "first_name": f"name_{id_}", "last_name": "Doe", "age": 20}
+
+    def test_transaction__commits_once(self):
+        commits: list[None] = []
+
+        def on_commit(*_):
+            commits.append(None)
+
+        event.listen(self.db.engine, "commit", on_commit)
+        try:
+            with self.db.transaction():
+                self.dao.create(data=self._generate_data(id_=1))
+                self.dao.bulk_create(data=[self._generate_data(id_=2), self._generate_data(id_=3)])
+                self.dao.update(specification={"id": 1}, update_data={"age": 30})
+                self.dao.delete(specification={"id": 3})
+                # Reads see changes of the transaction
+                entity = self.dao.get_by_pk(1)
+                assert entity
+                assert entity.age == 30
+                assert commits == []
+        finally:
+            event.remove(self.db.engine, "commit", on_commit)
+        assert len(commits) == 1
+        assert [entity.id for entity in self.dao.all()] == [1, 2]
+
+    def test_transaction__rollback(self):
+        with pytest.raises(RuntimeError):
+            with self.db.transaction():
+                self.dao.create(data=self._generate_data(id_=1))
+                raise RuntimeError()
+        assert self.dao.all() == ()
+
+    def test_transaction__nested_scope_is_rolled_back_alone(self):
+        with self.db.transaction():
+            self.dao.create(data=self._generate_data(id_=1))
+            with pytest.raises(RuntimeError):
+                with self.db.transaction():
+                    self.dao.create(data=self._generate_data(id_=2))
+                    raise RuntimeError()
+        assert [entity.id for entity in self.dao.all()] == [1]
+
+    def test_transaction__parallel_scan_sees_changes(self):
+        with self.db.transaction():
+            self.dao.bulk_create(data=[self._generate_data(id_=i) for i in range(1, 11)])
+            results = self.dao.parallel_scan(partitions=3, concurrency=3, ordered=True)
+            assert [entity.id for entity in results] == list(range(1, 11))
+
+    def test_transaction__entity_cache_is_bypassed(self):
+        ExampleDAOCached.__entity_cache__ = EntityCache()
+        dao = ExampleDAOCached(database=self.db)
+        dao.create(data=self._generate_data(id_=1))
+        assert (dao.get_by_pk(1)).age == 20
+        with pytest.raises(RuntimeError):
+            with self.db.transaction():
+                dao.update(specification={"id": 1}, update_data={"age": 30})
+                assert (dao.get_by_pk(1)).age == 30
+                raise RuntimeError()
+        assert (dao.get_by_pk(1)).age == 20
+
 
 class SyncDAODeleteTestCase(SyncDAOTestCaseBase):
     def _create_record(self):
@@ -310,3 +682,316 @@ class SyncDAODeleteTestCase(SyncDAOTestCaseBase):
     def test_delete__empty_specification(self):
         with pytest.raises(ValueError):
             self.dao.delete(specification={})
+
+
+class SyncDAOEntityCacheTestCase(SyncDAOTestCaseBase):
+    def setUp(self) -> None:
+        super().setUp()
+        ExampleDAOCached.__entity_cache__ = EntityCache(cache_misses=True)
+        self.dao = ExampleDAOCached(database=self.db)
+
+    def _generate_data(self, **data):
+        return {
+            "first_name": self.faker.first_name(),
+            "last_name": self.faker.last_name(),
+            "age": self.faker.pyint(min_value=10, max_value=100),
+            **data,
+        }
+
+    def _rename_bypassing_dao(self, pk: int, first_name: str):
+        with self.db.session as session:
+            session.execute(update(ExampleORMModel).filter_by(id=pk).values(first_name=first_name))
+            session.commit()
+
+    def test_get_by_pk__is_cached(self):
+        entity = self.dao.create(data=self._generate_data())
+        assert self.dao.get_by_pk(entity.id) == entity
+        self._rename_bypassing_dao(pk=entity.id, first_name="Changed")
+        assert self.dao.get_by_pk(entity.id) == entity
+        stats = self.dao.__entity_cache__.stats
+        assert stats.hits == 1
+        assert stats.misses == 1
+
+    def test_get_by_pk__miss_is_cached_until_create(self):
+        assert self.dao.get_by_pk(100) is None
+        assert self.dao.get_by_pk(100) is None
+        assert self.dao.__entity_cache__.stats.hits == 1
+        entity = self.dao.create(data=self._generate_data(id=100))
+        assert self.dao.get_by_pk(100) == entity
+
+    def test_get_by_pk__miss_is_cached_until_bulk_create(self):
+        assert self.dao.get_by_pk(100) is None
+        self.dao.bulk_create(data=(self._generate_data(id=100),))
+        assert self.dao.get_by_pk(100)
+
+    @parameterized.expand(((True,), (False,)))
+    def test_get_by_pk__update_invalidates_cache(self, by_pk: bool):
+        entity = self.dao.create(data=self._generate_data(age=50))
+        self.dao.get_by_pk(entity.id)
+        specification = {"id": entity.id} if by_pk else {"age": 50}
+        self.dao.update(specification=specification, update_data={"first_name": "Changed"})
+        result = self.dao.get_by_pk(entity.id)
+        assert result
+        assert result.first_name == "Changed"
+
+    def test_update__keeps_entries_of_other_daos(self):
+        entity = self.dao.create(data=self._generate_data(age=50))
+        cache = self.dao.__entity_cache__
+        cache.set(("OtherDAO", 1), "other_entity")
+        self.dao.get_by_pk(entity.id)
+        self.dao.update(specification={"age": 50}, update_data={"first_name": "Changed"})
+        assert cache.get(("OtherDAO", 1)) == (True, "other_entity")
+        assert self.dao.get_by_pk(entity.id).first_name == "Changed"
+
+    def test_get_by_pk__delete_invalidates_cache(self):
+        entity = self.dao.create(data=self._generate_data())
+        self.dao.get_by_pk(entity.id)
+        self.dao.delete(specification={"id": entity.id})
+        assert self.dao.get_by_pk(entity.id) is None
+
+
+class SyncDAOBatchedLookupTestCase(SyncDAOFetchingTestCaseBase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.records_count = 10
+        self.dao = ExampleDAOSmallChunks(database=self.db)
+        records = tuple(self._generate_record(id_=i, first_name=f"name_{i}") for i in range(1, self.records_count + 1))
+        with self.db.session as session:
+            session.add_all(records)
+            session.commit()
+
+    def test_get_many_by_pk(self):
+        pks = [1, 2, 3, 5, 8, 8, 100]
+        results = self.dao.get_many_by_pk(pks)
+        assert set(results) == {1, 2, 3, 5, 8}
+        assert all(isinstance(entity, ExampleEntity) and entity.id == pk for pk, entity in results.items())
+
+    def test_get_many_by_pk__empty(self):
+        assert self.dao.get_many_by_pk([]) == {}
+
+    def test_get_many_by_pk__entity_cache(self):
+        class ExampleDAOSmallChunksCached(ExampleDAOSmallChunks):
+            __entity_cache__ = EntityCache(cache_misses=True)
+
+        dao = ExampleDAOSmallChunksCached(database=self.db)
+        assert set(dao.get_many_by_pk([1, 2, 100])) == {1, 2}
+        assert set(dao.get_many_by_pk([1, 2, 3, 100])) == {1, 2, 3}
+        stats = dao.__entity_cache__.stats
+        assert stats.hits == 3
+        assert stats.misses == 4
+
+    def test_get_by_unique_key(self):
+        entity = self.dao.get_by_unique_key(field="first_name", value="name_4")
+        assert entity
+        assert entity.id == 4
+        assert self.dao.get_by_unique_key(field="first_name", value="unknown") is None
+
+    def test_get_by_unique_key__value_of_another_type(self):
+        entity = self.dao.get_by_unique_key(field="id", value="2")
+        assert entity
+        assert entity.id == 2
+
+
+class SyncDAOReadYourWritesTestCase(SyncDAOTestCaseBase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.db.disconnect()
+        self.db = Database(
+            db_url=SYNC_DB_URL,
+            read_replica_url=SYNC_DB_URL__SLAVE,
+            read_your_writes=ReadYourWritesConfig(window=60.0),
+        )
+        self.db.connect()
+        self.dao = ExampleDAO(database=self.db)
+
+    def test_reads_after_write_go_to_primary(self):
+        assert self.dao.get_by_pk(1) is None
+        assert self.db.replica_stats()["replica_0"].queries == 1
+        self.dao.create(data={"id": 1, "first_name": "John", "last_name": "Doe", "age": 20})
+        assert self.dao.get_by_pk(1)
+        assert self.db.replica_stats()["replica_0"].queries == 1
+
+
+class SyncDAOMetricsTestCase(SyncDAOTestCaseBase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.dao.__metrics__ = MetricsCollector()
+        self.measurements: list[OperationMetrics] = []
+        self.dao.__metrics__.add_callback(self.measurements.append)
+
+    def test_methods_are_measured(self):
+        self.dao.bulk_create(data=[{"id": id_, "first_name": "John", "last_name": "Doe", "age": 20} for id_ in (1, 2)])
+        assert self.dao.get_by_pk(1)
+        assert len(self.dao.all()) == 2
+        assert self.dao.delete(specification={"id": 2})
+        assert [(item.dao, item.method, item.engine, item.rows, item.rows_converted) for item in self.measurements] == [
+            ("ExampleDAO", "bulk_create", "primary", 2, 0),
+            ("ExampleDAO", "get_by_pk", "primary", 1, 1),
+            ("ExampleDAO", "all", "primary", 2, 2),
+            ("ExampleDAO", "delete", "primary", 1, 0),
+        ]
+        assert all(not item.error and item.duration > 0 for item in self.measurements)
+        assert 'ash_dal_operation_rows_total{dao="ExampleDAO",method="all",engine="primary"} 2' in (
+            self.dao.__metrics__.render_prometheus()
+        )
+
+    def test_engine_is_recorded_by_executed_statements(self):
+        class BindingDAO(ExampleDAO):
+            @instrument()
+            def bind(self, execute: bool) -> None:
+                with self.db.session as session:
+                    session.get_bind(clause=select(ExampleORMModel))
+                    if execute:
+                        session.execute(select(ExampleORMModel))
+
+        dao = BindingDAO(database=self.db)
+        dao.__metrics__ = self.dao.__metrics__
+        dao.bind(execute=False)
+        dao.bind(execute=True)
+        assert [item.engine for item in self.measurements] == [ENGINE_NONE, ENGINE_PRIMARY]
+
+    def test_paginator_is_measured(self):
+        self.dao.create(data={"id": 1, "first_name": "John", "last_name": "Doe", "age": 20})
+        self.dao.get_page(page_index=1)
+        # `size` is measured as a part of the paginator's `get_page`
+        assert [(item.dao, item.method) for item in self.measurements[1:]] == [
+            ("Paginator", "get_page"),
+            ("ExampleDAO", "get_page"),
+        ]
+
+    def test_stream_is_measured_once(self):
+        self.dao.create(data={"id": 1, "first_name": "John", "last_name": "Doe", "age": 20})
+        assert len(list(self.dao.stream())) == 1
+        assert [(item.method, item.rows_converted) for item in self.measurements[1:]] == [("stream", 1)]
+
+    def test_parallel_scan_is_measured_once(self):
+        self.dao.bulk_create(
+            data=[{"id": id_, "first_name": "John", "last_name": "Doe", "age": 20} for id_ in (1, 2, 3)]
+        )
+        assert len(list(self.dao.parallel_scan(partitions=3))) == 3
+        assert [(item.method, item.rows_converted) for item in self.measurements[1:]] == [("parallel_scan", 3)]
+
+
+class SyncDAOTracingTestCase(SyncDAOTestCaseBase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.dao.__tracer__ = InMemoryTracer()
+
+    def test_method_span(self):
+        self.dao.create(data={"id": 1, "first_name": "John", "last_name": "Doe", "age": 20})
+        self.dao.__tracer__.clear()
+        assert len(self.dao.all()) == 1
+        [span] = self.dao.__tracer__.root_spans
+        assert span.name == "ExampleDAO.all"
+        assert span.attributes == {"ash_dal.dao": "ExampleDAO", "ash_dal.method": "all", "ash_dal.engine": "primary"}
+        assert [child.name for child in span.children] == [
+            "ash_dal.checkout",
+            "ash_dal.execute",
+            "ash_dal.fetch",
+            "ash_dal.convert",
+        ]
+        assert "SELECT" in span.children[1].attributes["db.statement"]
+        assert span.children[3].attributes["ash_dal.rows"] == 1
+        assert all(item.end_time is not None and item.error is None for item in self.dao.__tracer__.spans)
+
+    def test_paginator_span_is_child_of_dao_span(self):
+        self.dao.create(data={"id": 1, "first_name": "John", "last_name": "Doe", "age": 20})
+        self.dao.__tracer__.clear()
+        self.dao.get_page(page_index=1)
+        [span] = self.dao.__tracer__.root_spans
+        assert span.name == "ExampleDAO.get_page"
+        assert "Paginator.get_page" in [child.name for child in span.children]
+
+    def test_error_is_recorded(self):
+        with pytest.raises(Exception):
+            self.dao.create(data={"id": 1, "unknown_column": "John"})
+        [span] = self.dao.__tracer__.root_spans
+        assert span.error is not None
+
+    def test_untraced_dao(self):
+        self.dao.__tracer__ = None
+        assert self.dao.all() == ()
+
+    def test_tracing_listeners_are_added_by_traced_calls(self):
+        tracer = self.dao.__tracer__
+        self.dao.__tracer__ = None
+        self.dao.all()
+        listeners = len(self.db.engine.dispatch.before_cursor_execute)
+        self.dao.__tracer__ = tracer
+        self.dao.all()
+        self.dao.all()
+        # Listeners recording the engine role and emitting execute spans, added once
+        assert len(self.db.engine.dispatch.before_cursor_execute) == listeners + 2
+
+
+class SyncDAOStatementCacheTestCase(SyncDAOTestCaseBase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.dao.__statement_cache__ = StatementCache()
+        self.dao.bulk_create(
+            data=[
+                {"id": 1, "first_name": "John", "last_name": "Doe", "age": 20},
+                {"id": 2, "first_name": "Jane", "last_name": "Doe", "age": 30},
+            ]
+        )
+
+    def test_statement_is_reused_for_specification_shape(self):
+        assert [entity.id for entity in self.dao.filter(specification={"age": 20})] == [1]
+        assert [entity.id for entity in self.dao.filter(specification={"age": 30})] == [2]
+        assert [entity.id for entity in self.dao.filter(specification={"age": 30, "last_name": "Doe"})] == [2]
+        stats = self.dao.__statement_cache__.stats
+        # The base select is cached as well and shared by both specification shapes
+        assert (stats.hits, stats.misses, stats.size) == (2, 3, 3)
+
+    def test_none_values_are_part_of_shape(self):
+        assert self.dao.filter(specification={"last_name": None}) == ()
+        assert len(self.dao.filter(specification={"last_name": "Doe"})) == 2
+
+    def test_lookups_by_keys(self):
+        assert set(self.dao.get_many_by_pk([1, 2, 3])) == {1, 2}
+        assert set(self.dao.get_many_by_pk([2])) == {2}
+        assert self.dao.get_by_unique_key("id", 1).first_name == "John"
+        self.dao.__use_core_rows__ = True
+        assert self.dao.get_by_pk(2).first_name == "Jane"
+        assert self.dao.get_by_pk(3) is None
+
+    def test_stream_and_pages(self):
+        assert [entity.id for entity in self.dao.stream(specification={"age": 30})] == [2]
+        assert [entity.id for entity in self.dao.stream(specification={"age": 20})] == [1]
+        assert [entity.id for entity in self.dao.get_page(specification={"age": 20}).items] == [1]
+
+    def test_disabled_cache(self):
+        self.dao.__statement_cache__ = None
+        assert [entity.id for entity in self.dao.filter(specification={"age": 20})] == [1]
+        assert len(self.dao.all()) == 2
+
+    def test_subclass_statements_are_not_shared(self):
+        class AdultsDAO(ExampleDAO):
+            def _build_select(self, load_options):
+                return super()._build_select(load_options).where(ExampleORMModel.age >= 25)
+
+        adults_dao = AdultsDAO(database=self.db)
+        adults_dao.__statement_cache__ = self.dao.__statement_cache__
+        assert len(self.dao.all()) == 2
+        assert len(self.dao.filter(specification={"last_name": "Doe"})) == 2
+        assert [entity.id for entity in adults_dao.all()] == [2]
+        assert [entity.id for entity in adults_dao.filter(specification={"last_name": "Doe"})] == [2]
+
+    def test_compiled_cache_stats(self):
+        db = Database(db_url=SYNC_DB_URL, count_compiled_cache_lookups=True)
+        db.connect()
+        self.addCleanup(db.disconnect)
+        dao = ExampleDAO(database=db)
+        dao.filter(specification={"age": 20})
+        stats = db.compiled_cache_stats()["primary"]
+        dao.filter(specification={"age": 30})
+        assert db.compiled_cache_stats()["primary"].hits == stats.hits + 1
+        assert stats.max_size == 500
+        assert stats.size > 0
+
+    def test_compiled_cache_lookups_are_not_counted_by_default(self):
+        self.dao.filter(specification={"age": 20})
+        self.dao.filter(specification={"age": 30})
+        stats = self.db.compiled_cache_stats()["primary"]
+        assert (stats.hits, stats.misses) == (0, 0)
+        assert stats.size > 0
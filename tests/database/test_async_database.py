@@ -1,6 +1,7 @@
 from unittest import IsolatedAsyncioTestCase
 
 import pytest
+from ash_dal.database import PoolConfig
 from ash_dal.database.async_database import AsyncDatabase
 from ash_dal.exceptions.database import DBConnectionError
 from sqlalchemy import select, text
@@ -43,3 +44,46 @@ class CreateSyncDatabaseTestCase(IsolatedAsyncioTestCase):
             r = await session.execute(select(text("1")))
             assert r.scalar() == 1
         await db.disconnect()
+
+    async def test_get_max_allowed_packet(self):
+        db = AsyncDatabase(db_url=self.main_db_url)
+        await db.connect()
+        max_allowed_packet = await db.get_max_allowed_packet()
+        assert isinstance(max_allowed_packet, int)
+        assert max_allowed_packet > 0
+        await db.disconnect()
+
+    async def test_transaction(self):
+        db = AsyncDatabase(db_url=self.main_db_url, read_replica_url=self.replica_db_url)
+        await db.connect()
+        assert db.current_session is None
+        async with db.transaction() as session:
+            assert db.current_session is session
+            # Reads are pinned to the primary server
+            assert session.sync_session.get_bind(clause=select(text("1"))) is db.engine.sync_engine
+            async with db.transaction() as nested_session:
+                assert nested_session is session
+                assert session.in_nested_transaction()
+            assert not session.in_nested_transaction()
+        assert db.current_session is None
+        await db.disconnect()
+
+    async def test_pool_stats(self):
+        db = AsyncDatabase(db_url=self.main_db_url, pool_config=PoolConfig(pool_size=3))
+        await db.connect()
+        async with db.engine.connect() as connection:
+            await connection.execute(select(text("1")))
+            stats = db.pool_stats()["primary"]
+            assert (stats.size, stats.checked_out, stats.checkouts) == (3, 1, 1)
+        await db.disconnect()
+
+    async def test_multiple_replicas(self):
+        db = AsyncDatabase(db_url=self.main_db_url, read_replica_urls=[self.replica_db_url, self.replica_db_url])
+        await db.connect()
+        assert db.read_only_engine is db.read_only_engines[0]
+        for _ in range(2):
+            async with db.session as session:
+                await session.execute(select(text("1")))
+        stats = db.replica_stats()
+        assert [(item.sessions, item.queries) for item in stats.values()] == [(1, 1), (1, 1)]
+        await db.disconnect()
@@ -0,0 +1,150 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import IsolatedAsyncioTestCase, TestCase, mock
+
+from ash_dal.database import AsyncDatabase, Database, ReadYourWritesConfig
+from ash_dal.database.consistency import WriteTracker
+from sqlalchemy import create_engine, select, text
+
+from tests.constants import ASYNC_DB_URL, ASYNC_DB_URL__SLAVE, SYNC_DB_URL, SYNC_DB_URL__SLAVE
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_write_tracker__pins_primary_within_window():
+    clock = FakeClock()
+    tracker = WriteTracker(ReadYourWritesConfig(window=2.0), clock=clock)
+    replica_engine = create_engine("sqlite://")
+    assert not tracker.pins_primary(replica_engine)
+    tracker.mark_write()
+    clock.now = 1.0
+    assert tracker.pins_primary(replica_engine)
+    clock.now = 2.0
+    assert not tracker.pins_primary(replica_engine)
+    assert tracker.recent_write is None
+
+
+def test_write_tracker__is_per_context():
+    tracker = WriteTracker(ReadYourWritesConfig(window=60.0))
+    replica_engine = create_engine("sqlite://")
+    contextvars.copy_context().run(tracker.mark_write)
+    assert not tracker.pins_primary(replica_engine)
+    tracker.mark_write()
+    pinned_in_thread: list[bool] = []
+    thread = threading.Thread(target=lambda: pinned_in_thread.append(tracker.pins_primary(replica_engine)))
+    thread.start()
+    thread.join()
+    assert pinned_in_thread == [False]
+    assert tracker.pins_primary(replica_engine)
+    tracker.reset()
+    assert not tracker.pins_primary(replica_engine)
+
+
+def test_write_tracker__releases_replica_that_applied_gtid():
+    tracker = WriteTracker(ReadYourWritesConfig(window=60.0, track_gtid=True))
+    lagging_engine, caught_up_engine = create_engine("sqlite://"), create_engine("sqlite://")
+    tracker.mark_write(gtid="3E11FA47-71CA-11E1-9E33-C80AA9429562:1-5")
+    with mock.patch(
+        "ash_dal.database.consistency.has_applied_gtid",
+        side_effect=lambda connection, gtid: connection.engine is caught_up_engine,
+    ) as has_applied_gtid:
+        assert tracker.pins_primary(lagging_engine)
+        assert not tracker.pins_primary(caught_up_engine)
+        assert not tracker.pins_primary(caught_up_engine)
+        assert tracker.pins_primary(lagging_engine)
+    # Every replica is checked once per write
+    assert has_applied_gtid.call_count == 2
+    tracker.mark_write(gtid="3E11FA47-71CA-11E1-9E33-C80AA9429562:1-6")
+    with mock.patch("ash_dal.database.consistency.has_applied_gtid", return_value=True):
+        assert not tracker.pins_primary(lagging_engine)
+
+
+class DatabaseReadYourWritesTestCase(TestCase):
+    def setUp(self) -> None:
+        self.db = Database(
+            db_url=SYNC_DB_URL,
+            read_replica_url=SYNC_DB_URL__SLAVE,
+            read_your_writes=ReadYourWritesConfig(window=60.0),
+        )
+        self.db.connect()
+
+    def tearDown(self) -> None:
+        self.db.disconnect()
+
+    def _read_bind(self):
+        with self.db.session as session:
+            return session.get_bind(clause=select(text("1")))
+
+    def test_reads_go_to_primary_after_write(self):
+        assert self._read_bind() is self.db.read_only_engine
+        self.db.record_write()
+        assert self._read_bind() is self.db.engine
+
+    def test_write_in_transaction_is_recorded_on_commit(self):
+        with self.db.transaction():
+            self.db.record_write()
+            assert self.db._write_tracker.recent_write is None
+        assert self._read_bind() is self.db.engine
+
+    def test_request_scope__write_does_not_pin_next_request_of_reused_thread(self):
+        def handle_request(write: bool) -> bool:
+            with self.db.request_scope():
+                if write:
+                    self.db.record_write()
+                return self._read_bind() is self.db.engine
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            assert executor.submit(handle_request, True).result()
+            assert not executor.submit(handle_request, False).result()
+
+    def test_request_scope__restores_outer_write(self):
+        self.db.record_write()
+        with self.db.request_scope():
+            assert self._read_bind() is self.db.read_only_engine
+        assert self._read_bind() is self.db.engine
+
+    def test_disabled(self):
+        db = Database(db_url=SYNC_DB_URL, read_replica_url=SYNC_DB_URL__SLAVE)
+        db.connect()
+        db.record_write()
+        with db.session as session:
+            assert session.get_bind(clause=select(text("1"))) is db.read_only_engine
+        db.disconnect()
+
+
+class AsyncDatabaseReadYourWritesTestCase(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.db = AsyncDatabase(
+            db_url=ASYNC_DB_URL,
+            read_replica_url=ASYNC_DB_URL__SLAVE,
+            read_your_writes=ReadYourWritesConfig(window=60.0),
+        )
+        await self.db.connect()
+
+    async def asyncTearDown(self) -> None:
+        await self.db.disconnect()
+
+    async def _read_bind(self):
+        async with self.db.session as session:
+            return session.sync_session.get_bind(clause=select(text("1")))
+
+    async def test_reads_go_to_primary_after_write(self):
+        await self.db.record_write()
+        assert await self._read_bind() is self.db.engine.sync_engine
+        # Tasks created with a separate context are not affected
+        bind = await asyncio.create_task(self._read_bind(), context=contextvars.Context())
+        assert bind is self.db.read_only_engine.sync_engine
+
+    async def test_request_scope__write_is_forgotten_at_exit(self):
+        with self.db.request_scope():
+            await self.db.record_write()
+            assert await self._read_bind() is self.db.engine.sync_engine
+        assert await self._read_bind() is self.db.read_only_engine.sync_engine
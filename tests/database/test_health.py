@@ -0,0 +1,216 @@
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from ash_dal.database import Database, HealthCheckConfig
+from ash_dal.database.health import (
+    AsyncReplicaHealthMonitor,
+    CircuitBreaker,
+    CircuitState,
+    ReplicaHealthMonitor,
+)
+from ash_dal.database.replicas import Replica, ReplicaSet
+from ash_dal.exceptions.database import ReplicaLagError
+from sqlalchemy import URL, create_engine, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from tests.constants import ASYNC_DB_URL__SLAVE, SYNC_DB_URL, SYNC_DB_URL__SLAVE
+
+UNREACHABLE_URL = URL.create(drivername="sqlite", database="/nonexistent/ash_dal/replica.db")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _replica(name: str, failure_threshold: int = 2) -> Replica:
+    return Replica(
+        name=name,
+        engine=create_engine("sqlite://"),
+        breaker=CircuitBreaker(failure_threshold=failure_threshold, recovery_time=10.0),
+    )
+
+
+def _failing_lag_reader(*_) -> float:
+    raise ReplicaLagError("Replication is not running")
+
+
+def test_circuit_breaker__opens_after_failures_in_a_row():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, recovery_time=10.0, clock=clock)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state is CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    assert not breaker.is_available
+
+
+def test_circuit_breaker__half_open_after_recovery_time():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_time=10.0, clock=clock)
+    breaker.record_failure()
+    clock.now = 10.0
+    assert breaker.state is CircuitState.HALF_OPEN
+    assert breaker.is_available
+    # A failed trial opens the circuit for another recovery time
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    clock.now = 20.0
+    breaker.record_success()
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_circuit_breaker__half_open_lets_single_trial_through():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_time=10.0, clock=clock)
+    assert not breaker.take_trial()
+    breaker.record_failure()
+    assert not breaker.take_trial()
+    clock.now = 10.0
+    assert breaker.take_trial()
+    assert not breaker.take_trial()
+    # A failed trial opens the circuit, the next recovery gives a new trial
+    breaker.record_failure()
+    clock.now = 20.0
+    assert breaker.take_trial()
+
+
+def test_replica_set__half_open_replica_gets_single_trial_session():
+    clock = FakeClock()
+    recovering, healthy = _replica("replica_0"), _replica("replica_1")
+    recovering.breaker = CircuitBreaker(failure_threshold=1, recovery_time=10.0, clock=clock)
+    recovering.breaker.record_failure()
+    replica_set = ReplicaSet([recovering, healthy])
+    assert all(replica_set.choose() is healthy for _ in range(3))
+    clock.now = 10.0
+    assert [replica_set.choose() for _ in range(3)] == [recovering, healthy, healthy]
+    assert ReplicaSet([recovering]).choose() is None
+    recovering.breaker.record_success()
+    assert ReplicaSet([recovering]).choose() is recovering
+
+
+def test_replica_without_breaker_is_always_available():
+    replica = Replica(name="replica_0", engine=create_engine("sqlite://"))
+    assert replica.is_available
+    assert replica.stats.available
+
+
+def test_monitor__ejects_lagging_replica():
+    lagging, healthy = _replica("replica_0"), _replica("replica_1")
+    lags = {lagging.engine: 100.0, healthy.engine: 1.0}
+    monitor = ReplicaHealthMonitor(
+        [lagging, healthy],
+        config=HealthCheckConfig(max_lag=30.0),
+        lag_reader=lambda connection: lags[connection.engine],
+    )
+    monitor.check()
+    assert lagging.is_available
+    monitor.check()
+    assert not lagging.is_available
+    assert lagging.stats.lag == 100.0
+    assert healthy.stats.available
+    assert healthy.stats.lag == 1.0
+    replica_set = ReplicaSet([lagging, healthy])
+    assert all(replica_set.choose() is healthy for _ in range(3))
+
+
+def test_monitor__ejects_replica_on_failures():
+    replica = _replica("replica_0", failure_threshold=1)
+    monitor = ReplicaHealthMonitor([replica], config=HealthCheckConfig(), lag_reader=_failing_lag_reader)
+    monitor.check()
+    assert not replica.is_available
+    assert ReplicaSet([replica]).choose() is None
+
+
+def test_monitor__lag_is_not_read_if_disabled():
+    replica = _replica("replica_0", failure_threshold=1)
+    monitor = ReplicaHealthMonitor([replica], config=HealthCheckConfig(max_lag=None), lag_reader=_failing_lag_reader)
+    monitor.check()
+    assert replica.is_available
+    assert replica.lag is None
+
+
+def test_monitor__runs_in_background():
+    replica = _replica("replica_0", failure_threshold=1)
+    monitor = ReplicaHealthMonitor([replica], config=HealthCheckConfig(interval=0.01), lag_reader=_failing_lag_reader)
+    monitor.start()
+    try:
+        for _ in range(100):
+            if not replica.is_available:
+                break
+            monitor._stopped.wait(0.01)
+    finally:
+        monitor.stop()
+    assert not replica.is_available
+
+
+class DatabaseHealthCheckTestCase(TestCase):
+    def setUp(self) -> None:
+        self.db = Database(
+            db_url=SYNC_DB_URL,
+            read_replica_urls=[SYNC_DB_URL__SLAVE, UNREACHABLE_URL],
+            health_check=HealthCheckConfig(interval=3600, failure_threshold=1, max_lag=None),
+        )
+        self.db.connect()
+
+    def tearDown(self) -> None:
+        self.db.disconnect()
+
+    def test_reads_skip_ejected_replicas(self):
+        self.db.check_replicas()
+        assert [item.available for item in self.db.replica_stats().values()] == [True, False]
+        for _ in range(2):
+            with self.db.session as session:
+                assert session.get_bind(clause=select(text("1"))) is self.db.read_only_engines[0]
+
+    def test_reads_fall_back_to_primary(self):
+        db = Database(
+            db_url=SYNC_DB_URL,
+            read_replica_urls=[UNREACHABLE_URL],
+            health_check=HealthCheckConfig(interval=3600, failure_threshold=1, max_lag=None),
+        )
+        db.connect()
+        db.check_replicas()
+        with db.session as session:
+            assert session.get_bind(clause=select(text("1"))) is db.engine
+        db.disconnect()
+
+
+class AsyncHealthMonitorTestCase(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.engine = create_async_engine(ASYNC_DB_URL__SLAVE)
+        self.replica = Replica(
+            name="replica_0", engine=self.engine.sync_engine, breaker=CircuitBreaker(failure_threshold=1)
+        )
+
+    async def asyncTearDown(self) -> None:
+        await self.engine.dispose()
+
+    async def test_check__ejects_lagging_replica(self):
+        monitor = AsyncReplicaHealthMonitor(
+            [(self.replica, self.engine)], config=HealthCheckConfig(max_lag=30.0), lag_reader=lambda _: 100.0
+        )
+        await monitor.check()
+        assert not self.replica.is_available
+        assert self.replica.lag == 100.0
+
+    async def test_check__returns_recovered_replica(self):
+        self.replica.breaker = CircuitBreaker(failure_threshold=1, recovery_time=0.0)
+        self.replica.breaker.record_failure()
+        monitor = AsyncReplicaHealthMonitor(
+            [(self.replica, self.engine)], config=HealthCheckConfig(max_lag=30.0), lag_reader=lambda _: 1.0
+        )
+        await monitor.check()
+        assert self.replica.breaker.state is CircuitState.CLOSED
+
+    async def test_start_stop(self):
+        monitor = AsyncReplicaHealthMonitor(
+            [(self.replica, self.engine)], config=HealthCheckConfig(interval=3600), lag_reader=_failing_lag_reader
+        )
+        monitor.start()
+        await monitor.stop()
+        assert self.replica.is_available
@@ -0,0 +1,92 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+import pytest
+from ash_dal.database import Database, PoolConfig
+from ash_dal.database.pool import engine_options
+from sqlalchemy import URL, event, text
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.pool import NullPool, QueuePool, SingletonThreadPool
+
+from tests.constants import SYNC_DB_URL, SYNC_DB_URL__SLAVE
+
+
+def test_engine_options__queue_pool():
+    options = engine_options(SYNC_DB_URL, PoolConfig(pool_size=3, max_overflow=1, pool_timeout=2, pool_recycle=60))
+    assert issubclass(options.pop("poolclass"), QueuePool)
+    assert options == {"pool_size": 3, "max_overflow": 1, "pool_timeout": 2, "pool_recycle": 60}
+
+
+def test_engine_options__other_pools():
+    options = engine_options(URL.create("sqlite"), PoolConfig())
+    assert issubclass(options["poolclass"], SingletonThreadPool)
+    assert "max_overflow" not in options
+    options = engine_options(SYNC_DB_URL, PoolConfig(poolclass=NullPool))
+    assert issubclass(options["poolclass"], NullPool)
+    assert "pool_size" not in options
+
+
+class DatabasePoolTestCase(TestCase):
+    def tearDown(self) -> None:
+        self.db.disconnect()
+
+    def _connect(self, pool_config: PoolConfig, **kwargs) -> Database:
+        self.db = Database(db_url=SYNC_DB_URL, pool_config=pool_config, **kwargs)
+        self.db.connect()
+        return self.db
+
+    def test_pool_stats(self):
+        db = self._connect(PoolConfig(pool_size=2, max_overflow=1, pool_timeout=0.1))
+        connections = [db.engine.connect() for _ in range(3)]
+        stats = db.pool_stats()["primary"]
+        assert (stats.size, stats.checked_out, stats.idle, stats.overflow) == (2, 3, 0, 1)
+        with pytest.raises(sa_exc.TimeoutError):
+            db.engine.connect()
+        for connection in connections:
+            connection.close()
+        stats = db.pool_stats()["primary"]
+        assert (stats.checked_out, stats.idle, stats.overflow) == (0, 2, 0)
+        assert stats.checkouts == 4
+        assert stats.checkout_timeouts == 1
+        assert stats.checkout_wait_max >= 0.1
+        assert stats.checkout_wait_avg > 0
+        assert list(db.pool_stats()) == ["primary"]
+
+    def test_pool_stats__replica(self):
+        db = self._connect(
+            PoolConfig(pool_size=2),
+            read_replica_url=SYNC_DB_URL__SLAVE,
+            read_replica_pool_config=PoolConfig(pool_size=4),
+        )
+        stats = db.pool_stats()
+        assert stats["primary"].size == 2
+        assert stats["replica_0"].size == 4
+
+    def test_idle_ping__replaces_dead_connection(self):
+        db = self._connect(PoolConfig(ping_after_idle=0))
+        connects: list[None] = []
+        event.listen(db.engine, "connect", lambda *_: connects.append(None))
+        with db.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        with patch.object(db.engine.dialect, "do_ping", side_effect=Exception("Gone away")):
+            with db.engine.connect() as connection:
+                assert connection.execute(text("SELECT 1")).scalar() == 1
+        assert len(connects) == 2
+
+    def test_idle_ping__skips_recently_used_connections(self):
+        db = self._connect(PoolConfig(ping_after_idle=60))
+        with db.engine.connect():
+            pass
+        with patch.object(db.engine.dialect, "do_ping") as do_ping:
+            with db.engine.connect():
+                pass
+        do_ping.assert_not_called()
+
+    def test_idle_ping__disabled(self):
+        db = self._connect(PoolConfig(ping_after_idle=None))
+        with db.engine.connect():
+            pass
+        with patch.object(db.engine.dialect, "do_ping") as do_ping:
+            with db.engine.connect():
+                pass
+        do_ping.assert_not_called()
@@ -0,0 +1,102 @@
+from unittest import TestCase
+
+import pytest
+from ash_dal.database import Database, LatencyBalancer, LeastConnectionsBalancer, RoundRobinBalancer
+from ash_dal.database.replicas import Replica, ReplicaSet
+from sqlalchemy import create_engine, select, text
+
+from tests.constants import SYNC_DB_URL, SYNC_DB_URL__SLAVE
+
+
+def _replicas(count: int) -> list[Replica]:
+    return [Replica(name=f"replica_{index}", engine=create_engine("sqlite://")) for index in range(count)]
+
+
+def test_round_robin_balancer():
+    replicas = _replicas(3)
+    balancer = RoundRobinBalancer()
+    assert [balancer.choose(replicas).name for _ in range(4)] == ["replica_0", "replica_1", "replica_2", "replica_0"]
+
+
+def test_least_connections_balancer():
+    replicas = _replicas(2)
+    with replicas[0].engine.connect():
+        assert LeastConnectionsBalancer().choose(replicas) is replicas[1]
+    with replicas[1].engine.connect():
+        assert LeastConnectionsBalancer().choose(replicas) is replicas[0]
+
+
+def test_latency_balancer():
+    replicas = _replicas(3)
+    replicas[0].record_query(0.5)
+    replicas[1].record_query(0.1)
+    assert LatencyBalancer().choose(replicas) is replicas[2]
+    replicas[2].record_query(0.3)
+    assert LatencyBalancer().choose(replicas) is replicas[1]
+
+
+def test_replica__latency_ewma():
+    replica = _replicas(1)[0]
+    assert replica.latency_ewma is None
+    replica.record_query(1.0)
+    replica.record_query(2.0)
+    assert replica.latency_ewma == pytest.approx(1.2)
+
+
+def test_replica__counts_queries():
+    replica = _replicas(1)[0]
+    with replica.engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        connection.execute(text("SELECT 2"))
+    stats = replica.stats
+    assert stats.queries == 2
+    assert stats.latency_ewma is not None
+
+
+def test_replica_set__records_sessions():
+    replica_set = ReplicaSet(_replicas(2))
+    for _ in range(3):
+        replica_set.choose()
+    assert [stats.sessions for stats in replica_set.stats().values()] == [2, 1]
+
+
+class MultipleReplicasTestCase(TestCase):
+    def setUp(self) -> None:
+        self.db = Database(
+            db_url=SYNC_DB_URL,
+            read_replica_url=SYNC_DB_URL__SLAVE,
+            read_replica_urls=[SYNC_DB_URL__SLAVE, SYNC_DB_URL__SLAVE],
+        )
+        self.db.connect()
+
+    def tearDown(self) -> None:
+        self.db.disconnect()
+
+    def test_read_only_engines(self):
+        assert len(self.db.read_only_engines) == 3
+        assert self.db.read_only_engine is self.db.read_only_engines[0]
+        assert self.db.read_only_engine is not self.db.engine
+
+    def test_sessions_are_balanced_and_sticky(self):
+        binds = []
+        for _ in range(3):
+            with self.db.session as session:
+                session.execute(select(text("1")))
+                session.execute(select(text("2")))
+                binds.append(session.get_bind(clause=select(text("3"))))
+        assert binds == [engine for engine in self.db.read_only_engines]
+        stats = self.db.replica_stats()
+        assert list(stats) == ["replica_0", "replica_1", "replica_2"]
+        assert [(item.sessions, item.queries) for item in stats.values()] == [(1, 2)] * 3
+
+    def test_writes_go_to_primary(self):
+        with self.db.session as session:
+            assert session.get_bind(clause=text("DELETE FROM users")) is self.db.engine
+        assert all(item.sessions == 0 for item in self.db.replica_stats().values())
+
+    def test_no_replicas(self):
+        db = Database(db_url=SYNC_DB_URL)
+        db.connect()
+        assert db.read_only_engine is db.engine
+        assert db.replica_stats() == {}
+        db.disconnect()
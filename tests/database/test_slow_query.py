@@ -0,0 +1,128 @@
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from ash_dal.database import AsyncDatabase, Database, SlowQuery, SlowQueryConfig
+from ash_dal.database.slow_query import ExplainRateLimiter, explain_statement, redact_parameters
+from ash_dal.utils.instrumentation import instrument
+from sqlalchemy import text
+
+from tests.constants import ASYNC_DB_URL, SYNC_DB_URL
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_redact_parameters():
+    assert redact_parameters({"id": 1, "name": "secret"}) == {"id": "int", "name": "str"}
+    assert redact_parameters((1, "secret", None)) == ("int", "str", "NoneType")
+    assert redact_parameters(None) is None
+
+
+def test_explain_statement():
+    assert explain_statement("mysql", "SELECT 1") == "EXPLAIN FORMAT=JSON SELECT 1"
+    assert explain_statement("sqlite", " select 1") == "EXPLAIN QUERY PLAN  select 1"
+    assert explain_statement("mysql", "SET NAMES utf8mb4") is None
+    assert explain_statement("mssql", "SELECT 1") is None
+
+
+def test_explain_rate_limiter__cooldown_per_statement():
+    clock = FakeClock()
+    limiter = ExplainRateLimiter(cooldown=10.0, max_per_minute=100, clock=clock)
+    assert limiter.acquire("SELECT 1")
+    assert not limiter.acquire("SELECT 1")
+    assert limiter.acquire("SELECT 2")
+    clock.now = 10.0
+    assert limiter.acquire("SELECT 1")
+
+
+def test_explain_rate_limiter__max_per_minute():
+    clock = FakeClock()
+    limiter = ExplainRateLimiter(cooldown=0.0, max_per_minute=2, clock=clock)
+    assert limiter.acquire("SELECT 1")
+    assert limiter.acquire("SELECT 2")
+    assert not limiter.acquire("SELECT 3")
+    clock.now = 60.0
+    assert limiter.acquire("SELECT 3")
+
+
+class Reader:
+    __metrics__ = None
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    @instrument()
+    def read(self, value: int) -> None:
+        with self.db.session as session:
+            session.execute(text("SELECT :value"), {"value": value})
+
+
+class AsyncReader:
+    __metrics__ = None
+
+    def __init__(self, db: AsyncDatabase):
+        self.db = db
+
+    @instrument()
+    async def read(self, value: int) -> None:
+        async with self.db.session as session:
+            await session.execute(text("SELECT :value"), {"value": value})
+
+
+class SlowQueryLogTestCase(TestCase):
+    def setUp(self) -> None:
+        self.queries: list[SlowQuery] = []
+        self.config = SlowQueryConfig(threshold=0.0, callback=self.queries.append)
+
+    def _connect(self, config: SlowQueryConfig) -> Database:
+        db = Database(db_url=SYNC_DB_URL, slow_query_log=config)
+        db.connect()
+        self.addCleanup(db.disconnect)
+        return db
+
+    def test_slow_query_is_reported_with_plan(self):
+        db = self._connect(self.config)
+        with self.assertLogs("ash_dal.database.slow_query", level="WARNING") as logs:
+            Reader(db).read(42)
+            db.disconnect()
+        [query] = [query for query in self.queries if query.call_site]
+        assert query.call_site == ("Reader.read",)
+        assert query.engine == "primary"
+        assert query.parameters in (("int",), {"value": "int"})
+        assert query.plan is not None
+        assert "42" not in str(query.parameters)
+        assert any("Reader.read" in line for line in logs.output)
+
+    def test_plans_are_rate_limited(self):
+        db = self._connect(SlowQueryConfig(threshold=0.0, callback=self.queries.append, explain_cooldown=60.0))
+        Reader(db).read(1)
+        Reader(db).read(2)
+        db.disconnect()
+        queries = [query for query in self.queries if query.call_site]
+        assert len(queries) == 2
+        assert sum(query.plan is not None for query in queries) == 1
+
+    def test_fast_queries_are_not_reported(self):
+        db = self._connect(SlowQueryConfig(threshold=60.0, callback=self.queries.append))
+        Reader(db).read(1)
+        db.disconnect()
+        assert self.queries == []
+
+
+class AsyncSlowQueryLogTestCase(IsolatedAsyncioTestCase):
+    async def test_slow_query_is_reported_with_plan(self):
+        queries: list[SlowQuery] = []
+        db = AsyncDatabase(db_url=ASYNC_DB_URL, slow_query_log=SlowQueryConfig(threshold=0.0, callback=queries.append))
+        await db.connect()
+        try:
+            await AsyncReader(db).read(42)
+        finally:
+            await db.disconnect()
+        [query] = [query for query in queries if query.call_site]
+        assert query.call_site == ("AsyncReader.read",)
+        assert query.engine == "primary"
+        assert query.plan is not None
@@ -42,3 +42,26 @@ class CreateSyncDatabaseTestCase(TestCase):
         with db.session as session:
             r = session.execute(select(text("1")))
             assert r.scalar() == 1
+
+    def test_get_max_allowed_packet(self):
+        db = Database(db_url=self.main_db_url)
+        db.connect()
+        max_allowed_packet = db.get_max_allowed_packet()
+        assert isinstance(max_allowed_packet, int)
+        assert max_allowed_packet > 0
+        db.disconnect()
+
+    def test_transaction(self):
+        db = Database(db_url=self.main_db_url, read_replica_url=self.replica_db_url)
+        db.connect()
+        assert db.current_session is None
+        with db.transaction() as session:
+            assert db.current_session is session
+            # Reads are pinned to the primary server
+            assert session.get_bind(clause=select(text("1"))) is db.engine
+            with db.transaction() as nested_session:
+                assert nested_session is session
+                assert session.in_nested_transaction()
+            assert not session.in_nested_transaction()
+        assert db.current_session is None
+        db.disconnect()
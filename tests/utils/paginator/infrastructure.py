@@ -13,3 +13,4 @@ class ExampleORMModel(Base):
     first_name: Mapped[str] = mapped_column(String(64))
     last_name: Mapped[str] = mapped_column(String(64))
     age: Mapped[int]
+    nickname: Mapped[str | None] = mapped_column(String(64))
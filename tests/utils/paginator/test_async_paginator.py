@@ -1,13 +1,17 @@
+import asyncio
 import math
 from abc import ABC, abstractmethod
+from contextlib import aclosing
 from unittest import IsolatedAsyncioTestCase
 
+import pytest
 from ash_dal import AsyncDatabase
-from ash_dal.utils import AsyncDeferredJoinPaginator, AsyncPaginator
+from ash_dal.exceptions.paginator import InvalidCursorError
+from ash_dal.utils import AsyncDeferredJoinPaginator, AsyncKeysetPaginator, AsyncPaginator, CountCache, CountEstimation
 from ash_dal.utils.paginator.interface import IAsyncPaginator
 from faker import Faker
 from parameterized import parameterized
-from sqlalchemy import Select, select
+from sqlalchemy import Select, event, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from tests.constants import ASYNC_DB_URL
@@ -15,6 +19,8 @@ from tests.utils.paginator.infrastructure import ExampleORMModel
 
 
 class AsyncPaginatorTestCaseBase(ABC):
+    prefetch_method = "_prefetch_page"
+
     async def asyncSetUp(self) -> None:
         self.faker = Faker()
         self.records_count = 100
@@ -47,6 +53,9 @@ class AsyncPaginatorTestCaseBase(ABC):
     def _build_paginator(self, query: Select, session: AsyncSession) -> IAsyncPaginator:
         ...
 
+    def _max_prefetched_pages(self, prefetch: int) -> int:
+        return prefetch
+
     async def test_paginator__paginate(self):
         async with self.db.session as session:
             paginator = self._build_paginator(
@@ -75,6 +84,73 @@ class AsyncPaginatorTestCaseBase(ABC):
                 counter += 1
             assert counter == math.ceil((self.records_count - id_offset) / self.page_size)
 
+    @parameterized.expand((1, 3, 20))
+    async def test_paginator__paginate_with_prefetch(self, prefetch: int):
+        async with self.db.session as session:
+            paginator = self._build_paginator(session=session, query=select(ExampleORMModel))
+            expected_ids = [item.id async for page in paginator.paginate() for item in page]
+            ids = [item.id async for page in paginator.paginate(prefetch=prefetch) for item in page]
+            assert ids == expected_ids
+            assert len(ids) == self.records_count
+
+    async def test_paginator__paginate_with_prefetch__early_stop(self):
+        prefetch = 3
+        async with self.db.session as session:
+            paginator = self._build_paginator(session=session, query=select(ExampleORMModel))
+            prefetch_tasks = []
+            spawn_session = paginator._spawn_session
+
+            def _spawn_session(bind):
+                prefetch_tasks.append(asyncio.current_task())
+                return spawn_session(bind=bind)
+
+            paginator._spawn_session = _spawn_session
+            async with aclosing(paginator.paginate(prefetch=prefetch)) as pages:
+                async for page in pages:
+                    assert page.index == 1
+                    break
+            assert len(prefetch_tasks) <= prefetch + 1
+            assert all(task.done() for task in prefetch_tasks)
+
+    @parameterized.expand((1, 3))
+    async def test_paginator__paginate_with_prefetch__concurrent_sessions(self, prefetch: int):
+        async with self.db.session as session:
+            paginator = self._build_paginator(session=session, query=select(ExampleORMModel))
+            active_sessions = 0
+            max_active_sessions = 0
+            spawn_bind_calls = 0
+            prefetch_page = getattr(paginator, self.prefetch_method)
+            spawn_bind = paginator._spawn_bind
+
+            async def _prefetch_page(**kwargs):
+                nonlocal active_sessions, max_active_sessions
+                active_sessions += 1
+                max_active_sessions = max(max_active_sessions, active_sessions)
+                try:
+                    await asyncio.sleep(0.01)
+                    return await prefetch_page(**kwargs)
+                finally:
+                    active_sessions -= 1
+
+            def _spawn_bind():
+                nonlocal spawn_bind_calls
+                spawn_bind_calls += 1
+                return spawn_bind()
+
+            setattr(paginator, self.prefetch_method, _prefetch_page)
+            paginator._spawn_bind = _spawn_bind
+            async for _ in paginator.paginate(prefetch=prefetch):
+                await asyncio.sleep(0.02)
+            assert max_active_sessions == self._max_prefetched_pages(prefetch)
+            assert spawn_bind_calls == 1
+
+    async def test_paginator__paginate_with_negative_prefetch(self):
+        async with self.db.session as session:
+            paginator = self._build_paginator(session=session, query=select(ExampleORMModel))
+            with pytest.raises(ValueError):
+                async for _ in paginator.paginate(prefetch=-1):
+                    ...
+
     async def test_paginator__get_page_by_index(self):
         async with self.db.session as session:
             paginator = self._build_paginator(
@@ -116,6 +192,51 @@ class AsyncPaginatorTestCase(AsyncPaginatorTestCaseBase, IsolatedAsyncioTestCase
         )
 
 
+class AsyncCachedCountPaginatorTestCase(AsyncPaginatorTestCaseBase, IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.count_cache = CountCache(ttl=60)
+
+    def _build_paginator(self, query: Select, session: AsyncSession) -> IAsyncPaginator:
+        return AsyncPaginator[ExampleORMModel](
+            session=session,
+            query=query,
+            page_size=self.page_size,
+            count_cache=self.count_cache,
+        )
+
+    async def test_paginator__size_is_shared_between_paginators(self):
+        async with self.db.session as session:
+            assert await self._build_paginator(session=session, query=select(ExampleORMModel)).size == 10
+            session.add(ExampleORMModel(id=self.records_count + 1, first_name="John", last_name="Doe", age=30))
+            await session.commit()
+            assert await self._build_paginator(session=session, query=select(ExampleORMModel)).size == 10
+        assert self.count_cache.stats.hits == 1
+
+
+class AsyncEstimatedCountPaginatorTestCase(AsyncPaginatorTestCaseBase, IsolatedAsyncioTestCase):
+    def _build_paginator(self, query: Select, session: AsyncSession, threshold: int = 10**6) -> IAsyncPaginator:
+        return AsyncPaginator[ExampleORMModel](
+            session=session,
+            query=query,
+            page_size=self.page_size,
+            count_estimation=CountEstimation(threshold=threshold),
+        )
+
+    async def test_paginator__size_below_threshold_is_exact(self):
+        async with self.db.session as session:
+            paginator = self._build_paginator(session=session, query=select(ExampleORMModel))
+            page = await paginator.get_page(page_index=1)
+            assert page.pages_count == math.ceil(self.records_count / self.page_size)
+            assert not page.is_estimate
+
+    async def test_paginator__size_is_estimated(self):
+        async with self.db.session as session:
+            paginator = self._build_paginator(session=session, query=select(ExampleORMModel), threshold=0)
+            page = await paginator.get_page(page_index=1)
+            assert page.is_estimate
+
+
 class AsyncDeferredJoinPaginatorTestCase(AsyncPaginatorTestCaseBase, IsolatedAsyncioTestCase):
     def _build_paginator(self, query: Select, session: AsyncSession) -> IAsyncPaginator:
         return AsyncDeferredJoinPaginator[ExampleORMModel](
@@ -124,3 +245,78 @@ class AsyncDeferredJoinPaginatorTestCase(AsyncPaginatorTestCaseBase, IsolatedAsy
             page_size=self.page_size,
             pk_field=ExampleORMModel.id,
         )
+
+
+class AsyncKeysetPaginatorTestCase(AsyncPaginatorTestCaseBase, IsolatedAsyncioTestCase):
+    prefetch_method = "_prefetch_page_after"
+
+    def _max_prefetched_pages(self, prefetch: int) -> int:
+        # Every page is seeked from the previous one, so only one page can be fetched ahead
+        return 1
+
+    def _build_paginator(self, query: Select, session: AsyncSession) -> AsyncKeysetPaginator:
+        return AsyncKeysetPaginator[ExampleORMModel](
+            session=session,
+            query=query,
+            page_size=self.page_size,
+            key_fields=(ExampleORMModel.age, ExampleORMModel.id),
+        )
+
+    async def test_keyset_paginator__cursors_walk_through_all_records(self):
+        async with self.db.session as session:
+            result = await session.scalars(select(ExampleORMModel).order_by(ExampleORMModel.age, ExampleORMModel.id))
+            expected_ids = [item.id for item in result]
+            paginator = self._build_paginator(session=session, query=select(ExampleORMModel))
+            page = await paginator.get_page(page_index=1)
+            ids = [item.id for item in page]
+            while page.next_cursor:
+                page = await paginator.get_page_after(cursor=page.next_cursor)
+                ids.extend(item.id for item in page)
+            assert ids == expected_ids
+
+    async def test_keyset_paginator__previous_cursor(self):
+        async with self.db.session as session:
+            paginator = self._build_paginator(session=session, query=select(ExampleORMModel))
+            first_page = await paginator.get_page(page_index=1)
+            second_page = await paginator.get_page_after(cursor=first_page.next_cursor)
+            previous_page = await paginator.get_page_after(cursor=second_page.previous_cursor)
+            assert previous_page.index == 1
+            assert [item.id for item in previous_page] == [item.id for item in first_page]
+
+    async def test_keyset_paginator__cursor_pages_are_not_counted(self):
+        statements: list[str] = []
+
+        def collect(conn, cursor, statement, *_):
+            statements.append(statement.lower())
+
+        async with self.db.session as session:
+            paginator = self._build_paginator(session=session, query=select(ExampleORMModel))
+            first_page = await paginator.get_page(page_index=1)
+            # A new paginator like the one a DAO builds per call, nothing is counted yet
+            paginator = self._build_paginator(session=session, query=select(ExampleORMModel))
+            event.listen(self.db.engine.sync_engine, "before_cursor_execute", collect)
+            try:
+                page = await paginator.get_page_after(cursor=first_page.next_cursor)
+            finally:
+                event.remove(self.db.engine.sync_engine, "before_cursor_execute", collect)
+            assert page.pages_count is None
+            assert statements
+            assert not any("count(" in statement for statement in statements)
+            counted_page = await paginator.get_page_after(cursor=first_page.next_cursor, with_count=True)
+            assert counted_page.pages_count == math.ceil(self.records_count / self.page_size)
+
+    async def test_keyset_paginator__nullable_key_fields(self):
+        async with self.db.session as session:
+            with pytest.raises(ValueError):
+                AsyncKeysetPaginator[ExampleORMModel](
+                    session=session,
+                    query=select(ExampleORMModel),
+                    page_size=self.page_size,
+                    key_fields=(ExampleORMModel.nickname, ExampleORMModel.id),
+                )
+
+    async def test_keyset_paginator__invalid_cursor(self):
+        async with self.db.session as session:
+            paginator = self._build_paginator(session=session, query=select(ExampleORMModel))
+            with pytest.raises(InvalidCursorError):
+                await paginator.get_page_after(cursor="not-a-cursor")
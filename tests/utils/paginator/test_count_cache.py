@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+import pytest
+from ash_dal.utils import CountCache
+
+from tests.utils.test_cache import FakeClock
+
+
+class CountCacheTestCase(TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.cache = CountCache(ttl=60, refresh_after=30, clock=self.clock)
+        self.calls = 0
+
+    def _count(self) -> int:
+        self.calls += 1
+        return 42
+
+    def test_get_or_count__cached(self):
+        assert self.cache.get_or_count(key="key", count=self._count) == 42
+        assert self.cache.get_or_count(key="key", count=self._count) == 42
+        assert self.calls == 1
+        assert self.cache.stats.hits == 1
+
+    def test_get_or_count__expired(self):
+        self.cache.get_or_count(key="key", count=self._count)
+        self.clock.now = 60
+        self.cache.get_or_count(key="key", count=self._count)
+        assert self.calls == 2
+
+    def test_get_or_count__invalidate(self):
+        self.cache.get_or_count(key="key", count=self._count)
+        self.cache.invalidate("key")
+        self.cache.get_or_count(key="key", count=self._count)
+        assert self.calls == 2
+
+    def test_get_or_count__single_flight(self):
+        started = threading.Event()
+
+        def slow_count() -> int:
+            started.set()
+            time.sleep(0.2)
+            return self._count()
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.cache.get_or_count(key="key", count=slow_count)))
+            for _ in range(5)
+        ]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == [42] * 5
+        assert self.calls == 1
+
+    def test_get_or_count__error_is_propagated(self):
+        def failing_count() -> int:
+            raise RuntimeError
+
+        with pytest.raises(RuntimeError):
+            self.cache.get_or_count(key="key", count=failing_count)
+        assert self.cache.get_or_count(key="key", count=self._count) == 42
+
+    def test_get_or_count__background_refresh(self):
+        refreshed = threading.Event()
+
+        def refresh() -> int:
+            refreshed.set()
+            return 100
+
+        self.cache.get_or_count(key="key", count=self._count)
+        self.clock.now = 30
+        assert self.cache.get_or_count(key="key", count=self._count, refresh=refresh) == 42
+        assert refreshed.wait(timeout=5)
+        for _ in range(50):
+            if self.cache.get_or_count(key="key", count=self._count) == 100:
+                break
+            time.sleep(0.01)
+        assert self.cache.get_or_count(key="key", count=self._count) == 100
+        assert self.calls == 1
+
+
+class AsyncCountCacheTestCase(IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.cache = CountCache(ttl=60, refresh_after=30, clock=self.clock)
+        self.calls = 0
+
+    async def _count(self) -> int:
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def test_get_or_count_async__single_flight(self):
+        results = await asyncio.gather(*(self.cache.get_or_count_async(key="key", count=self._count) for _ in range(5)))
+        assert results == [42] * 5
+        assert self.calls == 1
+
+    async def test_get_or_count_async__background_refresh(self):
+        async def refresh() -> int:
+            return 100
+
+        await self.cache.get_or_count_async(key="key", count=self._count)
+        self.clock.now = 30
+        assert await self.cache.get_or_count_async(key="key", count=self._count, refresh=refresh) == 42
+        await asyncio.sleep(0.01)
+        assert await self.cache.get_or_count_async(key="key", count=self._count) == 100
+        assert self.calls == 1
+
+    async def test_get_or_count_async__cancelled_leader_does_not_cancel_followers(self):
+        leader = asyncio.create_task(self.cache.get_or_count_async(key="key", count=self._count))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(self.cache.get_or_count_async(key="key", count=self._count)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        assert await asyncio.gather(*followers) == [42] * 3
+        assert leader.cancelled()
+        assert not any(follower.cancelled() for follower in followers)
+        # One of the followers took over the count
+        assert self.calls == 2
@@ -0,0 +1,36 @@
+import datetime
+import uuid
+from decimal import Decimal
+
+import pytest
+from ash_dal.exceptions.paginator import InvalidCursorError
+from ash_dal.utils.paginator.cursor import KeysetCursor, decode_cursor, encode_cursor
+from parameterized import parameterized
+
+
+@parameterized.expand(
+    (
+        ((1,),),
+        (("abc", None, True, 1.5),),
+        ((datetime.datetime(2023, 7, 1, 12, 30, 15, 123), 42),),
+        ((datetime.date(2023, 7, 1), datetime.time(10, 15)),),
+        ((Decimal("10.25"), uuid.UUID("12345678-1234-5678-1234-567812345678"), b"\x00\x01"),),
+    )
+)
+def test_cursor__round_trip(values):
+    cursor = KeysetCursor(values=values, is_backward=True, page_index=7)
+    token = encode_cursor(cursor)
+    assert isinstance(token, str)
+    assert "=" not in token
+    assert decode_cursor(token) == cursor
+
+
+def test_cursor__unsupported_value():
+    with pytest.raises(TypeError):
+        encode_cursor(KeysetCursor(values=(object(),), is_backward=False, page_index=1))
+
+
+@parameterized.expand(("", "not-a-cursor", "W10", "eyJ2IjogMX0"))
+def test_cursor__malformed(token):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token)
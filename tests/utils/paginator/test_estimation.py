@@ -0,0 +1,51 @@
+from ash_dal.utils import CountEstimation
+from ash_dal.utils.explain import Explain
+from ash_dal.utils.paginator.estimation import build_estimate_statement
+from parameterized import parameterized
+from sqlalchemy import create_engine, literal, select
+from sqlalchemy.dialects import mysql, sqlite
+
+from tests.utils.paginator.infrastructure import ExampleORMModel
+
+MYSQL_DIALECT = mysql.pymysql.dialect()
+
+
+def _compile(stmt) -> str:
+    return str(stmt.compile(dialect=MYSQL_DIALECT, compile_kwargs={"literal_binds": True}))
+
+
+def test_build_estimate_statement__table_statistics():
+    stmt, parse = build_estimate_statement(select(ExampleORMModel), MYSQL_DIALECT, CountEstimation())
+    sql = _compile(stmt)
+    assert "information_schema" in sql
+    assert "'paginator_table'" in sql
+
+
+def test_build_estimate_statement__explain():
+    query = select(ExampleORMModel).where(ExampleORMModel.age > 30)
+    stmt, parse = build_estimate_statement(query, MYSQL_DIALECT, CountEstimation())
+    assert isinstance(stmt, Explain)
+    assert _compile(stmt).startswith("EXPLAIN SELECT")
+
+
+@parameterized.expand(
+    (
+        (select(ExampleORMModel), CountEstimation(use_table_statistics=False, use_explain=False)),
+        (select(ExampleORMModel).where(ExampleORMModel.age > 30), CountEstimation(use_explain=False)),
+    )
+)
+def test_build_estimate_statement__disabled(query, estimation):
+    assert build_estimate_statement(query, MYSQL_DIALECT, estimation) is None
+
+
+def test_build_estimate_statement__not_supported_dialect():
+    assert build_estimate_statement(select(ExampleORMModel), sqlite.dialect(), CountEstimation()) is None
+
+
+def test_build_estimate_statement__parse_explain():
+    _, parse = build_estimate_statement(
+        select(ExampleORMModel).where(ExampleORMModel.age > 30), MYSQL_DIALECT, CountEstimation()
+    )
+    with create_engine("sqlite://").connect() as connection:
+        result = connection.execute(select(literal(200).label("rows"), literal(25.0).label("filtered")))
+        assert parse(result) == 50
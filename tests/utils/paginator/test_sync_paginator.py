@@ -2,13 +2,16 @@ import math
 from abc import ABC, abstractmethod
 from unittest import TestCase
 
+import pytest
 from ash_dal import Database
-from ash_dal.utils import Paginator
+from ash_dal.exceptions.paginator import InvalidCursorError
+from ash_dal.utils import CountCache, CountEstimation, KeysetPaginator, KeysetPaginatorFactory, Paginator
 from ash_dal.utils.paginator.interface import IPaginator
 from ash_dal.utils.paginator.sync_paginator import DeferredJoinPaginator
 from faker import Faker
 from parameterized import parameterized
-from sqlalchemy import Select, select
+from sqlalchemy import Select, event, select
+from sqlalchemy.dialects import mysql
 from sqlalchemy.orm import Session
 
 from tests.constants import SYNC_DB_URL
@@ -119,6 +122,73 @@ class SyncPaginatorTestCase(SyncPaginatorTestCaseBase, TestCase):
         )
 
 
+class SyncCachedCountPaginatorTestCase(SyncPaginatorTestCaseBase, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.count_cache = CountCache(ttl=60)
+
+    def _build_paginator(self, query: Select, session: Session) -> IPaginator:
+        return Paginator[ExampleORMModel](
+            session=session,
+            query=query,
+            page_size=self.page_size,
+            count_cache=self.count_cache,
+        )
+
+    def test_paginator__size_is_shared_between_paginators(self):
+        with self.db.session as session:
+            assert self._build_paginator(session=session, query=select(ExampleORMModel)).size == 100
+            session.add(ExampleORMModel(id=self.records_count + 1, first_name="John", last_name="Doe", age=30))
+            session.commit()
+            assert self._build_paginator(session=session, query=select(ExampleORMModel)).size == 100
+            filtered_query = select(ExampleORMModel).where(ExampleORMModel.id > 500)
+            assert self._build_paginator(session=session, query=filtered_query).size == 51
+        assert self.count_cache.stats.hits == 1
+        assert self.count_cache.stats.misses == 2
+
+    def test_paginator__count_cache_key_is_compiled_with_dialect(self):
+        queries = (
+            select(ExampleORMModel).where(ExampleORMModel.first_name.regexp_match("^J")),
+            select(ExampleORMModel).where(ExampleORMModel.first_name.regexp_match("^J", flags="i")),
+        )
+        with self.db.session as session:
+            keys = {
+                self._build_paginator(session=session, query=query)._count_cache_key(dialect=mysql.dialect())
+                for query in queries
+            }
+        assert len(keys) == 2
+
+
+class SyncEstimatedCountPaginatorTestCase(SyncPaginatorTestCaseBase, TestCase):
+    def _build_paginator(self, query: Select, session: Session, threshold: int = 10**6) -> IPaginator:
+        return Paginator[ExampleORMModel](
+            session=session,
+            query=query,
+            page_size=self.page_size,
+            count_estimation=CountEstimation(threshold=threshold),
+        )
+
+    def test_paginator__size_below_threshold_is_exact(self):
+        with self.db.session as session:
+            paginator = self._build_paginator(session=session, query=select(ExampleORMModel))
+            page = paginator.get_page(page_index=1)
+            assert page.pages_count == math.ceil(self.records_count / self.page_size)
+            assert not page.is_estimate
+            assert not paginator.is_size_estimated
+
+    @parameterized.expand(((False,), (True,)))
+    def test_paginator__size_is_estimated(self, filtered: bool):
+        query = select(ExampleORMModel)
+        if filtered:
+            query = query.where(ExampleORMModel.age > 30)
+        with self.db.session as session:
+            paginator = self._build_paginator(session=session, query=query, threshold=0)
+            page = paginator.get_page(page_index=1)
+            assert page.is_estimate
+            assert paginator.is_size_estimated
+            assert page.pages_count >= 0
+
+
 class SyncDeferredJoinPaginatorTestCase(SyncPaginatorTestCaseBase, TestCase):
     def _build_paginator(self, query: Select, session: Session) -> IPaginator:
         return DeferredJoinPaginator[ExampleORMModel](
@@ -127,3 +197,110 @@ class SyncDeferredJoinPaginatorTestCase(SyncPaginatorTestCaseBase, TestCase):
             page_size=self.page_size,
             pk_field=ExampleORMModel.id,
         )
+
+
+class SyncKeysetPaginatorTestCase(SyncPaginatorTestCaseBase, TestCase):
+    def _build_paginator(self, query: Select, session: Session, descending: bool = False) -> KeysetPaginator:
+        return KeysetPaginator[ExampleORMModel](
+            session=session,
+            query=query,
+            page_size=self.page_size,
+            key_fields=(ExampleORMModel.age, ExampleORMModel.id),
+            descending=descending,
+        )
+
+    def _walk_forward(self, paginator: KeysetPaginator) -> list[int]:
+        page = paginator.get_page(page_index=1)
+        ids = [item.id for item in page]
+        while page.next_cursor:
+            page = paginator.get_page_after(cursor=page.next_cursor)
+            ids.extend(item.id for item in page)
+        return ids
+
+    def test_keyset_paginator__cursors_walk_through_all_records(self):
+        with self.db.session as session:
+            expected_ids = [
+                item.id
+                for item in session.scalars(select(ExampleORMModel).order_by(ExampleORMModel.age, ExampleORMModel.id))
+            ]
+            paginator = self._build_paginator(session=session, query=select(ExampleORMModel))
+            assert self._walk_forward(paginator) == expected_ids
+
+    def test_keyset_paginator__descending(self):
+        with self.db.session as session:
+            expected_ids = [
+                item.id
+                for item in session.scalars(
+                    select(ExampleORMModel).order_by(ExampleORMModel.age.desc(), ExampleORMModel.id.desc())
+                )
+            ]
+            paginator = self._build_paginator(session=session, query=select(ExampleORMModel), descending=True)
+            assert self._walk_forward(paginator) == expected_ids
+
+    def test_keyset_paginator__nullable_key_fields(self):
+        with self.db.session as session:
+            with pytest.raises(ValueError):
+                KeysetPaginator[ExampleORMModel](
+                    session=session,
+                    query=select(ExampleORMModel),
+                    page_size=self.page_size,
+                    key_fields=(ExampleORMModel.nickname, ExampleORMModel.id),
+                )
+        with pytest.raises(ValueError):
+            KeysetPaginatorFactory(paginator_class=KeysetPaginator, key_fields=(ExampleORMModel.nickname,))
+
+    def test_keyset_paginator__previous_cursor(self):
+        with self.db.session as session:
+            paginator = self._build_paginator(session=session, query=select(ExampleORMModel))
+            first_page = paginator.get_page(page_index=1)
+            assert first_page.previous_cursor is None
+            assert first_page.next_cursor
+            second_page = paginator.get_page_after(cursor=first_page.next_cursor)
+            third_page = paginator.get_page_after(cursor=second_page.next_cursor)
+            assert third_page.index == 3
+            assert third_page.previous_cursor
+            previous_page = paginator.get_page_after(cursor=third_page.previous_cursor)
+            assert previous_page.index == 2
+            assert [item.id for item in previous_page] == [item.id for item in second_page]
+            assert [item.id for item in paginator.get_page_after(cursor=second_page.previous_cursor)] == [
+                item.id for item in first_page
+            ]
+
+    def test_keyset_paginator__last_page_has_no_next_cursor(self):
+        with self.db.session as session:
+            paginator = self._build_paginator(
+                session=session,
+                query=select(ExampleORMModel).where(ExampleORMModel.id <= self.page_size + 1),
+            )
+            first_page = paginator.get_page(page_index=1)
+            last_page = paginator.get_page_after(cursor=first_page.next_cursor)
+            assert len(last_page) == 1
+            assert last_page.next_cursor is None
+
+    def test_keyset_paginator__cursor_pages_are_not_counted(self):
+        statements: list[str] = []
+
+        def collect(conn, cursor, statement, *_):
+            statements.append(statement.lower())
+
+        with self.db.session as session:
+            paginator = self._build_paginator(session=session, query=select(ExampleORMModel))
+            first_page = paginator.get_page(page_index=1)
+            # A new paginator like the one a DAO builds per call, nothing is counted yet
+            paginator = self._build_paginator(session=session, query=select(ExampleORMModel))
+            event.listen(self.db.engine, "before_cursor_execute", collect)
+            try:
+                page = paginator.get_page_after(cursor=first_page.next_cursor)
+            finally:
+                event.remove(self.db.engine, "before_cursor_execute", collect)
+            assert page.pages_count is None
+            assert statements
+            assert not any("count(" in statement for statement in statements)
+            counted_page = paginator.get_page_after(cursor=first_page.next_cursor, with_count=True)
+            assert counted_page.pages_count == math.ceil(self.records_count / self.page_size)
+
+    def test_keyset_paginator__invalid_cursor(self):
+        with self.db.session as session:
+            paginator = self._build_paginator(session=session, query=select(ExampleORMModel))
+            with pytest.raises(InvalidCursorError):
+                paginator.get_page_after(cursor="not-a-cursor")
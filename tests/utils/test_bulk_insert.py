@@ -0,0 +1,5 @@
+from ash_dal.utils.bulk_insert import auto_increment_pks
+
+
+def test_auto_increment_pks():
+    assert auto_increment_pks(first_id=10, rows_count=3, increment=2) == [(10,), (12,), (14,)]
@@ -0,0 +1,43 @@
+from ash_dal.utils.bulk_update import build_bulk_update_statement, bulk_update_row_size
+from ash_dal.utils.chunking import estimate_row_size
+from sqlalchemy.dialects import mysql
+
+from tests.dao.infrastructure import ExampleORMModel
+
+TABLE = ExampleORMModel.__table__
+
+
+def _compile(statement) -> tuple[str, dict]:
+    compiled = statement.compile(dialect=mysql.dialect(), compile_kwargs={"render_postcompile": True})
+    return str(compiled), compiled.params
+
+
+def test_build_bulk_update_statement():
+    rows = [{"id": 1, "firstName": "John", "age": 42}, {"id": 2, "age": 24}]
+    sql, _ = _compile(build_bulk_update_statement(TABLE, rows, [TABLE.c.id], [TABLE.c.firstName, TABLE.c.age]))
+    assert sql == (
+        "UPDATE example_table SET "
+        "`firstName`=CASE example_table.id WHEN %s THEN %s ELSE example_table.`firstName` END, "
+        "age=CASE example_table.id WHEN %s THEN %s WHEN %s THEN %s ELSE example_table.age END "
+        "WHERE example_table.id IN (%s, %s)"
+    )
+
+
+def test_build_bulk_update_statement__composite_key():
+    rows = [{"firstName": "John", "lastName": "Doe", "age": 42}]
+    statement = build_bulk_update_statement(TABLE, rows, [TABLE.c.firstName, TABLE.c.lastName], [TABLE.c.age])
+    sql, _ = _compile(statement)
+    assert "age=CASE WHEN (example_table.`firstName` = %s AND example_table.`lastName` = %s) THEN %s" in sql
+    assert sql.endswith("WHERE (example_table.`firstName`, example_table.`lastName`) IN ((%s, %s))")
+
+
+def test_build_bulk_update_statement__last_row_wins():
+    rows = [{"id": 1, "age": 42}, {"id": 1, "age": 24}]
+    _, params = _compile(build_bulk_update_statement(TABLE, rows, [TABLE.c.id], [TABLE.c.age]))
+    assert 42 not in params.values()
+    assert 24 in params.values()
+
+
+def test_bulk_update_row_size():
+    row = {"id": 1, "age": 42}
+    assert bulk_update_row_size(row, key_fields=("id",)) == estimate_row_size(row) + 2 * estimate_row_size({"id": 1})
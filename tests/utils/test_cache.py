@@ -0,0 +1,62 @@
+from ash_dal.utils.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache__get_and_set():
+    cache = TTLCache[str, int](max_size=10)
+    assert cache.get("key") is None
+    cache.set("key", 1)
+    assert cache.get("key") == 1
+    stats = cache.stats
+    assert stats.hits == 1
+    assert stats.misses == 1
+    assert stats.size == 1
+    assert stats.hit_rate == 0.5
+
+
+def test_ttl_cache__expiration():
+    clock = FakeClock()
+    cache = TTLCache[str, int](max_size=10, ttl=5, clock=clock)
+    cache.set("key", 1)
+    clock.now = 3
+    assert cache.get_with_age("key") == (1, 3)
+    clock.now = 5
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache__no_ttl():
+    clock = FakeClock()
+    cache = TTLCache[str, int](max_size=10, ttl=None, clock=clock)
+    cache.set("key", 1)
+    clock.now = 10**6
+    assert cache.get("key") == 1
+
+
+def test_ttl_cache__lru_eviction():
+    cache = TTLCache[str, int](max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats.evictions == 1
+
+
+def test_ttl_cache__delete_and_clear():
+    cache = TTLCache[str, int](max_size=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.delete("a")
+    assert cache.get("a") is None
+    cache.clear()
+    assert cache.get("b") is None
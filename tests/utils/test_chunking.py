@@ -0,0 +1,58 @@
+import asyncio
+
+from ash_dal.utils.chunking import achunked_by_size, chunked, chunked_by_size, estimate_row_size
+from parameterized import parameterized
+
+
+@parameterized.expand(
+    (
+        (range(0), 3, []),
+        (range(3), 3, [(0, 1, 2)]),
+        (range(7), 3, [(0, 1, 2), (3, 4, 5), (6,)]),
+    )
+)
+def test_chunked(iterable, size, expected):
+    assert list(chunked(iterable, size)) == expected
+
+
+def test_chunked__consumes_iterator_lazily():
+    iterator = iter(range(10))
+    chunks = chunked(iterator, 4)
+    assert next(chunks) == (0, 1, 2, 3)
+    assert next(iterator) == 4
+
+
+@parameterized.expand(
+    (
+        ([1, 1, 1, 1, 1], 2, None, [(1, 1), (1, 1), (1,)]),
+        ([1, 1, 1, 1, 1], 10, 2, [(1, 1), (1, 1), (1,)]),
+        ([1, 5, 1, 1], 10, 3, [(1,), (5,), (1, 1)]),
+    )
+)
+def test_chunked_by_size(sizes, max_count, max_bytes, expected):
+    assert list(chunked_by_size(sizes, max_count=max_count, max_bytes=max_bytes, size_of=lambda size: size)) == expected
+
+
+async def _collect(iterable, max_count, max_bytes):
+    return [chunk async for chunk in achunked_by_size(iterable, max_count, max_bytes, size_of=lambda size: size)]
+
+
+async def _generate(items):
+    for item in items:
+        yield item
+
+
+@parameterized.expand(
+    (
+        ([1, 1, 1, 1, 1], 2, None, [(1, 1), (1, 1), (1,)]),
+        ([1, 5, 1, 1], 10, 3, [(1,), (5,), (1, 1)]),
+    )
+)
+def test_achunked_by_size(sizes, max_count, max_bytes, expected):
+    assert asyncio.run(_collect(_generate(sizes), max_count, max_bytes)) == expected
+    assert asyncio.run(_collect(sizes, max_count, max_bytes)) == expected
+
+
+def test_estimate_row_size():
+    assert estimate_row_size({"id": 1, "name": "abc", "data": b"ab"}) > estimate_row_size({"id": 1})
+    assert estimate_row_size({"name": "a" * 100}) >= 100
@@ -0,0 +1,62 @@
+import asyncio
+from contextvars import ContextVar
+from unittest import IsolatedAsyncioTestCase
+
+import pytest
+from ash_dal.utils.coalescer import LookupCoalescer
+
+_caller: ContextVar[str | None] = ContextVar("caller", default=None)
+
+
+class LookupCoalescerTestCase(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.batches = []
+        self.coalescer = LookupCoalescer[int, str](batch_load=self._batch_load)
+
+    async def _batch_load(self, keys: tuple[int, ...]) -> dict[int, str]:
+        self.batches.append(keys)
+        return {key: f"value_{key}" for key in keys if key % 2}
+
+    async def test_load__same_tick_is_one_batch(self):
+        results = await asyncio.gather(*(self.coalescer.load(key) for key in (1, 2, 3, 3)))
+        assert results == ["value_1", None, "value_3", "value_3"]
+        assert self.batches == [(1, 2, 3)]
+
+    async def test_load__different_ticks_are_different_batches(self):
+        assert await self.coalescer.load(1) == "value_1"
+        assert await self.coalescer.load(3) == "value_3"
+        assert self.batches == [(1,), (3,)]
+
+    async def test_load__error_is_raised_for_every_caller(self):
+        async def failing_batch_load(keys):
+            raise RuntimeError("DB is down")
+
+        coalescer = LookupCoalescer[int, str](batch_load=failing_batch_load)
+        results = await asyncio.gather(coalescer.load(1), coalescer.load(2), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        with pytest.raises(RuntimeError):
+            await coalescer.load(3)
+
+    async def test_load__cancelled_caller_does_not_break_batch(self):
+        cancelled = asyncio.ensure_future(self.coalescer.load(1))
+        other = asyncio.ensure_future(self.coalescer.load(3))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        assert await other == "value_3"
+        assert cancelled.cancelled()
+
+    async def test_load__batch_is_loaded_outside_of_callers_context(self):
+        callers: list[str | None] = []
+
+        async def batch_load(keys: tuple[int, ...]) -> dict[int, str]:
+            callers.append(_caller.get())
+            return {}
+
+        coalescer = LookupCoalescer[int, str](batch_load=batch_load)
+
+        async def load(key: int) -> str | None:
+            _caller.set(f"caller_{key}")
+            return await coalescer.load(key)
+
+        await asyncio.gather(load(1), load(2))
+        assert callers == [None]
@@ -0,0 +1,38 @@
+import contextvars
+import threading
+
+from ash_dal.utils.context import ContextSlot
+
+
+def test_context_slot__values_are_per_slot():
+    first, second = ContextSlot[str](), ContextSlot[str]()
+    assert first.get() is None
+    token = first.set("first")
+    second.set("second")
+    assert (first.get(), second.get()) == ("first", "second")
+    first.reset(token)
+    # Other slots keep values set after the token was taken
+    assert (first.get(), second.get()) == (None, "second")
+
+
+def test_context_slot__values_are_per_context():
+    slot = ContextSlot[str]()
+    contextvars.copy_context().run(slot.set, "other_context")
+    assert slot.get() is None
+    slot.set("value")
+    values_in_thread: list[str | None] = []
+    thread = threading.Thread(target=lambda: values_in_thread.append(slot.get()))
+    thread.start()
+    thread.join()
+    assert values_in_thread == [None]
+    assert contextvars.copy_context().run(slot.get) == "value"
+
+
+def test_context_slot__nested_reset():
+    slot = ContextSlot[str]()
+    outer = slot.set("outer")
+    inner = slot.set("inner")
+    slot.reset(inner)
+    assert slot.get() == "outer"
+    slot.reset(outer)
+    assert slot.get() is None
@@ -0,0 +1,104 @@
+from multiprocessing import Manager
+
+from ash_dal.utils import EntityCache, InMemoryCacheBackend, SharedDictCacheBackend
+from ash_dal.utils.entity_cache import ICacheBackend
+from parameterized import parameterized
+
+from tests.utils.test_cache import FakeClock
+
+
+def _build_backends(clock: FakeClock, max_size: int = 10, ttl: float = 5) -> tuple[ICacheBackend, ...]:
+    return (
+        InMemoryCacheBackend(max_size=max_size, ttl=ttl, clock=clock),
+        SharedDictCacheBackend(mapping={}, max_size=max_size, ttl=ttl, clock=clock),
+    )
+
+
+@parameterized.expand(((0,), (1,)))
+def test_entity_cache__get_and_set(backend_index):
+    cache = EntityCache(backend=_build_backends(FakeClock())[backend_index])
+    assert cache.get("key") == (False, None)
+    cache.set("key", "entity")
+    assert cache.get("key") == (True, "entity")
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+    assert cache.stats.size == 1
+
+
+@parameterized.expand(((0,), (1,)))
+def test_entity_cache__expiration(backend_index):
+    clock = FakeClock()
+    cache = EntityCache(backend=_build_backends(clock)[backend_index])
+    cache.set("key", "entity")
+    clock.now = 5
+    assert cache.get("key") == (False, None)
+
+
+@parameterized.expand(((0,), (1,)))
+def test_entity_cache__eviction(backend_index):
+    clock = FakeClock()
+    cache = EntityCache(backend=_build_backends(clock, max_size=2)[backend_index])
+    for i in range(3):
+        clock.now = i
+        cache.set(i, f"entity_{i}")
+    assert cache.get(0) == (False, None)
+    assert cache.get(2) == (True, "entity_2")
+    assert cache.stats.evictions == 1
+    assert cache.stats.size == 2
+
+
+@parameterized.expand(((False,), (True,)))
+def test_entity_cache__misses(cache_misses):
+    cache = EntityCache(cache_misses=cache_misses)
+    cache.set("key", None)
+    assert cache.get("key") == (cache_misses, None)
+
+
+def test_entity_cache__invalidate():
+    cache = EntityCache()
+    cache.set("key_1", "entity_1")
+    cache.set("key_2", "entity_2")
+    cache.invalidate("key_1")
+    assert cache.get("key_1") == (False, None)
+    assert cache.get("key_2") == (True, "entity_2")
+    cache.invalidate()
+    assert cache.stats.size == 0
+
+
+@parameterized.expand(((0,), (1,)))
+def test_entity_cache__invalidate_namespace(backend_index):
+    cache = EntityCache(backend=_build_backends(FakeClock())[backend_index])
+    cache.set(("users", 1), "user")
+    cache.set(("countries", 1), "country")
+    cache.set("key", "entity")
+    cache.invalidate(namespace="users")
+    assert cache.get(("users", 1)) == (False, None)
+    assert cache.get(("countries", 1)) == (True, "country")
+    assert cache.get("key") == (True, "entity")
+
+
+def test_shared_dict_cache_backend__namespace_keeps_other_keys_of_mapping():
+    mapping = {"foreign_key": "foreign_value"}
+    backend = SharedDictCacheBackend(mapping=mapping)
+    backend.set(("users", 1), "user")
+    backend.delete_namespace("users")
+    assert mapping == {"foreign_key": "foreign_value"}
+
+
+def test_entity_cache__value_read_before_invalidation_is_not_cached():
+    cache = EntityCache()
+    generation = cache.generation
+    cache.invalidate("key")
+    cache.set("key", "stale_entity", generation=generation)
+    assert cache.get("key") == (False, None)
+
+
+def test_entity_cache__multiprocessing_manager_dict():
+    with Manager() as manager:
+        mapping = manager.dict()
+        cache = EntityCache(backend=SharedDictCacheBackend(mapping=mapping), cache_misses=True)
+        cache.set(("namespace", 1), {"id": 1})
+        cache.set(("namespace", 2), None)
+        other_process_cache = EntityCache(backend=SharedDictCacheBackend(mapping=mapping))
+        assert other_process_cache.get(("namespace", 1)) == (True, {"id": 1})
+        assert other_process_cache.get(("namespace", 2)) == (True, None)
@@ -0,0 +1,159 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+import pytest
+from ash_dal.utils import MetricsCollector, OperationMetrics
+from ash_dal.utils.instrumentation import instrument
+from ash_dal.utils.metrics import ENGINE_NONE, ENGINE_PRIMARY, record_conversion, record_engine, record_rows
+
+
+class Service:
+    def __init__(self, collector: MetricsCollector | None):
+        self.__metrics__ = collector
+
+    @instrument()
+    def read(self, rows: int) -> int:
+        record_engine(ENGINE_PRIMARY)
+        record_conversion(rows=rows, duration=0.5)
+        return rows
+
+    @instrument()
+    def read_twice(self) -> int:
+        # Nested calls of the same object are measured as a part of the outer call
+        return self.read(1) + self.read(2)
+
+    @instrument()
+    def fail(self) -> None:
+        raise RuntimeError()
+
+    @instrument()
+    def iterate(self, count: int):
+        for index in range(count):
+            record_rows(1)
+            yield index
+
+    @instrument()
+    async def aread(self) -> int:
+        await asyncio.sleep(0)
+        record_rows(3)
+        return 3
+
+    @instrument()
+    async def aiterate(self, count: int):
+        for index in range(count):
+            await asyncio.sleep(0)
+            record_rows(1)
+            yield index
+
+
+class Child:
+    __metrics__ = None
+
+    @instrument(inherit=True)
+    def read(self) -> None:
+        record_engine("replica")
+
+
+class Parent(Service):
+    @instrument()
+    def read_child(self) -> None:
+        Child().read()
+
+
+def _collect(collector: MetricsCollector) -> list[OperationMetrics]:
+    measurements: list[OperationMetrics] = []
+    collector.add_callback(measurements.append)
+    return measurements
+
+
+def test_instrument__records_operation():
+    collector = MetricsCollector()
+    measurements = _collect(collector)
+    assert Service(collector).read(2) == 2
+    [metrics] = measurements
+    assert (metrics.dao, metrics.method, metrics.engine) == ("Service", "read", ENGINE_PRIMARY)
+    assert (metrics.rows, metrics.rows_converted, metrics.conversion_time) == (2, 2, 0.5)
+    assert metrics.duration >= 0
+    assert not metrics.error
+
+
+def test_instrument__nested_calls_of_same_object():
+    collector = MetricsCollector()
+    measurements = _collect(collector)
+    Service(collector).read_twice()
+    assert [(item.method, item.rows) for item in measurements] == [("read_twice", 3)]
+
+
+def test_instrument__inherits_collector_and_engine():
+    collector = MetricsCollector()
+    measurements = _collect(collector)
+    Parent(collector).read_child()
+    assert [(item.dao, item.method, item.engine) for item in measurements] == [
+        ("Child", "read", "replica"),
+        ("Parent", "read_child", "replica"),
+    ]
+    Child().read()
+    assert len(measurements) == 2
+
+
+def test_instrument__error():
+    collector = MetricsCollector()
+    measurements = _collect(collector)
+    with pytest.raises(RuntimeError):
+        Service(collector).fail()
+    assert measurements[0].error
+    assert measurements[0].engine == ENGINE_NONE
+
+
+def test_instrument__generator():
+    collector = MetricsCollector()
+    measurements = _collect(collector)
+    assert list(Service(collector).iterate(3)) == [0, 1, 2]
+    iterator = Service(collector).iterate(3)
+    next(iterator)
+    iterator.close()
+    assert [(item.rows, item.error) for item in measurements] == [(3, False), (1, False)]
+
+
+def test_instrument__disabled():
+    service = Service(None)
+    assert service.read(1) == 1
+    assert list(service.iterate(2)) == [0, 1]
+
+
+class AsyncInstrumentTestCase(IsolatedAsyncioTestCase):
+    async def test_instrument__async(self):
+        collector = MetricsCollector()
+        measurements = _collect(collector)
+        service = Service(collector)
+        assert await service.aread() == 3
+        assert [item async for item in service.aiterate(2)] == [0, 1]
+        assert [(item.method, item.rows) for item in measurements] == [("aread", 3), ("aiterate", 2)]
+
+
+def test_render_prometheus():
+    collector = MetricsCollector(buckets=(0.1, 1.0))
+    for duration in (0.05, 0.5, 5.0):
+        collector.record(
+            OperationMetrics(
+                dao='User"DAO',
+                method="get_by_pk",
+                engine="replica",
+                duration=duration,
+                rows=1,
+                rows_converted=1,
+                conversion_time=0.001,
+                error=duration > 1,
+            )
+        )
+    labels = 'dao="User\\"DAO",method="get_by_pk",engine="replica"'
+    text = collector.render_prometheus()
+    assert "# TYPE ash_dal_operation_duration_seconds histogram" in text
+    assert f'ash_dal_operation_duration_seconds_bucket{{{labels},le="0.1"}} 1' in text
+    assert f'ash_dal_operation_duration_seconds_bucket{{{labels},le="1.0"}} 2' in text
+    assert f'ash_dal_operation_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in text
+    assert f"ash_dal_operation_duration_seconds_count{{{labels}}} 3" in text
+    assert f"ash_dal_operation_rows_total{{{labels}}} 3" in text
+    assert f"ash_dal_operation_errors_total{{{labels}}} 1" in text
+    collector.reset()
+    assert "ash_dal_operation_rows_total{" not in collector.render_prometheus()
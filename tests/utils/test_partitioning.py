@@ -0,0 +1,40 @@
+import pytest
+from ash_dal.utils.partitioning import (
+    PKRange,
+    ScanBoundaries,
+    ranges_from_upper_bounds,
+    scan_ranges,
+    split_pk_range,
+)
+
+
+def test_split_pk_range():
+    assert split_pk_range(min_pk=1, max_pk=10, partitions=3) == [
+        PKRange(after=None, upper=4),
+        PKRange(after=4, upper=8),
+        PKRange(after=8, upper=10),
+    ]
+
+
+def test_split_pk_range__fewer_keys_than_partitions():
+    assert split_pk_range(min_pk=5, max_pk=6, partitions=4) == [PKRange(after=None, upper=5), PKRange(after=5, upper=6)]
+    assert split_pk_range(min_pk=7, max_pk=7, partitions=4) == [PKRange(after=None, upper=7)]
+
+
+def test_ranges_from_upper_bounds():
+    assert ranges_from_upper_bounds(["b", "d"]) == [PKRange(after=None, upper="b"), PKRange(after="b", upper="d")]
+    assert ranges_from_upper_bounds([]) == []
+
+
+def test_scan_ranges():
+    assert scan_ranges([(1, 4)], partitions=2, boundaries=ScanBoundaries.MIN_MAX) == split_pk_range(1, 4, 2)
+    assert scan_ranges([(None, None)], partitions=2, boundaries=ScanBoundaries.MIN_MAX) == []
+    assert scan_ranges([("b",), ("d",)], partitions=2, boundaries=ScanBoundaries.SAMPLED) == [
+        PKRange(after=None, upper="b"),
+        PKRange(after="b", upper="d"),
+    ]
+
+
+def test_scan_ranges__min_max_of_non_integer_keys():
+    with pytest.raises(ValueError):
+        scan_ranges([("a", "z")], partitions=2, boundaries=ScanBoundaries.MIN_MAX)
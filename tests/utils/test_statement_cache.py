@@ -0,0 +1,42 @@
+from ash_dal.utils import StatementCache
+from ash_dal.utils.statement_cache import specification_params, specification_shape, specification_template
+from sqlalchemy import literal
+
+COLUMN_KEYS = ("id", "name", "age")
+
+
+def test_specification_shape():
+    assert specification_shape({"name": "John", "age": None}, column_keys=COLUMN_KEYS) == (
+        ("age", True),
+        ("name", False),
+    )
+    assert specification_shape({}, column_keys=COLUMN_KEYS) == ()
+    # Relationships and SQL expressions aren't templated
+    assert specification_shape({"children": []}, column_keys=COLUMN_KEYS) is None
+    assert specification_shape({"age": literal(1)}, column_keys=COLUMN_KEYS) is None
+
+
+def test_specification_template_and_params():
+    shape = specification_shape({"name": "John", "age": None}, column_keys=COLUMN_KEYS)
+    template = specification_template(shape)
+    assert template["age"] is None
+    assert template["name"].key == "ash_dal_spec_name"
+    assert specification_params({"name": "John", "age": None}) == {"ash_dal_spec_name": "John"}
+
+
+def test_statement_cache():
+    cache = StatementCache(max_size=1)
+    built: list[str] = []
+
+    def build(value: str):
+        built.append(value)
+        return value
+
+    assert cache.get_or_build("a", lambda: build("a")) == "a"
+    assert cache.get_or_build("a", lambda: build("a")) == "a"
+    assert cache.get_or_build("b", lambda: build("b")) == "b"
+    assert built == ["a", "b"]
+    stats = cache.stats
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (1, 2, 1, 1)
+    cache.clear()
+    assert cache.stats.size == 0
@@ -0,0 +1,148 @@
+import sys
+import types
+from unittest import IsolatedAsyncioTestCase, mock
+
+import pytest
+from ash_dal.utils import InMemoryTracer, OpenTelemetryTracer
+from ash_dal.utils.instrumentation import instrument
+from ash_dal.utils.tracing import child_span, install_tracing, is_traced, set_span_attribute
+from sqlalchemy import create_engine, text
+
+
+class Service:
+    def __init__(self, tracer: InMemoryTracer | None):
+        self.__tracer__ = tracer
+
+    @instrument()
+    def read(self) -> bool:
+        set_span_attribute("ash_dal.engine", "replica")
+        with child_span("ash_dal.fetch", {"rows": 1}):
+            pass
+        return is_traced()
+
+    @instrument()
+    def read_twice(self) -> None:
+        self.read()
+        self.read()
+
+    @instrument()
+    def fail(self) -> None:
+        with child_span("ash_dal.fetch"):
+            raise RuntimeError()
+
+    @instrument()
+    async def aread(self) -> None:
+        with child_span("ash_dal.fetch"):
+            pass
+
+
+class Child:
+    __tracer__ = None
+
+    @instrument(inherit=True)
+    def read(self) -> None:
+        pass
+
+
+class Parent(Service):
+    @instrument()
+    def read_child(self) -> None:
+        Child().read()
+
+
+def test_instrument__span():
+    tracer = InMemoryTracer()
+    assert Service(tracer).read()
+    [span, fetch] = tracer.spans
+    assert span.name == "Service.read"
+    assert span.attributes == {"ash_dal.dao": "Service", "ash_dal.method": "read", "ash_dal.engine": "replica"}
+    assert span.children == [fetch]
+    assert (fetch.name, fetch.attributes, fetch.parent) == ("ash_dal.fetch", {"rows": 1}, span)
+    assert span.duration is not None and span.duration >= fetch.duration
+
+
+def test_instrument__nested_calls_of_same_object():
+    tracer = InMemoryTracer()
+    Service(tracer).read_twice()
+    [span] = tracer.root_spans
+    assert [child.name for child in span.children] == ["ash_dal.fetch", "ash_dal.fetch"]
+
+
+def test_instrument__inherits_tracer():
+    tracer = InMemoryTracer()
+    Parent(tracer).read_child()
+    [span] = tracer.root_spans
+    assert [child.name for child in span.children] == ["Child.read"]
+
+
+def test_instrument__error():
+    tracer = InMemoryTracer()
+    with pytest.raises(RuntimeError):
+        Service(tracer).fail()
+    assert all(isinstance(span.error, RuntimeError) for span in tracer.spans)
+
+
+def test_instrument__disabled():
+    assert not Service(None).read()
+    with child_span("ash_dal.fetch") as span:
+        assert span is None
+
+
+def test_install_tracing():
+    engine = create_engine("sqlite://")
+    install_tracing(engine)
+    tracer = InMemoryTracer()
+
+    class Reader:
+        __tracer__ = tracer
+
+        @instrument()
+        def read(self) -> None:
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+                with pytest.raises(Exception):
+                    connection.execute(text("SELECT * FROM missing"))
+
+    Reader().read()
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 2"))
+    [span] = tracer.root_spans
+    assert [(child.name, child.attributes["db.statement"]) for child in span.children] == [
+        ("ash_dal.execute", "SELECT 1"),
+        ("ash_dal.execute", "SELECT * FROM missing"),
+    ]
+    assert span.children[0].error is None
+    assert span.children[1].error is not None
+
+
+def test_open_telemetry_tracer():
+    trace = types.SimpleNamespace(
+        set_span_in_context=mock.Mock(return_value="context"),
+        Status=mock.Mock(return_value="status"),
+        StatusCode=types.SimpleNamespace(ERROR="error"),
+    )
+    otel = types.ModuleType("opentelemetry")
+    otel.trace = trace  # type: ignore
+    otel_tracer = mock.Mock()
+    with mock.patch.dict(sys.modules, {"opentelemetry": otel, "opentelemetry.trace": trace}):
+        tracer = OpenTelemetryTracer(otel_tracer)
+    with pytest.raises(RuntimeError):
+        Service(tracer).fail()  # type: ignore
+    root = otel_tracer.start_span.return_value
+    otel_tracer.start_span.assert_any_call(
+        "Service.fail", context=None, attributes={"ash_dal.dao": "Service", "ash_dal.method": "fail"}
+    )
+    otel_tracer.start_span.assert_any_call("ash_dal.fetch", context="context", attributes={})
+    trace.set_span_in_context.assert_called_with(root)
+    root.record_exception.assert_called()
+    root.set_status.assert_called_with("status")
+    root.end.assert_called()
+
+
+class AsyncTracingTestCase(IsolatedAsyncioTestCase):
+    async def test_instrument__async(self):
+        tracer = InMemoryTracer()
+        await Service(tracer).aread()
+        [span] = tracer.root_spans
+        assert span.name == "Service.aread"
+        assert [child.name for child in span.children] == ["ash_dal.fetch"]
@@ -0,0 +1,86 @@
+import pytest
+from ash_dal.exceptions.database import UnsupportedDialectError
+from ash_dal.utils import UpsertResult
+from ash_dal.utils.upsert import (
+    build_existing_rows_count_query,
+    build_upsert_statement,
+    dedupe_upsert_rows,
+    mysql_upsert_result,
+    upsert_result,
+)
+from parameterized import parameterized
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from tests.dao.infrastructure import ExampleORMModel
+
+TABLE = ExampleORMModel.__table__
+ROWS = [
+    {"id": 1, "firstName": "John", "lastName": "Doe", "age": 42},
+    {"id": 2, "firstName": "Jane", "lastName": "Doe", "age": 24},
+]
+
+
+def _build(dialect_name: str):
+    return build_upsert_statement(
+        TABLE,
+        dialect_name=dialect_name,
+        rows=ROWS,
+        update_columns=[TABLE.c.firstName, TABLE.c.age],
+        conflict_columns=[TABLE.c.id],
+    )
+
+
+def test_build_upsert_statement__mysql():
+    sql = str(_build("mysql").compile(dialect=mysql.dialect()))
+    assert "VALUES (%s, %s, %s, %s), (%s, %s, %s, %s)" in sql
+    assert sql.endswith("ON DUPLICATE KEY UPDATE `firstName` = VALUES(`firstName`), age = VALUES(age)")
+
+
+@parameterized.expand((("sqlite", sqlite.dialect()), ("postgresql", postgresql.dialect())))
+def test_build_upsert_statement__on_conflict(dialect_name, dialect):
+    sql = str(_build(dialect_name).compile(dialect=dialect))
+    assert 'ON CONFLICT (id) DO UPDATE SET "firstName" = excluded."firstName", age = excluded.age' in sql
+
+
+def test_build_upsert_statement__unsupported_dialect():
+    with pytest.raises(UnsupportedDialectError):
+        _build("mssql")
+
+
+@parameterized.expand(
+    (
+        (3, 3, UpsertResult(inserted=3, updated=0)),
+        (3, 5, UpsertResult(inserted=1, updated=2)),
+        (3, 6, UpsertResult(inserted=0, updated=3)),
+    )
+)
+def test_mysql_upsert_result(rows_count, affected_rows, expected):
+    assert mysql_upsert_result(rows_count=rows_count, affected_rows=affected_rows) == expected
+
+
+def test_upsert_result__add():
+    assert UpsertResult(inserted=1, updated=2) + UpsertResult(inserted=3) == UpsertResult(inserted=4, updated=2)
+
+
+def test_upsert_result__on_conflict():
+    result = upsert_result("sqlite", rows_count=3, affected_rows=3, existing_rows_count=1)
+    assert result == UpsertResult(inserted=2, updated=1)
+    assert upsert_result("mysql", rows_count=3, affected_rows=5, existing_rows_count=0) == mysql_upsert_result(3, 5)
+
+
+def test_build_existing_rows_count_query():
+    rows = [{"id": 1, "first_name": "John"}, {"first_name": "Jane"}]
+    query = build_existing_rows_count_query(ExampleORMModel, rows, conflict_fields=("id",))
+    compiled = query.compile(dialect=sqlite.dialect(), compile_kwargs={"render_postcompile": True})
+    assert str(compiled).endswith("WHERE example_table.id IN (?)")
+    assert build_existing_rows_count_query(ExampleORMModel, rows[1:], conflict_fields=("id",)) is None
+
+
+def test_dedupe_upsert_rows():
+    rows = [{"id": 1, "age": 1}, {"age": 2}, {"id": 1, "age": 3}, {"age": 4}, {"id": 2, "age": 5}]
+    assert dedupe_upsert_rows(rows, conflict_fields=("id",)) == [
+        {"id": 1, "age": 3},
+        {"age": 2},
+        {"age": 4},
+        {"id": 2, "age": 5},
+    ]